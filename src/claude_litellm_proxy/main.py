@@ -7,29 +7,69 @@ Claude Code SDK와 호환되는 HTTP 프록시 서버
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 import os
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Optional, Union
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
 # 통합 마스킹 시스템
+from .patterns.cloud_patterns import get_compiled_pattern_set
+from .patterns.parallel_scanner import DEFAULT_OFFLOAD_THRESHOLD
+from .proxy.content_walker import apply_leaves, collect_content_leaves, collect_tool_leaves, extract_subtree
 from .proxy.integrated_masking import IntegratedMaskingSystem
 from .proxy.litellm_client import LiteLLMClient
+from .proxy.message_mask_cache import MessageMaskCache
+from .proxy.redis_connection import RedisConnectionOptions
+from .proxy.sharded_mapping_store import parse_shard_nodes
+from .proxy.stream_unmasker import (
+    format_ndjson_event,
+    format_sse_event,
+    unmask_event_stream,
+    unmask_json_value,
+)
+from .proxy.token_codec import TokenCodec, parse_token_keys
 from .sdk.claude_code_client import ClaudeCodeHeadlessClient
+from .sdk.stream_json import DEFAULT_MAX_LINE_BYTES
+from .sdk.worker_pool import ClaudeWorkerPool, JobOptions, PoolSaturatedError
+from .utils.health import HealthMonitor
 from .utils.logging import setup_logger
+from .utils.metrics import (
+    IN_FLIGHT_REQUESTS,
+    REGISTRY,
+    UPSTREAM_ERRORS,
+    CollectedMetric,
+    InFlightMiddleware,
+)
+from .utils.request_timing import (
+    RequestTimingMiddleware,
+    RequestTimingSettings,
+    record_count,
+    stage_timer,
+    trace_stage,
+)
 
 # 로거 설정
 logger = setup_logger(__name__)
 
+# 패턴 집합은 import 시 한 번 컴파일 (gunicorn --preload 등 프리포크 시 워커가 copy-on-write로 공유)
+get_compiled_pattern_set()
+
 # 전역 시스템들
 masking_system: Optional[IntegratedMaskingSystem] = None
 litellm_client: Optional[LiteLLMClient] = None
 claude_code_client: Optional[ClaudeCodeHeadlessClient] = None
+claude_worker_pool: Optional[ClaudeWorkerPool] = None
+health_monitor: Optional[HealthMonitor] = None
+message_mask_cache: Optional[MessageMaskCache] = None
+
+# /v1/claude-code 기본 허용 도구 (warm 워커 옵션과 동일해야 재사용됨)
+DEFAULT_ALLOWED_TOOLS = ["Read", "Write", "Bash"]
 
 # 보안 스키마
 security = HTTPBearer()
@@ -38,7 +78,7 @@ security = HTTPBearer()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """애플리케이션 생명주기 관리"""
-    global masking_system, litellm_client, claude_code_client
+    global masking_system, litellm_client, claude_code_client, claude_worker_pool, health_monitor, message_mask_cache
     
     # 시작 시 초기화
     logger.info("🚀 Claude Code SDK + LiteLLM 프록시 서버 시작")
@@ -47,12 +87,56 @@ async def lifespan(app: FastAPI):
     redis_host = os.getenv("REDIS_HOST", "localhost")
     redis_port = int(os.getenv("REDIS_PORT", "6379"))
     redis_db = int(os.getenv("REDIS_DB", "0"))
+    redis_options = RedisConnectionOptions(
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
+        pool_timeout=float(os.getenv("REDIS_POOL_TIMEOUT", "5")),
+        socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "5")),
+        connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "2")),
+        socket_keepalive=os.getenv("REDIS_SOCKET_KEEPALIVE", "true").lower() == "true",
+        health_check_interval=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30")),
+        retry_attempts=int(os.getenv("REDIS_RETRY_ATTEMPTS", "3")),
+        retry_backoff_base=float(os.getenv("REDIS_RETRY_BACKOFF_BASE", "0.05")),
+        retry_backoff_cap=float(os.getenv("REDIS_RETRY_BACKOFF_CAP", "1")),
+        unix_socket_path=os.getenv("REDIS_UNIX_SOCKET") or None,
+        protocol=int(os.getenv("REDIS_PROTOCOL", "2"))
+    )
+    
+    # 토큰 모드 (MASKING_TOKEN_MODE=encrypted면 저장소 없는 키 기반 가역 토큰)
+    token_codec = None
+    if os.getenv("MASKING_TOKEN_MODE", "counter") == "encrypted":
+        active_key_id = os.getenv("MASKING_TOKEN_ACTIVE_KEY_ID")
+        token_codec = TokenCodec(
+            parse_token_keys(os.getenv("MASKING_TOKEN_KEYS", "")),
+            active_key_id=int(active_key_id) if active_key_id else None
+        )
+        logger.info(f"🔐 암호화 토큰 모드 (키 ID {token_codec.active_key_id})")
+    
+    # 대화 메시지 마스킹 캐시 (MESSAGE_MASK_CACHE_SIZE=0이면 매 턴 전체 재스캔)
+    message_cache_size = int(os.getenv("MESSAGE_MASK_CACHE_SIZE", "5000"))
+    if message_cache_size > 0:
+        message_mask_cache = MessageMaskCache(
+            max_entries=message_cache_size,
+            max_bytes=int(os.getenv("MESSAGE_MASK_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.getenv("MESSAGE_MASK_CACHE_TTL", "3600"))
+        )
     
     # 마스킹 시스템 초기화
     masking_system = IntegratedMaskingSystem(
         redis_host=redis_host,
         redis_port=redis_port,
-        redis_db=redis_db
+        redis_db=redis_db,
+        redis_password=os.getenv("REDIS_PASSWORD") or None,
+        redis_options=redis_options,
+        redis_shards=parse_shard_nodes(os.getenv("REDIS_SHARDS", "")) or None,
+        redis_shard_sub_tags=int(os.getenv("REDIS_SHARD_SUB_TAGS", "1")),
+        cache_size=int(os.getenv("MAPPING_CACHE_SIZE", "10000")),
+        cache_ttl=float(os.getenv("MAPPING_CACHE_TTL", "300")),
+        scan_offload_threshold=int(os.getenv("SCAN_OFFLOAD_THRESHOLD", str(DEFAULT_OFFLOAD_THRESHOLD))),
+        scan_workers=int(os.getenv("SCAN_WORKERS", "0")) or None,
+        token_codec=token_codec,
+        token_audit=os.getenv("MASKING_TOKEN_AUDIT", "false").lower() == "true",
+        mapping_ttl=int(os.getenv("MAPPING_TTL", "0")) or None,
+        message_mask_cache=message_mask_cache
     )
     logger.info("✅ 마스킹 시스템 초기화 완료")
     
@@ -67,16 +151,75 @@ async def lifespan(app: FastAPI):
         proxy_url=proxy_url,
         auth_token=auth_token
     )
+    
+    # Claude Code CLI 워커 풀 (CLAUDE_CODE_POOL_SIZE=0이면 요청마다 프로세스 생성)
+    pool_size = int(os.getenv("CLAUDE_CODE_POOL_SIZE", "0"))
+    if pool_size > 0:
+        claude_worker_pool = ClaudeWorkerPool(
+            options=JobOptions(allowed_tools=tuple(DEFAULT_ALLOWED_TOOLS)),
+            size=pool_size,
+            max_jobs_per_worker=int(os.getenv("CLAUDE_CODE_POOL_MAX_JOBS", "1")),
+            max_queue=int(os.getenv("CLAUDE_CODE_POOL_MAX_QUEUE", "8")),
+            job_timeout=int(os.getenv("API_TIMEOUT_MS", "30000")) / 1000
+        )
+        await claude_worker_pool.start()
+        claude_code_client.worker_pool = claude_worker_pool
     logger.info("✅ Claude Code SDK 클라이언트 초기화 완료")
     
+    # 백그라운드 헬스 프로버 (프로브 요청은 캐시만 읽음)
+    health_monitor = build_health_monitor()
+    await health_monitor.start()
+    
     yield
     
     # 종료 시 정리
+    if health_monitor:
+        await health_monitor.stop()
+    
+    if claude_worker_pool:
+        await claude_worker_pool.close()
+        logger.info("🔄 Claude Code 워커 풀 종료 완료")
+    
     if masking_system:
         await masking_system.close()
         logger.info("🔄 마스킹 시스템 종료 완료")
 
 
+def build_health_monitor() -> HealthMonitor:
+    """
+    컴포넌트 헬스 프로버 구성
+    
+    - redis: PING만 (매핑 읽기/쓰기 없음), 필수 (감사 없는 암호화 토큰 모드에서는 선택)
+    - upstream: Claude API 주소 TCP 연결만 (completion 호출/과금 없음), 필수
+    - claude_code: CLI 실행 파일 존재 확인 (프로세스 생성 없음), 선택
+    """
+    global masking_system, litellm_client, claude_code_client
+    
+    monitor = HealthMonitor(
+        interval=float(os.getenv("HEALTH_CHECK_INTERVAL", "5")),
+        ttl=float(os.getenv("HEALTH_CHECK_TTL", "15")),
+        check_timeout=float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    )
+    
+    if masking_system:
+        async def check_redis() -> Dict[str, Any]:
+            if not await masking_system.mapping_store.ping():
+                raise ConnectionError("Redis PING 실패")
+            return {}
+        
+        # 감사 없는 암호화 토큰 모드는 Redis 없이도 요청 처리 가능
+        stateless = masking_system.token_codec is not None and not masking_system.token_audit
+        monitor.register("redis", check_redis, required=not stateless)
+    
+    if litellm_client:
+        monitor.register("upstream", litellm_client.check_connectivity)
+    
+    if claude_code_client:
+        monitor.register("claude_code", claude_code_client.check_cli, required=False)
+    
+    return monitor
+
+
 # FastAPI 앱 생성
 app = FastAPI(
     title="Claude LiteLLM Proxy",
@@ -94,6 +237,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 처리 중 요청 수 (스트리밍은 본문 전송 완료까지)
+app.add_middleware(
+    InFlightMiddleware,
+    gauge=IN_FLIGHT_REQUESTS,
+    paths=["/v1/messages", "/v1/claude-code", "/v1/claude-code/analyze"],
+)
+
+# 요청별 Server-Timing 헤더 / 느린 요청 로그 (설정은 실행 중 변경 가능)
+request_timing_settings = RequestTimingSettings.from_env()
+app.add_middleware(
+    RequestTimingMiddleware,
+    settings=request_timing_settings,
+    paths=["/v1/messages", "/v1/claude-code", "/v1/claude-code/analyze"],
+)
+
+
+def collect_component_metrics() -> list[CollectedMetric]:
+    """스크레이프 시 캐시 적중/워커 풀 상태를 기존 통계에서 읽어 메트릭으로 변환"""
+    global masking_system, message_mask_cache, claude_worker_pool
+    
+    hits = CollectedMetric("proxy_cache_hits_total", "counter", "캐시 적중 수", "cache")
+    misses = CollectedMetric("proxy_cache_misses_total", "counter", "캐시 미스 수", "cache")
+    if masking_system:
+        mapping_cache = masking_system.mapping_store.get_cache_statistics()
+        if mapping_cache.get("enabled"):
+            hits.values["mapping"] = mapping_cache["hits"]
+            misses.values["mapping"] = mapping_cache["misses"]
+    if message_mask_cache is not None:
+        message_cache = message_mask_cache.get_statistics()
+        hits.values["message"] = message_cache["hits"]
+        misses.values["message"] = message_cache["misses"]
+    
+    collected = [hits, misses]
+    if masking_system:
+        collected.append(CollectedMetric(
+            "proxy_redis_pool_connections", "gauge", "Redis 연결 풀 상태별 연결 수", "state",
+            dict(masking_system.mapping_store.get_pool_statistics())
+        ))
+    if claude_worker_pool:
+        pool = claude_worker_pool.get_statistics()
+        collected.append(CollectedMetric(
+            "proxy_headless_pool_workers", "gauge", "Claude Code 워커 풀 상태별 워커 수", "state",
+            {"idle": pool["idle"], "busy": max(pool["size"] - pool["idle"], 0), "size": pool["size"]}
+        ))
+        collected.append(CollectedMetric(
+            "proxy_headless_pool_waiting", "gauge", "워커를 기다리는 작업 수", "pool", {"default": pool["waiting"]}
+        ))
+    return collected
+
+
+REGISTRY.register_collector("components", collect_component_metrics)
+
 
 async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """API 키 검증"""
@@ -109,67 +304,59 @@ async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(sec
     return credentials.credentials
 
 
+@app.get("/health/live")
+async def liveness_check() -> Dict[str, Any]:
+    """Liveness 프로브 (I/O 없음 - 이벤트 루프가 응답하면 alive)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready", response_model=None)
+async def readiness_check() -> Union[Dict[str, Any], JSONResponse]:
+    """Readiness 프로브 (백그라운드 프로버 캐시만 조회, 필수 컴포넌트 이상 시 503)"""
+    global health_monitor
+    
+    if not health_monitor:
+        return JSONResponse(status_code=503, content={"ready": False, "components": {}})
+    
+    snapshot = health_monitor.snapshot()
+    if not snapshot["ready"]:
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus 메트릭 (단계별 지연 히스토그램, 매치/오류 카운터, in-flight/워커 풀 게이지)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
-    """헬스체크 엔드포인트"""
-    global masking_system, litellm_client, claude_code_client
+    """헬스체크 엔드포인트 (캐시된 컴포넌트 상태 요약 - LLM 호출/CLI 실행 없음)"""
+    global masking_system, health_monitor, message_mask_cache
     
-    try:
-        # 마스킹 시스템 상태 확인
-        masking_status = "healthy" if masking_system else "not_initialized"
-        
-        # Redis 연결 확인
-        redis_status = "unknown"
-        if masking_system:
-            try:
-                # 간단한 매핑 테스트
-                test_masked, test_mapping = await masking_system.mask_text("test")
-                redis_status = "healthy" if test_mapping or test_masked == "test" else "error"
-            except Exception as e:
-                logger.error(f"Redis 상태 확인 실패: {e}")
-                redis_status = "error"
-        
-        # LiteLLM 클라이언트 상태 확인
-        litellm_status = "not_initialized"
-        if litellm_client:
-            litellm_health = await litellm_client.health_check()
-            litellm_status = litellm_health["status"]
-        
-        # Claude Code SDK 클라이언트 상태 확인 (Phase 3)
-        claude_code_status = "not_initialized"
-        if claude_code_client:
-            try:
-                claude_health = await claude_code_client.health_check()
-                claude_code_status = claude_health["status"]
-            except Exception as e:
-                logger.error(f"Claude Code SDK 상태 확인 실패: {e}")
-                claude_code_status = "error"
-        
-        return {
-            "status": "healthy",
-            "masking_engine": masking_status,
-            "redis_connection": redis_status,
-            "litellm_client": litellm_status,
-            "claude_code_sdk": claude_code_status,
-            "version": "0.1.0"
-        }
+    def component(name: str) -> str:
+        return health_monitor.component_status(name) if health_monitor else "not_initialized"
     
-    except Exception as e:
-        logger.error(f"헬스체크 실패: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Health check failed: {str(e)}"
-        )
+    return {
+        "status": "healthy" if health_monitor and health_monitor.is_ready() else "degraded",
+        "masking_engine": "healthy" if masking_system else "not_initialized",
+        "redis_connection": component("redis"),
+        "litellm_client": component("upstream"),
+        "claude_code_sdk": component("claude_code"),
+        "message_mask_cache": message_mask_cache.get_statistics() if message_mask_cache is not None else {"enabled": False},
+        "version": "0.1.0"
+    }
 
 
-@app.post("/v1/messages")
+@app.post("/v1/messages", response_model=None)
 async def claude_messages_proxy(
     request: Request,
     api_key: str = Depends(verify_api_key)
-) -> Dict[str, Any]:
+) -> Union[JSONResponse, StreamingResponse]:
     """
     Claude API /v1/messages 엔드포인트 프록시
-    민감정보 마스킹 적용
+    민감정보 마스킹 적용 ("stream": true면 SSE 스트리밍 + 점진적 언마스킹)
     """
     global masking_system, litellm_client
     
@@ -187,21 +374,34 @@ async def claude_messages_proxy(
     
     try:
         # 요청 본문 파싱
-        request_data = await request.json()
+        with stage_timer("body_parse"):
+            request_data = await request.json()
         
         logger.info(f"Claude API 요청 수신: model={request_data.get('model', 'unknown')}")
         
         # 요청에서 민감정보 마스킹
-        masked_request, request_mappings = await mask_request_content(request_data)
+        with trace_stage("mask"):
+            masked_request, request_mappings = await mask_request_content(request_data)
+        record_count("mappings", len(request_mappings))
+        
+        if request_data.get("stream"):
+            return await stream_messages_response(masked_request, request_mappings)
         
         # 실제 LiteLLM을 통한 Claude API 호출
-        claude_response = await litellm_client.call_claude_api(masked_request)
+        try:
+            with stage_timer("upstream"):
+                claude_response = await litellm_client.call_claude_api(masked_request)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(type(e).__name__)
+            raise
         
         # 응답에서 민감정보 복원
-        unmasked_response = await unmask_response_content(claude_response, request_mappings)
+        with stage_timer("unmask"):
+            unmasked_response = await unmask_response_content(claude_response, request_mappings)
         
         logger.info("Claude API 응답 처리 완료")
-        return unmasked_response
+        with stage_timer("serialize"):
+            return JSONResponse(content=unmasked_response)
     
     except Exception as e:
         logger.error(f"Claude API 프록시 오류: {e}")
@@ -211,73 +411,155 @@ async def claude_messages_proxy(
         )
 
 
+async def stream_messages_response(
+    masked_request: Dict[str, Any],
+    mappings: Dict[str, str]
+) -> StreamingResponse:
+    """
+    SSE 스트리밍 응답 생성
+    
+    upstream 이벤트를 받는 즉시 언마스킹해서 내보내며,
+    잘린 토큰일 수 있는 꼬리만 다음 청크까지 보류
+    첫 이벤트(upstream 연결 성립)까지는 기다려서 연결 오류는 HTTP 오류로 반환
+    """
+    global masking_system, litellm_client
+    
+    async def unmask(text: str) -> str:
+        # 스트리밍 언마스킹은 본문 전송 중 누적 (느린 요청 로그에 반영)
+        with trace_stage("unmask"):
+            return await masking_system.unmask_text(text, mappings)
+    
+    events = litellm_client.stream_claude_api(masked_request)
+    if mappings:
+        # 비스트리밍 경로와 동일하게 마스킹된 내용이 있을 때만 언마스킹
+        events = unmask_event_stream(events, unmask)
+    try:
+        # 첫 이벤트까지 = upstream 연결 + 첫 응답 시간
+        with stage_timer("upstream"):
+            first_event = await events.__anext__()
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(type(e).__name__)
+        raise
+    
+    async def sse_body() -> AsyncIterator[str]:
+        yield format_sse_event(first_event)
+        try:
+            async for event in events:
+                yield format_sse_event(event)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(type(e).__name__)
+            logger.error(f"Claude API 스트리밍 오류: {e}")
+            yield format_sse_event({
+                "type": "error",
+                "error": {"type": "api_error", "message": str(e)}
+            })
+    
+    return StreamingResponse(
+        sse_body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 async def mask_request_content(request_data: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, str]]:
-    """요청 내용에서 민감정보 마스킹"""
-    global masking_system
+    """
+    요청 내용에서 민감정보 마스킹
     
-    all_mappings = {}
-    masked_request = request_data.copy()
+    messages[].content, system, tools의 문자열 leaf만 구조를 따라 수집하여
+    한 번에 마스킹하고 바뀐 경로만 복사 (image/base64 블록은 건너뜀)
+    이전 턴에서 마스킹한 구간은 message_mask_cache에서 재사용
+    """
+    global masking_system, message_mask_cache
     
-    # messages 배열 처리
-    if "messages" in request_data and isinstance(request_data["messages"], list):
-        masked_messages = []
-        
-        for message in request_data["messages"]:
+    # 마스킹 구간: (경로, 캐시 role, 값, leaf 수집 함수)
+    sections = []
+    messages = request_data.get("messages")
+    if isinstance(messages, list):
+        for index, message in enumerate(messages):
             if isinstance(message, dict) and "content" in message:
-                # 내용 마스킹
-                masked_content, mappings = await masking_system.mask_text(message["content"])
+                sections.append((
+                    ("messages", index, "content"), message.get("role"), message["content"], collect_content_leaves
+                ))
+    if "system" in request_data:
+        sections.append((("system",), "system", request_data["system"], collect_content_leaves))
+    if "tools" in request_data:
+        sections.append((("tools",), "tools", request_data["tools"], collect_tool_leaves))
+    
+    all_mappings: Dict[str, str] = {}
+    replacements = []
+    leaves = []
+    pending = []  # (구간 경로, 캐시 키, leaf 범위)
+    
+    for path, role, value, collect in sections:
+        # 이전 턴에서 이미 마스킹한 구간은 재사용, 새 구간만 스캔
+        cache_key = None
+        if message_mask_cache is not None:
+            cache_key = message_mask_cache.key_for({"role": role, "content": value}, masking_system.cache_namespace)
+            cached = message_mask_cache.get(cache_key, len(value) if isinstance(value, str) else 0)
+            if cached is not None:
+                masked_value, mappings = cached
                 all_mappings.update(mappings)
-                
-                # 마스킹된 메시지 생성
-                masked_message = message.copy()
-                masked_message["content"] = masked_content
-                masked_messages.append(masked_message)
-            else:
-                masked_messages.append(message)
+                if masked_value is not value:
+                    replacements.append((path, masked_value))
+                continue
         
-        masked_request["messages"] = masked_messages
+        first = len(leaves)
+        collect(value, path, leaves)
+        pending.append((path, cache_key, first, len(leaves)))
+    
+    # 새 구간의 모든 leaf를 한 번에 마스킹 (Redis 1 round-trip)
+    results = await masking_system.mask_texts([text for _, text in leaves])
+    for (leaf_path, text), (masked_text, mappings) in zip(leaves, results):
+        all_mappings.update(mappings)
+        if masked_text != text:
+            replacements.append((leaf_path, masked_text))
+    
+    masked_request = apply_leaves(request_data, replacements)
+    
+    if message_mask_cache is not None:
+        for path, cache_key, first, last in pending:
+            section_mappings: Dict[str, str] = {}
+            for _, mappings in results[first:last]:
+                section_mappings.update(mappings)
+            message_mask_cache.put(
+                cache_key, extract_subtree(masked_request, path), section_mappings, ttl=masking_system.mapping_ttl
+            )
     
     return masked_request, all_mappings
 
 
 async def unmask_response_content(response_data: Dict[str, Any], mappings: Dict[str, str]) -> Dict[str, Any]:
-    """응답 내용에서 민감정보 복원"""
+    """응답 내용에서 민감정보 복원 (요청 범위 매핑 우선, 없는 토큰만 Redis 조회)"""
     global masking_system
     
     if not mappings:
         return response_data
     
-    unmasked_response = response_data.copy()
+    # 요청과 같은 walker로 content의 text / tool_use input 문자열 leaf 수집
+    # (tool_use input이 마스킹된 채로 가면 Claude Code가 가짜 ID로 도구를 실행)
+    leaves = []
+    if isinstance(response_data.get("content"), list):
+        collect_content_leaves(response_data["content"], ("content",), leaves)
     
-    # content 배열 처리 (Claude API 응답 형식)
-    if "content" in response_data and isinstance(response_data["content"], list):
-        unmasked_content = []
-        
-        for content_item in response_data["content"]:
-            if isinstance(content_item, dict) and "text" in content_item:
-                # 텍스트 내용 복원
-                unmasked_text = await masking_system.unmask_text(content_item["text"])
-                
-                unmasked_item = content_item.copy()
-                unmasked_item["text"] = unmasked_text
-                unmasked_content.append(unmasked_item)
-            else:
-                unmasked_content.append(content_item)
-        
-        unmasked_response["content"] = unmasked_content
+    replacements = []
+    for path, text in leaves:
+        unmasked_text = await masking_system.unmask_text(text, mappings)
+        if unmasked_text != text:
+            replacements.append((path, unmasked_text))
     
-    return unmasked_response
+    return apply_leaves(response_data, replacements)
 
 
 
 
-@app.post("/v1/claude-code")
+@app.post("/v1/claude-code", response_model=None)
 async def claude_code_headless_proxy(
     request: Request,
     api_key: str = Depends(verify_api_key)
-) -> Dict[str, Any]:
+) -> Union[Dict[str, Any], StreamingResponse]:
     """
     Claude Code SDK headless 모드 프록시 엔드포인트 (Phase 3-2: 마스킹 통합)
+    ("stream": true면 stream-json 이벤트를 SSE 또는 NDJSON으로 스트리밍)
     
     완전한 플로우:
     Claude Code SDK (-p headless) 
@@ -316,7 +598,9 @@ async def claude_code_headless_proxy(
         
         # Phase 3-2: 요청 프롬프트에서 민감정보 마스킹
         logger.info("🎭 요청 마스킹 시작...")
-        masked_prompt, prompt_mappings = await masking_system.mask_text(prompt)
+        with trace_stage("mask"):
+            masked_prompt, prompt_mappings = await masking_system.mask_text(prompt)
+        record_count("mappings", len(prompt_mappings))
         
         if prompt_mappings:
             logger.info(f"🔒 민감정보 {len(prompt_mappings)}개 마스킹됨")
@@ -326,24 +610,43 @@ async def claude_code_headless_proxy(
         masked_request_data = request_data.copy()
         masked_request_data["prompt"] = masked_prompt
         
-        result = await claude_code_client.query_headless(
-            prompt=masked_prompt,
-            allowed_tools=request_data.get("allowed_tools", ["Read", "Write", "Bash"]),
-            system_prompt=request_data.get("system_prompt"),
-            working_directory=request_data.get("working_directory")
-        )
+        if request_data.get("stream"):
+            return await stream_claude_code_response(
+                masked_request_data,
+                prompt_mappings,
+                ndjson="application/x-ndjson" in request.headers.get("accept", "")
+                or request_data.get("stream_format") == "ndjson"
+            )
+        
+        with trace_stage("upstream"):
+            result = await claude_code_client.query_headless(
+                prompt=masked_prompt,
+                allowed_tools=request_data.get("allowed_tools", DEFAULT_ALLOWED_TOOLS),
+                system_prompt=request_data.get("system_prompt"),
+                working_directory=request_data.get("working_directory")
+            )
         
         # Phase 3-2: 응답에서 민감정보 복원
         logger.info("🔓 응답 언마스킹 시작...")
         if result and "content" in result and result["content"]:
-            for content_item in result["content"]:
-                if "text" in content_item:
-                    # 응답 텍스트 언마스킹
-                    content_item["text"] = await masking_system.unmask_text(content_item["text"])
+            with trace_stage("unmask"):
+                for content_item in result["content"]:
+                    if "text" in content_item:
+                        # 응답 텍스트 언마스킹
+                        content_item["text"] = await masking_system.unmask_text(
+                            content_item["text"], prompt_mappings
+                        )
         
         logger.info("Claude Code SDK 응답 처리 완료 (마스킹/언마스킹 포함)")
         return result
     
+    except PoolSaturatedError as e:
+        logger.warning(f"Claude Code 워커 풀 포화: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Claude Code workers busy: {str(e)}",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Claude Code SDK 프록시 오류: {e}")
         raise HTTPException(
@@ -352,6 +655,72 @@ async def claude_code_headless_proxy(
         )
 
 
+async def stream_claude_code_response(
+    masked_request_data: Dict[str, Any],
+    mappings: Dict[str, str],
+    ndjson: bool = False
+) -> StreamingResponse:
+    """
+    Claude Code SDK stream-json 이벤트 스트리밍 응답 생성
+    
+    CLI stdout을 한 줄씩 읽어 이벤트마다 언마스킹 후 바로 전달
+    (한 줄 최대 크기 CLAUDE_CODE_STREAM_MAX_LINE_BYTES로 메모리 제한)
+    첫 이벤트까지는 기다려서 CLI 실행 오류는 HTTP 오류로 반환
+    
+    Args:
+        masked_request_data: 프롬프트가 마스킹된 요청 본문
+        mappings: 요청 범위 마스킹 매핑 (언마스킹 시 우선 사용)
+        ndjson: True면 NDJSON, False면 SSE
+    """
+    global masking_system, claude_code_client
+    
+    async def unmask(text: str) -> str:
+        # 스트리밍 언마스킹은 본문 전송 중 누적 (느린 요청 로그에 반영)
+        with trace_stage("unmask"):
+            return await masking_system.unmask_text(text, mappings)
+    
+    events = claude_code_client.stream_headless(
+        prompt=masked_request_data["prompt"],
+        allowed_tools=masked_request_data.get("allowed_tools", DEFAULT_ALLOWED_TOOLS),
+        system_prompt=masked_request_data.get("system_prompt"),
+        working_directory=masked_request_data.get("working_directory"),
+        max_line_bytes=int(os.getenv("CLAUDE_CODE_STREAM_MAX_LINE_BYTES", str(DEFAULT_MAX_LINE_BYTES)))
+    )
+    try:
+        with trace_stage("upstream"):
+            first_event: Optional[Dict[str, Any]] = await events.__anext__()
+    except StopAsyncIteration:
+        first_event = None
+    
+    format_event = format_ndjson_event if ndjson else format_sse_event
+    
+    async def render(event: Dict[str, Any]) -> str:
+        if mappings:
+            event = await unmask_json_value(event, unmask)
+        return format_event(event)
+    
+    async def body() -> AsyncIterator[str]:
+        try:
+            if first_event is not None:
+                yield await render(first_event)
+                async for event in events:
+                    yield await render(event)
+        except Exception as e:
+            logger.error(f"Claude Code SDK 스트리밍 오류: {e}")
+            yield await render({
+                "type": "error",
+                "error": {"type": "api_error", "message": str(e)}
+            })
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson" if ndjson else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/v1/claude-code/analyze")
 async def claude_code_analyze_proxy(
     request: Request,
@@ -393,33 +762,48 @@ async def claude_code_analyze_proxy(
         logger.info(f"Claude Code SDK 코드 분석 요청: {code_path}")
         
         # Phase 3-2: specific_prompt가 있으면 마스킹 처리
+        prompt_mappings: Dict[str, str] = {}
         if specific_prompt:
             logger.info("🎭 분석 프롬프트 마스킹 시작...")
-            masked_prompt, prompt_mappings = await masking_system.mask_text(specific_prompt)
+            with trace_stage("mask"):
+                masked_prompt, prompt_mappings = await masking_system.mask_text(specific_prompt)
             
             if prompt_mappings:
                 logger.info(f"🔒 분석 프롬프트에서 민감정보 {len(prompt_mappings)}개 마스킹됨")
             
             specific_prompt = masked_prompt
         
+        record_count("mappings", len(prompt_mappings))
+        
         # 코드 분석 실행 (마스킹된 프롬프트 사용)
-        result = await claude_code_client.analyze_code(
-            code_path=code_path,
-            analysis_type=analysis_type,
-            specific_prompt=specific_prompt
-        )
+        with trace_stage("upstream"):
+            result = await claude_code_client.analyze_code(
+                code_path=code_path,
+                analysis_type=analysis_type,
+                specific_prompt=specific_prompt
+            )
         
         # Phase 3-2: 분석 결과에서 민감정보 복원
         logger.info("🔓 분석 결과 언마스킹 시작...")
         if result and "content" in result and result["content"]:
-            for content_item in result["content"]:
-                if "text" in content_item:
-                    # 분석 결과 텍스트 언마스킹
-                    content_item["text"] = await masking_system.unmask_text(content_item["text"])
+            with trace_stage("unmask"):
+                for content_item in result["content"]:
+                    if "text" in content_item:
+                        # 분석 결과 텍스트 언마스킹
+                        content_item["text"] = await masking_system.unmask_text(
+                            content_item["text"], prompt_mappings
+                        )
         
         logger.info("Claude Code SDK 코드 분석 완료 (마스킹/언마스킹 포함)")
         return result
     
+    except PoolSaturatedError as e:
+        logger.warning(f"Claude Code 워커 풀 포화: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Claude Code workers busy: {str(e)}",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Claude Code SDK 코드 분석 오류: {e}")
         raise HTTPException(
@@ -436,6 +820,8 @@ async def root():
         "version": "0.1.0",
         "endpoints": {
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
             "claude_api": "/v1/messages",
             "claude_code_headless": "/v1/claude-code",
             "claude_code_analyze": "/v1/claude-code/analyze"
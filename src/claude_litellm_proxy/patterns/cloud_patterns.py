@@ -7,15 +7,19 @@ ref-1 Kong 플러그인의 patterns.lua를 Python으로 포팅
 
 import re
 import ipaddress
+import threading
 from dataclasses import dataclass
-from typing import Callable, Dict, List, NamedTuple, Optional, Any, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Any, Tuple
 
+from .literal_prefilter import required_literals
 from .overlap_detection import OverlapDetectionEngine
+from .pattern_scanner import PatternScanner
 
 
-@dataclass
+@dataclass(frozen=True)
 class PatternDefinition:
-    """패턴 정의 클래스"""
+    """패턴 정의 클래스 (불변 - 프로세스 전역 패턴 집합에서 공유)"""
 
     pattern: str  # 정규식 패턴
     replacement: str  # 대체 형식 (예: "ec2-{:03d}")
@@ -25,16 +29,120 @@ class PatternDefinition:
     validator: Optional[Callable[[str], Tuple[bool, str]]] = None  # 추가 검증 함수
 
 
+@dataclass(frozen=True)
+class CompiledPatternSet:
+    """
+    컴파일된 패턴 집합 (불변, 프로세스 전역 공유)
+
+    패턴 정의, 컴파일된 정규식, 우선순위 정렬, 프리필터 앵커를 한 번만 만들어
+    모든 CloudPatterns 인스턴스(MaskingEngine, IntegratedMaskingSystem, 테스트 도구)가 공유
+    프리포크 서버는 fork 전에 만들어 두면 워커가 copy-on-write로 공유함
+    """
+
+    patterns: Mapping[str, PatternDefinition]
+    compiled: Mapping[str, re.Pattern]
+    sorted_patterns: Tuple[Tuple[str, PatternDefinition], ...]
+    anchors: Mapping[str, Tuple[str, ...]]  # 정규식 문자열 → 프리필터 필수 리터럴
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        """프로세스 풀 워커로 전달 (MappingProxyType은 pickle 불가 → dict로 보내고 다시 감쌈)"""
+        return _restore_pattern_set, (
+            dict(self.patterns), dict(self.compiled), self.sorted_patterns, dict(self.anchors)
+        )
+
+
+def _restore_pattern_set(
+    patterns: Dict[str, PatternDefinition],
+    compiled: Dict[str, re.Pattern],
+    sorted_patterns: Tuple[Tuple[str, PatternDefinition], ...],
+    anchors: Dict[str, Tuple[str, ...]]
+) -> CompiledPatternSet:
+    return CompiledPatternSet(
+        patterns=MappingProxyType(patterns),
+        compiled=MappingProxyType(compiled),
+        sorted_patterns=sorted_patterns,
+        anchors=MappingProxyType(anchors),
+    )
+
+
+_shared_pattern_set: Optional[CompiledPatternSet] = None
+_shared_pattern_set_lock = threading.Lock()
+
+
+def get_compiled_pattern_set() -> CompiledPatternSet:
+    """
+    프로세스 전역 컴파일 패턴 집합 반환 (처음 호출 시 한 번만 생성)
+
+    Returns:
+        공유 CompiledPatternSet
+    """
+    global _shared_pattern_set
+    if _shared_pattern_set is None:
+        with _shared_pattern_set_lock:
+            if _shared_pattern_set is None:
+                _shared_pattern_set = CloudPatterns.build_pattern_set()
+    return _shared_pattern_set
+
+
 class CloudPatterns:
     """클라우드 리소스 패턴 관리 클래스"""
 
-    def __init__(self) -> None:
-        """패턴 초기화"""
-        self._patterns = self._initialize_patterns()
-        self._compiled_patterns = self._compile_patterns()
+    def __init__(
+        self,
+        use_scanner: bool = True,
+        use_prefilter: bool = True,
+        pattern_set: Optional[CompiledPatternSet] = None
+    ) -> None:
+        """
+        패턴 초기화
+
+        패턴 정의/컴파일/앵커 추출은 공유 패턴 집합에서 가져오고,
+        인스턴스는 스캐너 옵션, 프리필터 통계, 디버그 플래그만 따로 가짐
+
+        Args:
+            use_scanner: True면 컴파일된 PatternScanner 사용,
+                False면 패턴별 finditer 루프 사용 (비교/검증용)
+            use_prefilter: 스캐너에서 리터럴 앵커 프리필터 사용 여부
+            pattern_set: 사용할 패턴 집합 (기본: 프로세스 전역 공유 집합)
+        """
+        pattern_set = pattern_set or get_compiled_pattern_set()
+        self._pattern_set = pattern_set
+        self._patterns = pattern_set.patterns
+        self._compiled_patterns = pattern_set.compiled
         self._overlap_engine = OverlapDetectionEngine()
-    
-    def _validate_public_ip(self, ip: str) -> Tuple[bool, str]:
+
+        # 우선순위 정렬은 패턴 집합 생성 시 한 번만 수행
+        self._sorted_patterns = list(pattern_set.sorted_patterns)
+        self._use_scanner = use_scanner
+        self._use_prefilter = use_prefilter
+        self._scanner = PatternScanner(
+            self._sorted_patterns,
+            self._compiled_patterns,
+            use_prefilter=use_prefilter,
+            anchors=pattern_set.anchors
+        )
+
+    @classmethod
+    def build_pattern_set(cls) -> CompiledPatternSet:
+        """
+        패턴 정의부터 새 패턴 집합 생성 (보통은 get_compiled_pattern_set 사용)
+
+        Returns:
+            불변 CompiledPatternSet
+        """
+        patterns = cls._initialize_patterns()
+        compiled = cls._compile_patterns(patterns)
+        return CompiledPatternSet(
+            patterns=MappingProxyType(patterns),
+            compiled=MappingProxyType(compiled),
+            sorted_patterns=tuple(sorted(patterns.items(), key=lambda x: x[1].priority)),
+            anchors=MappingProxyType({
+                regex.pattern: required_literals(regex.pattern, regex.flags) for regex in compiled.values()
+            }),
+        )
+
+    @staticmethod
+    def _validate_public_ip(ip: str) -> Tuple[bool, str]:
         """
         Public IP 검증 함수 - RFC 표준 완전 준수
         사설 IP, 특수 용도 IP는 마스킹하지 않음
@@ -96,7 +204,8 @@ class CloudPatterns:
         except (ipaddress.AddressValueError, ValueError) as e:
             return False, f"invalid_format: {str(e)}"
     
-    def _validate_account_id(self, account_id: str) -> Tuple[bool, str]:
+    @staticmethod
+    def _validate_account_id(account_id: str) -> Tuple[bool, str]:
         """
         Account ID 검증 함수
         ARN 내부의 Account ID는 제외하고 독립적인 Account ID만 매칭
@@ -119,7 +228,8 @@ class CloudPatterns:
         # 유효한 독립 Account ID
         return True, "valid_account_id"
     
-    def _validate_insights_query_id(self, query_id: str) -> Tuple[bool, str]:
+    @staticmethod
+    def _validate_insights_query_id(query_id: str) -> Tuple[bool, str]:
         """
         CloudWatch Insights Query ID 검증 함수
         UUID 형식이지만 KMS Key ID와 구분하기 위한 더 구체적인 검증
@@ -142,7 +252,8 @@ class CloudPatterns:
         # 숫자로 시작하는 UUID는 KMS로 간주하여 거부
         return False, "numeric_start_likely_kms"
 
-    def _initialize_patterns(self) -> Dict[str, PatternDefinition]:
+    @classmethod
+    def _initialize_patterns(cls) -> Dict[str, PatternDefinition]:
         """
         AWS 리소스 패턴 초기화
         ref-1 Kong 플러그인의 patterns.lua 기반
@@ -175,7 +286,7 @@ class CloudPatterns:
                 type="insights",
                 description="CloudWatch Insights Query ID (UUID format)",
                 priority=75,
-                validator=self._validate_insights_query_id,
+                validator=cls._validate_insights_query_id,
             ),
             
             # AWS App Runner Service ARN (Priority 85)
@@ -658,7 +769,7 @@ class CloudPatterns:
                 type="public_ip",
                 description="Public IP Address",
                 priority=460,
-                validator=self._validate_public_ip,
+                validator=cls._validate_public_ip,
             ),
             
             # Priority 500-699: Fallback 패턴
@@ -695,7 +806,7 @@ class CloudPatterns:
                 type="account", 
                 description="AWS Account ID (12 digits)",
                 priority=600,
-                validator=self._validate_account_id,
+                validator=cls._validate_account_id,
             ),
             
             # AWS Session Token (Priority 610)
@@ -726,10 +837,11 @@ class CloudPatterns:
             ),
         }
 
-    def _compile_patterns(self) -> Dict[str, re.Pattern]:
+    @staticmethod
+    def _compile_patterns(patterns: Dict[str, PatternDefinition]) -> Dict[str, re.Pattern]:
         """정규식 패턴 컴파일"""
         compiled = {}
-        for name, pattern_def in self._patterns.items():
+        for name, pattern_def in patterns.items():
             try:
                 compiled[name] = re.compile(pattern_def.pattern)
             except re.error as e:
@@ -750,12 +862,67 @@ class CloudPatterns:
         if not text or not isinstance(text, str):
             return []
 
-        matches: List[Dict[str, Any]] = []
+        matches = self.scan(text)
+
+        # Overlap Detection Engine 사용 여부 결정
+        if resolve_conflicts and matches:
+            return self.resolve_conflicts(matches)
+        else:
+            # 기존 중복 제거 로직 (호환성)
+            unique_matches: List[Dict[str, Any]] = []
+            used_positions = set()
 
-        # 우선순위 순으로 정렬
-        sorted_patterns = sorted(self._patterns.items(), key=lambda x: x[1].priority)
+            for match_info in matches:
+                pos_key = (match_info["start"], match_info["end"])
+                if pos_key not in used_positions:
+                    unique_matches.append(match_info)
+                    used_positions.add(pos_key)
 
-        for pattern_name, pattern_def in sorted_patterns:
+            return unique_matches
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        충돌 해결 전 후보 매치 수집 (단계별 시간을 따로 재는 호출자용, 보통은 find_matches)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            충돌 해결 전 매치 정보 리스트
+        """
+        if not text or not isinstance(text, str):
+            return []
+        if self._use_scanner:
+            return self._scanner.scan(text)
+        return self._scan_sequential(text)
+
+    def resolve_conflicts(self, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        scan 결과의 겹치는 매치 충돌 해결 (Overlap Detection Engine)
+
+        Args:
+            matches: scan이 반환한 매치 리스트
+
+        Returns:
+            충돌 해결된 매치 정보 리스트
+        """
+        if not matches:
+            return []
+        return self._overlap_engine.resolve_conflicts(matches)
+
+    def _scan_sequential(self, text: str) -> List[Dict[str, Any]]:
+        """
+        패턴별 finditer 루프로 후보 매치 수집 (스캐너 도입 전 방식)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            충돌 해결 전 매치 정보 리스트
+        """
+        matches: List[Dict[str, Any]] = []
+
+        for pattern_name, pattern_def in self._sorted_patterns:
             compiled_pattern = self._compiled_patterns[pattern_name]
 
             for match in compiled_pattern.finditer(text):
@@ -779,21 +946,7 @@ class CloudPatterns:
                     }
                 )
 
-        # Overlap Detection Engine 사용 여부 결정
-        if resolve_conflicts and matches:
-            return self._overlap_engine.resolve_conflicts(matches)
-        else:
-            # 기존 중복 제거 로직 (호환성)
-            unique_matches: List[Dict[str, Any]] = []
-            used_positions = set()
-
-            for match_info in matches:
-                pos_key = (match_info["start"], match_info["end"])
-                if pos_key not in used_positions:
-                    unique_matches.append(match_info)
-                    used_positions.add(pos_key)
-
-            return unique_matches
+        return matches
 
     def get_pattern(self, pattern_name: str) -> Optional[PatternDefinition]:
         """패턴 정의 가져오기"""
@@ -833,6 +986,19 @@ class CloudPatterns:
         
         return resolved_matches, analysis
     
+    def get_prefilter_stats(self) -> Dict[str, Any]:
+        """
+        리터럴 프리필터 통계 반환
+
+        Returns:
+            {"calls": 스캔 횟수, "patterns": {패턴명: {anchors, skipped, skip_rate}}}
+        """
+        return self._scanner.get_prefilter_stats()
+
+    def reset_prefilter_stats(self) -> None:
+        """리터럴 프리필터 통계 초기화"""
+        self._scanner.reset_prefilter_stats()
+
     def enable_debug(self, enabled: bool = True):
         """디버그 모드 활성화/비활성화"""
         self._overlap_engine.debug = enabled
@@ -0,0 +1,210 @@
+"""
+리터럴 앵커 기반 프리필터
+
+각 패턴의 모든 매치가 반드시 포함하는 고정 리터럴(앵커)을 컴파일 시 추출하고,
+스캔 전에 텍스트에 앵커가 하나도 없는 패턴은 정규식 실행 자체를 건너뜀
+
+예:
+- lambda_arn  → "arn:aws:lambda:"
+- rds_instance → "db"
+- ipv6        → ":"
+- account_id  → 앵커 없음 (항상 실행)
+
+일반 대화 텍스트에는 AWS 식별자가 거의 없으므로 대부분의 패턴이 부분 문자열
+검색 몇 번으로 제외됨
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef]
+
+_REPEAT_OPS = tuple(
+    op for op in (
+        sre_parse.MAX_REPEAT,
+        sre_parse.MIN_REPEAT,
+        getattr(sre_parse, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+)
+
+
+def _score(anchors: Tuple[str, ...]) -> Tuple[int, int]:
+    """앵커 선택 기준: 가장 짧은 후보가 길수록, 후보 수가 적을수록 선택적"""
+    return (min(len(a) for a in anchors), -len(anchors))
+
+
+def _sequence_anchors(parsed: Any) -> Tuple[str, ...]:
+    """
+    정규식 시퀀스에서 필수 리터럴 후보 추출
+
+    Returns:
+        모든 매치가 이 중 하나 이상을 포함하는 리터럴 튜플 (없으면 빈 튜플)
+    """
+    best: Tuple[str, ...] = ()
+    run: List[str] = []
+
+    def consider(candidate: Tuple[str, ...]) -> None:
+        nonlocal best
+        if candidate and all(candidate) and (not best or _score(candidate) > _score(best)):
+            best = candidate
+
+    def flush() -> None:
+        if run:
+            consider(("".join(run),))
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+
+        flush()
+
+        if op is sre_parse.SUBPATTERN:
+            # (group, add_flags, del_flags, pattern)
+            consider(_sequence_anchors(av[-1]))
+        elif op in _REPEAT_OPS:
+            min_count, _max_count, item = av
+            if min_count >= 1:
+                consider(_sequence_anchors(item))
+        elif op is sre_parse.BRANCH:
+            # 모든 분기에 앵커가 있어야 분기 전체의 앵커가 됨
+            options: List[str] = []
+            for alternative in av[1]:
+                alternative_anchors = _sequence_anchors(alternative)
+                if not alternative_anchors:
+                    options = []
+                    break
+                options.extend(alternative_anchors)
+            consider(tuple(dict.fromkeys(options)))
+
+    flush()
+    return best
+
+
+def required_literals(pattern: str, flags: int = 0) -> Tuple[str, ...]:
+    """
+    패턴의 모든 매치가 포함하는 필수 리터럴 추출
+
+    Args:
+        pattern: 정규식 문자열
+        flags: 정규식 플래그
+
+    Returns:
+        리터럴 후보 튜플 (하나라도 텍스트에 있어야 매치 가능, 빈 튜플이면 항상 실행)
+    """
+    # 대소문자 무시 패턴은 단순 부분 문자열 검색으로 판정할 수 없음
+    if flags & re.IGNORECASE:
+        return ()
+
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return ()
+
+    if parsed.state.flags & re.IGNORECASE:
+        return ()
+
+    return _sequence_anchors(parsed)
+
+
+class LiteralPrefilter:
+    """
+    다중 리터럴 프리필터
+
+    스캔 대상 패턴마다 앵커를 보관하고, 텍스트마다 어떤 패턴을 실행해야 하는지
+    판정하며 패턴별 스킵 통계를 누적
+    (evaluate는 요청 경로와 스캔 스레드에서 동시에 호출되므로 통계 갱신은 잠금 안에서)
+    """
+
+    def __init__(self, anchors: List[Tuple[str, Tuple[str, ...]]]) -> None:
+        """
+        Args:
+            anchors: 스캔 순서대로 (패턴명, 필수 리터럴 튜플) 리스트
+        """
+        self._names = [name for name, _ in anchors]
+        self._anchors = [literals for _, literals in anchors]
+
+        # 짧은 리터럴부터 검사하고, 이미 없는 것으로 판정된 짧은 리터럴을
+        # 포함하는 긴 리터럴은 검색 없이 제외 (예: "arn:aws:" 부재 → 모든 ARN 앵커 부재)
+        distinct = sorted({lit for literals in self._anchors for lit in literals}, key=len)
+        self._literals = distinct
+        self._contained: Dict[str, List[str]] = {
+            literal: [shorter for shorter in distinct[:i] if shorter in literal]
+            for i, literal in enumerate(distinct)
+        }
+
+        # 통계 (_stats_lock으로 보호)
+        self._stats_lock = threading.Lock()
+        self._calls = 0
+        self._skips: Counter = Counter()
+
+    def evaluate(self, text: str) -> List[bool]:
+        """
+        텍스트에 대해 패턴별 실행 여부 판정
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            스캔 순서별 실행 여부 (False면 해당 패턴은 매치 불가)
+        """
+        present: Dict[str, bool] = {}
+        for literal in self._literals:
+            if any(not present[shorter] for shorter in self._contained[literal]):
+                present[literal] = False
+            else:
+                present[literal] = literal in text
+
+        active = [
+            not literals or any(present[lit] for lit in literals)
+            for literals in self._anchors
+        ]
+
+        skipped = [name for name, is_active in zip(self._names, active) if not is_active]
+        with self._stats_lock:
+            self._calls += 1
+            self._skips.update(skipped)
+
+        return active
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        패턴별 스킵 통계 반환
+
+        Returns:
+            {"calls": 전체 판정 횟수, "patterns": {패턴명: {anchors, skipped, skip_rate}}}
+        """
+        with self._stats_lock:
+            calls = self._calls
+            skips = dict(self._skips)
+
+        patterns: Dict[str, Dict[str, Any]] = {}
+        for name, literals in zip(self._names, self._anchors):
+            skipped = skips.get(name, 0)
+            patterns[name] = {
+                "anchors": list(literals),
+                "skipped": skipped,
+                "skip_rate": skipped / calls if calls else 0.0,
+            }
+
+        return {"calls": calls, "patterns": patterns}
+
+    def reset_statistics(self) -> None:
+        """스킵 통계 초기화"""
+        with self._stats_lock:
+            self._calls = 0
+            self._skips.clear()
+
+    def get_anchors(self, name: str) -> Optional[Tuple[str, ...]]:
+        """패턴 앵커 조회"""
+        try:
+            return self._anchors[self._names.index(name)]
+        except ValueError:
+            return None
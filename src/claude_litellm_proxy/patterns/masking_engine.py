@@ -8,6 +8,8 @@ ref-1 Kong 플러그인의 마스킹 로직을 Python으로 포팅
 from typing import Dict, List, Optional, Tuple, Any
 
 from .cloud_patterns import CloudPatterns, PatternDefinition
+from .multi_replacer import MultiStringReplacer
+from .text_rewriter import RewriteSpan, apply_spans
 
 
 class MaskingEngine:
@@ -24,6 +26,9 @@ class MaskingEngine:
         self.mapping_store = mapping_store  # Redis 기반 카운터용
         self._mapping_cache: Dict[str, str] = {}  # 원본 → 마스킹 매핑
         self._reverse_mapping: Dict[str, str] = {}  # 마스킹 → 원본 매핑
+        self._counter: Dict[str, int] = {}  # 리소스 타입별 카운터
+        self._replacer: Optional[MultiStringReplacer] = None  # 마지막 매핑의 치환기
+        self._replacer_mapping: Dict[str, str] = {}
 
     def mask_text(self, text: str) -> Tuple[str, Dict[str, str]]:
         """
@@ -43,18 +48,32 @@ class MaskingEngine:
         if not isinstance(text, str):
             return str(text), {}
 
+        spans, mapping = self.mask_spans(text)
+        return apply_spans(text, spans), mapping
+
+    def mask_spans(self, text: str) -> Tuple[List[RewriteSpan], Dict[str, str]]:
+        """
+        마스킹 치환 구간만 계산 (마스킹된 문자열은 만들지 않음)
+
+        iter_segments / iter_json_string으로 바로 직렬화하는 호출자용
+
+        Args:
+            text: 마스킹할 텍스트
+
+        Returns:
+            (시작 위치 순 치환 구간, 매핑_정보)
+        """
         # AWS 리소스 찾기
         matches = self.patterns.find_matches(text)
 
         if not matches:
-            # AWS 리소스가 없으면 원본 그대로 반환
-            return text, {}
+            # AWS 리소스가 없으면 원본 그대로
+            return [], {}
 
-        # 마스킹 수행
-        masked_text = text
+        spans: List[RewriteSpan] = []
         mapping = {}
 
-        # 뒤에서부터 처리 (인덱스 변화 방지)
+        # 카운터는 뒤에서부터 부여 (기존 번호 순서 유지)
         matches.sort(key=lambda x: x["start"], reverse=True)
 
         for match in matches:
@@ -70,14 +89,13 @@ class MaskingEngine:
                 self._mapping_cache[original] = masked_value
                 self._reverse_mapping[masked_value] = original
 
-            # 텍스트에서 교체
-            start, end = match["start"], match["end"]
-            masked_text = masked_text[:start] + masked_value + masked_text[end:]
+            spans.append((match["start"], match["end"], masked_value))
 
             # 매핑 정보 추가
             mapping[masked_value] = original
 
-        return masked_text, mapping
+        spans.reverse()
+        return spans, mapping
 
     def _generate_masked_value(self, original: str, pattern_def: PatternDefinition) -> str:
         """
@@ -126,13 +144,12 @@ class MaskingEngine:
         if not masked_text or not mapping:
             return masked_text or ""
 
-        unmasked_text = masked_text
-
-        # 매핑 정보로 복원
-        for masked_value, original_value in mapping.items():
-            unmasked_text = unmasked_text.replace(masked_value, original_value)
+        # 단일 패스 치환 (긴 토큰 우선), 매핑이 같으면 치환기 재사용
+        if self._replacer is None or mapping != self._replacer_mapping:
+            self._replacer = MultiStringReplacer(mapping)
+            self._replacer_mapping = dict(mapping)
 
-        return unmasked_text
+        return self._replacer.replace(masked_text)
 
     def get_mapping_info(self) -> Dict[str, str]:
         """현재 매핑 정보 반환"""
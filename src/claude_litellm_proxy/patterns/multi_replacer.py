@@ -0,0 +1,154 @@
+"""
+Aho-Corasick 기반 다중 문자열 치환기
+
+매핑 항목마다 str.replace를 반복하면 O(텍스트 길이 × 매핑 수)이고,
+한 토큰이 다른 토큰의 접두어일 때(AWS_EC2_001 / AWS_EC2_0012) 짧은 토큰이
+긴 토큰의 앞부분을 먼저 바꿔 결과가 깨짐
+
+매핑 키로 오토마톤을 한 번 만들고 텍스트를 한 번만 훑어
+가장 왼쪽에서 시작하는 가장 긴 키(leftmost-longest)를 치환함
+- 치환 결과는 다시 검사하지 않음 (원본 값에 토큰 모양 문자열이 있어도 안전)
+- 매핑이 같으면 오토마톤 재사용 (MaskingEngine.unmask_text)
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+class MultiStringReplacer:
+    """
+    다중 문자열 단일 패스 치환기
+
+    사용 예:
+        replacer = MultiStringReplacer({"AWS_EC2_001": "i-abc", "AWS_EC2_0012": "i-def"})
+        replacer.replace("AWS_EC2_0012 AWS_EC2_001")  # "i-def i-abc"
+    """
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        """
+        Args:
+            mapping: {찾을_문자열: 바꿀_문자열} (빈 키는 무시)
+        """
+        self._replacements: Dict[str, str] = {key: value for key, value in mapping.items() if key}
+
+        # 트라이 노드별 전이 / 실패 링크 / 깊이 / 이 노드에서 끝나는 가장 긴 키 길이
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._depth: List[int] = [0]
+        self._output: List[int] = [0]
+        self._build()
+
+        # 루트 상태에서 다음 후보 위치로 건너뛰기 위한 첫 글자 집합
+        first_chars = "".join(sorted(self._goto[0]))
+        self._first_char_pattern: Optional[re.Pattern[str]] = (
+            re.compile(f"[{re.escape(first_chars)}]") if first_chars else None
+        )
+
+    def _build(self) -> None:
+        """트라이 구성 후 BFS로 실패 링크와 출력(가장 긴 접미 키) 계산"""
+        goto, fail, depth, output = self._goto, self._fail, self._depth, self._output
+
+        for key in self._replacements:
+            state = 0
+            for char in key:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    depth.append(depth[state] + 1)
+                    output.append(0)
+                state = next_state
+            output[state] = len(key)
+
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, child in goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(char, 0) if state else 0
+                if not output[child]:
+                    output[child] = output[fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._replacements)
+
+    def find_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        치환할 구간 검색 (겹치지 않음, 왼쪽 우선 → 같은 시작이면 가장 긴 키)
+
+        Args:
+            text: 검색할 텍스트
+
+        Returns:
+            [(시작, 끝)] 시작 위치 순
+        """
+        if self._first_char_pattern is None:
+            return []
+
+        goto, fail, depth, output = self._goto, self._fail, self._depth, self._output
+        search = self._first_char_pattern.search
+        length = len(text)
+        spans: List[Tuple[int, int]] = []
+        pending: Optional[Tuple[int, int]] = None
+        state = 0
+        position = 0
+
+        while True:
+            if state == 0:
+                match = search(text, position)
+                if match is None:
+                    break
+                position = match.start()
+            elif position >= length:
+                if pending is None:
+                    break
+                # 텍스트 끝: 보류 매치 확정 후 그 뒤부터 다시 검색
+                spans.append(pending)
+                position, state, pending = pending[1], 0, None
+                continue
+
+            char = text[position]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            position += 1
+
+            if output[state]:
+                start = position - output[state]
+                if pending is None or start < pending[0] or (start == pending[0] and position > pending[1]):
+                    pending = (start, position)
+
+            # 진행 중인 부분 매치가 모두 보류 매치 뒤에서 시작하면 확정
+            if pending is not None and position - depth[state] > pending[0]:
+                spans.append(pending)
+                position, state, pending = pending[1], 0, None
+
+        return spans
+
+    def replace(self, text: str) -> str:
+        """
+        텍스트를 한 번 훑어 모든 키를 치환
+
+        Args:
+            text: 원본 텍스트
+
+        Returns:
+            치환된 텍스트
+        """
+        spans = self.find_spans(text)
+        if not spans:
+            return text
+
+        replacements = self._replacements
+        parts: List[str] = []
+        cursor = 0
+        for start, end in spans:
+            parts.append(text[cursor:start])
+            parts.append(replacements[text[start:end]])
+            cursor = end
+        parts.append(text[cursor:])
+        return "".join(parts)
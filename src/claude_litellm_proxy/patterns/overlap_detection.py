@@ -5,13 +5,11 @@ Overlap Detection Engine
 겹치는 패턴 중 최적 선택:
 1. 가장 긴 매치 우선
 2. 동일 길이면 높은 우선순위(낮은 숫자) 우선  
-3. Interval Tree 기반 O(log n) 성능 최적화
+3. 시작 위치 정렬 1회 + sweep-line 그룹핑으로 O(n log n) 성능
 """
 
 from dataclasses import dataclass
 from typing import List, Dict, Any, Set, Tuple
-from collections import defaultdict
-import bisect
 
 
 @dataclass
@@ -40,8 +38,10 @@ class Match:
 
 class IntervalTree:
     """
-    Interval Tree 기반 빠른 overlap 검출
-    O(log n) 성능으로 겹치는 구간 검색
+    정적 Interval Tree 기반 overlap 인덱스
+
+    시작 위치로 정렬한 배열 위에 암묵적 균형 트리를 구성하고,
+    각 서브트리의 최대 끝 위치로 가지치기하여 O(log n + k) 검색
     """
     
     def __init__(self, matches: List[Match]):
@@ -49,9 +49,25 @@ class IntervalTree:
         Args:
             matches: 매치 리스트
         """
-        self.matches = sorted(matches, key=lambda m: m.start)
+        self.matches = sorted(matches, key=lambda m: (m.start, m.end))
         self.starts = [m.start for m in self.matches]
         self.ends = [m.end for m in self.matches]
+        
+        # 서브트리(구간 [lo, hi)의 중앙 노드 기준) 최대 끝 위치
+        self._max_end = [0] * len(self.matches)
+        self._build(0, len(self.matches))
+    
+    def _build(self, lo: int, hi: int) -> int:
+        """구간 [lo, hi)의 서브트리 최대 끝 위치 계산"""
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        max_end = max(self.ends[mid], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+    
+    def __len__(self) -> int:
+        return len(self.matches)
     
     def find_overlapping(self, match: Match) -> List[Match]:
         """
@@ -61,28 +77,47 @@ class IntervalTree:
             match: 기준 매치
             
         Returns:
-            겹치는 매치 리스트
+            겹치는 매치 리스트 (시작 위치 순, 기준 매치 자신도 포함될 수 있음)
         """
-        overlapping = []
+        return self.find_overlapping_range(match.start, match.end)
+    
+    def find_overlapping_range(self, start: int, end: int) -> List[Match]:
+        """
+        구간 [start, end)와 겹치는 모든 매치 찾기
         
-        # Binary search로 겹칠 가능성이 있는 범위 찾기
-        # start <= match.end 인 첫 번째 위치
-        start_idx = bisect.bisect_right(self.starts, match.end) - 1
-        start_idx = max(0, start_idx)
+        Args:
+            start: 구간 시작 위치
+            end: 구간 끝 위치 (미포함)
+            
+        Returns:
+            겹치는 매치 리스트 (시작 위치 순)
+        """
+        found: List[int] = []
+        stack = [(0, len(self.matches))]
         
-        # 앞으로 스캔하면서 실제 겹치는 것들 찾기
-        for i in range(start_idx, len(self.matches)):
-            candidate = self.matches[i]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            
+            mid = (lo + hi) // 2
+            # 서브트리 전체가 start 이전에 끝나면 겹칠 수 없음
+            if self._max_end[mid] <= start:
+                continue
+            
+            # 왼쪽 서브트리는 시작 위치가 더 작으므로 항상 후보
+            stack.append((lo, mid))
             
-            # 더 이상 겹칠 가능성이 없으면 종료
-            if candidate.start >= match.end:
-                break
-                
-            # 실제로 겹치는지 확인
-            if match.overlaps_with(candidate):
-                overlapping.append(candidate)
-        
-        return overlapping
+            # 중앙 노드가 end 이후에 시작하면 오른쪽 서브트리도 모두 제외
+            if self.starts[mid] >= end:
+                continue
+            
+            if self.ends[mid] > start:
+                found.append(mid)
+            stack.append((mid + 1, hi))
+        
+        found.sort()
+        return [self.matches[i] for i in found]
 
 
 class OverlapDetectionEngine:
@@ -107,10 +142,41 @@ class OverlapDetectionEngine:
         if not matches:
             return []
         
-        # Dict를 Match 객체로 변환
-        match_objects = []
-        for match_dict in matches:
-            match_obj = Match(
+        if self.debug:
+            print(f"🔍 Input matches: {len(matches)}")
+            for i, m in enumerate(self._to_match_objects(matches)):
+                print(f"  {i+1}. {m}")
+        
+        # 충돌 그룹 생성 (원본 리스트 인덱스 기준)
+        spans = [(m['start'], m['end']) for m in matches]
+        index_groups = self._build_conflict_index_groups(spans)
+        
+        if self.debug:
+            print(f"🔗 Conflict groups: {len(index_groups)}")
+            for i, group in enumerate(index_groups):
+                print(f"  Group {i+1}: {len(group)} matches")
+                for idx in group:
+                    print(f"    - {self._to_match_objects([matches[idx]])[0]}")
+        
+        # 각 그룹에서 최적 매치 선택 후 원본 dict를 인덱스로 바로 반환
+        result = []
+        for group in index_groups:
+            best_idx = self._select_best_index(matches, group)
+            result.append(matches[best_idx])
+            
+            if self.debug:
+                print(f"✅ Selected: {self._to_match_objects([matches[best_idx]])[0]}")
+        
+        if self.debug:
+            print(f"🎯 Final result: {len(result)} matches")
+        
+        return result
+    
+    @staticmethod
+    def _to_match_objects(matches: List[Dict[str, Any]]) -> List[Match]:
+        """Dict 매치 리스트를 Match 객체 리스트로 변환"""
+        return [
+            Match(
                 start=match_dict['start'],
                 end=match_dict['end'],
                 text=match_dict['match'],
@@ -119,52 +185,71 @@ class OverlapDetectionEngine:
                 priority=match_dict['pattern_def'].priority,
                 pattern_def=match_dict['pattern_def']
             )
-            match_objects.append(match_obj)
-        
-        if self.debug:
-            print(f"🔍 Input matches: {len(match_objects)}")
-            for i, m in enumerate(match_objects):
-                print(f"  {i+1}. {m}")
+            for match_dict in matches
+        ]
+    
+    @staticmethod
+    def _build_conflict_index_groups(spans: List[Tuple[int, int]]) -> List[List[int]]:
+        """
+        겹치는 구간들을 sweep-line으로 그룹핑
         
-        # 충돌 그룹 생성
-        conflict_groups = self._build_conflict_groups(match_objects)
+        시작 위치 순으로 한 번 정렬한 뒤, 현재 그룹의 최대 끝 위치보다
+        앞에서 시작하는 구간은 같은 그룹으로 묶음 (겹침 그래프의 연결 요소와 동일)
         
-        if self.debug:
-            print(f"🔗 Conflict groups: {len(conflict_groups)}")
-            for i, group in enumerate(conflict_groups):
-                print(f"  Group {i+1}: {len(group)} matches")
-                for m in group:
-                    print(f"    - {m}")
-        
-        # 각 그룹에서 최적 매치 선택
-        resolved_matches = []
-        for group in conflict_groups:
-            best_match = self._select_best_match(group)
-            resolved_matches.append(best_match)
+        Args:
+            spans: (start, end) 리스트
             
-            if self.debug:
-                print(f"✅ Selected: {best_match}")
+        Returns:
+            원본 인덱스 그룹 리스트
+            (그룹은 첫 멤버의 입력 순서, 그룹 내부는 입력 순서로 정렬 - 기존 Union-Find 결과와 동일)
+        """
+        if not spans:
+            return []
         
-        # Match 객체를 다시 Dict로 변환
-        result = []
-        for match_obj in resolved_matches:
-            # 원본 matches에서 해당 매치 찾기
-            for original in matches:
-                if (original['start'] == match_obj.start and 
-                    original['end'] == match_obj.end and
-                    original['pattern_name'] == match_obj.pattern_name):
-                    result.append(original)
-                    break
+        order = sorted(range(len(spans)), key=lambda i: spans[i])
+        
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_end = -1
+        
+        for idx in order:
+            start, end = spans[idx]
+            if current and start >= current_end:
+                groups.append(current)
+                current = []
+            if not current:
+                current_end = end
+            current.append(idx)
+            if end > current_end:
+                current_end = end
+        groups.append(current)
+        
+        for group in groups:
+            group.sort()
+        groups.sort(key=lambda group: group[0])
+        
+        return groups
+    
+    @staticmethod
+    def _select_best_index(matches: List[Dict[str, Any]], group: List[int]) -> int:
+        """
+        그룹에서 최적 매치 인덱스 선택 (_select_best_match와 동일한 기준)
         
-        if self.debug:
-            print(f"🎯 Final result: {len(result)} matches")
+        1. 가장 긴 매치 2. 낮은 priority 숫자 3. 패턴명 사전순 4. 입력 순서
+        """
+        if len(group) == 1:
+            return group[0]
         
-        return result
+        def rank(idx: int) -> Tuple[int, int, str]:
+            m = matches[idx]
+            return (m['start'] - m['end'], m['pattern_def'].priority, m['pattern_name'])
+        
+        return min(group, key=rank)
     
     def _build_conflict_groups(self, matches: List[Match]) -> List[List[Match]]:
         """
         겹치는 매치들을 그룹핑
-        Union-Find 알고리즘 사용
+        sweep-line 그룹핑 사용 (O(n log n))
         
         Args:
             matches: 매치 리스트
@@ -172,35 +257,10 @@ class OverlapDetectionEngine:
         Returns:
             충돌 그룹 리스트
         """
-        if len(matches) <= 1:
-            return [matches] if matches else []
-        
-        # Union-Find 자료구조 구현
-        parent = list(range(len(matches)))
-        
-        def find(x):
-            if parent[x] != x:
-                parent[x] = find(parent[x])
-            return parent[x]
-        
-        def union(x, y):
-            px, py = find(x), find(y)
-            if px != py:
-                parent[px] = py
-        
-        # 겹치는 매치들을 같은 그룹으로 통합
-        for i in range(len(matches)):
-            for j in range(i + 1, len(matches)):
-                if matches[i].overlaps_with(matches[j]):
-                    union(i, j)
-        
-        # 그룹별로 매치 분류
-        groups = defaultdict(list)
-        for i, match in enumerate(matches):
-            root = find(i)
-            groups[root].append(match)
-        
-        return list(groups.values())
+        index_groups = self._build_conflict_index_groups(
+            [(m.start, m.end) for m in matches]
+        )
+        return [[matches[i] for i in group] for group in index_groups]
     
     def _select_best_match(self, candidates: List[Match]) -> Match:
         """
@@ -251,18 +311,7 @@ class OverlapDetectionEngine:
             return {"total_matches": 0, "conflicts": 0, "groups": []}
         
         # Match 객체로 변환
-        match_objects = []
-        for match_dict in matches:
-            match_obj = Match(
-                start=match_dict['start'],
-                end=match_dict['end'],
-                text=match_dict['match'],
-                pattern_name=match_dict['pattern_name'],
-                pattern_type=match_dict['type'],
-                priority=match_dict['pattern_def'].priority,
-                pattern_def=match_dict['pattern_def']
-            )
-            match_objects.append(match_obj)
+        match_objects = self._to_match_objects(matches)
         
         conflict_groups = self._build_conflict_groups(match_objects)
         
@@ -0,0 +1,417 @@
+"""
+대용량 텍스트 패턴 스캔 오프로드
+
+CloudPatterns.find_matches는 순수 CPU 작업이라 이벤트 루프에서 그대로 실행하면
+2MB tool_result 하나가 같은 워커의 다른 요청을 모두 막음
+
+- 임계값 미만: 기존처럼 인라인 스캔
+- 임계값 이상: 청크로 나눠 프로세스(또는 스레드) 풀에서 병렬 스캔 후
+  원시 매치를 합쳐 OverlapDetectionEngine으로 한 번에 충돌 해결
+
+청크 경계:
+대부분의 패턴이 [a-z0-9\\-]+ 같은 무한 반복이라 "가장 긴 매치"만큼 겹치게
+나누는 방식으로는 결과가 같음을 보장할 수 없음. 대신 어떤 패턴도 소비할 수
+없는 구분 문자(공백/개행 등, 컴파일 시 정규식 구조로 검증) 바로 뒤에서만
+자르므로 모든 매치가 한 청크 안에 완전히 포함되고, 결과는 단일 스캔과 동일
+(구분 문자가 없는 긴 구간은 나누지 않고 한 청크로 처리)
+
+워커 프로세스:
+- 호출자의 패턴 집합/프리필터 설정을 initializer로 전달 (인라인 스캔과 같은 패턴)
+- 로깅 리스너 등 스레드가 도는 부모를 fork하지 않도록 forkserver(없으면 spawn)로 시작
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    from re import _constants as sre_constants  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+from .cloud_patterns import CloudPatterns, CompiledPatternSet, get_compiled_pattern_set
+
+# 청크 구분 후보 문자 (패턴이 소비할 수 없는 것만 사용)
+SEPARATOR_CANDIDATES = "\n \t\r"
+
+# 기본 오프로드 임계값 (글자 수)
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+
+# 기본 청크 크기 (글자 수, 실제 청크는 다음 구분 문자까지 늘어남)
+DEFAULT_CHUNK_SIZE = 128 * 1024
+
+_BOUNDARY_ASSERTIONS = (sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY)
+
+_CATEGORY_TESTS = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda c: not c.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    sre_constants.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+def _set_contains(items: Any, char: str) -> Optional[bool]:
+    """IN 문자 집합이 char를 포함하는지 (판단 불가 시 None)"""
+    negate = False
+    found = False
+    code = ord(char)
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            found = found or av == code
+        elif op is sre_constants.RANGE:
+            found = found or av[0] <= code <= av[1]
+        elif op is sre_constants.CATEGORY and av in _CATEGORY_TESTS:
+            found = found or _CATEGORY_TESTS[av](char)
+        else:
+            return None
+    return found != negate
+
+
+def _can_consume(parsed: Any, char: str) -> bool:
+    """
+    파싱된 정규식이 char를 소비하거나 청크 경계에서 결과가 달라질 수 있는지 (보수적)
+
+    Args:
+        parsed: sre_parse 결과 (SubPattern 또는 항목 리스트)
+        char: 검사할 구분 문자
+
+    Returns:
+        True면 char를 구분 문자로 사용할 수 없음
+    """
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            if av == ord(char):
+                return True
+        elif op is sre_constants.NOT_LITERAL:
+            if av != ord(char):
+                return True
+        elif op is sre_constants.ANY:
+            return True
+        elif op is sre_constants.IN:
+            if _set_contains(av, char) is not False:
+                return True
+        elif op is sre_constants.AT:
+            # \b / \B는 구분 문자(비단어 문자)와 텍스트 경계를 똑같이 취급
+            # ^ $ \A \Z는 청크 시작/끝에서 결과가 달라짐
+            if av not in _BOUNDARY_ASSERTIONS:
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _can_consume(av[-1], char):
+                return True
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if _can_consume(av[2], char):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_can_consume(branch, char) for branch in av[1]):
+                return True
+        else:
+            # lookaround, 역참조 등은 판단하지 않음
+            return True
+    return False
+
+
+def safe_separators(patterns: CloudPatterns, candidates: str = SEPARATOR_CANDIDATES) -> FrozenSet[str]:
+    """
+    어떤 패턴도 소비할 수 없는 구분 문자 집합 계산
+
+    Args:
+        patterns: 패턴 집합
+        candidates: 구분 문자 후보
+
+    Returns:
+        청크 경계로 써도 결과가 바뀌지 않는 문자 집합 (비어 있으면 청크 분할 불가)
+    """
+    safe = set(candidates)
+    for _name, pattern_def in patterns._sorted_patterns:
+        parsed = sre_parse.parse(pattern_def.pattern)
+        if parsed.getwidth()[0] == 0:
+            return frozenset()
+        safe = {char for char in safe if not _can_consume(parsed, char)}
+    return frozenset(safe)
+
+
+def split_chunks(text: str, chunk_size: int, separators: FrozenSet[str]) -> List[Tuple[int, int]]:
+    """
+    텍스트를 구분 문자 바로 뒤에서 잘라 청크 범위 목록 생성
+
+    Args:
+        text: 대상 텍스트
+        chunk_size: 목표 청크 크기 (다음 구분 문자까지 늘어남)
+        separators: 구분 문자 집합
+
+    Returns:
+        (시작, 끝) 목록 (텍스트 전체를 빈틈없이 덮음)
+    """
+    if not separators:
+        return [(0, len(text))]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        target = start + chunk_size
+        if target >= len(text):
+            chunks.append((start, len(text)))
+            break
+
+        cut = min(
+            (position for position in (text.find(sep, target) for sep in separators) if position != -1),
+            default=-1,
+        )
+        if cut == -1:
+            chunks.append((start, len(text)))
+            break
+
+        chunks.append((start, cut + 1))
+        start = cut + 1
+
+    return chunks
+
+
+# 풀 워커 프로세스의 패턴 집합 (프로세스마다 initializer에서 한 번 생성)
+_worker_patterns: Optional[CloudPatterns] = None
+
+
+def _process_context() -> Any:
+    """스레드가 있는 부모를 fork하지 않는 multiprocessing 컨텍스트"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _init_worker(pattern_set: Optional[CompiledPatternSet], use_prefilter: bool) -> None:
+    """
+    풀 워커 초기화
+
+    Args:
+        pattern_set: 호출자의 패턴 집합 (None이면 워커 프로세스의 공유 집합)
+        use_prefilter: 리터럴 앵커 프리필터 사용 여부
+    """
+    global _worker_patterns
+    _worker_patterns = CloudPatterns(use_prefilter=use_prefilter, pattern_set=pattern_set)
+
+
+def _scan_with(patterns: CloudPatterns, chunk: str, offset: int) -> List[Tuple[str, int, int]]:
+    """
+    청크의 원시 매치 수집 (검증 포함, 충돌 해결 전)
+
+    매치 dict의 PatternDefinition(검증 함수 포함)은 프로세스 간 전달하지 않고
+    (패턴명, 시작, 끝)만 반환
+
+    Args:
+        patterns: 스캔할 패턴 집합
+        chunk: 청크 텍스트
+        offset: 원본 텍스트 내 청크 시작 위치
+
+    Returns:
+        [(패턴명, 시작, 끝)] (원본 텍스트 기준 위치, 스캐너 출력 순서)
+    """
+    return [
+        (match["pattern_name"], match["start"] + offset, match["end"] + offset)
+        for match in patterns._scanner.scan(chunk)
+    ]
+
+
+def _scan_chunk(chunk: str, offset: int) -> List[Tuple[str, int, int]]:
+    """풀 워커 프로세스에서 청크 스캔 (initializer가 설정한 패턴 집합 사용)"""
+    return _scan_with(_worker_patterns, chunk, offset)
+
+
+class ParallelScanner:
+    """
+    이벤트 루프 밖에서 대용량 텍스트를 스캔하는 find_matches 래퍼
+
+    사용 예:
+        scanner = ParallelScanner(CloudPatterns())
+        matches = await scanner.find_matches(text)   # 결과는 patterns.find_matches(text)와 동일
+        scanner.close()
+    """
+
+    def __init__(
+        self,
+        patterns: CloudPatterns,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+    ) -> None:
+        """
+        Args:
+            patterns: 인라인 스캔 및 매치 복원에 사용할 패턴 집합
+            offload_threshold: 이 길이(글자 수) 이상이면 풀에서 스캔 (0이면 오프로드 안 함)
+            chunk_size: 목표 청크 크기 (글자 수)
+            max_workers: 풀 워커 수 (기본: CPU 코어 수)
+            use_processes: True면 프로세스 풀(코어 병렬), False면 스레드 풀(루프 비차단만)
+        """
+        self.patterns = patterns
+        self.offload_threshold = offload_threshold
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+
+        self._separators = safe_separators(patterns)
+        self._pattern_defs = {name: pattern_def for name, pattern_def in patterns._sorted_patterns}
+        self._executor: Optional[Executor] = None
+
+        # 통계
+        self.inline_scans = 0
+        self.offloaded_scans = 0
+        self.offloaded_chunks = 0
+
+    def _get_executor(self) -> Executor:
+        """
+        풀 지연 생성 (대용량 텍스트가 오기 전에는 프로세스를 만들지 않음)
+
+        프로세스 풀은 패턴 설정을 initializer로 넘기고 (기본 공유 집합이면 워커가 직접 생성),
+        스레드 풀은 같은 프로세스이므로 self.patterns를 그대로 사용
+        """
+        if self._executor is None:
+            if self.use_processes:
+                pattern_set = self.patterns._pattern_set
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=_process_context(),
+                    initializer=_init_worker,
+                    initargs=(
+                        None if pattern_set is get_compiled_pattern_set() else pattern_set,
+                        self.patterns._use_prefilter,
+                    ),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _chunk_scanner(self) -> Any:
+        """풀에 제출할 청크 스캔 함수"""
+        if self.use_processes:
+            return _scan_chunk
+        return lambda chunk, offset: _scan_with(self.patterns, chunk, offset)
+
+    def should_offload(self, text: str) -> bool:
+        """풀에서 스캔할 크기인지"""
+        return 0 < self.offload_threshold <= len(text)
+
+    async def find_matches(self, text: str) -> List[Dict[str, Any]]:
+        """
+        충돌 해결된 매치 목록 (CloudPatterns.find_matches와 동일한 결과)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            매치된 패턴 정보 리스트
+        """
+        return await self.resolve_conflicts(text, await self.scan(text))
+
+    async def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        충돌 해결 전 후보 매치 (CloudPatterns.scan과 같은 매치 집합, 단계별 시간을 따로 재는 호출자용)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            충돌 해결 전 매치 정보 리스트
+        """
+        if not text or not isinstance(text, str) or not self.should_offload(text):
+            self.inline_scans += 1
+            return self.patterns.scan(text)
+
+        chunks = split_chunks(text, self.chunk_size, self._separators)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        scan = self._chunk_scanner()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, scan, text[start:end], start)
+            for start, end in chunks
+        ))
+
+        self.offloaded_scans += 1
+        self.offloaded_chunks += len(chunks)
+        # 매치 복원도 매치가 많으면 수십 ms이므로 루프 밖에서
+        return await loop.run_in_executor(None, self._collect, text, results)
+
+    async def resolve_conflicts(self, text: str, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        scan 결과의 충돌 해결 (오프로드 크기의 텍스트는 루프 밖 스레드에서)
+
+        Args:
+            text: scan에 넘긴 텍스트
+            matches: scan이 반환한 매치 리스트
+
+        Returns:
+            충돌 해결된 매치 정보 리스트
+        """
+        if not matches or not self.should_offload(text):
+            return self.patterns.resolve_conflicts(matches)
+        return await asyncio.get_running_loop().run_in_executor(None, self.patterns.resolve_conflicts, matches)
+
+    def find_matches_chunked(self, text: str) -> List[Dict[str, Any]]:
+        """
+        같은 청크 분할로 현재 스레드에서 스캔 (검증/벤치마크 기준선)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            매치된 패턴 정보 리스트
+        """
+        results = [
+            _scan_with(self.patterns, text[start:end], start)
+            for start, end in split_chunks(text, self.chunk_size, self._separators)
+        ]
+        return self.patterns.resolve_conflicts(self._collect(text, results))
+
+    def _collect(self, text: str, results: List[List[Tuple[str, int, int]]]) -> List[Dict[str, Any]]:
+        """
+        청크별 원시 매치를 단일 스캔과 같은 순서(우선순위 → 위치)의 매치 정보로 복원
+
+        Args:
+            text: 원본 텍스트
+            results: 청크 순서대로 [(패턴명, 시작, 끝)] 목록
+
+        Returns:
+            충돌 해결 전 매치 정보 리스트
+        """
+        per_pattern: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self._pattern_defs}
+        for chunk_matches in results:
+            for name, start, end in chunk_matches:
+                pattern_def = self._pattern_defs[name]
+                per_pattern[name].append({
+                    "match": text[start:end],
+                    "pattern_name": name,
+                    "pattern_def": pattern_def,
+                    "start": start,
+                    "end": end,
+                    "type": pattern_def.type,
+                    "priority": pattern_def.priority,
+                })
+
+        raw_matches: List[Dict[str, Any]] = []
+        for matches in per_pattern.values():
+            raw_matches.extend(matches)
+        return raw_matches
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """오프로드 통계 반환"""
+        return {
+            "inline_scans": self.inline_scans,
+            "offloaded_scans": self.offloaded_scans,
+            "offloaded_chunks": self.offloaded_chunks,
+            "offload_threshold": self.offload_threshold,
+            "max_workers": self.max_workers,
+            "executor": "process" if self.use_processes else "thread",
+            "separators": sorted(self._separators),
+        }
+
+    def close(self) -> None:
+        """풀 종료"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
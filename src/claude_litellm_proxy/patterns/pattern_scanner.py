@@ -0,0 +1,313 @@
+"""
+컴파일된 패턴 스캐너
+
+CloudPatterns.find_matches의 "패턴마다 finditer 한 번" 루프를 대체하는 스캔 계획
+- 우선순위 정렬은 생성 시 한 번만 수행
+- 동일한 정규식 본문은 한 번만 스캔하고 결과를 공유
+- 공통 리터럴 접두어(예: "arn:aws:")를 가진 패턴 계열은 접두어 검색 한 번 후
+  후보 위치에서만 각 패턴을 match (27개 ARN 패턴 → 1회 스캔)
+
+- 리터럴 앵커 프리필터로 텍스트에 앵커가 없는 패턴은 실행하지 않음
+
+반환하는 매치 dict와 순서(우선순위 → 위치)는 기존 루프와 완전히 동일
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .literal_prefilter import LiteralPrefilter, required_literals
+
+# 계열 그룹핑에 사용하는 리터럴 접두어 길이 ("arn:aws:" = 8)
+FAMILY_PREFIX_LENGTH = 8
+
+# 계열 내 디스패치 버킷 키 길이 (접두어 뒤 2글자, 예: "la" → lambda)
+DISPATCH_KEY_LENGTH = 2
+
+_REGEX_METACHARS = ".^$*+?{}[]()|"
+_QUANTIFIERS = "*+?{"
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    정규식이 항상 시작하는 고정 리터럴 접두어 추출
+
+    Args:
+        pattern: 정규식 문자열
+
+    Returns:
+        리터럴 접두어 (없으면 빈 문자열)
+    """
+    # 최상위 alternation은 접두어를 보장하지 않으므로 보수적으로 제외
+    if "|" in pattern:
+        return ""
+
+    prefix: List[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # \d, \b 같은 클래스/어서션은 리터럴이 아님
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal, step = pattern[i + 1], 2
+        elif char in _REGEX_METACHARS:
+            break
+        else:
+            literal, step = char, 1
+
+        # 수량자가 붙은 문자는 선택적/반복일 수 있으므로 접두어에서 제외
+        following = pattern[i + step:i + step + 1]
+        if following and following in _QUANTIFIERS:
+            break
+
+        prefix.append(literal)
+        i += step
+
+    return "".join(prefix)
+
+
+@dataclass
+class ScanTarget:
+    """스캔 대상 패턴 (우선순위 순서 인덱스 포함)"""
+
+    order: int  # 우선순위 정렬 순서 (결과 병합용)
+    name: str
+    pattern_def: Any  # PatternDefinition
+    compiled: re.Pattern
+    prefix: str  # 리터럴 접두어
+
+
+class PatternScanner:
+    """
+    CloudPatterns용 컴파일된 스캐너
+
+    생성 시 스캔 계획을 만들고 scan()은 계획대로 텍스트를 훑어
+    기존 find_matches 루프와 동일한 원시 매치 리스트를 반환
+    """
+
+    def __init__(
+        self,
+        ordered_patterns: List[Tuple[str, Any]],
+        compiled_patterns: Dict[str, re.Pattern],
+        use_prefilter: bool = True,
+        anchors: Optional[Mapping[str, Tuple[str, ...]]] = None,
+    ) -> None:
+        """
+        Args:
+            ordered_patterns: 우선순위 순으로 정렬된 (패턴명, PatternDefinition) 리스트
+            compiled_patterns: 패턴명 → 컴파일된 정규식
+            use_prefilter: 리터럴 앵커 프리필터 사용 여부
+            anchors: 정규식 문자열 → 미리 추출한 필수 리터럴 (없는 정규식만 새로 추출)
+        """
+        self._targets = [
+            ScanTarget(
+                order=order,
+                name=name,
+                pattern_def=pattern_def,
+                compiled=compiled_patterns[name],
+                prefix=literal_prefix(pattern_def.pattern),
+            )
+            for order, (name, pattern_def) in enumerate(ordered_patterns)
+        ]
+        self._families, self._body_groups = self._build_plan(self._targets)
+        self._dispatch_tables = {
+            key: self._build_dispatch_table(key, members)
+            for key, members in self._families.items()
+        }
+
+        self._prefilter: Optional[LiteralPrefilter] = None
+        if use_prefilter:
+            anchors = anchors or {}
+            self._prefilter = LiteralPrefilter([
+                (
+                    target.name,
+                    anchors[target.compiled.pattern] if target.compiled.pattern in anchors
+                    else required_literals(target.compiled.pattern, target.compiled.flags),
+                )
+                for target in self._targets
+            ])
+
+    @staticmethod
+    def _build_plan(
+        targets: List[ScanTarget],
+    ) -> Tuple[Dict[str, List[ScanTarget]], List[List[ScanTarget]]]:
+        """
+        스캔 계획 구성
+
+        Returns:
+            (families, body_groups):
+            - families: 공통 접두어 → 접두어 검색 후 디스패치할 패턴들
+            - body_groups: 동일 정규식 본문별로 묶인 단독 스캔 패턴들
+        """
+        by_family: Dict[str, List[ScanTarget]] = defaultdict(list)
+        standalone: List[ScanTarget] = []
+
+        for target in targets:
+            if len(target.prefix) >= FAMILY_PREFIX_LENGTH:
+                by_family[target.prefix[:FAMILY_PREFIX_LENGTH]].append(target)
+            else:
+                standalone.append(target)
+
+        families: Dict[str, List[ScanTarget]] = {}
+        for key, members in by_family.items():
+            if len(members) > 1:
+                families[key] = members
+            else:
+                # 단일 멤버 계열은 정규식 엔진의 접두어 검색이 더 빠름
+                standalone.extend(members)
+
+        by_body: Dict[str, List[ScanTarget]] = defaultdict(list)
+        for target in sorted(standalone, key=lambda t: t.order):
+            by_body[target.pattern_def.pattern].append(target)
+
+        return families, list(by_body.values())
+
+    @staticmethod
+    def _build_dispatch_table(
+        key: str, members: List[ScanTarget]
+    ) -> Tuple[List[Tuple[int, ScanTarget]], Dict[str, List[Tuple[int, ScanTarget]]]]:
+        """
+        계열 내 디스패치 테이블 구성
+
+        접두어 뒤 글자로 후보 패턴을 좁혀 위치마다 전체 멤버를 검사하지 않도록 함
+
+        Returns:
+            (always, buckets): 항상 시도할 멤버, 뒤 글자별 멤버
+            (멤버는 계열 내 인덱스와 함께 저장)
+        """
+        always: List[Tuple[int, ScanTarget]] = []
+        buckets: Dict[str, List[Tuple[int, ScanTarget]]] = defaultdict(list)
+
+        for index, target in enumerate(members):
+            bucket_key = target.prefix[len(key):len(key) + DISPATCH_KEY_LENGTH]
+            if len(bucket_key) < DISPATCH_KEY_LENGTH:
+                always.append((index, target))
+            else:
+                buckets[bucket_key].append((index, target))
+
+        return always, dict(buckets)
+
+    def scan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        텍스트의 모든 후보 매치 수집 (충돌 해결 전)
+
+        Args:
+            text: 검사할 텍스트
+
+        Returns:
+            기존 루프와 동일한 순서의 매치 정보 리스트
+        """
+        per_target: List[List[Dict[str, Any]]] = [[] for _ in self._targets]
+
+        # 앵커가 텍스트에 없는 패턴은 매치 불가 → 실행 생략
+        active = self._prefilter.evaluate(text) if self._prefilter else None
+
+        for group in self._body_groups:
+            # 동일 본문은 앵커도 동일
+            if active is not None and not active[group[0].order]:
+                continue
+            self._scan_body_group(text, group, per_target)
+
+        for key, members in self._families.items():
+            if active is not None and not any(active[t.order] for t in members):
+                continue
+            self._scan_family(text, key, members, per_target, active)
+
+        matches: List[Dict[str, Any]] = []
+        for target_matches in per_target:
+            matches.extend(target_matches)
+        return matches
+
+    def _scan_body_group(
+        self,
+        text: str,
+        group: List[ScanTarget],
+        per_target: List[List[Dict[str, Any]]],
+    ) -> None:
+        """동일 정규식 본문을 가진 패턴들을 finditer 한 번으로 처리"""
+        for match in group[0].compiled.finditer(text):
+            for target in group:
+                self._emit(target, match, per_target)
+
+    def _scan_family(
+        self,
+        text: str,
+        key: str,
+        members: List[ScanTarget],
+        per_target: List[List[Dict[str, Any]]],
+        active: Optional[List[bool]] = None,
+    ) -> None:
+        """
+        공통 접두어 계열 처리
+
+        각 패턴은 접두어 위치에서만 시작할 수 있으므로, 접두어 위치를 오름차순으로
+        훑으며 패턴별 마지막 매치 끝 이후 위치에서만 match를 시도한다.
+        이는 패턴별 finditer의 비중첩 결과와 동일하다.
+        """
+        always, buckets = self._dispatch_tables[key]
+        key_end = len(key)
+        last_end = [0] * len(members)
+        position = text.find(key)
+
+        while position != -1:
+            bucket_start = position + key_end
+            bucket = buckets.get(text[bucket_start:bucket_start + DISPATCH_KEY_LENGTH], ())
+
+            for candidates in (always, bucket):
+                for index, target in candidates:
+                    if position < last_end[index]:
+                        continue
+                    if active is not None and not active[target.order]:
+                        continue
+                    if not text.startswith(target.prefix, position):
+                        continue
+
+                    match = target.compiled.match(text, position)
+                    if match is None:
+                        continue
+
+                    last_end[index] = match.end()
+                    self._emit(target, match, per_target)
+
+            position = text.find(key, position + 1)
+
+    def get_prefilter_stats(self) -> Dict[str, Any]:
+        """프리필터 패턴별 스킵 통계 반환 (프리필터 미사용 시 빈 통계)"""
+        if self._prefilter is None:
+            return {"calls": 0, "patterns": {}}
+        return self._prefilter.get_statistics()
+
+    def reset_prefilter_stats(self) -> None:
+        """프리필터 스킵 통계 초기화"""
+        if self._prefilter is not None:
+            self._prefilter.reset_statistics()
+
+    @staticmethod
+    def _emit(
+        target: ScanTarget,
+        match: re.Match,
+        per_target: List[List[Dict[str, Any]]],
+    ) -> None:
+        """검증 통과한 매치를 패턴별 결과에 추가"""
+        matched_text = match.group(0)
+        pattern_def = target.pattern_def
+
+        # 추가 검증이 있으면 실행
+        if pattern_def.validator:
+            is_valid, _reason = pattern_def.validator(matched_text)
+            if not is_valid:
+                return
+
+        per_target[target.order].append(
+            {
+                "match": matched_text,
+                "pattern_name": target.name,
+                "pattern_def": pattern_def,
+                "start": match.start(),
+                "end": match.end(),
+                "type": pattern_def.type,
+                "priority": pattern_def.priority,
+            }
+        )
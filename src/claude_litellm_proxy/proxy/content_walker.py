@@ -0,0 +1,190 @@
+"""
+Claude API 요청 구조 인식 마스킹 대상 수집
+
+messages[].content, system, tools는 문자열 또는 content block 리스트이므로
+마스킹해야 하는 문자열 leaf만 경로와 함께 수집하고,
+마스킹 결과는 바뀐 경로의 컨테이너만 복사해서 반영 (요청 전체 복사 없음)
+
+수집 대상:
+- text 블록의 text
+- tool_use 블록의 input (모든 문자열 leaf, 키 제외)
+- tool_result 블록의 content (문자열 또는 블록 리스트 재귀)
+- document 블록 중 text 소스의 data
+- system (문자열 또는 text 블록 리스트)
+- tools[]의 description과 input_schema 안의 description
+  (스키마 키워드/값, properties 이름, required/enum 등 구조는 그대로)
+
+건너뜀: image / base64 document (디코딩 안 함), thinking 계열(서명 검증), 알 수 없는 블록
+"""
+
+from typing import Any, Dict, List, Tuple, Union
+
+# 요청 루트부터 leaf까지의 경로 (dict 키 또는 list 인덱스)
+LeafPath = Tuple[Union[str, int], ...]
+Leaf = Tuple[LeafPath, str]
+
+
+def collect_json_leaves(value: Any, path: LeafPath, leaves: List[Leaf]) -> None:
+    """
+    임의 JSON 값의 모든 문자열 leaf 수집 (dict 키는 대상 아님)
+
+    Args:
+        value: JSON 값
+        path: value의 경로
+        leaves: 수집 결과 (경로, 문자열) 추가 대상
+    """
+    if isinstance(value, str):
+        if value:
+            leaves.append((path, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            collect_json_leaves(item, path + (key,), leaves)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            collect_json_leaves(item, path + (index,), leaves)
+
+
+def collect_block_leaves(block: Any, path: LeafPath, leaves: List[Leaf]) -> None:
+    """
+    content block 하나에서 마스킹 대상 leaf 수집
+
+    Args:
+        block: content block (dict)
+        path: block의 경로
+        leaves: 수집 결과
+    """
+    if not isinstance(block, dict):
+        return
+
+    block_type = block.get("type")
+    if block_type == "text":
+        text = block.get("text")
+        if isinstance(text, str) and text:
+            leaves.append((path + ("text",), text))
+    elif block_type == "tool_use":
+        collect_json_leaves(block.get("input"), path + ("input",), leaves)
+    elif block_type == "tool_result":
+        collect_content_leaves(block.get("content"), path + ("content",), leaves)
+    elif block_type == "document":
+        source = block.get("source")
+        if isinstance(source, dict) and source.get("type") == "text":
+            data = source.get("data")
+            if isinstance(data, str) and data:
+                leaves.append((path + ("source", "data"), data))
+
+
+def collect_content_leaves(content: Any, path: LeafPath, leaves: List[Leaf]) -> None:
+    """
+    content 값(문자열 또는 content block 리스트)에서 마스킹 대상 leaf 수집
+
+    Args:
+        content: message/system/tool_result의 content
+        path: content의 경로
+        leaves: 수집 결과
+    """
+    if isinstance(content, str):
+        if content:
+            leaves.append((path, content))
+    elif isinstance(content, list):
+        for index, block in enumerate(content):
+            collect_block_leaves(block, path + (index,), leaves)
+
+
+# 하위 스키마를 값으로 갖는 JSON Schema 키워드
+_SCHEMA_CHILD = ("items", "additionalProperties", "not", "if", "then", "else", "contains")
+_SCHEMA_LIST = ("anyOf", "oneOf", "allOf", "prefixItems")
+_SCHEMA_MAP = ("properties", "patternProperties", "$defs", "definitions")
+
+
+def collect_schema_descriptions(schema: Any, path: LeafPath, leaves: List[Leaf]) -> None:
+    """
+    JSON Schema에서 description 문자열만 수집 (하위 스키마 재귀)
+
+    $schema / type / required / enum / properties 이름 등은 도구 정의의 구조라
+    마스킹하면 스키마가 깨지거나 다른 도구를 설명하게 되므로 수집하지 않음
+
+    Args:
+        schema: 스키마 (dict가 아니면 무시)
+        path: schema의 경로
+        leaves: 수집 결과
+    """
+    if not isinstance(schema, dict):
+        return
+
+    description = schema.get("description")
+    if isinstance(description, str) and description:
+        leaves.append((path + ("description",), description))
+
+    for keyword in _SCHEMA_CHILD:
+        collect_schema_descriptions(schema.get(keyword), path + (keyword,), leaves)
+    for keyword in _SCHEMA_LIST:
+        children = schema.get(keyword)
+        if isinstance(children, list):
+            for index, child in enumerate(children):
+                collect_schema_descriptions(child, path + (keyword, index), leaves)
+    for keyword in _SCHEMA_MAP:
+        children = schema.get(keyword)
+        if isinstance(children, dict):
+            for name, child in children.items():
+                collect_schema_descriptions(child, path + (keyword, name), leaves)
+
+
+def collect_tool_leaves(tools: Any, path: LeafPath, leaves: List[Leaf]) -> None:
+    """
+    tools 정의에서 설명 문자열 leaf 수집 (name은 도구 식별자이므로 제외)
+
+    Args:
+        tools: 요청의 tools 리스트
+        path: tools의 경로
+        leaves: 수집 결과
+    """
+    if not isinstance(tools, list):
+        return
+
+    for index, tool in enumerate(tools):
+        if not isinstance(tool, dict):
+            continue
+        description = tool.get("description")
+        if isinstance(description, str) and description:
+            leaves.append((path + (index, "description"), description))
+        collect_schema_descriptions(tool.get("input_schema"), path + (index, "input_schema"), leaves)
+
+
+def apply_leaves(root: Dict[str, Any], replacements: List[Tuple[LeafPath, Any]]) -> Dict[str, Any]:
+    """
+    바뀐 leaf만 반영한 새 요청 반환 (copy-on-write)
+
+    바뀐 leaf의 경로에 있는 컨테이너만 얕은 복사하고
+    나머지 하위 트리는 원본 객체를 그대로 공유
+
+    Args:
+        root: 원본 요청 (수정하지 않음)
+        replacements: (경로, 새 값) 목록 (leaf 문자열 또는 캐시된 하위 트리)
+
+    Returns:
+        새 요청 (바뀐 것이 없으면 root 얕은 복사본)
+    """
+    result = dict(root)
+    copied = {()}
+
+    for path, value in replacements:
+        container: Any = result
+        for depth, key in enumerate(path[:-1]):
+            prefix = path[:depth + 1]
+            child = container[key]
+            if prefix not in copied:
+                child = dict(child) if isinstance(child, dict) else list(child)
+                container[key] = child
+                copied.add(prefix)
+            container = child
+        container[path[-1]] = value
+
+    return result
+
+
+def extract_subtree(root: Any, path: LeafPath) -> Any:
+    """경로의 값 반환"""
+    value = root
+    for key in path:
+        value = value[key]
+    return value
@@ -0,0 +1,202 @@
+"""
+카운터 블록 예약 할당기
+
+새 토큰 생성(get-or-create)과 get_next_counter가 새 식별자마다 INCR을 보내는 대신
+카운터 키별로 INCRBY로 구간(블록)을 예약해 두고 프로세스 안에서 나눠 줌
+
+- 유일성: 블록은 Redis 카운터를 원자적으로 전진시켜 얻으므로
+  여러 워커/노드가 같은 값을 받는 일은 없음 (번호 순서는 워커마다 섞일 수 있음)
+- 블록 크기 적응: 블록을 빨리 소진하면 두 배, 오래 남으면 절반 (최대 MAX_BLOCK_SIZE)
+- 할당했지만 쓰지 않은 값(이미 매핑이 있던 원본)은 give_back으로 돌려받아 먼저 재사용
+- 종료 시 남은 구간은 다른 워커가 그 뒤를 예약하지 않았을 때만 카운터를 되돌려 반납
+  (이미 뒤를 예약했으면 빈 번호로 남음 - 유일성에는 영향 없음)
+- 예약이 실패하면 (응답 전에 끊겼어도 INCRBY는 적용됐을 수 있음) 필요한 개수만 한 번 다시 예약
+  → 재예약으로 버려질 수 있는 번호가 블록 크기만큼 늘지 않음 (예약 함수는 재시도하지 않아야 함)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# 블록 크기 상한: 다른 워커가 뒤를 예약했거나 프로세스가 강제 종료되면 남은 구간은
+# 빈 번호로 남으므로, 버려지는 번호가 토큰 번호를 키우지 않도록 작게 유지
+MAX_BLOCK_SIZE = 256
+
+# (카운터 키, 개수) → INCRBY 결과(구간의 마지막 값)
+ReserveFunc = Callable[[str, int], Awaitable[int]]
+
+
+@dataclass
+class CounterBlock:
+    """예약된 카운터 구간 [next_value, end]"""
+
+    next_value: int
+    end: int
+    size: int
+    reserved_at: float
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.next_value + 1
+
+
+class CounterBlockAllocator:
+    """
+    카운터 키별 블록 할당기
+
+    사용 예:
+        allocator = CounterBlockAllocator(reserve=incrby, initial_block_size=64)
+        counter = (await allocator.allocate("counter:ec2"))[0]
+    """
+
+    def __init__(
+        self,
+        reserve: ReserveFunc,
+        initial_block_size: int = 64,
+        min_block_size: int = 8,
+        max_block_size: int = MAX_BLOCK_SIZE,
+        fast_refill_seconds: float = 1.0
+    ) -> None:
+        """
+        Args:
+            reserve: 구간 예약 함수 (INCRBY, 실패 시 재시도는 할당기가 한 번만)
+            initial_block_size: 카운터 키별 첫 블록 크기
+            min_block_size: 최소 블록 크기
+            max_block_size: 최대 블록 크기
+            fast_refill_seconds: 블록을 이 시간 안에 소진하면 크기 두 배, 8배 넘게 걸리면 절반
+        """
+        if not 1 <= min_block_size <= initial_block_size <= max_block_size:
+            raise ValueError("블록 크기는 1 <= min <= initial <= max 이어야 합니다")
+
+        self._reserve = reserve
+        self.initial_block_size = initial_block_size
+        self.min_block_size = min_block_size
+        self.max_block_size = max_block_size
+        self.fast_refill_seconds = fast_refill_seconds
+
+        self._blocks: Dict[str, CounterBlock] = {}
+        self._block_sizes: Dict[str, int] = {}
+        self._returned: Dict[str, List[int]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        # 통계
+        self.allocated = 0
+        self.reservations = 0
+
+    def _next_block_size(self, resource_type: str) -> int:
+        """이전 블록 소진 속도로 다음 블록 크기 결정"""
+        size = self._block_sizes.get(resource_type, self.initial_block_size)
+        previous = self._blocks.get(resource_type)
+        if previous is not None:
+            lifetime = time.monotonic() - previous.reserved_at
+            if lifetime < self.fast_refill_seconds:
+                size = min(size * 2, self.max_block_size)
+            elif lifetime > self.fast_refill_seconds * 8:
+                size = max(size // 2, self.min_block_size)
+        self._block_sizes[resource_type] = size
+        return size
+
+    async def allocate(self, resource_type: str, count: int = 1) -> List[int]:
+        """
+        카운터 값 할당
+
+        Args:
+            resource_type: 카운터 키
+            count: 필요한 개수
+
+        Returns:
+            유일한 카운터 값 목록 (돌려받은 값 먼저, 이후 블록 순서)
+        """
+        lock = self._locks.setdefault(resource_type, asyncio.Lock())
+        async with lock:
+            returned = self._returned.get(resource_type)
+            values = returned[:count] if returned else []
+            if values:
+                del returned[:len(values)]
+            while len(values) < count:
+                block = self._blocks.get(resource_type)
+                if block is None or block.remaining == 0:
+                    needed = count - len(values)
+                    size = max(self._next_block_size(resource_type), needed)
+                    try:
+                        last_value = await self._reserve(resource_type, size)
+                    except Exception:
+                        size = needed
+                        last_value = await self._reserve(resource_type, size)
+                    block = CounterBlock(
+                        next_value=last_value - size + 1,
+                        end=last_value,
+                        size=size,
+                        reserved_at=time.monotonic(),
+                    )
+                    self._blocks[resource_type] = block
+                    self.reservations += 1
+
+                take = min(block.remaining, count - len(values))
+                values.extend(range(block.next_value, block.next_value + take))
+                block.next_value += take
+
+            self.allocated += count
+            return values
+
+    def give_back(self, resource_type: str, values: List[int]) -> None:
+        """
+        할당했지만 쓰지 않은 값 반환 (다음 allocate에서 먼저 사용)
+
+        Args:
+            resource_type: 카운터 키
+            values: 이 할당기에서 받은 뒤 Redis에 쓰지 않은 값
+        """
+        if not values:
+            return
+        returned = self._returned.setdefault(resource_type, [])
+        returned.extend(values)
+        returned.sort()
+        self.allocated -= len(values)
+
+        # 블록의 다음 값 바로 앞까지 이어지는 값은 블록에 되붙임 (종료 시 함께 반납 가능)
+        block = self._blocks.get(resource_type)
+        while block is not None and returned and returned[-1] == block.next_value - 1:
+            block.next_value -= 1
+            returned.pop()
+
+    def discard(self, resource_type: str) -> None:
+        """
+        블록과 돌려받은 값 폐기 (카운터가 기존 토큰보다 뒤처진 경우, 다음 할당은 새로 예약)
+
+        Args:
+            resource_type: 카운터 키
+        """
+        self._blocks.pop(resource_type, None)
+        self._returned.pop(resource_type, None)
+
+    def take_unused(self) -> Dict[str, Tuple[int, int]]:
+        """
+        남은 구간을 꺼내고 블록 초기화 (종료/카운터 초기화 시)
+
+        돌려받은 값은 구간 끝에 붙어 있지 않으므로 빈 번호로 남김
+
+        Returns:
+            {카운터 키: (첫 미사용 값, 구간 끝)}
+        """
+        unused = {
+            resource_type: (block.next_value, block.end)
+            for resource_type, block in self._blocks.items()
+            if block.remaining > 0
+        }
+        self._blocks.clear()
+        self._returned.clear()
+        return unused
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """할당 통계 반환"""
+        unused = {resource_type: block.remaining for resource_type, block in self._blocks.items()}
+        for resource_type, values in self._returned.items():
+            unused[resource_type] = unused.get(resource_type, 0) + len(values)
+        return {
+            "allocated": self.allocated,
+            "reservations": self.reservations,
+            "block_sizes": dict(self._block_sizes),
+            "unused": unused,
+        }
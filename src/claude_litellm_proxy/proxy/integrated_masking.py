@@ -7,9 +7,28 @@
 TDD Green Phase: 테스트를 통과하는 구현
 """
 
-from typing import Dict, Tuple, Optional
+import asyncio
+import logging
+import re
+from typing import Dict, List, Set, Tuple, Optional, Union
+from ..patterns.cloud_patterns import PatternDefinition
 from ..patterns.masking_engine import MaskingEngine
+from ..patterns.parallel_scanner import DEFAULT_OFFLOAD_THRESHOLD, ParallelScanner
+from ..patterns.text_rewriter import RewriteSpan, apply_spans, drop_overlapping, spans_from_matches
 from .mapping_store import MappingStore
+from .message_mask_cache import MessageMaskCache
+from .redis_connection import RedisConnectionOptions
+from .sharded_mapping_store import ShardedMappingStore
+from .token_codec import TokenCodec
+from ..utils.logging import log_event, setup_logger
+from ..utils.metrics import PATTERN_MATCHES
+from ..utils.request_timing import record_count, stage_timer
+
+logger = setup_logger(__name__)
+
+# 마스킹 토큰 형식 (예: AWS_EC2_001, AWS_S3_BUCKET_002, AWS_EC2_1000)
+# 카운터는 1000 이상이면 4자리 이상이므로 숫자 전체를 토큰으로 (AWS_EC2_1000을 AWS_EC2_100 + "0"으로 자르지 않음)
+_MASKED_TOKEN_PATTERN = re.compile(r'AWS_[A-Z0-9_]+_\d{3,}(?!\d)')
 
 
 class IntegratedMaskingSystem:
@@ -21,6 +40,11 @@ class IntegratedMaskingSystem:
     - 일관된 마스킹 결과 보장
     - 영속적 매핑 관리
     - 세션 간 일관성 유지
+    
+    토큰 모드:
+    - 카운터 (기본): Redis 카운터로 AWS_EC2_001 형식 토큰 생성, 복원은 Redis 조회
+    - 암호화 (token_codec 지정): 키 기반 가역 토큰, 마스킹/복원 모두 저장소 없이 처리
+      (token_audit=True면 감사용으로 Redis에 비동기 기록)
     """
     
     def __init__(
@@ -28,7 +52,18 @@ class IntegratedMaskingSystem:
         redis_host: str = "localhost",
         redis_port: int = 6379,
         redis_db: int = 0,
-        redis_password: Optional[str] = None
+        redis_password: Optional[str] = None,
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        scan_offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        scan_workers: Optional[int] = None,
+        token_codec: Optional[TokenCodec] = None,
+        token_audit: bool = False,
+        redis_options: Optional[RedisConnectionOptions] = None,
+        redis_shards: Optional[List[Tuple[str, int]]] = None,
+        redis_shard_sub_tags: int = 1,
+        mapping_ttl: Optional[int] = None,
+        message_mask_cache: Optional[MessageMaskCache] = None
     ) -> None:
         """
         통합 시스템 초기화
@@ -38,17 +73,70 @@ class IntegratedMaskingSystem:
             redis_port: Redis 서버 포트  
             redis_db: Redis 데이터베이스 번호
             redis_password: Redis 비밀번호 (선택)
+            cache_size: 프로세스 내 매핑 캐시 최대 항목 수 (0이면 사용 안 함)
+            cache_ttl: 매핑 캐시 항목 최대 유지 시간 (초)
+            scan_offload_threshold: 이 길이 이상의 텍스트는 프로세스 풀에서 스캔 (0이면 항상 인라인)
+            scan_workers: 스캔 프로세스 풀 크기 (기본: CPU 코어 수)
+            token_codec: 지정 시 암호화 토큰 모드 (Redis 카운터/조회 없음)
+            token_audit: 암호화 토큰 모드에서 매핑을 Redis에 감사 기록 (응답 경로에서 대기하지 않음)
+            redis_options: Redis 연결 풀/재시도/전송 설정 (기본값은 RedisConnectionOptions 참고)
+            redis_shards: 지정 시 [(호스트, 포트)] 노드에 나눠 저장 (redis_host/redis_port 무시)
+            redis_shard_sub_tags: 샤드 저장소의 태그당 하위 태그 수 (1보다 크면 한 타입을 여러 노드에 분산)
+            mapping_ttl: ttl을 지정하지 않은 마스킹의 매핑 만료 시간 (초, 기본: 만료 없음)
+            message_mask_cache: 대화 메시지 마스킹 캐시 (clear_all_mappings 시 함께 비움)
         """
         # 마스킹 엔진 초기화 (mapping_store 주입)
         self.masking_engine = MaskingEngine(mapping_store=None)  # 일단 None으로 초기화
         
-        # Redis 매핑 저장소 초기화
-        self.mapping_store = MappingStore(
-            host=redis_host,
-            port=redis_port,
-            db=redis_db,
-            password=redis_password
+        # 대용량 텍스트 스캔은 이벤트 루프 밖에서
+        self.scanner = ParallelScanner(
+            self.masking_engine.patterns,
+            offload_threshold=scan_offload_threshold,
+            max_workers=scan_workers
         )
+        
+        # Redis 매핑 저장소 초기화 (샤드 지정 시 노드별 해시 태그 저장소)
+        self.mapping_store: Union[MappingStore, ShardedMappingStore]
+        if redis_shards:
+            self.mapping_store = ShardedMappingStore(
+                redis_shards,
+                db=redis_db,
+                password=redis_password,
+                cache_size=cache_size,
+                cache_ttl=cache_ttl,
+                connection_options=redis_options,
+                sub_tags=redis_shard_sub_tags
+            )
+        else:
+            self.mapping_store = MappingStore(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                password=redis_password,
+                cache_size=cache_size,
+                cache_ttl=cache_ttl,
+                connection_options=redis_options
+            )
+        
+        self.token_codec = token_codec
+        self.token_audit = token_audit
+        self._audit_tasks: Set[asyncio.Task] = set()
+        
+        self.mapping_ttl = mapping_ttl
+        self.message_mask_cache = message_mask_cache
+        # 매핑 세대 (clear_all_mappings마다 증가, 이전 세대의 메시지 캐시 항목은 사용 안 함)
+        self.generation = 0
+    
+    @property
+    def cache_namespace(self) -> str:
+        """
+        메시지 마스킹 캐시 키 네임스페이스 (토큰 모드 + 매핑 세대)
+        
+        토큰 모드/키나 매핑 세대가 바뀌면 캐시된 마스킹 결과의 토큰이
+        현재 매핑과 다를 수 있으므로 다른 키를 사용
+        """
+        mode = f"encrypted:{self.token_codec.active_key_id}" if self.token_codec else "counter"
+        return f"{mode}:{self.generation}"
     
     async def mask_text(self, text: str, ttl: Optional[int] = None) -> Tuple[str, Dict[str, str]]:
         """
@@ -64,26 +152,31 @@ class IntegratedMaskingSystem:
         if not text:
             return text or "", {}
         
-        # 1. 기존 매핑이 있는지 Redis에서 확인
-        existing_mappings = await self._get_existing_mappings_for_text(text)
-        if existing_mappings:
-            print(f"[DEBUG] 기존 매핑 {len(existing_mappings)}개 발견: {existing_mappings}")
-        
-        # 2. Redis 기반 직접 마스킹 처리 (기존 매핑 활용)
-        masked_text, final_mappings = await self._mask_text_with_redis_counter(text, existing_mappings)
+        # 스캔 1회 + MGET 1회 + 카운터 예약 1회 + 저장 파이프라인 1회
+        masked_text, final_mappings = await self._mask_text_with_redis_counter(text, ttl)
         
         if final_mappings:
-            print(f"[DEBUG] 최종 매핑 {len(final_mappings)}개 생성: {final_mappings}")
+            # 원본 값은 기록하지 않음 (개수만)
+            log_event(logger, logging.DEBUG, "mask_text", sample_every=100, mappings=len(final_mappings))
         
         # 매핑은 이미 _mask_text_with_redis_counter에서 저장됨
         return masked_text, final_mappings
     
-    async def unmask_text(self, masked_text: str) -> str:
+    async def unmask_text(
+        self,
+        masked_text: str,
+        known_mappings: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         마스킹된 텍스트를 원본으로 복원
         
+        토큰은 요청 마스킹 시 만든 매핑(known_mappings)에서 먼저 찾고,
+        없는 토큰(모델이 만들었거나 이전 대화에서 반복한 토큰)만
+        MGET 한 번으로 Redis에서 조회
+        
         Args:
             masked_text: 마스킹된 텍스트
+            known_mappings: 요청 범위 매핑 {마스킹된_값: 원본_값} (선택)
             
         Returns:
             복원된 텍스트
@@ -91,46 +184,65 @@ class IntegratedMaskingSystem:
         if not masked_text:
             return masked_text or ""
         
-        print(f"[DEBUG] 언마스킹 대상 텍스트: {masked_text[:200]}...")
+        # AWS 마스킹 토큰 위치 수집
+        token_matches = list(_MASKED_TOKEN_PATTERN.finditer(masked_text))
+        if not token_matches:
+            return masked_text
         
-        # Redis에서 매핑 정보 조회하여 복원
-        unmasked_text = masked_text
+        # 요청 범위 매핑 우선, 나머지만 Redis 일괄 조회
+        known_mappings = known_mappings or {}
+        originals: Dict[str, str] = {}
+        missing = []
+        for token in dict.fromkeys(match.group() for match in token_matches):
+            if token in known_mappings:
+                originals[token] = known_mappings[token]
+            else:
+                missing.append(token)
         
-        # 정규식을 사용하여 AWS 마스킹 패턴 찾기
-        import re
-        aws_pattern = r'AWS_[A-Z_]+_\d{3}'
-        matches = re.finditer(aws_pattern, masked_text)
+        if missing and self.token_codec is not None:
+            # 암호화 토큰은 저장소 없이 복원
+            undecoded = []
+            for token in missing:
+                original = self.token_codec.decode(token)
+                if original is None:
+                    undecoded.append(token)
+                else:
+                    originals[token] = original
+            missing = undecoded if self.token_audit else []
         
-        # 뒤에서부터 치환 (인덱스 변화 방지)
-        replacements = []
-        for match in matches:
-            masked_token = match.group()
-            start, end = match.span()
-            replacements.append((start, end, masked_token))
+        if missing:
+            with stage_timer("redis"):
+                originals.update(await self.mapping_store.get_originals_batch(missing))
+            unresolved = [token for token in missing if token not in originals]
+            if unresolved:
+                # 토큰 자체는 민감정보가 아님
+                log_event(
+                    logger, logging.WARNING, "unmask_unresolved",
+                    sample_every=10, tokens=unresolved[:10], count=len(unresolved)
+                )
         
-        # 뒤에서부터 처리
-        replacements.sort(key=lambda x: x[0], reverse=True)
-        
-        for start, end, masked_token in replacements:
-            print(f"[DEBUG] 언마스킹 시도: '{masked_token}'")
-            
-            # Redis에서 원본 값 조회
-            original = await self.mapping_store.get_original(masked_token)
-            if original:
-                print(f"[DEBUG] 언마스킹 성공: {masked_token} -> {original}")
-                unmasked_text = unmasked_text[:start] + original + unmasked_text[end:]
-            else:
-                print(f"[DEBUG] 언마스킹 실패: {masked_token} (Redis에서 찾을 수 없음)")
+        # 앞에서부터 한 번에 치환
+        parts = []
+        cursor = 0
+        for match in token_matches:
+            original = originals.get(match.group())
+            if original is None:
+                continue
+            start, end = match.span()
+            parts.append(masked_text[cursor:start])
+            parts.append(original)
+            cursor = end
+        parts.append(masked_text[cursor:])
         
-        return unmasked_text
+        return "".join(parts)
     
-    async def _mask_text_with_redis_counter(self, text: str, existing_mappings: Optional[Dict[str, str]] = None) -> tuple[str, Dict[str, str]]:
+    async def _mask_text_with_redis_counter(self, text: str, ttl: Optional[int] = None) -> tuple[str, Dict[str, str]]:
         """
-        Redis 기반 유일 카운터를 사용한 마스킹
+        Redis 기반 유일 카운터를 사용한 배치 마스킹 (텍스트 1개)
         
         Args:
             text: 마스킹할 텍스트
-            existing_mappings: 기존 매핑 정보 (중복 Redis 조회 방지)
+            ttl: 매핑 만료 시간 (초, 선택사항)
             
         Returns:
             (마스킹된_텍스트, 매핑_정보)
@@ -138,99 +250,188 @@ class IntegratedMaskingSystem:
         if not text:
             return text or "", {}
         
-        # 1. AWS 패턴 찾기
-        matches = self.masking_engine.patterns.find_matches(text)
-        if not matches:
-            return text, {}
-        
-        masked_text = text
-        mappings = {}
+        return (await self._mask_texts_with_redis_counter([text], ttl))[0]
+    
+    async def mask_texts(self, texts: List[str], ttl: Optional[int] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        여러 텍스트(요청 JSON의 문자열 leaf 등)를 한 번에 마스킹
         
-        # 뒤에서부터 처리 (인덱스 변화 방지)
-        matches.sort(key=lambda x: x["start"], reverse=True)
+        텍스트마다 패턴 스캔 후 전체 원본을 모아 get-or-create 스크립트
+        한 번으로 처리 (leaf 개수와 무관하게 Redis 1 round-trip)
         
-        for match in matches:
-            original = match["match"]
-            pattern_def = match["pattern_def"]
-            print(f"[DEBUG] 처리 중인 원본: {original} (타입: {pattern_def.type})")
+        Args:
+            texts: 마스킹할 텍스트 목록
+            ttl: 매핑 만료 시간 (초, 선택사항)
             
-            # 2. 기존 매핑 확인 (existing_mappings 우선 사용)
-            existing_masked = None
-            if existing_mappings:
-                # 기존 매핑에서 찾기
-                for masked_key, original_val in existing_mappings.items():
-                    if original_val == original:
-                        existing_masked = masked_key
-                        print(f"[DEBUG] 기존 매핑에서 발견: {original} → {existing_masked}")
-                        break
+        Returns:
+            텍스트별 (마스킹된_텍스트, 매핑_정보) 목록 (입력 순서)
+        """
+        if not texts:
+            return []
+        
+        results = await self._mask_texts_with_redis_counter(texts, ttl)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            total = sum(len(mappings) for _, mappings in results)
+            log_event(logger, logging.DEBUG, "mask_texts", sample_every=100, texts=len(texts), mappings=total)
+        
+        return results
+    
+    async def mask_texts_spans(
+        self,
+        texts: List[str],
+        ttl: Optional[int] = None
+    ) -> List[Tuple[List[RewriteSpan], Dict[str, str]]]:
+        """
+        mask_texts와 같지만 마스킹된 문자열 대신 치환 구간을 반환
+        
+        JSON으로 직렬화하는 호출자는 iter_json_string(text, spans)으로
+        마스킹된 전체 문자열을 만들지 않고 바로 내보낼 수 있음
+        
+        Args:
+            texts: 마스킹할 텍스트 목록
+            ttl: 매핑 만료 시간 (초, 선택사항)
             
-            # 기존 매핑에 없으면 Redis에서 직접 조회
-            if not existing_masked:
-                existing_masked = await self.mapping_store.get_masked(original)
-                if existing_masked:
-                    print(f"[DEBUG] Redis에서 발견: {original} → {existing_masked}")
+        Returns:
+            텍스트별 (시작 위치 순 치환 구간, 매핑_정보) 목록 (입력 순서)
+        """
+        if not texts:
+            return []
+        
+        return await self._mask_spans_with_redis_counter(texts, ttl)
+    
+    async def _mask_texts_with_redis_counter(
+        self,
+        texts: List[str],
+        ttl: Optional[int] = None
+    ) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Redis 기반 유일 카운터를 사용한 배치 마스킹 (치환 구간을 한 번에 적용)
+        
+        Args:
+            texts: 마스킹할 텍스트 목록
+            ttl: 매핑 만료 시간 (초, 선택사항)
             
-            if existing_masked:
-                # 기존 매핑 재사용
-                masked_value = existing_masked
-                mappings[masked_value] = original
-                print(f"[DEBUG] 기존 매핑 재사용: {original} → {masked_value}")
-            else:
-                # 3. Redis 기반 유일 카운터로 새 ID 생성
-                counter_value = await self.mapping_store.get_next_counter(pattern_def.type)
-                print(f"[DEBUG] 새 카운터 생성: {pattern_def.type} → {counter_value}")
-                
-                # 4. 마스킹 값 생성
-                try:
-                    masked_value = pattern_def.replacement.format(counter_value)
-                except (ValueError, KeyError):
-                    masked_value = f"{pattern_def.type.upper()}_{counter_value:03d}"
-                
-                print(f"[DEBUG] 새 매핑 생성: {original} → {masked_value}")
-                
-                # 5. Redis에 매핑 저장
-                await self.mapping_store.save_mapping(masked_value, original)
-                mappings[masked_value] = original
+        Returns:
+            텍스트별 (마스킹된_텍스트, 매핑_정보) 목록
+        """
+        results = await self._mask_spans_with_redis_counter(texts, ttl)
+        return [
+            (apply_spans(text, spans), mappings)
+            for text, (spans, mappings) in zip(texts, results)
+        ]
+    
+    async def _mask_spans_with_redis_counter(
+        self,
+        texts: List[str],
+        ttl: Optional[int] = None
+    ) -> List[Tuple[List[RewriteSpan], Dict[str, str]]]:
+        """
+        Redis 기반 유일 카운터를 사용한 배치 마스킹
+        
+        텍스트마다 패턴 스캔 1회 후 전체 원본 값을 중복 제거하고, 조회/카운터 증가/저장을
+        MappingStore의 원자적 get-or-create 스크립트 한 번으로 처리
+        (동시 요청이 같은 새 원본을 마스킹해도 토큰은 하나만 생성)
+        
+        카운터 번호와 매핑 순서는 텍스트 순서대로, 텍스트 안에서는 뒤에서부터
+        매치를 하나씩 처리하던 기존 방식과 동일하게 부여됨
+        
+        Args:
+            texts: 마스킹할 텍스트 목록
+            ttl: 매핑 만료 시간 (초, 선택사항)
             
-            # 6. 텍스트에서 교체
-            start, end = match["start"], match["end"]
-            masked_text = masked_text[:start] + masked_value + masked_text[end:]
+        Returns:
+            텍스트별 (시작 위치 순 치환 구간, 매핑_정보) 목록
+        """
+        if ttl is None:
+            ttl = self.mapping_ttl
+        
+        # 1. AWS 패턴 찾기 (뒤에서부터 처리하던 순서 유지)
+        matches_per_text = []
+        for text in texts:
+            matches = []
+            if text:
+                with stage_timer("pattern_scan"):
+                    matches = await self.scanner.scan(text)
+                with stage_timer("overlap_resolution"):
+                    matches = await self.scanner.resolve_conflicts(text, matches)
+            if matches and "AWS_" in text:
+                # 이미 마스킹된 토큰 안의 매치는 제외 (암호화 토큰의 base32 페이로드 등)
+                token_spans = [token.span() for token in _MASKED_TOKEN_PATTERN.finditer(text)]
+                matches = drop_overlapping(matches, token_spans)
+            matches.sort(key=lambda x: x["start"], reverse=True)
+            matches_per_text.append(matches)
+        
+        # 원본별로 처음 처리되는 매치의 패턴 사용
+        pattern_by_original: Dict[str, PatternDefinition] = {}
+        for matches in matches_per_text:
+            for match in matches:
+                pattern_by_original.setdefault(match["match"], match["pattern_def"])
+        
+        if not pattern_by_original:
+            return [([], {}) for _ in texts]
         
-        return masked_text, mappings
+        # 2. 토큰 생성
+        if self.token_codec is not None:
+            # 암호화 토큰: 저장소 없이 계산
+            masked_by_original = {
+                original: self.token_codec.format_token(pattern_def.replacement, original)
+                for original, pattern_def in pattern_by_original.items()
+            }
+            if self.token_audit:
+                self._schedule_audit(
+                    {masked: original for original, masked in masked_by_original.items()}, ttl
+                )
+        else:
+            # 조회 + 새 토큰 생성 + 저장을 Redis 안에서 원자적으로 (1 round-trip)
+            pairs = [(pattern_def.type, original) for original, pattern_def in pattern_by_original.items()]
+            token_formats = {pattern_def.type: pattern_def.replacement for pattern_def in pattern_by_original.values()}
+            with stage_timer("redis"):
+                tokens = await self.mapping_store.get_or_create_batch(pairs, token_formats, ttl=ttl)
+            masked_by_original = dict(zip(pattern_by_original, tokens))
+        
+        # 3. 치환 구간 (매치는 충돌 해결 후이므로 서로 겹치지 않음)
+        record_count("matches", sum(len(matches) for matches in matches_per_text))
+        results = []
+        for matches in matches_per_text:
+            mappings: Dict[str, str] = {}
+            for match in matches:
+                mappings[masked_by_original[match["match"]]] = match["match"]
+                PATTERN_MATCHES.inc(match["type"])
+            results.append((spans_from_matches(matches, masked_by_original), mappings))
+        
+        return results
+    
+    def _schedule_audit(self, mappings: Dict[str, str], ttl: Optional[int]) -> None:
+        """암호화 토큰 매핑 감사 기록 (백그라운드, 실패해도 마스킹에는 영향 없음)"""
+        async def record() -> None:
+            try:
+                await self.mapping_store.save_batch(mappings, ttl=ttl)
+            except Exception as e:
+                log_event(
+                    logger, logging.WARNING, "token_audit_failed",
+                    sample_every=100, error=str(e), mappings=len(mappings)
+                )
+        
+        task = asyncio.create_task(record())
+        self._audit_tasks.add(task)
+        task.add_done_callback(self._audit_tasks.discard)
     
     async def get_original_from_redis(self, masked: str) -> Optional[str]:
         """Redis에서 직접 원본 값 조회 (테스트용)"""
         return await self.mapping_store.get_original(masked)
     
     async def clear_all_mappings(self) -> None:
-        """모든 매핑 데이터 삭제 (테스트용)"""
+        """모든 매핑 데이터 삭제 (테스트용, 이전 매핑으로 마스킹한 메시지 캐시도 무효화)"""
         await self.mapping_store.clear_all()
         self.masking_engine.clear_mappings()
+        self.generation += 1
+        if self.message_mask_cache is not None:
+            self.message_mask_cache.clear()
     
     async def close(self) -> None:
         """시스템 종료"""
+        if self._audit_tasks:
+            await asyncio.gather(*self._audit_tasks, return_exceptions=True)
+        self.scanner.close()
         await self.mapping_store.close()
-    
-    async def _get_existing_mappings_for_text(self, text: str) -> Dict[str, str]:
-        """
-        텍스트에 포함된 리소스의 기존 매핑 조회
-        
-        Args:
-            text: 검사할 텍스트
-            
-        Returns:
-            기존 매핑 정보
-        """
-        existing_mappings = {}
-        
-        # 패턴으로 AWS 리소스 찾기
-        matches = self.masking_engine.patterns.find_matches(text)
-        
-        for match in matches:
-            original = match["match"]
-            # Redis에서 기존 매핑 확인
-            existing_masked = await self.mapping_store.get_masked(original)
-            if existing_masked:
-                existing_mappings[existing_masked] = original
-        
-        return existing_mappings
\ No newline at end of file
@@ -7,7 +7,9 @@ TDD Green Phase: 실제 LLM 프록시 구현
 
 import os
 import asyncio
-from typing import Dict, Any, Optional
+import uuid
+from typing import Dict, Any, AsyncIterator, Optional
+from urllib.parse import urlparse
 import litellm
 from ..utils.logging import setup_logger
 
@@ -62,26 +64,8 @@ class LiteLLMClient:
             Exception: API 호출 실패시
         """
         try:
-            # 모델 설정 (기본값 적용)
-            model = request_data.get("model", self.default_model)
-            
-            # Claude API 형식으로 변환
-            max_tokens = min(request_data.get("max_tokens", 4096), 4096)  # Haiku 모델 제한
-            litellm_request = {
-                "model": model,
-                "messages": request_data.get("messages", []),
-                "max_tokens": max_tokens,
-                "temperature": request_data.get("temperature", 0.7),
-                "api_key": self.claude_api_key,
-                "base_url": self.claude_base_url  # 환경변수에서 읽은 Claude API 주소
-            }
-            
-            # 추가 파라미터 처리
-            if "system" in request_data:
-                litellm_request["system"] = request_data["system"]
-            
-            if "stop_sequences" in request_data:
-                litellm_request["stop"] = request_data["stop_sequences"]
+            litellm_request = self._build_litellm_request(request_data)
+            model = litellm_request["model"]
             
             logger.info(f"Claude API 호출 시작: model={model}")
             
@@ -98,6 +82,138 @@ class LiteLLMClient:
             logger.error(f"Claude API 호출 실패: {e}")
             raise
     
+    async def stream_claude_api(self, request_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Claude API 스트리밍 호출 (비동기)
+        
+        upstream 연결이 성립된 뒤 Anthropic 스트리밍 이벤트
+        (message_start → content_block_start → content_block_delta... →
+        content_block_stop → message_delta → message_stop)를 순서대로 생성
+        
+        Args:
+            request_data: Claude API 요청 데이터
+            
+        Yields:
+            Claude API 스트리밍 이벤트
+            
+        Raises:
+            Exception: API 호출 실패시
+        """
+        litellm_request = self._build_litellm_request(request_data)
+        litellm_request["stream"] = True
+        litellm_request["stream_options"] = {"include_usage": True}
+        
+        logger.info(f"Claude API 스트리밍 호출 시작: model={litellm_request['model']}")
+        
+        try:
+            response = await litellm.acompletion(**litellm_request)
+        except Exception as e:
+            logger.error(f"Claude API 스트리밍 호출 실패: {e}")
+            raise
+        
+        async for event in self._convert_stream_to_claude_events(response, litellm_request["model"]):
+            yield event
+    
+    def _build_litellm_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Claude API 요청을 LiteLLM 요청으로 변환
+        
+        Args:
+            request_data: Claude API 요청 데이터
+            
+        Returns:
+            litellm.acompletion 인자
+        """
+        # 모델 설정 (기본값 적용)
+        model = request_data.get("model", self.default_model)
+        
+        # Claude API 형식으로 변환
+        max_tokens = min(request_data.get("max_tokens", 4096), 4096)  # Haiku 모델 제한
+        litellm_request = {
+            "model": model,
+            "messages": request_data.get("messages", []),
+            "max_tokens": max_tokens,
+            "temperature": request_data.get("temperature", 0.7),
+            "api_key": self.claude_api_key,
+            "base_url": self.claude_base_url  # 환경변수에서 읽은 Claude API 주소
+        }
+        
+        # 추가 파라미터 처리
+        if "system" in request_data:
+            litellm_request["system"] = request_data["system"]
+        
+        if "stop_sequences" in request_data:
+            litellm_request["stop"] = request_data["stop_sequences"]
+        
+        return litellm_request
+    
+    async def _convert_stream_to_claude_events(
+        self,
+        chunks: AsyncIterator[Any],
+        model: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        LiteLLM 스트리밍 청크를 Claude API 스트리밍 이벤트로 변환
+        
+        Args:
+            chunks: LiteLLM ModelResponseStream 청크 스트림
+            model: 요청 모델명
+            
+        Yields:
+            Claude API 스트리밍 이벤트
+        """
+        yield {
+            "type": "message_start",
+            "message": {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [],
+                "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": 0, "output_tokens": 0}
+            }
+        }
+        yield {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""}
+        }
+        
+        finish_reason = None
+        usage = None
+        
+        async for chunk in chunks:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            
+            if not chunk.choices:
+                continue
+            
+            choice = chunk.choices[0]
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+            
+            text = choice.delta.content if choice.delta else None
+            if text:
+                yield {
+                    "type": "content_block_delta",
+                    "index": 0,
+                    "delta": {"type": "text_delta", "text": text}
+                }
+        
+        yield {"type": "content_block_stop", "index": 0}
+        yield {
+            "type": "message_delta",
+            "delta": {"stop_reason": self._map_finish_reason(finish_reason), "stop_sequence": None},
+            "usage": {
+                "input_tokens": usage.prompt_tokens if usage else 0,
+                "output_tokens": usage.completion_tokens if usage else 0
+            }
+        }
+        yield {"type": "message_stop"}
+    
     def _convert_to_claude_format(self, litellm_response: Any) -> Dict[str, Any]:
         """
         LiteLLM 응답을 Claude API 형식으로 변환
@@ -155,9 +271,35 @@ class LiteLLMClient:
         
         return mapping.get(finish_reason, "end_turn")
     
+    async def check_connectivity(self, timeout: float = 2.0) -> Dict[str, Any]:
+        """
+        Claude API 주소로 TCP 연결만 확인 (API 호출/과금 없음)
+        
+        Args:
+            timeout: 연결 타임아웃 (초)
+            
+        Returns:
+            연결 대상 정보 (연결 실패 시 예외)
+        """
+        parsed = urlparse(self.claude_base_url)
+        host = parsed.hostname or "localhost"
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        
+        return {
+            "upstream": f"{host}:{port}",
+            "api_key_configured": bool(self.claude_api_key)
+        }
+    
     async def health_check(self) -> Dict[str, Any]:
         """
-        LiteLLM 연결 상태 확인
+        LiteLLM 연결 상태 확인 (실제 completion 호출 - 과금 발생, 프로브용으로 사용 금지)
         
         Returns:
             상태 정보
@@ -0,0 +1,140 @@
+"""
+프로세스 내 매핑 캐시 (MappingStore 1단계 캐시)
+
+같은 ARN/계정 ID/인스턴스 ID가 대화 턴마다 반복되므로
+Redis 조회 전에 프로세스 메모리에서 먼저 찾음
+
+- 크기 제한 LRU + 항목별 만료 시간
+- 키는 Redis 키 그대로 사용 ("m2o:AWS_EC2_001", "o2m:i-123...")
+  → keyspace 알림으로 받은 키 이름으로 바로 무효화 가능
+- 매핑은 한 번 쓰면 바뀌지 않으므로 음성 결과(없음)는 캐시하지 않고
+  존재하는 매핑만 캐시
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class MappingCache:
+    """
+    크기 제한 LRU + TTL 캐시
+
+    사용 예:
+        cache = MappingCache(max_entries=10000, ttl=300)
+        cache.set("m2o:AWS_EC2_001", "i-1234567890abcdef0")
+        cache.get("m2o:AWS_EC2_001")
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0) -> None:
+        """
+        Args:
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목 제거)
+            ttl: 기본 만료 시간 (초)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries는 1 이상이어야 합니다")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # 키 → (값, 만료 시각)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시 조회 (만료 항목은 제거 후 miss)
+
+        Args:
+            key: Redis 키
+
+        Returns:
+            값 또는 None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        여러 키 조회
+
+        Returns:
+            {키: 값} (캐시에 있는 키만 포함)
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        항목 저장
+
+        Args:
+            key: Redis 키
+            value: 값
+            ttl: 만료 시간 (초, Redis 키의 남은 TTL이 더 짧으면 그 값, 기본 self.ttl)
+        """
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+
+        self._entries[key] = (value, time.monotonic() + lifetime)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        """
+        항목 무효화
+
+        Returns:
+            제거된 항목이 있었는지 여부
+        """
+        if self._entries.pop(key, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def clear(self) -> None:
+        """전체 비우기 (통계는 유지)"""
+        self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """캐시 통계 반환"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
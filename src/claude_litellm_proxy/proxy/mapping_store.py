@@ -7,8 +7,310 @@ TDD Green Phase: 테스트를 통과하는 구현
 
 import asyncio
 import json
-from typing import Dict, Optional, Any
+import re
+import zlib
+from typing import Dict, List, Optional, Any, Tuple
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+from ..utils.logging import setup_logger
+from .counter_allocator import MAX_BLOCK_SIZE, CounterBlockAllocator
+from .mapping_cache import MappingCache
+from .redis_connection import (
+    RedisConnectionOptions,
+    counter_connection_options,
+    create_connection_pool,
+    pool_statistics,
+)
+
+# 로거 설정
+logger = setup_logger(__name__)
+
+# 캐시 무효화 대상 keyspace 이벤트 (UNLINK도 del 이벤트로 전달됨)
+_INVALIDATING_EVENTS = frozenset({"del", "expired", "evicted"})
+
+# 원자적 get-or-create 스크립트 (카운터 값은 호출자가 블록에서 미리 예약해 후보 토큰으로 전달)
+# KEYS: 원본마다 (o2m 키, 통계 해시 키), 이후 후보 풀마다 후보 토큰의 m2o 키들
+# ARGV: TTL(0이면 없음), 원본 수 N, 원본마다 (원본, 타입 통계 필드 또는 "", 후보 풀 번호),
+#       이후 후보 풀마다 (후보 개수, 후보 토큰...)
+# 새 원본은 자기 풀의 후보를 앞에서부터 사용 (토큰이 이미 있으면 다음 후보, 풀이 바닥나면 상태 2)
+# 반환: {토큰 목록, o2m 키의 남은 TTL(ms, -1이면 없음) 목록, 상태 목록, 풀별 사용한 후보 개수}
+#   상태 0: 기존 매핑, 1: 새로 생성, 2: 후보가 모두 기존 토큰과 겹침 (토큰 "", 재시도 필요)
+# 스크립트가 접근하는 키는 모두 KEYS로 선언 (해시 태그 모드에서는 태그별로 호출하므로
+# 한 호출의 키가 모두 같은 슬롯 → Redis Cluster에서도 실행 가능)
+GET_OR_CREATE_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local count = tonumber(ARGV[2])
+local pool_args = {}
+local pool_keys = {}
+local used = {}
+local pos = 3 + count * 3
+local key_pos = count * 2 + 1
+while pos <= #ARGV do
+    local size = tonumber(ARGV[pos])
+    pool_args[#pool_args + 1] = pos
+    pool_keys[#pool_keys + 1] = key_pos
+    used[#used + 1] = 0
+    pos = pos + size + 1
+    key_pos = key_pos + size
+end
+local tokens = {}
+local ttls = {}
+local statuses = {}
+for i = 1, count do
+    local o2m_key = KEYS[i * 2 - 1]
+    local stats_key = KEYS[i * 2]
+    local base = 2 + (i - 1) * 3
+    local original = ARGV[base + 1]
+    local token = redis.call('GET', o2m_key)
+    local status = 0
+    if not token then
+        local pool = tonumber(ARGV[base + 3])
+        local arg_start = pool_args[pool]
+        token = ''
+        status = 2
+        while used[pool] < tonumber(ARGV[arg_start]) do
+            local m2o_key = KEYS[pool_keys[pool] + used[pool]]
+            used[pool] = used[pool] + 1
+            if redis.call('EXISTS', m2o_key) == 0 then
+                token = ARGV[arg_start + used[pool]]
+                status = 1
+                redis.call('HINCRBY', stats_key, 'total_count', 1)
+                if ARGV[base + 2] ~= '' then
+                    redis.call('HINCRBY', stats_key, ARGV[base + 2], 1)
+                end
+                if ttl > 0 then
+                    redis.call('SET', m2o_key, original, 'EX', ttl)
+                    redis.call('SET', o2m_key, token, 'EX', ttl)
+                else
+                    redis.call('SET', m2o_key, original)
+                    redis.call('SET', o2m_key, token)
+                end
+                break
+            end
+        end
+    end
+    tokens[i] = token
+    ttls[i] = redis.call('PTTL', o2m_key)
+    statuses[i] = status
+end
+return {tokens, ttls, statuses, used}
+"""
+
+# 후보가 모두 기존 토큰과 겹칠 때 (카운터가 기존 토큰보다 뒤처짐) 새 블록으로 재시도하는 횟수
+_GET_OR_CREATE_ATTEMPTS = 3
+
+# 매핑 저장 + 통계 갱신 스크립트 (새 마스킹 값일 때만 통계 증가)
+# KEYS: 마스킹 값마다 (m2o 키, o2m 키, 통계 해시 키)
+# ARGV: TTL(0이면 없음), 이후 마스킹 값마다 (원본, 마스킹 값, 타입 통계 필드 또는 "")
+SAVE_MAPPINGS_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+for i = 1, #KEYS, 3 do
+    local base = 1 + (i - 1) / 3 * 3
+    local original = ARGV[base + 1]
+    local masked = ARGV[base + 2]
+    local type_field = ARGV[base + 3]
+    local stats_key = KEYS[i + 2]
+    if redis.call('EXISTS', KEYS[i]) == 0 then
+        redis.call('HINCRBY', stats_key, 'total_count', 1)
+        if type_field ~= '' then
+            redis.call('HINCRBY', stats_key, type_field, 1)
+        end
+    end
+    if ttl > 0 then
+        redis.call('SET', KEYS[i], original, 'EX', ttl)
+        redis.call('SET', KEYS[i + 1], masked, 'EX', ttl)
+    else
+        redis.call('SET', KEYS[i], original)
+        redis.call('SET', KEYS[i + 1], masked)
+    end
+end
+return #KEYS / 3
+"""
+
+# 미사용 카운터 구간 반납 스크립트 (그 뒤를 아무도 예약하지 않았을 때만 되돌림)
+# KEYS: 카운터 키 / ARGV: 구간 끝, 되돌릴 값(첫 미사용 값 - 1)
+RELEASE_COUNTER_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1])) == tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# 마스킹 토큰에서 리소스 타입 추출 (예: "AWS_EC2_001" → "ec2", 암호화 토큰 "AWS_EC2_<페이로드>_001" → "ec2")
+_TOKEN_TYPE = re.compile(r"^AWS_([A-Z0-9_]+?)(?:_[A-Z2-7]{26,})?_\d+$")
+
+# 해시 태그용 토큰 타입 부분 (예: "AWS_S3_BUCKET_001" → "S3_BUCKET", 암호화 토큰의 페이로드 제외)
+_TOKEN_TAG = re.compile(r"^AWS_([A-Z0-9]+(?:_[A-Z0-9]+)*?)_(?:[A-Z2-7]{26,}_)?\d+(?!\d)")
+
+# 토큰 끝의 번호 (하위 태그 결정)
+_TOKEN_NUMBER = re.compile(r"(\d+)$")
+
+# 파이썬 토큰 형식의 카운터 자리 ({}, {:d}, {:03d})
+_COUNTER_PLACEHOLDER = re.compile(r"\{(?::(0?\d*)d)?\}")
+
+
+def to_lua_format(token_format: str, resource_type: str) -> str:
+    """
+    파이썬 토큰 형식(예: "AWS_EC2_{:03d}")을 Lua string.format 형식으로 변환
+    
+    Args:
+        token_format: 카운터 자리 하나를 가진 파이썬 형식 문자열
+        resource_type: 변환 불가 시 대체 형식에 사용할 리소스 타입
+        
+    Returns:
+        Lua 형식 문자열 (예: "AWS_EC2_%03d")
+    """
+    placeholders = _COUNTER_PLACEHOLDER.findall(token_format)
+    literal_parts = _COUNTER_PLACEHOLDER.split(token_format)[::2]
+    
+    if len(placeholders) != 1 or any("{" in part or "}" in part for part in literal_parts):
+        # 파이썬 format 실패 시와 동일한 대체 형식
+        return f"{resource_type.upper().replace('%', '%%')}_%03d"
+    
+    head, tail = (part.replace("%", "%%") for part in literal_parts)
+    return f"{head}%{placeholders[0]}d{tail}"
+
+
+def stats_type_of(masked: str) -> Optional[str]:
+    """
+    마스킹 값의 통계용 리소스 타입
+    
+    Args:
+        masked: 마스킹된 값 (예: "ec2-001", "AWS_EC2_001")
+        
+    Returns:
+        리소스 타입 (예: "ec2"), 알 수 없으면 None
+    """
+    if "-" in masked:
+        return masked.split("-")[0]
+    
+    token_match = _TOKEN_TYPE.match(masked)
+    if token_match:
+        return token_match.group(1).lower()
+    
+    return None
+
+
+def stats_field_of(masked: str) -> str:
+    """
+    마스킹 값이 집계되는 통계 필드 (모든 쓰기 경로와 recount_statistics가 공유)
+    
+    Args:
+        masked: 마스킹된 값 (예: "AWS_S3_BUCKET_001")
+        
+    Returns:
+        통계 필드 (예: "s3_bucket_count"), 알 수 없는 형식이면 빈 문자열
+    """
+    resource_type = stats_type_of(masked)
+    return f"{resource_type}_count" if resource_type else ""
+
+
+def shard_tag(masked: str) -> str:
+    """
+    마스킹 값의 해시 태그 (같은 토큰 형식이면 카운터 값과 무관하게 같음)
+    
+    Args:
+        masked: 마스킹된 값 (예: "AWS_EC2_001", "ec2-001")
+        
+    Returns:
+        태그 (예: "ec2"), 알 수 없으면 "default"
+    """
+    token_match = _TOKEN_TAG.match(masked)
+    if token_match:
+        return token_match.group(1).lower()
+    return stats_type_of(masked) or "default"
+
+
+def counter_tag(resource_type: str, token_format: Optional[str] = None) -> str:
+    """
+    리소스 타입 카운터의 해시 태그 (get-or-create가 그 형식의 토큰에 쓰는 카운터와 같은 태그)
+    
+    Args:
+        resource_type: 리소스 타입
+        token_format: 파이썬 토큰 형식 (없으면 "AWS_<타입>_{:03d}")
+        
+    Returns:
+        태그 (예: "s3"와 "AWS_S3_BUCKET_{:03d}" → "s3_bucket")
+    """
+    return format_shard_tag(token_format or f"AWS_{resource_type.upper()}_{{:03d}}", resource_type)
+
+
+def format_shard_tag(token_format: str, resource_type: str) -> str:
+    """
+    토큰 형식으로 만들어질 토큰들의 해시 태그 (get-or-create에서 o2m/카운터 키 태그)
+    
+    Args:
+        token_format: 파이썬 토큰 형식 (예: "AWS_EC2_{:03d}")
+        resource_type: 리소스 타입
+        
+    Returns:
+        shard_tag(이 형식으로 만든 토큰)과 같은 태그
+    """
+    # Lua 형식(%03d, %%)은 파이썬 % 연산과 같은 결과
+    return shard_tag(to_lua_format(token_format, resource_type) % 0)
+
+
+def sub_tag(tag: str, index: int, sub_tags: int) -> str:
+    """
+    하위 태그 (sub_tags가 1이면 태그 그대로)
+    
+    Args:
+        tag: 토큰 형식의 태그 (예: "ec2")
+        index: 하위 태그 번호 (0 ~ sub_tags - 1)
+        sub_tags: 태그당 하위 태그 수
+        
+    Returns:
+        키 태그 (예: "ec2", "ec2:3")
+    """
+    return tag if sub_tags <= 1 else f"{tag}:{index}"
+
+
+def token_number(counter: int, index: int, sub_tags: int) -> int:
+    """
+    하위 태그 카운터 값의 토큰 번호 (하위 태그마다 번호를 sub_tags 간격으로 나눠 가짐)
+    
+    Args:
+        counter: 하위 태그 카운터 값 (1부터)
+        index: 하위 태그 번호
+        sub_tags: 태그당 하위 태그 수
+        
+    Returns:
+        토큰 번호 ((번호 - 1) % sub_tags == index, sub_tags가 1이면 카운터 값 그대로)
+    """
+    return (counter - 1) * sub_tags + index + 1
+
+
+def masked_key_tag(masked: str, sub_tags: int = 1) -> str:
+    """
+    마스킹 값의 m2o/o2m 키 태그 (하위 태그는 토큰 번호로 결정)
+    
+    Args:
+        masked: 마스킹된 값 (예: "AWS_EC2_005")
+        sub_tags: 태그당 하위 태그 수
+        
+    Returns:
+        키 태그 (예: sub_tags=4면 "ec2:0")
+    """
+    if sub_tags <= 1:
+        return shard_tag(masked)
+    number_match = _TOKEN_NUMBER.search(masked)
+    index = (int(number_match.group(1)) - 1) % sub_tags if number_match else 0
+    return sub_tag(shard_tag(masked), index, sub_tags)
+
+
+def original_sub_index(original: str, sub_tags: int) -> int:
+    """
+    get-or-create에서 원본의 하위 태그 번호 (프로세스와 무관한 crc32)
+    
+    Args:
+        original: 원본 값
+        sub_tags: 태그당 하위 태그 수
+        
+    Returns:
+        하위 태그 번호 (sub_tags가 1이면 0)
+    """
+    return zlib.crc32(original.encode("utf-8")) % sub_tags if sub_tags > 1 else 0
 
 
 class MappingStore:
@@ -19,16 +321,38 @@ class MappingStore:
     - 원본 → 마스킹 매핑 저장
     - TTL 기반 자동 만료
     - 배치 저장/조회
-    - 통계 정보 제공
+    - 통계 정보 제공 (쓰기와 같은 스크립트에서 갱신하는 타입별 카운터 해시)
+    - 2단계 조회: 프로세스 내 LRU 캐시 → Redis
+      (다른 워커/프로세스의 삭제·만료는 keyspace 알림으로 무효화)
+    - 해시 태그 키 (hash_tags=True): 한 매핑의 m2o/o2m 키와 카운터/통계 키가 같은 태그
+      (예: m2o:{ec2}AWS_EC2_001, o2m:{ec2}i-..., counter:{ec2}, mapping_stats:{ec2})
+      sub_tags > 1이면 원본의 crc32로 하위 태그를 골라 그 하위 태그 카운터로 토큰 번호를 만들고,
+      토큰 번호로 하위 태그를 다시 알 수 있음 (예: sub_tags=4, AWS_EC2_006 → {ec2:1})
+      → 한 타입의 매핑이 여러 슬롯/노드에 분산되면서 각 매핑은 카운터와 같은 슬롯
+        (save_batch로 저장한 임의 토큰은 토큰 번호의 하위 태그에 저장되므로
+         get_masked로 찾을 수 있는 것은 get-or-create로 만든 매핑)
+      → 쓰기 스크립트는 태그별로 실행하고 선언된 키만 접근하므로 클러스터 슬롯 규칙을 지킴,
+        ShardedMappingStore가 태그로 노드 선택
+        (MappingStore 자체는 Redis Cluster 클라이언트가 아님: MGET/UNLINK 배치는 여러 슬롯에 걸침)
     """
     
+    # SCAN/UNLINK 배치 크기
+    scan_batch_size = 1000
+    
     def __init__(
         self,
         host: str = "localhost",
         port: int = 6379,
         db: int = 0,
         password: Optional[str] = None,
-        timeout: int = 5
+        timeout: int = 5,
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        cache_invalidation: bool = True,
+        counter_block_size: int = 64,
+        connection_options: Optional[RedisConnectionOptions] = None,
+        hash_tags: bool = False,
+        sub_tags: int = 1
     ) -> None:
         """
         Redis 연결 초기화
@@ -38,32 +362,105 @@ class MappingStore:
             port: Redis 서버 포트
             db: Redis 데이터베이스 번호
             password: Redis 비밀번호 (선택)
-            timeout: 연결 타임아웃 (초)
+            timeout: 명령 응답 타임아웃 (초, connection_options 미지정 시 사용)
+            cache_size: 프로세스 내 캐시 최대 항목 수 (0이면 캐시 사용 안 함)
+            cache_ttl: 캐시 항목 최대 유지 시간 (초, 다른 워커의 변경을 놓쳐도 이 시간 후 반영)
+            cache_invalidation: keyspace 알림 구독으로 캐시 무효화 여부
+            counter_block_size: 새 토큰/get_next_counter용 카운터 블록 초기 크기
+                (0이면 호출마다 INCRBY, 최대 MAX_BLOCK_SIZE)
+            connection_options: 연결 풀/재시도/전송 설정 (기본: 풀 50, 재시도 3회)
+            hash_tags: 해시 태그 키 사용 (기존 단일 노드 키와 호환되지 않음,
+                카운터는 토큰 형식의 태그별이므로 기본과 다른 형식이면 get_next_counters에 token_format 전달)
+            sub_tags: 태그당 하위 태그 수 (hash_tags일 때만, 한 타입의 매핑을 여러 슬롯/노드로 분산,
+                바꾸면 기존 키를 찾지 못하므로 모든 워커에서 같아야 함)
         """
+        if sub_tags > 1 and not hash_tags:
+            raise ValueError("sub_tags는 hash_tags=True일 때만 사용할 수 있습니다")
+
         self.host = host
         self.port = port
         self.db = db
         self.password = password
         self.timeout = timeout
+        self.connection_options = connection_options or RedisConnectionOptions(socket_timeout=timeout)
         
         # Redis 클라이언트 (lazy 초기화)
         self._redis: Optional[redis.Redis] = None
+        # 카운터 INCRBY 전용 클라이언트 (재시도 없음, lazy 초기화)
+        self._counter_redis: Optional[redis.Redis] = None
         
         # 키 접두어
         self.masked_to_original_prefix = "m2o:"  # masked → original
         self.original_to_masked_prefix = "o2m:"  # original → masked
         self.stats_key = "mapping_stats"
+        self.counter_prefix = "counter:"
+        self.hash_tags = hash_tags
+        self.sub_tags = max(sub_tags, 1)
+        
+        # 스크립트 SHA (SCRIPT LOAD 후 캐시)
+        self._script_shas: Dict[str, str] = {}
+        
+        # 1단계 캐시 (Redis 키 → 값)
+        self.cache: Optional[MappingCache] = (
+            MappingCache(max_entries=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        )
+        self.cache_invalidation = cache_invalidation
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._invalidation_active = False
+        
+        # 카운터 블록 예약 (카운터 키별로 INCRBY로 구간을 받아 프로세스 안에서 할당)
+        self.counter_allocator: Optional[CounterBlockAllocator] = (
+            CounterBlockAllocator(
+                self._reserve_counter_block,
+                initial_block_size=min(counter_block_size, MAX_BLOCK_SIZE),
+                min_block_size=min(8, counter_block_size)
+            ) if counter_block_size > 0 else None
+        )
+    
+    def _tag(self, tag: str) -> str:
+        return f"{{{tag}}}" if self.hash_tags else ""
+    
+    def m2o_key(self, masked: str) -> str:
+        """마스킹 값 → 원본 키"""
+        if not self.hash_tags:
+            return f"{self.masked_to_original_prefix}{masked}"
+        return f"{self.masked_to_original_prefix}{{{masked_key_tag(masked, self.sub_tags)}}}{masked}"
+    
+    def o2m_key(self, original: str, tag: str) -> str:
+        """원본 → 마스킹 값 키 (tag는 hash_tags일 때만 사용하는 키 태그)"""
+        return f"{self.original_to_masked_prefix}{self._tag(tag)}{original}"
+    
+    def original_key_tag(self, original: str, tag: str) -> str:
+        """get-or-create로 만든 원본 매핑의 키 태그 (tag는 format_shard_tag 값)"""
+        return sub_tag(tag, original_sub_index(original, self.sub_tags), self.sub_tags)
+    
+    def counter_key(self, resource_type: str, token_format: Optional[str] = None, index: int = 0) -> str:
+        """
+        카운터 키 (hash_tags면 토큰 형식의 (하위) 태그별 카운터 counter:{태그})
+        
+        Args:
+            resource_type: 리소스 타입
+            token_format: 파이썬 토큰 형식 (hash_tags일 때만 사용, 없으면 기본 형식)
+            index: 하위 태그 번호 (sub_tags > 1일 때만 사용)
+            
+        Returns:
+            카운터 키 (예: "counter:ec2", "counter:{s3_bucket}", "counter:{ec2:3}")
+        """
+        if not self.hash_tags:
+            return f"{self.counter_prefix}{resource_type}"
+        tag = sub_tag(counter_tag(resource_type, token_format), index, self.sub_tags)
+        return f"{self.counter_prefix}{{{tag}}}"
+    
+    def stats_key_for(self, tag: str) -> str:
+        """통계 해시 키 (hash_tags면 태그별 mapping_stats:{태그})"""
+        return f"{self.stats_key}:{{{tag}}}" if self.hash_tags else self.stats_key
     
     async def _get_redis(self) -> redis.Redis:
         """Redis 클라이언트 가져오기 (lazy 초기화)"""
         if self._redis is None:
-            self._redis = redis.Redis(
-                host=self.host,
-                port=self.port,
-                db=self.db,
-                password=self.password,
-                socket_timeout=self.timeout,
-                decode_responses=True
+            # 클라이언트가 풀을 소유 (aclose 시 풀의 연결도 정리)
+            self._redis = redis.Redis.from_pool(
+                create_connection_pool(self.host, self.port, self.db, self.password, self.connection_options)
             )
             
             # 연결 테스트
@@ -71,9 +468,146 @@ class MappingStore:
                 await self._redis.ping()
             except Exception as e:
                 raise ConnectionError(f"Redis 연결 실패: {e}")
+            
+            if self.cache is not None and self.cache_invalidation:
+                await self._start_invalidation_listener()
         
         return self._redis
     
+    def _get_counter_redis(self) -> redis.Redis:
+        """카운터 INCRBY 클라이언트 (투명 재시도가 카운터를 두 번 전진시키지 않도록 재시도 없음)"""
+        if self._counter_redis is None:
+            self._counter_redis = redis.Redis.from_pool(
+                create_connection_pool(
+                    self.host, self.port, self.db, self.password,
+                    counter_connection_options(self.connection_options)
+                )
+            )
+        return self._counter_redis
+    
+    async def _start_invalidation_listener(self) -> None:
+        """
+        keyspace 알림 구독 시작
+        
+        서버에 notify-keyspace-events(K + g/x/e 또는 A)가 켜져 있어야 함
+        꺼져 있거나 CONFIG가 막힌 환경이면 캐시 TTL로만 일관성 유지
+        """
+        try:
+            config = await self._redis.config_get("notify-keyspace-events")
+            flags = config.get("notify-keyspace-events", "")
+        except Exception as e:
+            logger.warning(f"keyspace 알림 설정 확인 실패, 캐시 TTL로만 무효화: {e}")
+            return
+        
+        if "K" not in flags or not ("A" in flags or all(flag in flags for flag in "gxe")):
+            logger.warning(
+                f"Redis notify-keyspace-events='{flags}' - 캐시 무효화 알림 비활성, "
+                f"캐시 TTL({self.cache.ttl}초)로만 무효화"
+            )
+            return
+        
+        self._invalidation_task = asyncio.create_task(self._listen_invalidations())
+    
+    async def _listen_invalidations(self) -> None:
+        """삭제/만료/축출된 매핑 키를 캐시에서 제거 (연결 끊기면 캐시 비우고 재구독)"""
+        channel_prefix = f"__keyspace@{self.db}__:"
+        patterns = [
+            f"{channel_prefix}{self.masked_to_original_prefix}*",
+            f"{channel_prefix}{self.original_to_masked_prefix}*",
+        ]
+        
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(*patterns)
+                # 구독 전/재구독 사이에 놓친 무효화가 있을 수 있음
+                self.cache.clear()
+                self._invalidation_active = True
+                
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage" and message["data"] in _INVALIDATING_EVENTS:
+                        self.cache.invalidate(message["channel"][len(channel_prefix):])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"keyspace 알림 구독 끊김, 재연결: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                self._invalidation_active = False
+                await pubsub.aclose()
+    
+    def _cache_set(self, key: str, value: str, pttl: int) -> None:
+        """Redis 키의 남은 TTL(ms)을 넘지 않게 캐시 (-2: 키 없음 → 캐시 안 함)"""
+        if pttl == -2:
+            return
+        self.cache.set(key, value, ttl=None if pttl < 0 else pttl / 1000)
+    
+    async def _get_many(self, key_to_name: Dict[str, str]) -> Dict[str, str]:
+        """
+        캐시 → Redis 순서로 여러 키 조회
+        
+        캐시에 없는 키만 MGET (+ 캐시 만료 시간용 PTTL)을 파이프라인 한 번으로 조회
+        
+        Args:
+            key_to_name: {Redis 키: 결과에 쓸 이름}
+            
+        Returns:
+            {이름: 값} (값이 있는 이름만 포함)
+        """
+        found: Dict[str, str] = {}
+        
+        if self.cache is not None:
+            for key, value in self.cache.get_many(key_to_name).items():
+                found[key_to_name[key]] = value
+        
+        missing = [key for key, name in key_to_name.items() if name not in found]
+        if not missing:
+            return found
+        
+        redis_client = await self._get_redis()
+        if self.cache is None:
+            values = await redis_client.mget(missing)
+            found.update({key_to_name[key]: value for key, value in zip(missing, values) if value is not None})
+            return found
+        
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.mget(missing)
+        for key in missing:
+            pipe.pttl(key)
+        values, *ttls = await pipe.execute()
+        
+        for key, value, pttl in zip(missing, values, ttls):
+            if value is not None:
+                found[key_to_name[key]] = value
+                self._cache_set(key, value, pttl)
+        return found
+    
+    def get_pool_statistics(self) -> Dict[str, int]:
+        """
+        Redis 연결 풀 사용 현황
+        
+        Returns:
+            {"max": 최대 연결 수, "in_use": 사용 중, "idle": 대기 중} (연결 전이면 모두 0,
+            카운터 INCRBY 전용 풀(최대 COUNTER_MAX_CONNECTIONS)은 제외)
+        """
+        return pool_statistics(self._redis.connection_pool if self._redis is not None else None)
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """
+        1단계 캐시 통계
+        
+        Returns:
+            hits / misses / evictions / expirations / invalidations / size 등
+            (캐시 미사용 시 {"enabled": False})
+        """
+        if self.cache is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "invalidation": "keyspace" if self._invalidation_active else "ttl_only",
+            **self.cache.get_statistics()
+        }
+    
     async def save_mapping(
         self, 
         masked: str, 
@@ -88,26 +622,7 @@ class MappingStore:
             original: 원본 값 (예: "AKIA123...")
             ttl: 만료 시간 (초, 선택사항)
         """
-        redis_client = await self._get_redis()
-        
-        # 양방향 매핑 저장
-        masked_key = f"{self.masked_to_original_prefix}{masked}"
-        original_key = f"{self.original_to_masked_prefix}{original}"
-        
-        # 파이프라인으로 원자성 보장
-        pipe = redis_client.pipeline()
-        
-        if ttl:
-            pipe.setex(masked_key, ttl, original)
-            pipe.setex(original_key, ttl, masked)
-        else:
-            pipe.set(masked_key, original)
-            pipe.set(original_key, masked)
-        
-        # 통계 업데이트
-        await self._update_statistics(masked, increment=True)
-        
-        await pipe.execute()
+        await self.save_batch({masked: original}, ttl=ttl)
     
     async def get_original(self, masked: str) -> Optional[str]:
         """
@@ -119,132 +634,531 @@ class MappingStore:
         Returns:
             원본 값 또는 None
         """
-        redis_client = await self._get_redis()
-        masked_key = f"{self.masked_to_original_prefix}{masked}"
-        
-        result = await redis_client.get(masked_key)
-        return result
+        return (await self._get_many({self.m2o_key(masked): masked})).get(masked)
     
-    async def get_masked(self, original: str) -> Optional[str]:
+    async def get_masked(self, original: str, tag: str = "default") -> Optional[str]:
         """
         원본 값으로 마스킹된 값 조회
         
         Args:
             original: 원본 값
+            tag: 해시 태그 (hash_tags일 때만 사용, format_shard_tag 값)
             
         Returns:
             마스킹된 값 또는 None
         """
+        key = self.o2m_key(original, self.original_key_tag(original, tag))
+        return (await self._get_many({key: original})).get(original)
+    
+    async def get_originals_batch(self, masked_values: List[str]) -> Dict[str, str]:
+        """
+        여러 마스킹 값의 원본 값을 조회 (캐시에 없는 값만 MGET 한 번)
+        
+        Args:
+            masked_values: 마스킹된 값 리스트
+            
+        Returns:
+            {마스킹된_값: 원본_값} (매핑이 있는 값만 포함)
+        """
+        if not masked_values:
+            return {}
+        return await self._get_many({self.m2o_key(masked): masked for masked in masked_values})
+    
+    async def get_masked_batch(self, originals: List[str], tag: str = "default") -> Dict[str, str]:
+        """
+        여러 원본 값의 마스킹 값을 조회 (캐시에 없는 값만 MGET 한 번)
+        
+        Args:
+            originals: 원본 값 리스트
+            tag: 해시 태그 (hash_tags일 때만 사용, 모든 원본에 공통)
+            
+        Returns:
+            {원본_값: 마스킹된_값} (매핑이 있는 원본만 포함)
+        """
+        if not originals:
+            return {}
+        return await self._get_many({
+            self.o2m_key(original, self.original_key_tag(original, tag)): original for original in originals
+        })
+    
+    async def get_or_create_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        token_formats: Dict[str, str],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        (타입, 원본) 쌍의 마스킹 토큰을 Redis 내부에서 원자적으로 조회/생성
+        
+        캐시에 없는 원본마다 카운터 블록에서 값을 하나씩 미리 할당해 후보 토큰으로 전달하고,
+        조회 → (없으면) 토큰 생성 → 양방향 저장은 Lua 스크립트 하나로 실행되므로
+        동시 요청이 같은 새 원본을 마스킹해도 토큰은 하나만 생성됨
+        이미 매핑이 있던 원본의 값은 할당기에 돌려줘 다음 새 토큰에 사용
+        스크립트는 SCRIPT LOAD로 한 번 적재하고 이후 EVALSHA로 호출
+        (블록이 남아 있으면 1 round-trip, 블록 예약 시 INCRBY 추가,
+        해시 태그 모드는 태그별 스크립트를 병렬 실행)
+        모든 원본이 캐시에 있으면 Redis 호출 없음 (매핑은 한 번 만들면 바뀌지 않음)
+        
+        Args:
+            pairs: 처리 순서대로 (리소스_타입, 원본_값) 리스트
+            token_formats: 리소스_타입 → 토큰 형식 (예: "AWS_EC2_{:03d}")
+            ttl: 새 매핑 만료 시간 (초, 선택사항)
+            
+        Returns:
+            pairs 순서의 최종 마스킹 토큰 리스트
+        """
+        if not pairs:
+            return []
+        
+        tags = {
+            resource_type: format_shard_tag(token_formats[resource_type], resource_type) if self.hash_tags else resource_type
+            for resource_type in {resource_type for resource_type, _ in pairs}
+        }
+        key_tags = [self.original_key_tag(original, tags[resource_type]) for resource_type, original in pairs]
+        o2m_keys = [self.o2m_key(original, key_tag) for (_, original), key_tag in zip(pairs, key_tags)]
+        
+        tokens: List[Optional[str]] = [None] * len(pairs)
+        if self.cache is not None:
+            for i, key in enumerate(o2m_keys):
+                tokens[i] = self.cache.get(key)
+        
+        # 같은 원본이 여러 번 나오면 첫 위치만 조회/생성
+        positions: Dict[str, List[int]] = {}
+        for i, token in enumerate(tokens):
+            if token is None:
+                positions.setdefault(o2m_keys[i], []).append(i)
+        
+        # 해시 태그 모드는 (하위) 태그(슬롯)별로 스크립트 실행
+        groups: Dict[str, List[int]] = {}
+        for indexes in positions.values():
+            groups.setdefault(key_tags[indexes[0]] if self.hash_tags else "", []).append(indexes[0])
+        
+        results = await asyncio.gather(*(
+            self._get_or_create_group(pairs, pending, key_tags, token_formats, o2m_keys, ttl)
+            for pending in groups.values()
+        ))
+        for created in results:
+            for i, token in created.items():
+                for position in positions[o2m_keys[i]]:
+                    tokens[position] = token
+        return tokens
+    
+    async def _get_or_create_group(
+        self,
+        pairs: List[Tuple[str, str]],
+        pending: List[int],
+        key_tags: List[str],
+        token_formats: Dict[str, str],
+        o2m_keys: List[str],
+        ttl: Optional[int]
+    ) -> Dict[int, str]:
+        """
+        캐시에 없는 원본들의 get-or-create 스크립트 실행 (후보가 겹치면 새 블록으로 재시도)
+        
+        Args:
+            pairs: (리소스_타입, 원본_값) 리스트
+            pending: 처리할 pairs 위치 (원본 중복 없음, 해시 태그 모드는 모두 같은 키 태그)
+            key_tags: pairs 위치별 키 태그
+            token_formats: 리소스_타입 → 토큰 형식
+            o2m_keys: pairs 위치별 o2m 키
+            ttl: 새 매핑 만료 시간 (초)
+            
+        Returns:
+            {pairs 위치: 마스킹 토큰}
+        """
+        # (카운터 키, Lua 토큰 형식)별 후보 풀, 통계 필드는 save_batch와 같이 토큰에서 결정
+        # 하위 태그 카운터 값은 그 하위 태그 몫의 토큰 번호로 바꿔 후보를 만듦
+        index = original_sub_index(pairs[pending[0]][1], self.sub_tags)
+        pool_for = {
+            resource_type: (
+                self.counter_key(resource_type, token_formats[resource_type], index),
+                to_lua_format(token_formats[resource_type], resource_type),
+            )
+            for resource_type in {pairs[i][0] for i in pending}
+        }
+        stats_fields = {pool: stats_field_of(pool[1] % 0) for pool in pool_for.values()}
+        
+        created: Dict[int, str] = {}
+        for _ in range(_GET_OR_CREATE_ATTEMPTS):
+            if not pending:
+                return created
+            
+            # 새 원본이 몇 개일지 모르므로 풀마다 대기 원본 수만큼 할당
+            pool_of: Dict[Tuple[str, str], int] = {}
+            pool_sizes: Dict[Tuple[str, str], int] = {}
+            for i in pending:
+                pool = pool_for[pairs[i][0]]
+                pool_of.setdefault(pool, len(pool_of) + 1)
+                pool_sizes[pool] = pool_sizes.get(pool, 0) + 1
+            counters = await self._allocate_counters(pool_sizes)
+            
+            keys: List[str] = []
+            args: List[Any] = [ttl or 0, len(pending)]
+            for i in pending:
+                resource_type, original = pairs[i]
+                keys.extend([o2m_keys[i], self.stats_key_for(key_tags[i])])
+                args.extend([
+                    original,
+                    stats_fields[pool_for[resource_type]],
+                    pool_of[pool_for[resource_type]],
+                ])
+            for pool in pool_of:
+                candidates = [pool[1] % token_number(counter, index, self.sub_tags) for counter in counters[pool]]
+                keys.extend(self.m2o_key(candidate) for candidate in candidates)
+                args.append(len(candidates))
+                args.extend(candidates)
+            
+            results, ttls, statuses, used = await self._run_script(GET_OR_CREATE_SCRIPT, keys, args)
+            
+            retry: List[int] = []
+            for i, token, pttl, status in zip(pending, results, ttls, statuses):
+                if status == 2:
+                    retry.append(i)
+                    continue
+                created[i] = token
+                if self.cache is not None:
+                    self._cache_set(o2m_keys[i], token, pttl)
+                    self._cache_set(self.m2o_key(token), pairs[i][1], pttl)
+            
+            if self.counter_allocator is not None:
+                exhausted = {pool_for[pairs[i][0]] for i in retry}
+                for pool, count in zip(pool_of, used):
+                    if pool in exhausted:
+                        # 카운터가 기존 토큰보다 뒤처짐 → 남은 블록도 겹칠 수 있으므로 새로 예약
+                        logger.warning(f"카운터가 기존 토큰보다 뒤처짐, 새 블록 예약: {pool[0]}")
+                        self.counter_allocator.discard(pool[0])
+                    else:
+                        self.counter_allocator.give_back(pool[0], counters[pool][count:])
+            pending = retry
+        
+        if pending:
+            raise Exception(
+                f"Redis token generation failed: counter behind existing tokens ({len(pending)} originals)"
+            )
+        return created
+    
+    async def _allocate_counters(self, counts: Dict[Tuple[str, str], int]) -> Dict[Tuple[str, str], List[int]]:
+        """
+        후보 풀별 유일한 카운터 값 할당
+        
+        블록 할당기가 있으면 블록에서 (비면 INCRBY), 없으면 풀별 INCRBY 파이프라인
+        (할당기가 없으면 쓰지 않은 값은 빈 번호로 남음)
+        
+        Args:
+            counts: {(카운터 키, 토큰 형식): 필요한 개수}
+            
+        Returns:
+            {(카운터 키, 토큰 형식): 카운터 값 목록}
+        """
+        if self.counter_allocator is not None:
+            return {
+                pool: await self.counter_allocator.allocate(pool[0], count)
+                for pool, count in counts.items()
+            }
+        
+        pipe = self._get_counter_redis().pipeline()
+        for (counter_key, _), count in counts.items():
+            pipe.incrby(counter_key, count)
+        return {
+            pool: list(range(last_value - count + 1, last_value + 1))
+            for (pool, count), last_value in zip(counts.items(), await pipe.execute())
+        }
+    
+    async def _run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """
+        Lua 스크립트 실행 (SCRIPT LOAD 한 번 후 EVALSHA, 1 round-trip)
+        
+        Args:
+            script: 스크립트 본문
+            keys: KEYS
+            args: ARGV
+            
+        Returns:
+            스크립트 반환값
+        """
         redis_client = await self._get_redis()
-        original_key = f"{self.original_to_masked_prefix}{original}"
         
-        result = await redis_client.get(original_key)
-        return result
+        sha = self._script_shas.get(script)
+        if sha is None:
+            sha = self._script_shas[script] = await redis_client.script_load(script)
+        
+        try:
+            return await redis_client.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            # 서버 재시작/SCRIPT FLUSH로 캐시가 사라진 경우 재적재 후 1회 재시도
+            sha = self._script_shas[script] = await redis_client.script_load(script)
+            return await redis_client.evalsha(sha, len(keys), *keys, *args)
     
     async def save_batch(self, mappings: Dict[str, str], ttl: Optional[int] = None) -> None:
         """
         여러 매핑을 한번에 저장
         
+        양방향 저장과 통계 갱신을 스크립트 하나로 실행
+        (이미 있는 마스킹 값을 다시 저장해도 통계는 중복 증가하지 않음,
+        해시 태그 모드는 태그(슬롯)별 스크립트를 병렬 실행)
+        
         Args:
             mappings: {마스킹된_값: 원본_값} 딕셔너리
             ttl: 만료 시간 (초, 선택사항)
         """
-        redis_client = await self._get_redis()
-        
-        # 파이프라인으로 배치 저장
-        pipe = redis_client.pipeline()
+        if not mappings:
+            return
         
+        groups: Dict[str, Dict[str, str]] = {}
         for masked, original in mappings.items():
-            masked_key = f"{self.masked_to_original_prefix}{masked}"
-            original_key = f"{self.original_to_masked_prefix}{original}"
-            
-            if ttl:
-                pipe.setex(masked_key, ttl, original)
-                pipe.setex(original_key, ttl, masked)
-            else:
-                pipe.set(masked_key, original)
-                pipe.set(original_key, masked)
+            groups.setdefault(masked_key_tag(masked, self.sub_tags) if self.hash_tags else "", {})[masked] = original
+        await asyncio.gather(*(self._save_group(group, ttl) for group in groups.values()))
+    
+    async def _save_group(self, mappings: Dict[str, str], ttl: Optional[int]) -> None:
+        """매핑 저장 스크립트 한 번 실행 (save_batch 참고)"""
+        keys: List[str] = []
+        args: List[Any] = [ttl or 0]
+        for masked, original in mappings.items():
+            tag = masked_key_tag(masked, self.sub_tags)
+            keys.extend([self.m2o_key(masked), self.o2m_key(original, tag), self.stats_key_for(tag)])
+            args.extend([original, masked, stats_field_of(masked)])
         
-        # 배치 통계 업데이트
-        for masked in mappings.keys():
-            await self._update_statistics(masked, increment=True)
+        await self._run_script(SAVE_MAPPINGS_SCRIPT, keys, args)
         
-        await pipe.execute()
+        if self.cache is not None:
+            for i, (masked, original) in enumerate(mappings.items()):
+                self.cache.set(keys[i * 3], original, ttl=ttl or None)
+                self.cache.set(keys[i * 3 + 1], masked, ttl=ttl or None)
     
     async def get_statistics(self) -> Dict[str, int]:
         """
-        매핑 통계 정보 조회
+        매핑 통계 정보 조회 (통계 해시 HGETALL 한 번, 키 순회 없음)
+        
+        쓰기 시점에 갱신한 카운터이므로 TTL로 만료된 매핑은 차감되지 않음
+        (정확한 값이 필요하면 recount_statistics로 재계산)
         
         Returns:
-            통계 정보 딕셔너리
+            통계 정보 딕셔너리 (total_count, <타입>_count)
         """
         redis_client = await self._get_redis()
+        if not self.hash_tags:
+            stats = await redis_client.hgetall(self.stats_key)
+            return {
+                "total_count": 0,
+                **{field: int(value) for field, value in stats.items()}
+            }
         
-        # 전체 키 수 조회
-        masked_keys = await redis_client.keys(f"{self.masked_to_original_prefix}*")
-        total_count = len(masked_keys)
+        # 태그별 통계 해시 합산
+        totals: Dict[str, int] = {"total_count": 0}
+        async for key in redis_client.scan_iter(match=f"{self.stats_key}:*", count=self.scan_batch_size):
+            for field, value in (await redis_client.hgetall(key)).items():
+                totals[field] = totals.get(field, 0) + int(value)
+        return totals
+    
+    async def recount_statistics(self) -> Dict[str, int]:
+        """
+        m2o 키를 SCAN으로 순회하여 통계 해시 재계산
         
-        # 타입별 통계
-        type_counts = {}
-        for key in masked_keys:
-            # 키에서 마스킹된 값 추출
-            masked_value = key.replace(self.masked_to_original_prefix, "")
-            
-            # 타입 추출 (예: "ec2-001" → "ec2")
-            if "-" in masked_value:
-                resource_type = masked_value.split("-")[0]
-                type_counts[f"{resource_type}_count"] = type_counts.get(f"{resource_type}_count", 0) + 1
+        기존 데이터 마이그레이션/만료 반영용 (서버를 막지 않는 커서 순회)
         
-        return {
-            "total_count": total_count,
-            **type_counts
-        }
+        Returns:
+            재계산된 통계 정보
+        """
+        redis_client = await self._get_redis()
+        
+        # 통계 해시 키별 개수 (hash_tags가 아니면 키 하나)
+        per_key: Dict[str, Dict[str, int]] = {}
+        prefix_length = len(self.masked_to_original_prefix)
+        async for key in redis_client.scan_iter(
+            match=f"{self.masked_to_original_prefix}*", count=self.scan_batch_size
+        ):
+            masked = key[prefix_length:]
+            if self.hash_tags and masked.startswith("{"):
+                masked = masked[masked.find("}") + 1:]
+            counts = per_key.setdefault(self.stats_key_for(masked_key_tag(masked, self.sub_tags)), {"total_count": 0})
+            counts["total_count"] += 1
+            field = stats_field_of(masked)
+            if field:
+                counts[field] = counts.get(field, 0) + 1
+        
+        stale = [self.stats_key]
+        if self.hash_tags:
+            stale = [key async for key in redis_client.scan_iter(match=f"{self.stats_key}:*", count=self.scan_batch_size)]
+        
+        pipe = redis_client.pipeline()
+        for key in stale:
+            pipe.unlink(key)
+        for key, counts in per_key.items():
+            pipe.hset(key, mapping=counts)
+        await pipe.execute()
+        
+        totals: Dict[str, int] = {"total_count": 0}
+        for counts in per_key.values():
+            for field, value in counts.items():
+                totals[field] = totals.get(field, 0) + value
+        return totals
     
     async def clear_all(self) -> None:
-        """모든 매핑 데이터 삭제 (테스트용)"""
+        """
+        모든 매핑 데이터 삭제 (테스트용)
+        
+        KEYS 대신 커서 기반 SCAN + 배치 UNLINK (삭제 중에도 다른 요청 처리 가능)
+        """
         redis_client = await self._get_redis()
         
-        # 모든 매핑 키 삭제
-        masked_keys = await redis_client.keys(f"{self.masked_to_original_prefix}*")
-        original_keys = await redis_client.keys(f"{self.original_to_masked_prefix}*")
+        patterns = [f"{self.masked_to_original_prefix}*", f"{self.original_to_masked_prefix}*"]
+        if self.hash_tags:
+            patterns.append(f"{self.stats_key}:*")
+        for pattern in patterns:
+            batch: List[str] = []
+            async for key in redis_client.scan_iter(match=pattern, count=self.scan_batch_size):
+                batch.append(key)
+                if len(batch) >= self.scan_batch_size:
+                    await redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                await redis_client.unlink(*batch)
         
-        all_keys = masked_keys + original_keys + [self.stats_key]
+        await redis_client.unlink(self.stats_key)
         
-        if all_keys:
-            await redis_client.delete(*all_keys)
+        if self.cache is not None:
+            self.cache.clear()
     
-    async def get_next_counter(self, resource_type: str) -> int:
+    async def get_next_counter(self, resource_type: str, token_format: Optional[str] = None) -> int:
         """
-        리소스 타입별 유일 카운터 생성 (Redis INCR 사용)
+        리소스 타입별 유일 카운터 생성
+        
+        예약해 둔 블록에서 할당하고, 블록이 비면 INCRBY로 새 블록 예약
+        (counter_block_size=0이면 호출마다 INCR)
         
         Args:
             resource_type: AWS 리소스 타입 (예: "eks", "sagemaker")
+            token_format: 토큰 형식 (hash_tags일 때 카운터 태그 결정, 없으면 기본 형식)
             
         Returns:
             유일한 카운터 값
         """
+        return (await self.get_next_counters(resource_type, 1, token_format))[0]
+    
+    async def get_next_counters(
+        self,
+        resource_type: str,
+        count: int,
+        token_format: Optional[str] = None
+    ) -> List[int]:
+        """
+        리소스 타입별 유일 카운터 여러 개 생성
+        
+        Args:
+            resource_type: AWS 리소스 타입
+            count: 필요한 개수
+            token_format: 토큰 형식 (hash_tags일 때 카운터 태그 결정, 없으면 기본 형식)
+            
+        Returns:
+            유일한 카운터 값 목록 (워커 간에는 연속이 아닐 수 있음,
+            sub_tags > 1이면 하위 태그 0 몫의 토큰 번호라 sub_tags 간격)
+        """
+        counter_key = self.counter_key(resource_type, token_format)
         try:
-            redis_client = await self._get_redis()
-            counter_key = f"counter:{resource_type}"
-            counter_value = await redis_client.incr(counter_key)
-            return counter_value
+            if self.counter_allocator is not None:
+                values = await self.counter_allocator.allocate(counter_key, count)
+            else:
+                last_value = await self._get_counter_redis().incrby(counter_key, count)
+                values = list(range(last_value - count + 1, last_value + 1))
         except Exception as e:
             raise Exception(f"Redis counter generation failed: {e}")
+        return [token_number(value, 0, self.sub_tags) for value in values]
     
-    async def close(self) -> None:
-        """Redis 연결 종료"""
-        if self._redis:
-            await self._redis.aclose()
-            self._redis = None
+    async def _reserve_counter_block(self, counter_key: str, size: int) -> int:
+        """카운터 블록 예약 (재시도 없는 INCRBY, 구간의 마지막 값 반환)"""
+        return await self._get_counter_redis().incrby(counter_key, size)
     
-    async def _update_statistics(self, masked: str, increment: bool = True) -> None:
+    async def release_counter_blocks(self) -> int:
         """
-        통계 정보 업데이트 (내부용)
+        미사용 카운터 구간 반납
+        
+        다른 워커가 그 뒤를 예약하지 않은 구간만 카운터를 되돌리고,
+        나머지는 빈 번호로 남김 (유일성 유지)
+        
+        Returns:
+            반납된 구간 수
+        """
+        if self.counter_allocator is None:
+            return 0
+        
+        unused = self.counter_allocator.take_unused()
+        if not unused or self._counter_redis is None:
+            return 0
+        
+        released = 0
+        for counter_key, (first_unused, end) in unused.items():
+            released += await self._run_script(
+                RELEASE_COUNTER_SCRIPT,
+                [counter_key],
+                [end, first_unused - 1]
+            )
+        return released
+    
+    async def reserve_counters(
+        self,
+        counts: Dict[str, int],
+        token_formats: Optional[Dict[str, str]] = None
+    ) -> Dict[str, int]:
+        """
+        리소스 타입별 카운터 구간을 한 번에 예약 (파이프라인 INCRBY)
         
         Args:
-            masked: 마스킹된 값
-            increment: 증가(True) 또는 감소(False)
+            counts: {리소스_타입: 필요한_개수}
+            token_formats: 리소스_타입 → 토큰 형식 (hash_tags일 때 카운터 태그 결정, 없으면 기본 형식)
+            
+        Returns:
+            {리소스_타입: 예약된 구간의 첫 카운터 값}
+            (값 first ~ first + 개수 - 1 을 순서대로 사용)
+            
+        Raises:
+            ValueError: sub_tags > 1 (하위 태그 몫의 토큰 번호는 연속 구간이 아님, get_next_counters 사용)
+        """
+        if self.sub_tags > 1:
+            raise ValueError("sub_tags > 1이면 연속 구간을 예약할 수 없습니다 (get_next_counters 사용)")
+        if not counts:
+            return {}
+        
+        try:
+            pipe = self._get_counter_redis().pipeline()
+            for resource_type, count in counts.items():
+                pipe.incrby(self.counter_key(resource_type, (token_formats or {}).get(resource_type)), count)
+            last_values = await pipe.execute()
+        except Exception as e:
+            raise Exception(f"Redis counter generation failed: {e}")
+        
+        return {
+            resource_type: last_value - count + 1
+            for (resource_type, count), last_value in zip(counts.items(), last_values)
+        }
+    
+    async def ping(self) -> bool:
         """
-        # 현재는 get_statistics에서 실시간 계산
-        # 필요시 Redis에 별도 통계 저장 가능
-        pass
\ No newline at end of file
+        Redis PING (헬스체크용, 데이터 읽기/쓰기 없음)
+        
+        Returns:
+            PONG 수신 여부 (연결 실패 시 예외)
+        """
+        client = await self._get_redis()
+        return bool(await client.ping())
+    
+    async def close(self) -> None:
+        """Redis 연결 종료 (미사용 카운터 구간 반납 후)"""
+        try:
+            await self.release_counter_blocks()
+        except Exception as e:
+            logger.warning(f"카운터 구간 반납 실패 (빈 번호로 남음): {e}")
+        
+        if self._invalidation_task:
+            # 구독 직후 읽기 중 취소는 redis-py 안에서 삼켜질 수 있어 끝날 때까지 다시 취소
+            while not self._invalidation_task.done():
+                self._invalidation_task.cancel()
+                await asyncio.wait({self._invalidation_task}, timeout=0.1)
+            self._invalidation_task = None
+        
+        if self._counter_redis:
+            await self._counter_redis.aclose()
+            self._counter_redis = None
+        
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
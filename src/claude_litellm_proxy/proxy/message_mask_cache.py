@@ -0,0 +1,188 @@
+"""
+대화 메시지 마스킹 결과 캐시
+
+Claude Code는 /v1/messages 호출마다 전체 대화 기록을 다시 보내므로
+이전 턴의 메시지를 매번 다시 스캔하면 세션 전체 비용이 O(n²)이 됨
+
+메시지(role + content)의 내용 해시를 키로 마스킹 결과와 매핑을 보관하여
+이전 메시지는 그대로 재사용하고 새로 추가된 메시지만 스캔
+
+- 항목 수와 대략적인 메모리 크기(바이트)로 제한되는 LRU
+- 매핑 토큰은 한 번 만들면 바뀌지 않으므로(카운터 기반, 재사용 없음)
+  재사용한 마스킹 결과와 매핑은 그대로 유효
+- 단, 매핑 초기화/토큰 모드 변경 후에는 같은 토큰이 다른 원본을 가리킬 수 있으므로
+  키에 네임스페이스(토큰 모드 + 매핑 세대)를 포함하고, 항목 유지 시간은 매핑 TTL 이하
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class CachedMessage:
+    """메시지 하나의 마스킹 결과"""
+
+    masked_content: Any
+    mappings: Dict[str, str]
+    size: int  # 대략적인 메모리 크기 (바이트)
+    expires_at: float
+
+
+class MessageMaskCache:
+    """
+    메시지 내용 해시 → 마스킹 결과 LRU 캐시
+
+    사용 예:
+        cache = MessageMaskCache(max_entries=5000, max_bytes=64 * 1024 * 1024)
+        key = cache.key_for(message)
+        cached = cache.get(key)
+        if cached is None:
+            masked, mappings = await masking_system.mask_text(message["content"])
+            cache.put(key, masked, mappings)
+    """
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600.0) -> None:
+        """
+        Args:
+            max_entries: 최대 항목 수
+            max_bytes: 최대 메모리 크기 (바이트, 마스킹 결과 + 매핑 기준 근사치)
+            ttl: 항목 유지 시간 (초)
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries와 max_bytes는 1 이상이어야 합니다")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, CachedMessage]" = OrderedDict()
+        self._bytes = 0
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped_bytes = 0  # 재스캔을 피한 원본 내용 크기
+
+    @staticmethod
+    def key_for(message: Dict[str, Any], namespace: str = "") -> str:
+        """
+        메시지 캐시 키 (네임스페이스 + role + content의 SHA-256)
+
+        Args:
+            message: {"role": ..., "content": 문자열 또는 content block 리스트}
+            namespace: 토큰 모드 + 매핑 세대 (IntegratedMaskingSystem.cache_namespace)
+
+        Returns:
+            16진수 해시 문자열
+        """
+        content = message.get("content")
+        serialized = content if isinstance(content, str) else json.dumps(
+            content, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+        digest = hashlib.sha256()
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(message.get("role", "")).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(serialized.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str, content_size: int = 0) -> Optional[Tuple[Any, Dict[str, str]]]:
+        """
+        캐시 조회
+
+        Args:
+            key: key_for() 결과
+            content_size: 원본 내용 크기 (재스캔 절감량 통계용)
+
+        Returns:
+            (마스킹된_content, 매핑) 또는 None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.skipped_bytes += content_size
+        return entry.masked_content, entry.mappings
+
+    def put(
+        self,
+        key: str,
+        masked_content: Any,
+        mappings: Dict[str, str],
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        마스킹 결과 저장 (크기 제한 초과 시 오래된 항목부터 축출)
+
+        Args:
+            key: key_for() 결과
+            masked_content: 마스킹된 content
+            mappings: 이 메시지에서 나온 {마스킹된_값: 원본_값}
+            ttl: 매핑 만료 시간 (초, 지정 시 항목 유지 시간을 이 값 이하로)
+        """
+        size = self._estimate_size(masked_content, mappings)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CachedMessage(
+            masked_content=masked_content,
+            mappings=dict(mappings),
+            size=size,
+            expires_at=time.monotonic() + (min(self.ttl, ttl) if ttl else self.ttl),
+        )
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """항목 제거 및 크기 갱신"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    @staticmethod
+    def _estimate_size(masked_content: Any, mappings: Dict[str, str]) -> int:
+        """마스킹 결과 + 매핑의 대략적인 크기 (문자 수 기준, 항목 오버헤드 포함)"""
+        if isinstance(masked_content, str):
+            content_size = len(masked_content)
+        else:
+            content_size = len(json.dumps(masked_content, ensure_ascii=False))
+        mapping_size = sum(len(masked) + len(original) for masked, original in mappings.items())
+        return content_size + mapping_size + 200
+
+    def clear(self) -> None:
+        """전체 비우기 (통계는 유지)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        """캐시 통계 반환"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "skipped_bytes": self.skipped_bytes,
+        }
@@ -0,0 +1,146 @@
+"""
+Redis 연결 풀 설정
+
+기본 redis.Redis는 풀 크기 제한 없음 + 연결 확인 없음 + 재시도 없음이라
+동시 요청이 몰리면 연결이 계속 늘고, 끊긴 유휴 연결은 첫 명령이 실패해야 드러남
+- BlockingConnectionPool: 최대 연결 수를 넘으면 새로 만들지 않고 pool_timeout까지 대기
+- connect_timeout / socket_timeout 분리 (연결 수립은 짧게, 명령 응답은 길게)
+- 연결/타임아웃 오류는 지수 백오프(지터)로 재시도
+  (매핑 스크립트는 원본 기준 get-or-create라 재실행해도 안전)
+- 카운터 INCRBY는 재시도 없는 별도 풀 (counter_connection_options)
+  응답 전에 끊기거나 타임아웃이어도 명령은 이미 적용됐을 수 있어, 투명 재시도는
+  재시도마다 블록 하나씩 카운터를 더 전진시킴 (유일성은 유지되지만 버려진 번호만큼
+  토큰 번호가 커짐) → 재시도 여부와 크기는 호출자(CounterBlockAllocator)가 결정
+- health_check_interval: 이 시간 이상 쉰 연결은 사용 전 PING
+- TCP keepalive, 선택적 unix 소켓 / RESP3
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+
+@dataclass
+class RedisConnectionOptions:
+    """
+    Redis 연결 풀 / 소켓 / 재시도 설정
+
+    Args:
+        max_connections: 풀 최대 연결 수 (keyspace 알림 구독이 1개를 계속 사용)
+        pool_timeout: 풀이 가득 찼을 때 연결을 기다리는 최대 시간 (초)
+        socket_timeout: 명령 응답 타임아웃 (초)
+        connect_timeout: 연결 수립 타임아웃 (초)
+        socket_keepalive: TCP keepalive 사용
+        health_check_interval: 이 시간(초) 이상 쉰 연결은 사용 전 PING (0이면 확인 안 함)
+        retry_attempts: 연결/타임아웃 오류 재시도 횟수 (0이면 재시도 안 함)
+        retry_backoff_base: 재시도 대기 시작 값 (초, 매번 2배 + 지터)
+        retry_backoff_cap: 재시도 대기 최대 값 (초)
+        unix_socket_path: 지정 시 TCP 대신 unix 소켓으로 연결
+        protocol: RESP 프로토콜 버전 (2 또는 3)
+    """
+
+    max_connections: int = 50
+    pool_timeout: float = 5.0
+    socket_timeout: float = 5.0
+    connect_timeout: float = 2.0
+    socket_keepalive: bool = True
+    health_check_interval: int = 30
+    retry_attempts: int = 3
+    retry_backoff_base: float = 0.05
+    retry_backoff_cap: float = 1.0
+    unix_socket_path: Optional[str] = None
+    protocol: int = 2
+
+
+# 카운터 풀 최대 연결 수 (블록 예약은 블록마다 한 번이라 적게)
+COUNTER_MAX_CONNECTIONS = 4
+
+
+def counter_connection_options(options: RedisConnectionOptions) -> RedisConnectionOptions:
+    """
+    카운터 INCRBY용 연결 설정 (재시도 없음, 작은 풀)
+
+    Args:
+        options: 기본 연결 설정
+
+    Returns:
+        retry_attempts=0, max_connections는 COUNTER_MAX_CONNECTIONS 이하인 설정
+    """
+    return replace(
+        options,
+        retry_attempts=0,
+        max_connections=min(options.max_connections, COUNTER_MAX_CONNECTIONS)
+    )
+
+
+def create_connection_pool(
+    host: str,
+    port: int,
+    db: int,
+    password: Optional[str],
+    options: RedisConnectionOptions
+) -> redis.BlockingConnectionPool:
+    """
+    설정대로 연결 풀 생성 (연결은 처음 사용할 때 만들어짐)
+
+    Args:
+        host: Redis 호스트 (unix 소켓 사용 시 무시)
+        port: Redis 포트 (unix 소켓 사용 시 무시)
+        db: 데이터베이스 번호
+        password: 비밀번호 (선택)
+        options: 풀/소켓/재시도 설정
+
+    Returns:
+        redis.Redis(connection_pool=...)에 넘길 풀
+    """
+    connection_kwargs: Dict[str, Any] = {
+        "db": db,
+        "password": password or None,
+        "socket_timeout": options.socket_timeout,
+        "socket_connect_timeout": options.connect_timeout,
+        "health_check_interval": options.health_check_interval,
+        "retry": Retry(
+            ExponentialWithJitterBackoff(cap=options.retry_backoff_cap, base=options.retry_backoff_base),
+            options.retry_attempts,
+            supported_errors=(RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError),
+        ),
+        "protocol": options.protocol,
+        "decode_responses": True,
+    }
+    if options.unix_socket_path:
+        connection_class = redis.UnixDomainSocketConnection
+        connection_kwargs["path"] = options.unix_socket_path
+    else:
+        connection_class = redis.Connection
+        connection_kwargs.update(host=host, port=port, socket_keepalive=options.socket_keepalive)
+
+    return redis.BlockingConnectionPool(
+        max_connections=options.max_connections,
+        timeout=options.pool_timeout,
+        connection_class=connection_class,
+        **connection_kwargs
+    )
+
+
+def pool_statistics(pool: Optional[redis.ConnectionPool]) -> Dict[str, int]:
+    """
+    연결 풀 사용 현황
+
+    Args:
+        pool: 연결 풀 (아직 연결 전이면 None)
+
+    Returns:
+        {"max": 최대 연결 수, "in_use": 사용 중, "idle": 풀에서 대기 중인 연결}
+    """
+    if pool is None:
+        return {"max": 0, "in_use": 0, "idle": 0}
+    return {
+        "max": pool.max_connections,
+        "in_use": len(getattr(pool, "_in_use_connections", ())),
+        "idle": len(getattr(pool, "_available_connections", ())),
+    }
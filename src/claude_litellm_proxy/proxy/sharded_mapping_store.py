@@ -0,0 +1,460 @@
+"""
+샤딩된 Redis 매핑 저장소
+
+단일 Redis는 메모리/처리량이 노드 하나로 제한됨
+여러 Redis 노드에 매핑을 나눠 저장하는 클라이언트 측 샤딩
+- 노드마다 hash_tags=True인 MappingStore (해시 태그 키 레이아웃)
+- 키의 해시 태그(토큰 타입, 예: "ec2")로 일관 해시 링에서 노드 선택
+  → 한 매핑의 m2o/o2m 키, 카운터, 통계가 항상 같은 노드
+  (쓰기 스크립트는 태그별로 실행하고 선언된 키만 접근하므로 Redis Cluster에서도 동작,
+   다만 배치 조회/삭제는 여러 슬롯에 걸치므로 노드는 독립 Redis여야 함)
+- 기본(sub_tags=1)은 한 토큰 타입의 매핑/카운터가 모두 한 노드
+  → 타입 수보다 노드가 많거나 한 타입(예: ec2)이 대부분이면 메모리/처리량이 고르게 나뉘지 않음
+  sub_tags > 1이면 태그마다 하위 태그(예: {ec2:3})와 하위 태그별 카운터로 한 타입이 여러 노드에 분산
+  (토큰 번호로 하위 태그를 알 수 있어 복원은 노드 하나 조회, reserve_counters는 사용 불가)
+- 배치 연산은 노드별로 나눠 병렬 실행 (asyncio.gather) 후 입력 순서대로 합침
+- 노드 추가/제거 시 일관 해시라 태그 일부만 다른 노드로 이동
+  (이동한 태그의 기존 매핑은 새 노드에 없으므로 운영 중 노드 변경은 재마스킹/이관 필요)
+
+환경 변수:
+    REDIS_SHARDS: "host:port,host:port,..." (지정 시 REDIS_HOST/REDIS_PORT 대신 사용)
+    REDIS_SHARD_SUB_TAGS: 태그당 하위 태그 수 (기본 1, 바꾸면 기존 매핑을 찾지 못함)
+"""
+
+import asyncio
+import bisect
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .mapping_store import (
+    MappingStore,
+    counter_tag,
+    format_shard_tag,
+    masked_key_tag,
+    original_sub_index,
+    sub_tag,
+)
+from .redis_connection import RedisConnectionOptions
+
+# 노드당 링 위의 가상 노드 수 (태그 분포 균등화)
+DEFAULT_VIRTUAL_NODES = 160
+
+
+def parse_shard_nodes(value: str) -> List[Tuple[str, int]]:
+    """
+    REDIS_SHARDS 값 파싱
+
+    Args:
+        value: "host:port,host:port" (포트 생략 시 6379)
+
+    Returns:
+        [(호스트, 포트)] (빈 문자열이면 빈 리스트)
+    """
+    nodes = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if ":" in item else (item, "", "6379")
+        nodes.append((host, int(port)))
+    return nodes
+
+
+class HashRing:
+    """
+    일관 해시 링 (md5 + 가상 노드, 이분 탐색)
+
+    Args:
+        node_count: 노드 수
+        virtual_nodes: 노드당 가상 노드 수
+    """
+
+    def __init__(self, node_count: int, virtual_nodes: int = DEFAULT_VIRTUAL_NODES) -> None:
+        if node_count <= 0:
+            raise ValueError("샤드 노드가 하나 이상 필요합니다")
+        points = sorted(
+            (self._hash(f"{node}-{replica}"), node)
+            for node in range(node_count)
+            for replica in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def node_for(self, tag: str) -> int:
+        """태그를 담당하는 노드 번호"""
+        index = bisect.bisect(self._hashes, self._hash(tag)) % len(self._hashes)
+        return self._nodes[index]
+
+
+class ShardedMappingStore:
+    """
+    여러 Redis 노드에 나눠 저장하는 매핑 저장소 (MappingStore와 같은 인터페이스)
+
+    카운터는 토큰 형식의 태그별이므로 get_next_counters / reserve_counters는
+    get-or-create와 같은 형식을 받아 같은 카운터/노드를 사용
+    (예: "s3", "AWS_S3_BUCKET_{:03d}" → counter:{s3_bucket}, 형식이 없으면 "AWS_<타입>_{:03d}")
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[Tuple[str, int]],
+        db: int = 0,
+        password: Optional[str] = None,
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        cache_invalidation: bool = True,
+        counter_block_size: int = 64,
+        connection_options: Optional[RedisConnectionOptions] = None,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES,
+        sub_tags: int = 1
+    ) -> None:
+        """
+        노드별 저장소 초기화 (연결은 처음 사용할 때)
+
+        Args:
+            nodes: [(호스트, 포트)] (순서가 링 배치를 결정하므로 모든 워커에서 같아야 함)
+            db: Redis 데이터베이스 번호
+            password: Redis 비밀번호 (선택, 모든 노드 공통)
+            cache_size: 노드별 프로세스 내 캐시 최대 항목 수 (0이면 사용 안 함)
+            cache_ttl: 캐시 항목 최대 유지 시간 (초)
+            cache_invalidation: keyspace 알림 구독으로 캐시 무효화 여부
+            counter_block_size: 새 토큰/get_next_counter용 카운터 블록 초기 크기
+            connection_options: 노드별 연결 풀/재시도/전송 설정
+            virtual_nodes: 노드당 가상 노드 수
+            sub_tags: 태그당 하위 태그 수 (1보다 크면 한 타입의 매핑이 여러 노드에 분산,
+                노드 목록처럼 모든 워커에서 같아야 함)
+        """
+        self.nodes = list(nodes)
+        self.sub_tags = max(sub_tags, 1)
+        self.ring = HashRing(len(self.nodes), virtual_nodes)
+        self.shards = [
+            MappingStore(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                cache_size=cache_size,
+                cache_ttl=cache_ttl,
+                cache_invalidation=cache_invalidation,
+                counter_block_size=counter_block_size,
+                connection_options=connection_options,
+                hash_tags=True,
+                sub_tags=self.sub_tags
+            )
+            for host, port in self.nodes
+        ]
+
+    def shard_for(self, tag: str) -> MappingStore:
+        """태그를 담당하는 노드 저장소"""
+        return self.shards[self.ring.node_for(tag)]
+
+    def shard_for_masked(self, masked: str) -> MappingStore:
+        """마스킹 값의 매핑이 저장된 노드 저장소"""
+        return self.shard_for(masked_key_tag(masked, self.sub_tags))
+
+    def _original_tag(self, original: str, tag: str) -> str:
+        """get-or-create로 만든 원본 매핑의 키 태그"""
+        return sub_tag(tag, original_sub_index(original, self.sub_tags), self.sub_tags)
+
+    def _counter_tag(self, resource_type: str, token_format: Optional[str]) -> str:
+        """카운터 API가 사용하는 (하위 태그 0) 카운터의 태그"""
+        return sub_tag(counter_tag(resource_type, token_format), 0, self.sub_tags)
+
+    def _group(self, tags: Sequence[str]) -> Dict[int, List[int]]:
+        """입력 위치를 노드 번호별로 묶음 {노드: [위치...]}"""
+        groups: Dict[int, List[int]] = {}
+        for i, tag in enumerate(tags):
+            groups.setdefault(self.ring.node_for(tag), []).append(i)
+        return groups
+
+    async def save_mapping(self, masked: str, original: str, ttl: Optional[int] = None) -> None:
+        """
+        매핑 저장
+
+        Args:
+            masked: 마스킹된 값
+            original: 원본 값
+            ttl: 만료 시간 (초, 선택사항)
+        """
+        await self.save_batch({masked: original}, ttl=ttl)
+
+    async def get_original(self, masked: str) -> Optional[str]:
+        """
+        마스킹된 값으로 원본 값 조회
+
+        Args:
+            masked: 마스킹된 값
+
+        Returns:
+            원본 값 또는 None
+        """
+        return await self.shard_for_masked(masked).get_original(masked)
+
+    async def get_masked(self, original: str, tag: str = "default") -> Optional[str]:
+        """
+        원본 값으로 마스킹된 값 조회
+
+        Args:
+            original: 원본 값
+            tag: 해시 태그 (format_shard_tag 값, 예: "ec2")
+
+        Returns:
+            마스킹된 값 또는 None
+        """
+        return await self.shard_for(self._original_tag(original, tag)).get_masked(original, tag)
+
+    async def get_masked_batch(self, originals: List[str], tag: str = "default") -> Dict[str, str]:
+        """
+        같은 태그의 여러 원본 값의 마스킹 값을 조회
+
+        Args:
+            originals: 원본 값 리스트
+            tag: 해시 태그 (모든 원본에 공통)
+
+        Returns:
+            {원본_값: 마스킹된_값} (매핑이 있는 원본만 포함)
+        """
+        if not originals:
+            return {}
+        groups = self._group([self._original_tag(original, tag) for original in originals])
+        results = await asyncio.gather(*(
+            self.shards[node].get_masked_batch([originals[i] for i in positions], tag)
+            for node, positions in groups.items()
+        ))
+        found: Dict[str, str] = {}
+        for result in results:
+            found.update(result)
+        return found
+
+    async def get_originals_batch(self, masked_values: List[str]) -> Dict[str, str]:
+        """
+        여러 마스킹 값의 원본 값을 노드별 MGET으로 병렬 조회
+
+        Args:
+            masked_values: 마스킹된 값 리스트
+
+        Returns:
+            {마스킹된_값: 원본_값} (매핑이 있는 값만 포함)
+        """
+        if not masked_values:
+            return {}
+        groups = self._group([masked_key_tag(masked, self.sub_tags) for masked in masked_values])
+        results = await asyncio.gather(*(
+            self.shards[node].get_originals_batch([masked_values[i] for i in positions])
+            for node, positions in groups.items()
+        ))
+        found: Dict[str, str] = {}
+        for result in results:
+            found.update(result)
+        return found
+
+    async def get_or_create_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        token_formats: Dict[str, str],
+        ttl: Optional[int] = None
+    ) -> List[str]:
+        """
+        (타입, 원본) 쌍의 마스킹 토큰을 노드별 스크립트로 병렬 조회/생성
+
+        한 원본의 키는 모두 같은 (하위) 태그의 노드라 노드 안의 스크립트가 원자성을 보장
+
+        Args:
+            pairs: 처리 순서대로 (리소스_타입, 원본_값) 리스트
+            token_formats: 리소스_타입 → 토큰 형식
+            ttl: 새 매핑 만료 시간 (초, 선택사항)
+
+        Returns:
+            pairs 순서의 최종 마스킹 토큰 리스트
+        """
+        if not pairs:
+            return []
+        tags = {
+            resource_type: format_shard_tag(token_formats[resource_type], resource_type)
+            for resource_type in {resource_type for resource_type, _ in pairs}
+        }
+        groups = self._group([
+            self._original_tag(original, tags[resource_type]) for resource_type, original in pairs
+        ])
+        results = await asyncio.gather(*(
+            self.shards[node].get_or_create_batch([pairs[i] for i in positions], token_formats, ttl=ttl)
+            for node, positions in groups.items()
+        ))
+        tokens: List[str] = [""] * len(pairs)
+        for positions, created in zip(groups.values(), results):
+            for i, token in zip(positions, created):
+                tokens[i] = token
+        return tokens
+
+    async def save_batch(self, mappings: Dict[str, str], ttl: Optional[int] = None) -> None:
+        """
+        여러 매핑을 노드별로 나눠 병렬 저장
+
+        Args:
+            mappings: {마스킹된_값: 원본_값} 딕셔너리
+            ttl: 만료 시간 (초, 선택사항)
+        """
+        if not mappings:
+            return
+        per_node: Dict[int, Dict[str, str]] = {}
+        for masked, original in mappings.items():
+            per_node.setdefault(self.ring.node_for(masked_key_tag(masked, self.sub_tags)), {})[masked] = original
+        await asyncio.gather(*(
+            self.shards[node].save_batch(node_mappings, ttl=ttl)
+            for node, node_mappings in per_node.items()
+        ))
+
+    async def get_next_counter(self, resource_type: str, token_format: Optional[str] = None) -> int:
+        """
+        리소스 타입별 유일 카운터 생성 (토큰 형식의 태그가 있는 노드)
+
+        Args:
+            resource_type: 리소스 타입 (예: "ec2")
+            token_format: 토큰 형식 (없으면 기본 형식)
+
+        Returns:
+            유일한 카운터 값
+        """
+        shard = self.shard_for(self._counter_tag(resource_type, token_format))
+        return await shard.get_next_counter(resource_type, token_format)
+
+    async def get_next_counters(
+        self,
+        resource_type: str,
+        count: int,
+        token_format: Optional[str] = None
+    ) -> List[int]:
+        """
+        리소스 타입별 유일 카운터 여러 개 생성 (토큰 형식의 태그가 있는 노드)
+
+        Args:
+            resource_type: 리소스 타입
+            count: 필요한 개수
+            token_format: 토큰 형식 (없으면 기본 형식)
+
+        Returns:
+            유일한 카운터 값 목록
+        """
+        shard = self.shard_for(self._counter_tag(resource_type, token_format))
+        return await shard.get_next_counters(resource_type, count, token_format)
+
+    async def reserve_counters(
+        self,
+        counts: Dict[str, int],
+        token_formats: Optional[Dict[str, str]] = None
+    ) -> Dict[str, int]:
+        """
+        리소스 타입별 카운터 구간을 노드별 파이프라인으로 병렬 예약
+
+        Args:
+            counts: {리소스_타입: 필요한_개수}
+            token_formats: 리소스_타입 → 토큰 형식 (없는 타입은 기본 형식)
+
+        Returns:
+            {리소스_타입: 예약된 구간의 첫 카운터 값}
+
+        Raises:
+            ValueError: sub_tags > 1 (MappingStore.reserve_counters 참고)
+        """
+        if self.sub_tags > 1:
+            raise ValueError("sub_tags > 1이면 연속 구간을 예약할 수 없습니다 (get_next_counters 사용)")
+        formats = token_formats or {}
+        per_node: Dict[int, Dict[str, int]] = {}
+        for resource_type, count in counts.items():
+            node = self.ring.node_for(counter_tag(resource_type, formats.get(resource_type)))
+            per_node.setdefault(node, {})[resource_type] = count
+        results = await asyncio.gather(*(
+            self.shards[node].reserve_counters(node_counts, token_formats)
+            for node, node_counts in per_node.items()
+        ))
+        firsts: Dict[str, int] = {}
+        for result in results:
+            firsts.update(result)
+        return firsts
+
+    async def _gather_statistics(self, recount: bool) -> Dict[str, int]:
+        results = await asyncio.gather(*(
+            shard.recount_statistics() if recount else shard.get_statistics()
+            for shard in self.shards
+        ))
+        totals: Dict[str, int] = {"total_count": 0}
+        for stats in results:
+            for field, value in stats.items():
+                totals[field] = totals.get(field, 0) + value
+        return totals
+
+    async def get_statistics(self) -> Dict[str, int]:
+        """
+        모든 노드의 매핑 통계 합산
+
+        Returns:
+            통계 정보 딕셔너리 (total_count, <타입>_count)
+        """
+        return await self._gather_statistics(recount=False)
+
+    async def recount_statistics(self) -> Dict[str, int]:
+        """
+        노드별 통계 해시 재계산 후 합산
+
+        Returns:
+            재계산된 통계 정보
+        """
+        return await self._gather_statistics(recount=True)
+
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """
+        노드별 1단계 캐시 통계 합산
+
+        Returns:
+            hits / misses / size 등 합계 (캐시 미사용 시 {"enabled": False})
+        """
+        per_shard = [shard.get_cache_statistics() for shard in self.shards]
+        if not per_shard[0].get("enabled"):
+            return {"enabled": False}
+        totals: Dict[str, Any] = {
+            "enabled": True,
+            "invalidation": (
+                "keyspace" if all(stats["invalidation"] == "keyspace" for stats in per_shard) else "ttl_only"
+            ),
+        }
+        for stats in per_shard:
+            for field, value in stats.items():
+                if field not in totals:
+                    totals[field] = 0
+                if isinstance(value, int) and not isinstance(value, bool):
+                    totals[field] += value
+        return totals
+
+    def get_pool_statistics(self) -> Dict[str, int]:
+        """
+        노드별 Redis 연결 풀 사용 현황 합산
+
+        Returns:
+            {"max": 최대 연결 수 합, "in_use": 사용 중, "idle": 대기 중}
+        """
+        totals = {"max": 0, "in_use": 0, "idle": 0}
+        for shard in self.shards:
+            for field, value in shard.get_pool_statistics().items():
+                totals[field] += value
+        return totals
+
+    async def ping(self) -> bool:
+        """
+        모든 노드 PING (헬스체크용)
+
+        Returns:
+            모든 노드 PONG 수신 여부 (연결 실패 시 예외)
+        """
+        return all(await asyncio.gather(*(shard.ping() for shard in self.shards)))
+
+    async def clear_all(self) -> None:
+        """모든 노드의 매핑 데이터 삭제 (테스트용)"""
+        await asyncio.gather(*(shard.clear_all() for shard in self.shards))
+
+    async def close(self) -> None:
+        """모든 노드 연결 종료"""
+        await asyncio.gather(*(shard.close() for shard in self.shards), return_exceptions=True)
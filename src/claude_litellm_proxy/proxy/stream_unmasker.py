@@ -0,0 +1,262 @@
+"""
+스트리밍 응답 점진적 언마스킹
+
+SSE로 흘러가는 text_delta를 받는 즉시 언마스킹하여 내보내고,
+청크 경계에서 잘렸을 수 있는 마스킹 토큰(AWS_..._NNN) 꼬리만 잠시 보류
+
+토큰 문자는 모두 [A-Z0-9_]이므로 토큰은 이 문자들의 연속 구간(run) 안에서만
+매치됨. 따라서 버퍼 끝의 run 중 "AWS_" 또는 그 접두어("A", "AW", "AWS")에서
+시작하는 부분만 보류하면 전체 텍스트를 한 번에 언마스킹한 결과와 동일
+
+tool_use 블록의 input_json_delta는 JSON 조각이라 중간에서 언마스킹할 수 없으므로
+content_block_stop까지 모아 파싱 후 문자열 값을 언마스킹하고 한 번에 내보냄
+"""
+
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# 토큰 구성 문자 연속 구간
+_TOKEN_RUN_TAIL = re.compile(r"[A-Z0-9_]+\Z")
+
+# 마스킹 토큰 접두어
+_TOKEN_PREFIX = "AWS_"
+
+# 보류 꼬리 최대 길이 (가장 긴 토큰보다 충분히 큼, 초과 시 그대로 처리)
+# 암호화 토큰은 원본 길이에 비례하므로(긴 ARN → 수백 글자) 여유 있게 설정
+MAX_HOLD_BACK = 4096
+
+
+def _hold_back_start(buffer: str) -> int:
+    """
+    버퍼에서 아직 내보내면 안 되는 꼬리의 시작 위치 계산
+
+    Args:
+        buffer: 지금까지 받은 미처리 텍스트
+
+    Returns:
+        보류 시작 위치 (보류할 것이 없으면 len(buffer))
+    """
+    tail = _TOKEN_RUN_TAIL.search(buffer)
+    if tail is None:
+        return len(buffer)
+
+    run_start = tail.start()
+    run = tail.group()
+
+    # run 안의 첫 "AWS_"부터는 다음 청크에 따라 토큰 범위가 바뀔 수 있음
+    prefix_at = run.find(_TOKEN_PREFIX)
+    if prefix_at != -1:
+        return run_start + prefix_at
+
+    # run 끝이 "A"/"AW"/"AWS"면 다음 청크와 이어져 토큰이 시작될 수 있음
+    for length in range(len(_TOKEN_PREFIX) - 1, 0, -1):
+        if run.endswith(_TOKEN_PREFIX[:length]):
+            return len(buffer) - length
+
+    return len(buffer)
+
+
+class StreamUnmasker:
+    """
+    청크 단위 점진적 언마스킹
+
+    feed()로 받은 텍스트 중 안전한 부분만 언마스킹해서 반환하고,
+    잘린 토큰일 수 있는 꼬리는 다음 청크나 flush()까지 보류
+    """
+
+    def __init__(
+        self,
+        unmask: Callable[[str], Awaitable[str]],
+        max_hold_back: int = MAX_HOLD_BACK
+    ) -> None:
+        """
+        Args:
+            unmask: 완결된 텍스트 조각 언마스킹 함수 (예: 요청 매핑을 묶은 unmask_text)
+            max_hold_back: 보류 꼬리 최대 길이
+        """
+        self._unmask = unmask
+        self._max_hold_back = max_hold_back
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """보류 중인 꼬리 텍스트"""
+        return self._buffer
+
+    async def feed(self, chunk: str) -> str:
+        """
+        청크 추가 후 내보낼 수 있는 언마스킹 텍스트 반환
+
+        Args:
+            chunk: 새로 받은 텍스트
+
+        Returns:
+            언마스킹된 안전한 텍스트 (없으면 빈 문자열)
+        """
+        self._buffer += chunk
+
+        cut = _hold_back_start(self._buffer)
+        if len(self._buffer) - cut > self._max_hold_back:
+            cut = len(self._buffer)
+
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return await self._unmask_segment(ready)
+
+    async def flush(self) -> str:
+        """스트림 종료 시 보류 꼬리까지 모두 언마스킹해서 반환"""
+        ready, self._buffer = self._buffer, ""
+        return await self._unmask_segment(ready)
+
+    async def _unmask_segment(self, segment: str) -> str:
+        """토큰 접두어가 없는 조각은 언마스킹 생략"""
+        if _TOKEN_PREFIX not in segment:
+            return segment
+        return await self._unmask(segment)
+
+
+async def unmask_event_stream(
+    events: AsyncIterator[Dict[str, Any]],
+    unmask: Callable[[str], Awaitable[str]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Anthropic 스트리밍 이벤트의 text_delta / input_json_delta 언마스킹
+
+    text_delta: content block마다 StreamUnmasker를 두고, 보류된 꼬리는
+    content_block_stop 직전에 마지막 delta로 내보냄
+    input_json_delta: content_block_stop까지 모은 뒤 tool_use 입력 전체를 언마스킹해서
+    delta 하나로 내보냄
+
+    Args:
+        events: message_start / content_block_delta / ... 이벤트 스트림
+        unmask: 텍스트 조각 언마스킹 함수
+
+    Yields:
+        언마스킹된 이벤트
+    """
+    unmaskers: Dict[int, StreamUnmasker] = {}
+    tool_inputs: Dict[int, List[str]] = {}
+
+    async for event in events:
+        event_type = event.get("type")
+        index = event.get("index", 0)
+
+        if event_type == "content_block_delta":
+            delta_type = event.get("delta", {}).get("type")
+            if delta_type == "text_delta":
+                unmasker = unmaskers.setdefault(index, StreamUnmasker(unmask))
+                text = await unmasker.feed(event["delta"]["text"])
+                if text:
+                    yield _text_delta(index, text)
+                continue
+            if delta_type == "input_json_delta":
+                tool_inputs.setdefault(index, []).append(event["delta"].get("partial_json", ""))
+                continue
+
+        if event_type == "content_block_stop":
+            if index in unmaskers:
+                text = await unmaskers.pop(index).flush()
+                if text:
+                    yield _text_delta(index, text)
+            if index in tool_inputs:
+                yield _input_json_delta(index, await _unmask_tool_input(tool_inputs.pop(index), unmask))
+
+        yield event
+
+    # content_block_stop 없이 끝난 경우에도 보류 꼬리를 유실하지 않음
+    for index, unmasker in unmaskers.items():
+        text = await unmasker.flush()
+        if text:
+            yield _text_delta(index, text)
+    for index, parts in tool_inputs.items():
+        yield _input_json_delta(index, await _unmask_tool_input(parts, unmask))
+
+
+async def _unmask_tool_input(parts: List[str], unmask: Callable[[str], Awaitable[str]]) -> str:
+    """
+    모은 input_json_delta 조각을 언마스킹한 JSON 문자열로
+
+    Args:
+        parts: partial_json 조각 목록
+        unmask: 텍스트 언마스킹 함수
+
+    Returns:
+        언마스킹된 JSON 문자열 (파싱 불가면 원문 그대로 언마스킹)
+    """
+    raw = "".join(parts)
+    if _TOKEN_PREFIX not in raw:
+        return raw
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return await unmask(raw)
+    return json.dumps(await unmask_json_value(value, unmask), ensure_ascii=False)
+
+
+async def unmask_json_value(value: Any, unmask: Callable[[str], Awaitable[str]]) -> Any:
+    """
+    JSON 값 안의 모든 문자열 언마스킹 (dict 키는 그대로)
+
+    Claude Code stream-json 이벤트는 줄 단위로 완결되므로 보류 없이 바로 언마스킹
+    (assistant 텍스트, tool_use 입력, tool_result, result 등 위치와 무관)
+
+    Args:
+        value: json.loads 결과 값
+        unmask: 텍스트 언마스킹 함수
+
+    Returns:
+        언마스킹된 새 값 (토큰이 없는 문자열은 그대로)
+    """
+    if isinstance(value, str):
+        return await unmask(value) if _TOKEN_PREFIX in value else value
+    if isinstance(value, dict):
+        return {key: await unmask_json_value(item, unmask) for key, item in value.items()}
+    if isinstance(value, list):
+        return [await unmask_json_value(item, unmask) for item in value]
+    return value
+
+
+def _text_delta(index: int, text: str) -> Dict[str, Any]:
+    """content_block_delta(text_delta) 이벤트 생성"""
+    return {
+        "type": "content_block_delta",
+        "index": index,
+        "delta": {"type": "text_delta", "text": text},
+    }
+
+
+def _input_json_delta(index: int, partial_json: str) -> Dict[str, Any]:
+    """content_block_delta(input_json_delta) 이벤트 생성"""
+    return {
+        "type": "content_block_delta",
+        "index": index,
+        "delta": {"type": "input_json_delta", "partial_json": partial_json},
+    }
+
+
+def format_sse_event(event: Dict[str, Any], event_name: Optional[str] = None) -> str:
+    """
+    이벤트를 SSE 프레임으로 직렬화
+
+    Args:
+        event: 이벤트 데이터
+        event_name: SSE event 필드 (기본값: event["type"])
+
+    Returns:
+        "event: ...\\ndata: ...\\n\\n" 형식 문자열
+    """
+    name = event_name or event.get("type", "message")
+    return f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def format_ndjson_event(event: Dict[str, Any]) -> str:
+    """
+    이벤트를 NDJSON 한 줄로 직렬화
+
+    Args:
+        event: 이벤트 데이터
+
+    Returns:
+        "{...}\\n" 형식 문자열
+    """
+    return json.dumps(event, ensure_ascii=False) + "\n"
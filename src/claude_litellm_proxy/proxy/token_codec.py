@@ -0,0 +1,182 @@
+"""
+키 기반 가역 토큰 (저장소 없는 마스킹)
+
+카운터 토큰(AWS_EC2_001)은 새 식별자마다 INCR + SET 2회, 복원마다 GET이 필요함
+암호화 토큰은 원본을 비밀 키로 결정적 인증 암호화해 토큰 안에 담으므로
+마스킹/복원 모두 저장소 조회 없이 처리됨
+
+토큰 형식: AWS_<TYPE>_<BASE32 페이로드>_<키 ID 3자리>
+    예) AWS_EC2_7QZ2...K4A_001
+    - 기존 토큰 정규식(AWS_[A-Z0-9_]+_\\d{3,})과 호환 → unmask_text/스트리밍 그대로 사용
+    - 키 ID로 키 교체(rotation) 지원: 새 키로 만들고, 이전 키 토큰도 복원
+
+암호화 방식 (HMAC-SHA256 기반 SIV, 표준 라이브러리만 사용):
+    siv = HMAC(mac_key, 접두어 || 원본)[:16]        # 합성 IV 겸 인증 태그
+    ct  = 원본 XOR HMAC-CTR(enc_key, siv)
+    페이로드 = base32(siv || ct)
+- 같은 키/원본이면 항상 같은 토큰 (세션/워커 간 일관성, 조정 불필요)
+- 토큰 타입 접두어를 인증 데이터로 묶어 다른 타입으로 바꿔치기 불가
+- 변조되었거나 다른 키로 만든 토큰은 복원하지 않음 (None)
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import re
+from typing import Dict, Optional
+
+# 합성 IV(인증 태그) 길이 (바이트)
+SIV_LENGTH = 16
+
+# 페이로드 최소 길이 (태그만 있는 경우의 base32 길이)
+_MIN_PAYLOAD_LENGTH = (SIV_LENGTH * 8 + 4) // 5
+
+_PAYLOAD_PATTERN = re.compile(r"[A-Z2-7]+")
+
+
+def parse_token_keys(spec: str) -> Dict[int, bytes]:
+    """
+    "키ID:base64키,키ID:base64키" 형식의 키 목록 파싱 (MASKING_TOKEN_KEYS)
+
+    Args:
+        spec: 키 목록 문자열
+
+    Returns:
+        {키 ID: 키 바이트}
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 키가 16바이트 미만일 때
+    """
+    keys: Dict[int, bytes] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key_id, _, encoded = item.partition(":")
+        try:
+            keys[int(key_id)] = base64.b64decode(encoded, validate=True)
+        except (ValueError, binascii.Error) as e:
+            raise ValueError(f"잘못된 토큰 키 형식: {key_id}") from e
+    for key_id, key in keys.items():
+        if len(key) < 16:
+            raise ValueError(f"토큰 키 {key_id}는 16바이트 이상이어야 합니다")
+    return keys
+
+
+class TokenCodec:
+    """
+    키 기반 가역 토큰 인코더/디코더
+
+    사용 예:
+        codec = TokenCodec({1: secret_key})
+        token = codec.encode("AWS_EC2_", "i-1234567890abcdef0")
+        codec.decode(token)  # "i-1234567890abcdef0"
+    """
+
+    def __init__(self, keys: Dict[int, bytes], active_key_id: Optional[int] = None) -> None:
+        """
+        Args:
+            keys: {키 ID(0~999): 비밀 키(16바이트 이상)}
+            active_key_id: 새 토큰에 사용할 키 ID (기본: 가장 큰 ID)
+        """
+        if not keys:
+            raise ValueError("토큰 키가 하나 이상 필요합니다")
+        if any(not 0 <= key_id <= 999 for key_id in keys):
+            raise ValueError("토큰 키 ID는 0~999 범위여야 합니다")
+
+        self.active_key_id = max(keys) if active_key_id is None else active_key_id
+        if self.active_key_id not in keys:
+            raise ValueError(f"활성 키 ID {self.active_key_id}에 해당하는 키가 없습니다")
+
+        # 키 ID → (MAC 키, 암호화 키)
+        self._keys = {
+            key_id: (
+                hmac.new(key, b"token-mac", hashlib.sha256).digest(),
+                hmac.new(key, b"token-enc", hashlib.sha256).digest(),
+            )
+            for key_id, key in keys.items()
+        }
+
+    @staticmethod
+    def _siv(mac_key: bytes, prefix: bytes, plaintext: bytes) -> bytes:
+        """합성 IV 계산 (접두어 길이를 앞에 붙여 경계 모호성 제거)"""
+        message = len(prefix).to_bytes(2, "big") + prefix + plaintext
+        return hmac.new(mac_key, message, hashlib.sha256).digest()[:SIV_LENGTH]
+
+    @staticmethod
+    def _keystream_xor(enc_key: bytes, siv: bytes, data: bytes) -> bytes:
+        """HMAC-SHA256 카운터 모드 키스트림과 XOR"""
+        blocks = []
+        for counter in range((len(data) + 31) // 32):
+            blocks.append(hmac.new(enc_key, siv + counter.to_bytes(4, "big"), hashlib.sha256).digest())
+        keystream = b"".join(blocks)[:len(data)]
+        return bytes(a ^ b for a, b in zip(data, keystream))
+
+    def encode(self, prefix: str, original: str) -> str:
+        """
+        원본 값을 토큰으로 변환
+
+        Args:
+            prefix: 토큰 타입 접두어 (예: "AWS_EC2_")
+            original: 원본 값
+
+        Returns:
+            토큰 (예: "AWS_EC2_<페이로드>_001")
+        """
+        mac_key, enc_key = self._keys[self.active_key_id]
+        plaintext = original.encode("utf-8")
+        siv = self._siv(mac_key, prefix.encode("ascii"), plaintext)
+        ciphertext = self._keystream_xor(enc_key, siv, plaintext)
+        payload = base64.b32encode(siv + ciphertext).decode("ascii").rstrip("=")
+        return f"{prefix}{payload}_{self.active_key_id:03d}"
+
+    def token_prefix(self, replacement: str) -> str:
+        """패턴 대체 형식("AWS_EC2_{:03d}")에서 토큰 접두어 추출"""
+        return replacement.split("{", 1)[0]
+
+    def format_token(self, replacement: str, original: str) -> str:
+        """
+        패턴 대체 형식에 암호화 토큰을 채운 마스킹 값
+
+        Args:
+            replacement: 패턴 대체 형식 (예: "AWS_EC2_{:03d}")
+            original: 원본 값
+
+        Returns:
+            마스킹 값 (대체 형식의 접미어 유지)
+        """
+        prefix = self.token_prefix(replacement)
+        return replacement.replace("{:03d}", self.encode(prefix, original)[len(prefix):], 1)
+
+    def decode(self, token: str) -> Optional[str]:
+        """
+        토큰을 원본 값으로 복원
+
+        Args:
+            token: 마스킹 토큰 (AWS_..._NNN)
+
+        Returns:
+            원본 값 (암호화 토큰이 아니거나 변조/알 수 없는 키면 None)
+        """
+        body, _, key_id = token.rpartition("_")
+        prefix, _, payload = body.rpartition("_")
+        if not key_id.isdigit() or len(payload) < _MIN_PAYLOAD_LENGTH or not _PAYLOAD_PATTERN.fullmatch(payload):
+            return None
+
+        keys = self._keys.get(int(key_id))
+        if keys is None:
+            return None
+        mac_key, enc_key = keys
+
+        try:
+            raw = base64.b32decode(payload + "=" * (-len(payload) % 8))
+        except binascii.Error:
+            return None
+
+        siv, ciphertext = raw[:SIV_LENGTH], raw[SIV_LENGTH:]
+        plaintext = self._keystream_xor(enc_key, siv, ciphertext)
+        if not hmac.compare_digest(siv, self._siv(mac_key, (prefix + "_").encode("ascii"), plaintext)):
+            return None
+
+        try:
+            return plaintext.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
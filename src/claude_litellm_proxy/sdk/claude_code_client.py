@@ -9,10 +9,14 @@ Phase 3 핵심 구현: Claude Code SDK → HTTP Proxy → LiteLLM 플로우
 
 import os
 import asyncio
+import shutil
 import subprocess
 import json
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, AsyncIterator, Optional, List
 from ..utils.logging import setup_logger
+from .stream_json import DEFAULT_MAX_LINE_BYTES, JsonLineReader, drain_tail
+from .worker_pool import STDERR_TAIL_LIMIT, ClaudeWorkerPool, JobOptions, JobTiming
 
 # 로거 설정
 logger = setup_logger(__name__)
@@ -32,7 +36,9 @@ class ClaudeCodeHeadlessClient:
     def __init__(
         self,
         proxy_url: str = "http://localhost:8000",
-        auth_token: str = "sk-litellm-master-key"
+        auth_token: str = "sk-litellm-master-key",
+        worker_pool: Optional[ClaudeWorkerPool] = None,
+        cli_command: Optional[List[str]] = None
     ):
         """
         Claude Code SDK 클라이언트 초기화
@@ -40,9 +46,13 @@ class ClaudeCodeHeadlessClient:
         Args:
             proxy_url: 우리 프록시 서버 URL
             auth_token: 인증 토큰 (LITELLM_MASTER_KEY)
+            worker_pool: 미리 띄운 CLI 워커 풀 (없으면 요청마다 프로세스 생성)
+            cli_command: CLI 실행 파일과 고정 인자 (기본값: ["claude"])
         """
         self.proxy_url = proxy_url
         self.auth_token = auth_token
+        self.worker_pool = worker_pool
+        self.cli_command = cli_command or ["claude"]
         
         # Claude Code SDK 환경변수 설정
         self._setup_environment()
@@ -98,6 +108,22 @@ class ClaudeCodeHeadlessClient:
         logger.info(f"Claude Code SDK headless 쿼리 시작: {prompt[:100]}...")
         
         try:
+            if self.worker_pool:
+                # 워커 풀: 미리 띄운 프로세스에 stdin으로 프롬프트 전달
+                job = await self.worker_pool.run(
+                    prompt,
+                    JobOptions(
+                        allowed_tools=tuple(allowed_tools or ()),
+                        system_prompt=system_prompt,
+                        working_directory=working_directory
+                    )
+                )
+                result = await self._process_command_result(job.return_code, job.stdout, job.stderr)
+                result["timing"] = job.timing.to_dict()
+                
+                logger.info("Claude Code SDK headless 쿼리 완료")
+                return result
+            
             # Claude Code SDK headless 명령 구성
             cmd = self._build_headless_command(
                 prompt=prompt,
@@ -117,6 +143,89 @@ class ClaudeCodeHeadlessClient:
             logger.error(f"Claude Code SDK headless 쿼리 실패: {e}")
             raise
     
+    async def stream_headless(
+        self,
+        prompt: str,
+        allowed_tools: Optional[List[str]] = None,
+        system_prompt: Optional[str] = None,
+        working_directory: Optional[str] = None,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Claude Code SDK headless 모드 스트리밍 실행
+        
+        stdout 전체를 모으지 않고 stream-json 이벤트를 한 줄씩 yield
+        (메모리 사용량은 max_line_bytes로 제한)
+        
+        Args:
+            prompt: 사용자 프롬프트
+            allowed_tools: 허용된 도구 목록
+            system_prompt: 시스템 프롬프트
+            working_directory: 작업 디렉터리
+            max_line_bytes: stream-json 한 줄 최대 크기 (초과 줄은 오류 이벤트로 대체)
+            
+        Yields:
+            stream-json 이벤트 (system / assistant / user / result ...)
+            
+        Raises:
+            RuntimeError: CLI가 0이 아닌 코드로 종료된 경우 (마지막 이벤트 이후)
+            TimeoutError: API_TIMEOUT_MS 동안 출력이 없는 경우
+        """
+        if not prompt.strip():
+            raise ValueError("프롬프트가 비어있습니다")
+        
+        cmd = self._build_headless_command(
+            prompt=prompt,
+            allowed_tools=allowed_tools,
+            system_prompt=system_prompt,
+            working_directory=working_directory
+        )
+        
+        logger.info(f"Claude Code SDK headless 스트리밍 시작: {prompt[:100]}...")
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=os.environ.copy(),
+            cwd=working_directory or os.getcwd()
+        )
+        stderr = bytearray()
+        stderr_task = asyncio.create_task(drain_tail(process.stderr, stderr, STDERR_TAIL_LIMIT))
+        
+        # 긴 실행도 출력이 이어지는 동안은 유지 (출력 간격에만 타임아웃 적용)
+        reader = JsonLineReader(
+            process.stdout,
+            max_line_bytes=max_line_bytes,
+            idle_timeout=int(os.getenv("API_TIMEOUT_MS", "30000")) / 1000
+        )
+        
+        try:
+            async for event in reader.events():
+                yield event
+            
+            return_code = await process.wait()
+            await stderr_task
+        finally:
+            # 클라이언트 연결 종료/타임아웃 시 프로세스 정리
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            if not stderr_task.done():
+                stderr_task.cancel()
+        
+        logger.info(
+            f"Claude Code SDK headless 스트리밍 완료: {reader.lines} lines "
+            f"(생략 {reader.dropped_lines}, code {return_code})"
+        )
+        
+        if return_code != 0:
+            error_msg = f"Claude Code SDK 실행 실패 (code: {return_code})"
+            stderr_text = stderr.decode("utf-8", errors="replace")
+            if stderr_text:
+                error_msg += f": {stderr_text}"
+            raise RuntimeError(error_msg)
+    
     def _build_headless_command(
         self,
         prompt: str,
@@ -130,8 +239,7 @@ class ClaudeCodeHeadlessClient:
         
         핵심: -p 플래그로 headless 모드 강제
         """
-        cmd = [
-            "claude",
+        cmd = self.cli_command + [
             "-p", prompt,  # 핵심: headless 모드 플래그
             "--output-format", "stream-json"  # JSON 출력으로 파싱 용이
         ]
@@ -177,6 +285,8 @@ class ClaudeCodeHeadlessClient:
             logger.debug(f"명령 실행: {' '.join(cmd)} (cwd: {cwd})")
             
             # 비동기 subprocess 실행
+            timing = JobTiming()
+            spawn_start = time.perf_counter()
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
@@ -184,8 +294,10 @@ class ClaudeCodeHeadlessClient:
                 env=env,
                 cwd=cwd
             )
+            timing.spawn = time.perf_counter() - spawn_start
             
             # 결과 대기 (타임아웃 설정)
+            execute_start = time.perf_counter()
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
@@ -194,11 +306,19 @@ class ClaudeCodeHeadlessClient:
             except asyncio.TimeoutError:
                 process.kill()
                 raise TimeoutError("Claude Code SDK 실행 타임아웃")
+            timing.execute = time.perf_counter() - execute_start
+            
+            logger.info(
+                f"Claude Code 명령 완료: spawn={timing.spawn * 1000:.1f}ms "
+                f"execute={timing.execute * 1000:.1f}ms"
+            )
             
             # 결과 처리
-            return await self._process_command_result(
+            result = await self._process_command_result(
                 process.returncode, stdout, stderr
             )
+            result["timing"] = timing.to_dict()
+            return result
             
         except Exception as e:
             logger.error(f"Claude Code SDK 명령 실행 실패: {e}")
@@ -284,9 +404,25 @@ class ClaudeCodeHeadlessClient:
             working_directory=os.path.dirname(os.path.abspath(code_path))
         )
     
+    async def check_cli(self) -> Dict[str, Any]:
+        """
+        Claude Code CLI 실행 파일 존재 확인 (프로세스 생성 없음)
+        
+        Returns:
+            CLI 경로와 워커 풀 통계 (실행 파일이 없으면 예외)
+        """
+        path = shutil.which(self.cli_command[0])
+        if path is None:
+            raise FileNotFoundError(f"Claude Code CLI를 찾을 수 없음: {self.cli_command[0]}")
+        
+        detail: Dict[str, Any] = {"cli": path}
+        if self.worker_pool:
+            detail["pool"] = self.worker_pool.get_statistics()
+        return detail
+    
     async def health_check(self) -> Dict[str, Any]:
         """
-        Claude Code SDK 연결 상태 확인
+        Claude Code SDK 연결 상태 확인 (실제 headless 실행 - 프로브용으로 사용 금지)
         """
         try:
             result = await self.query_headless(
@@ -0,0 +1,170 @@
+"""
+Claude Code CLI stream-json 출력 점진적 파싱
+
+process.communicate()로 stdout 전체를 모으지 않고 고정 크기 청크로 읽으면서
+줄 단위로 JSON 이벤트를 내보냄
+
+- 메모리 사용량: 한 줄 최대 크기(max_line_bytes) + 읽기 청크 크기로 제한
+- 최대 크기를 넘는 줄은 버리고 line_too_large 오류 이벤트로 대체
+- idle_timeout 동안 출력이 없으면 TimeoutError (긴 agentic 실행도 진행 중이면 유지)
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..utils.logging import setup_logger
+
+# 로거 설정
+logger = setup_logger(__name__)
+
+# stream-json 한 줄 최대 크기 기본값 (바이트)
+DEFAULT_MAX_LINE_BYTES = 1024 * 1024
+
+# stdout 읽기 단위 (바이트)
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def drain_tail(stream: Optional[asyncio.StreamReader], tail: bytearray, limit: int) -> None:
+    """
+    파이프가 막히지 않도록 스트림을 끝까지 읽고 마지막 limit 바이트만 보관
+
+    Args:
+        stream: 읽을 스트림 (보통 stderr)
+        tail: 내용을 보관할 버퍼
+        limit: 보관 최대 크기
+    """
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            return
+        tail.extend(chunk)
+        if len(tail) > limit:
+            del tail[:-limit]
+
+
+class JsonLineReader:
+    """
+    stream-json 줄 단위 이벤트 리더
+
+    사용 예:
+        reader = JsonLineReader(process.stdout, max_line_bytes=1 << 20)
+        async for event in reader.events():
+            ...
+    """
+
+    def __init__(
+        self,
+        stream: asyncio.StreamReader,
+        max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+        idle_timeout: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            stream: CLI stdout
+            max_line_bytes: 한 줄 최대 크기 (초과 시 해당 줄 버림)
+            idle_timeout: 출력 대기 최대 시간 (초, None이면 무제한)
+        """
+        if max_line_bytes < 1:
+            raise ValueError("max_line_bytes는 1 이상이어야 합니다")
+
+        self.stream = stream
+        self.max_line_bytes = max_line_bytes
+        self.idle_timeout = idle_timeout
+
+        # 통계
+        self.lines = 0
+        self.dropped_lines = 0
+        self.invalid_lines = 0
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        stdout EOF까지 이벤트 순서대로 yield
+
+        Yields:
+            JSON 이벤트 (dict) 또는 line_too_large 오류 이벤트
+        """
+        buffer = bytearray()
+        discarded = 0  # 0보다 크면 현재 줄을 버리는 중
+
+        while True:
+            chunk = await self._read_chunk()
+            if not chunk:
+                break
+
+            start = 0
+            while True:
+                newline = chunk.find(b"\n", start)
+                piece = chunk[start:] if newline == -1 else chunk[start:newline]
+
+                if discarded:
+                    discarded += len(piece)
+                elif len(buffer) + len(piece) > self.max_line_bytes:
+                    discarded = len(buffer) + len(piece)
+                    buffer.clear()
+                else:
+                    buffer.extend(piece)
+
+                if newline == -1:
+                    break
+
+                if discarded:
+                    yield self._oversized(discarded)
+                    discarded = 0
+                else:
+                    event = self._parse(buffer)
+                    buffer.clear()
+                    if event is not None:
+                        yield event
+                start = newline + 1
+
+        # 마지막 줄에 개행이 없는 경우
+        if discarded:
+            yield self._oversized(discarded)
+        elif buffer:
+            event = self._parse(buffer)
+            if event is not None:
+                yield event
+
+    async def _read_chunk(self) -> bytes:
+        """청크 하나 읽기 (idle_timeout 적용)"""
+        if self.idle_timeout is None:
+            return await self.stream.read(READ_CHUNK_SIZE)
+        try:
+            return await asyncio.wait_for(self.stream.read(READ_CHUNK_SIZE), timeout=self.idle_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Claude Code SDK 출력 대기 타임아웃 ({self.idle_timeout}초)")
+
+    def _parse(self, line: bytearray) -> Optional[Dict[str, Any]]:
+        """JSON 줄 파싱 (빈 줄/JSON이 아닌 줄은 건너뜀)"""
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            return None
+
+        self.lines += 1
+        try:
+            event = json.loads(text)
+        except json.JSONDecodeError:
+            self.invalid_lines += 1
+            logger.debug(f"JSON이 아닌 출력 무시: {text[:200]}")
+            return None
+
+        if not isinstance(event, dict):
+            self.invalid_lines += 1
+            return None
+        return event
+
+    def _oversized(self, size: int) -> Dict[str, Any]:
+        """최대 크기를 넘어 버린 줄 대신 내보낼 오류 이벤트"""
+        self.lines += 1
+        self.dropped_lines += 1
+        logger.warning(f"stream-json 줄 크기 초과로 생략: {size} bytes (최대 {self.max_line_bytes})")
+        return {
+            "type": "error",
+            "error": {
+                "type": "line_too_large",
+                "message": f"stream-json line of {size} bytes exceeds limit of {self.max_line_bytes} bytes",
+            },
+        }
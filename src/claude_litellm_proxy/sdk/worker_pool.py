@@ -0,0 +1,434 @@
+"""
+Claude Code CLI 워커 풀
+
+요청마다 `claude -p` 프로세스를 새로 띄우면 Node/CLI 기동 시간이 짧은 쿼리의
+대부분을 차지함. 워커 풀은 프로세스를 미리 띄워 두고(warm) 프롬프트를 stdin으로
+전달하여 기동 시간을 요청 경로에서 제거
+
+- 워커 프로토콜: stream-json 입력 (job마다 user 메시지 JSON 한 줄),
+  stdout에서 {"type": "result"} 라인이 나오면 job 완료
+- max_jobs_per_worker 도달 시 stdin을 닫고 워커 교체 (recycle)
+  실제 CLI는 같은 프로세스의 job끼리 대화 문맥을 공유하므로 기본값 1 (stateless 유지)
+- 동시 실행 워커 수 제한 + 대기열 길이 제한 (초과 시 PoolSaturatedError)
+- 런처 교체 가능 (테스트에서는 로컬 fake CLI 스크립트 사용)
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..utils.logging import setup_logger
+from .stream_json import drain_tail
+
+# 로거 설정
+logger = setup_logger(__name__)
+
+# 워커 stderr 보관 최대 크기 (바이트)
+STDERR_TAIL_LIMIT = 64 * 1024
+
+
+class PoolSaturatedError(RuntimeError):
+    """모든 워커가 사용 중이고 대기열도 가득 찬 경우"""
+
+
+@dataclass(frozen=True)
+class JobOptions:
+    """워커 명령줄을 결정하는 job 옵션 (같은 옵션의 job만 같은 워커 재사용)"""
+
+    allowed_tools: Tuple[str, ...] = ()
+    system_prompt: Optional[str] = None
+    working_directory: Optional[str] = None
+
+
+@dataclass
+class JobTiming:
+    """요청별 시간 측정 (초)"""
+
+    queue_wait: float = 0.0  # 워커 슬롯 대기
+    spawn: float = 0.0  # 프로세스 생성 (warm 워커면 0)
+    execute: float = 0.0  # 프롬프트 전달 ~ 결과 수신
+    warm: bool = False  # 미리 띄워 둔 워커 사용 여부
+
+    def to_dict(self) -> Dict[str, Any]:
+        """응답/로그용 dict (밀리초)"""
+        return {
+            "queue_wait_ms": round(self.queue_wait * 1000, 2),
+            "spawn_ms": round(self.spawn * 1000, 2),
+            "execute_ms": round(self.execute * 1000, 2),
+            "warm": self.warm,
+        }
+
+
+@dataclass
+class JobResult:
+    """job 실행 결과"""
+
+    return_code: int
+    stdout: bytes
+    stderr: bytes
+    timing: JobTiming
+
+
+class CliLauncher:
+    """
+    Claude Code CLI 런처
+
+    프롬프트 없이 stream-json 입력 모드로 프로세스를 띄움
+    (프롬프트는 워커가 stdin으로 전달)
+    """
+
+    def __init__(self, command: Optional[List[str]] = None) -> None:
+        """
+        Args:
+            command: 실행 파일과 고정 인자 (기본값: ["claude"])
+        """
+        self.command = command or ["claude"]
+
+    def build_command(self, options: JobOptions) -> List[str]:
+        """job 옵션에 맞는 명령줄 구성"""
+        cmd = self.command + [
+            "-p",  # 핵심: headless 모드 플래그
+            "--input-format", "stream-json",
+            "--output-format", "stream-json",
+        ]
+
+        if options.allowed_tools:
+            cmd.extend(["--allowedTools", ",".join(options.allowed_tools)])
+
+        if options.system_prompt:
+            cmd.extend(["--append-system-prompt", options.system_prompt])
+
+        if options.working_directory:
+            cmd.extend(["--cwd", options.working_directory])
+
+        cmd.extend(["--permission-mode", "acceptEdits", "--verbose"])
+        return cmd
+
+    async def launch(self, options: JobOptions) -> asyncio.subprocess.Process:
+        """워커 프로세스 생성"""
+        return await asyncio.create_subprocess_exec(
+            *self.build_command(options),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=os.environ.copy(),
+            cwd=options.working_directory or os.getcwd(),
+        )
+
+
+class Worker:
+    """stream-json 프로토콜로 job을 처리하는 CLI 프로세스 하나"""
+
+    def __init__(self, worker_id: int, process: asyncio.subprocess.Process, options: JobOptions) -> None:
+        self.worker_id = worker_id
+        self.process = process
+        self.options = options
+        self.jobs_done = 0
+        self._stderr = bytearray()
+        self._stderr_task = asyncio.create_task(drain_tail(process.stderr, self._stderr, STDERR_TAIL_LIMIT))
+
+    @property
+    def alive(self) -> bool:
+        """프로세스 실행 중 여부"""
+        return self.process.returncode is None
+
+    async def execute(self, prompt: str, last_job: bool, timeout: float) -> Tuple[int, bytes, bytes]:
+        """
+        job 하나 실행
+
+        Args:
+            prompt: 사용자 프롬프트
+            last_job: 마지막 job이면 전달 후 stdin을 닫아 프로세스 종료 유도
+            timeout: job 타임아웃 (초)
+
+        Returns:
+            (return_code, stdout, stderr)
+        """
+        stderr_start = len(self._stderr)
+        message = {
+            "type": "user",
+            "message": {"role": "user", "content": [{"type": "text", "text": prompt}]},
+        }
+
+        self.process.stdin.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        if last_job:
+            self.process.stdin.close()
+
+        try:
+            stdout, finished = await asyncio.wait_for(self._read_until_result(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            raise TimeoutError("Claude Code SDK 실행 타임아웃")
+
+        self.jobs_done += 1
+
+        if finished:
+            return_code = 0
+        else:
+            # 결과 라인 없이 stdout이 닫힘 → 프로세스 종료 코드 사용
+            return_code = await self.process.wait()
+            await self._stderr_task
+
+        return return_code, stdout, bytes(self._stderr[stderr_start:])
+
+    async def _read_until_result(self) -> Tuple[bytes, bool]:
+        """stdout을 result 라인(또는 EOF)까지 읽기"""
+        lines: List[bytes] = []
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                return b"".join(lines), False
+            lines.append(line)
+            if b'"result"' in line:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(event, dict) and event.get("type") == "result":
+                    return b"".join(lines), True
+
+    def kill(self) -> None:
+        """프로세스 강제 종료"""
+        if self.alive:
+            self.process.kill()
+
+    async def close(self) -> None:
+        """stdin을 닫고 종료 대기 (응답 없으면 강제 종료)"""
+        if self.process.stdin and not self.process.stdin.is_closing():
+            self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=5.0)
+        except asyncio.TimeoutError:
+            self.kill()
+            await self.process.wait()
+        await self._stderr_task
+
+
+class ClaudeWorkerPool:
+    """
+    미리 띄운 CLI 워커 풀
+
+    기본 옵션(options)과 같은 job은 warm 워커를 사용하고,
+    다른 옵션의 job은 같은 동시 실행 한도 안에서 즉석 워커로 실행
+    """
+
+    def __init__(
+        self,
+        launcher: Optional[CliLauncher] = None,
+        options: Optional[JobOptions] = None,
+        size: int = 2,
+        max_jobs_per_worker: int = 1,
+        max_queue: int = 8,
+        job_timeout: float = 30.0,
+    ) -> None:
+        """
+        Args:
+            launcher: 워커 프로세스 런처 (기본값: claude CLI)
+            options: warm 워커의 job 옵션
+            size: warm 워커 수 = 동시 실행 한도
+            max_jobs_per_worker: 워커 교체 전 최대 job 수
+            max_queue: 워커 대기 요청 최대 수 (초과 시 PoolSaturatedError)
+            job_timeout: job 타임아웃 (초)
+        """
+        if size < 1 or max_jobs_per_worker < 1:
+            raise ValueError("size와 max_jobs_per_worker는 1 이상이어야 합니다")
+
+        self.launcher = launcher or CliLauncher()
+        self.options = options or JobOptions()
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+
+        self._slots = asyncio.Semaphore(size)
+        self._idle: Deque[Worker] = deque()
+        self._waiting = 0
+        self._next_id = 0
+        self._pending_spawns = 0
+        self._refilled = asyncio.Condition()
+        self._background: set = set()
+        self._closed = False
+
+        # 통계
+        self._stats: Dict[str, int] = {
+            "jobs": 0,
+            "warm_jobs": 0,
+            "cold_jobs": 0,
+            "spawned": 0,
+            "recycled": 0,
+            "rejected": 0,
+        }
+
+    async def start(self) -> None:
+        """warm 워커 미리 생성"""
+        for _ in range(self.size - len(self._idle)):
+            self._idle.append(await self._spawn(self.options))
+        logger.info(f"Claude Code 워커 풀 시작: {self.size}개 warm 워커")
+
+    async def run(self, prompt: str, options: Optional[JobOptions] = None) -> JobResult:
+        """
+        job 실행
+
+        Args:
+            prompt: 사용자 프롬프트
+            options: job 옵션 (기본값: 풀 옵션)
+
+        Returns:
+            실행 결과와 시간 측정
+
+        Raises:
+            PoolSaturatedError: 모든 워커 사용 중이고 대기열이 가득 찬 경우
+        """
+        if self._closed:
+            raise RuntimeError("워커 풀이 종료되었습니다")
+
+        options = options or self.options
+        timing = JobTiming()
+
+        # 승인 제어: 빈 슬롯이 없으면 대기열 길이 확인
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise PoolSaturatedError(
+                f"Claude Code 워커 {self.size}개 모두 사용 중, 대기 요청 {self._waiting}개"
+            )
+
+        wait_start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        timing.queue_wait = time.perf_counter() - wait_start
+
+        try:
+            worker = await self._acquire_warm(options)
+            if worker is None:
+                spawn_start = time.perf_counter()
+                worker = await self._spawn(options)
+                timing.spawn = time.perf_counter() - spawn_start
+            else:
+                timing.warm = True
+
+            last_job = worker.jobs_done + 1 >= self.max_jobs_per_worker or options != self.options
+
+            execute_start = time.perf_counter()
+            try:
+                return_code, stdout, stderr = await worker.execute(prompt, last_job, self.job_timeout)
+            except BaseException:
+                worker.kill()
+                self._in_background(worker.close())
+                self._schedule_refill()
+                raise
+            timing.execute = time.perf_counter() - execute_start
+
+            self._release_worker(worker, last_job)
+        finally:
+            self._slots.release()
+
+        self._stats["jobs"] += 1
+        self._stats["warm_jobs" if timing.warm else "cold_jobs"] += 1
+        logger.info(
+            f"Claude Code job 완료: warm={timing.warm} "
+            f"spawn={timing.spawn * 1000:.1f}ms execute={timing.execute * 1000:.1f}ms"
+        )
+
+        return JobResult(return_code=return_code, stdout=stdout, stderr=stderr, timing=timing)
+
+    async def _acquire_warm(self, options: JobOptions) -> Optional[Worker]:
+        """
+        같은 옵션의 warm 워커 확보
+
+        idle 워커가 없어도 보충 중인 워커가 있으면 그 워커를 기다림
+        (즉석 생성과 보충이 겹쳐 워커가 size를 넘지 않도록)
+        """
+        if options != self.options:
+            return None
+        while True:
+            worker = self._take_idle()
+            if worker is not None or self._pending_spawns == 0:
+                return worker
+            async with self._refilled:
+                await self._refilled.wait()
+
+    def _take_idle(self) -> Optional[Worker]:
+        """살아 있는 idle 워커 꺼내기"""
+        while self._idle:
+            worker = self._idle.popleft()
+            if worker.alive:
+                return worker
+            self._in_background(worker.close())
+            self._schedule_refill()
+        return None
+
+    def _release_worker(self, worker: Worker, last_job: bool) -> None:
+        """job 후 워커 반납 또는 교체"""
+        if not last_job and worker.alive and not self._closed and len(self._idle) < self.size:
+            self._idle.append(worker)
+            return
+
+        if worker.options == self.options:
+            self._stats["recycled"] += 1
+        self._in_background(worker.close())
+        self._schedule_refill()
+
+    def _in_background(self, coroutine: Any) -> None:
+        """백그라운드 작업 실행 (close() 시 완료 대기)"""
+        task = asyncio.create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _schedule_refill(self) -> None:
+        """warm 워커 수를 size까지 백그라운드로 보충"""
+        if self._closed or len(self._idle) + self._pending_spawns >= self.size:
+            return
+        self._pending_spawns += 1
+        self._in_background(self._refill())
+
+    async def _refill(self) -> None:
+        """warm 워커 하나 보충 (_schedule_refill에서 _pending_spawns 선점)"""
+        worker = None
+        try:
+            worker = await self._spawn(self.options)
+        except Exception as e:
+            logger.error(f"Claude Code 워커 보충 실패: {e}")
+        finally:
+            self._pending_spawns -= 1
+
+        if worker is not None:
+            if self._closed:
+                await worker.close()
+            else:
+                self._idle.append(worker)
+
+        async with self._refilled:
+            self._refilled.notify_all()
+
+    async def _spawn(self, options: JobOptions) -> Worker:
+        """워커 프로세스 생성"""
+        process = await self.launcher.launch(options)
+        self._next_id += 1
+        self._stats["spawned"] += 1
+        return Worker(self._next_id, process, options)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """풀 통계 반환"""
+        return {
+            **self._stats,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "size": self.size,
+        }
+
+    async def close(self) -> None:
+        """모든 워커 종료"""
+        self._closed = True
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+        while self._idle:
+            await self._idle.popleft().close()
+        logger.info("Claude Code 워커 풀 종료")
@@ -0,0 +1,160 @@
+"""
+백그라운드 헬스 프로버
+
+로드밸런서 프로브가 올 때마다 Redis/LLM/CLI를 직접 확인하지 않고,
+백그라운드 태스크가 주기적으로 확인한 결과를 캐시해 두고 그대로 반환
+
+- 컴포넌트별 검사 함수는 가벼운 것만 사용 (Redis PING, TCP 연결 등)
+- 결과가 ttl보다 오래되면 stale로 간주 (프로버가 멈춘 경우 readiness 실패)
+- 필수(required) 컴포넌트가 모두 healthy여야 ready
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .logging import setup_logger
+
+# 로거 설정
+logger = setup_logger(__name__)
+
+# 검사 함수: 세부 정보 dict 반환, 실패 시 예외
+HealthCheck = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class ComponentStatus:
+    """컴포넌트 상태 캐시 항목"""
+
+    status: str = "unknown"  # healthy / error / timeout / unknown
+    checked_at: float = 0.0  # time.monotonic() 기준
+    latency_ms: float = 0.0
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+
+class HealthMonitor:
+    """
+    컴포넌트 상태를 주기적으로 확인하고 캐시하는 프로버
+
+    사용 예:
+        monitor = HealthMonitor(interval=5.0, ttl=15.0)
+        monitor.register("redis", redis_ping, required=True)
+        await monitor.start()
+        monitor.is_ready()  # I/O 없이 캐시만 확인
+    """
+
+    def __init__(self, interval: float = 5.0, ttl: float = 15.0, check_timeout: float = 2.0) -> None:
+        """
+        Args:
+            interval: 검사 주기 (초)
+            ttl: 캐시 유효 시간 (초, 초과 시 stale)
+            check_timeout: 검사 하나의 타임아웃 (초)
+        """
+        self.interval = interval
+        self.ttl = ttl
+        self.check_timeout = check_timeout
+
+        self._checks: Dict[str, HealthCheck] = {}
+        self._required: List[str] = []
+        self._statuses: Dict[str, ComponentStatus] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, check: HealthCheck, required: bool = True) -> None:
+        """
+        검사 함수 등록
+
+        Args:
+            name: 컴포넌트 이름
+            check: 검사 함수
+            required: readiness 판단에 포함 여부
+        """
+        self._checks[name] = check
+        self._statuses[name] = ComponentStatus()
+        if required and name not in self._required:
+            self._required.append(name)
+
+    async def start(self) -> None:
+        """첫 검사를 끝낸 뒤 백그라운드 프로버 시작"""
+        await self.probe_all()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        logger.info(f"헬스 프로버 시작: {list(self._checks)} (주기 {self.interval}초)")
+
+    async def stop(self) -> None:
+        """백그라운드 프로버 종료"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """주기적 검사 루프"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"헬스 프로버 오류: {e}")
+
+    async def probe_all(self) -> None:
+        """등록된 모든 컴포넌트를 동시에 검사하고 캐시 갱신"""
+        await asyncio.gather(*(self._probe(name, check) for name, check in self._checks.items()))
+
+    async def _probe(self, name: str, check: HealthCheck) -> None:
+        """컴포넌트 하나 검사"""
+        start = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(check(), timeout=self.check_timeout)
+            status = "healthy"
+        except asyncio.TimeoutError:
+            detail, status = {}, "timeout"
+        except Exception as e:
+            detail, status = {"error": str(e)}, "error"
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        previous = self._statuses.get(name)
+        if previous is not None and previous.status not in ("unknown", status):
+            logger.warning(f"컴포넌트 상태 변경: {name} {previous.status} → {status}")
+
+        self._statuses[name] = ComponentStatus(
+            status=status,
+            checked_at=time.monotonic(),
+            latency_ms=round(latency_ms, 3),
+            detail=detail or {},
+        )
+
+    def component_status(self, name: str) -> str:
+        """캐시된 상태 (ttl 초과 시 stale)"""
+        cached = self._statuses.get(name)
+        if cached is None:
+            return "not_registered"
+        if cached.checked_at and time.monotonic() - cached.checked_at > self.ttl:
+            return "stale"
+        return cached.status
+
+    def is_ready(self) -> bool:
+        """필수 컴포넌트가 모두 healthy인지 (캐시만 확인)"""
+        return all(self.component_status(name) == "healthy" for name in self._required)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        캐시된 전체 상태
+
+        Returns:
+            {"ready": bool, "components": {이름: {status, age_s, latency_ms, required, ...}}}
+        """
+        now = time.monotonic()
+        components = {}
+        for name, cached in self._statuses.items():
+            components[name] = {
+                "status": self.component_status(name),
+                "required": name in self._required,
+                "age_s": round(now - cached.checked_at, 3) if cached.checked_at else None,
+                "latency_ms": cached.latency_ms,
+                **cached.detail,
+            }
+        return {"ready": self.is_ready(), "components": components}
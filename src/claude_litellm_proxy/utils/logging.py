@@ -1,56 +1,230 @@
 """
 로깅 설정 유틸리티
 
-TDD Green Phase: 구조화된 로깅 시스템
+비동기 구조화 로깅 파이프라인
+- 로거는 레코드를 큐에 넣기만 하고 (가득 차면 버림, 대기 없음)
+  별도 리스너 스레드가 JSON(또는 텍스트)으로 직렬화해 stdout에 기록
+  → stdout 쓰기가 이벤트 루프를 막지 않음
+- 레벨이 꺼져 있으면 메시지 포맷/필드 계산 없음 (log_event + isEnabledFor)
+- 대량 이벤트는 N건마다 1건만 기록 (sample_every)
+
+환경 변수:
+    LOG_LEVEL: 기본 로깅 레벨 (기본 INFO)
+    LOG_FORMAT: json(기본) | text
+    LOG_QUEUE_SIZE: 로그 큐 최대 크기 (기본 10000)
 """
 
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-from typing import Optional
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# LogRecord 기본 속성 (나머지는 extra로 전달된 구조화 필드)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+DEFAULT_TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄 JSON으로 직렬화 (extra 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버리는 QueueHandler (버린 건수 집계)"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        메시지 인자만 호출 스레드에서 확정 (이후 값이 바뀌어도 안전)
+        JSON 직렬화는 리스너 스레드에서 수행
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _LoggingPipeline:
+    """프로세스 전역 큐 핸들러 + 리스너 스레드"""
+
+    def __init__(self, json_format: bool, queue_size: int, format_string: Optional[str]) -> None:
+        self.json_format = json_format
+        self.queue_size = queue_size
+        self.format_string = format_string or DEFAULT_TEXT_FORMAT
+        self.handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.start()
+
+    def _output_handler(self) -> logging.Handler:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if self.json_format else logging.Formatter(self.format_string))
+        return handler
+
+    def start(self) -> None:
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, self._output_handler(), respect_handler_level=False
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """남은 로그를 모두 기록하고 리스너 종료"""
+        if self.listener is not None:
+            try:
+                self.listener.stop()
+            except queue.Full:
+                # 종료 신호를 넣을 자리가 없으면 남은 로그와 함께 포기 (종료를 막지 않음)
+                pass
+            self.listener = None
+
+    def restart_after_fork(self) -> None:
+        """fork된 자식은 리스너 스레드가 없으므로 새 큐/리스너로 다시 시작"""
+        self.handler.queue = queue.Queue(maxsize=self.queue_size)
+        self.handler.dropped = 0
+        self.start()
+
+
+_pipeline: Optional[_LoggingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+# 샘플링 이벤트별 발생 카운터
+_event_counters: Dict[str, "itertools.count[int]"] = {}
+_sampled_out = 0
+
+
+def _get_pipeline(format_string: Optional[str] = None) -> _LoggingPipeline:
+    """로깅 파이프라인 (처음 호출 시 생성)"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = _LoggingPipeline(
+                    json_format=os.getenv("LOG_FORMAT", "json").lower() != "text",
+                    queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+                    format_string=format_string,
+                )
+                atexit.register(shutdown_logging)
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(after_in_child=_pipeline.restart_after_fork)
+    return _pipeline
 
 
 def setup_logger(
     name: str,
-    level: str = "INFO",
+    level: Optional[str] = None,
     format_string: Optional[str] = None
 ) -> logging.Logger:
     """
-    구조화된 로거 설정
-    
+    구조화된 로거 설정 (공유 비동기 파이프라인에 연결)
+
     Args:
         name: 로거 이름 (보통 __name__)
-        level: 로깅 레벨
-        format_string: 커스텀 포맷 (선택)
-        
+        level: 로깅 레벨 (기본: LOG_LEVEL 환경 변수, 없으면 INFO)
+        format_string: LOG_FORMAT=text일 때 포맷 (파이프라인 첫 생성 시 적용)
+
     Returns:
         설정된 로거
     """
     logger = logging.getLogger(name)
-    
+
     # 기존 핸들러 제거 (중복 방지)
     logger.handlers.clear()
-    
+
     # 로깅 레벨 설정
-    numeric_level = getattr(logging, level.upper(), logging.INFO)
-    logger.setLevel(numeric_level)
-    
-    # 핸들러 생성
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(numeric_level)
-    
-    # 포맷터 설정
-    if format_string is None:
-        format_string = (
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-    
-    formatter = logging.Formatter(format_string)
-    handler.setFormatter(formatter)
-    
-    # 핸들러 추가
-    logger.addHandler(handler)
-    
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    # 공유 큐 핸들러 (stdout 쓰기는 리스너 스레드에서)
+    logger.addHandler(_get_pipeline(format_string).handler)
+
     # 상위 로거로 전파 방지
     logger.propagate = False
-    
-    return logger
\ No newline at end of file
+
+    return logger
+
+
+def log_event(
+    logger: logging.Logger,
+    level: int,
+    event: str,
+    sample_every: int = 1,
+    **fields: Any
+) -> None:
+    """
+    구조화 이벤트 기록
+
+    레벨이 꺼져 있으면 즉시 반환하므로, 필드 계산 비용이 큰 호출부는
+    logger.isEnabledFor(level)로 먼저 감싸면 비활성 시 비용이 없음
+
+    Args:
+        logger: 대상 로거
+        level: 로깅 레벨 (logging.DEBUG 등)
+        event: 이벤트 이름 (메시지 겸 샘플링 키)
+        sample_every: N건마다 1건만 기록 (기록 시 sampled=N 필드 추가)
+        **fields: JSON에 함께 기록할 필드 (원본 민감정보는 넣지 말 것)
+    """
+    global _sampled_out
+    if not logger.isEnabledFor(level):
+        return
+
+    if sample_every > 1:
+        counter = _event_counters.setdefault(event, itertools.count())
+        if next(counter) % sample_every:
+            _sampled_out += 1
+            return
+        fields["sampled"] = sample_every
+
+    # LogRecord 속성과 겹치는 필드 이름은 접두어를 붙여 충돌 방지
+    extra = {key if key not in _RECORD_ATTRIBUTES else f"field_{key}": value for key, value in fields.items()}
+    extra["event"] = event
+    logger.log(level, event, extra=extra)
+
+
+def get_logging_statistics() -> Dict[str, int]:
+    """로깅 파이프라인 통계 (큐 대기, 큐 초과로 버림, 샘플링으로 생략)"""
+    pipeline = _pipeline
+    return {
+        "queued": pipeline.handler.queue.qsize() if pipeline else 0,
+        "dropped": pipeline.handler.dropped if pipeline else 0,
+        "sampled_out": _sampled_out,
+    }
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 로그를 기록하고 리스너 종료 (프로세스 종료 시 자동 호출)"""
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -0,0 +1,297 @@
+"""
+Prometheus 텍스트 형식 메트릭
+
+외부 의존성 없이 /metrics 노출용 히스토그램/카운터/게이지 제공
+- 기록은 잠금 없음: 스레드마다 자기 샤드(threading.local)에만 쓰고,
+  스크레이프 시 모든 샤드를 합산 (스레드 첫 기록 시 샤드 등록만 한 번)
+- 레이블은 메트릭당 하나 (단계 이름, 리소스 타입 등 값 종류가 제한된 것만)
+- 다른 컴포넌트의 기존 통계(캐시 적중, 워커 풀)는 스크레이프 시 수집 함수로 읽음
+
+사용 예:
+    with STAGE_SECONDS.time("pattern_scan"):
+        matches = patterns.find_matches(text)
+    PATTERN_MATCHES.inc("ec2")
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 요청 단계 지연 시간 버킷 (초): 0.1ms ~ 30s
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+@dataclass
+class CollectedMetric:
+    """수집 함수가 스크레이프 시 반환하는 메트릭 (레이블 값 → 값)"""
+
+    name: str
+    kind: str  # counter | gauge
+    help: str
+    label_name: str
+    values: Dict[str, float] = field(default_factory=dict)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """스레드별 샤드를 가진 메트릭 기반 클래스"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_name: Optional[str] = None) -> None:
+        self.name = name
+        self.help = help
+        self.label_name = label_name
+        self._local = threading.local()
+        self._shards: List[Dict[str, Any]] = []
+
+    def _shard(self) -> Dict[str, Any]:
+        """현재 스레드의 샤드 (처음이면 생성 후 등록 - list.append는 원자적)"""
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[str, Any] = {}
+            self._local.values = values
+            self._shards.append(values)
+            return values
+
+    def _labels(self, label: str, extra: str = "") -> str:
+        parts = []
+        if self.label_name:
+            parts.append(f'{self.label_name}="{_escape(label)}"')
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def inc(self, label: str = "", amount: float = 1) -> None:
+        values = self._shard()
+        values[label] = values.get(label, 0) + amount
+
+    def get(self, label: str = "") -> float:
+        """현재 값 (모든 스레드 합산)"""
+        return sum(shard.get(label, 0) for shard in list(self._shards))
+
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for shard in list(self._shards):
+            for label, value in list(shard.items()):
+                totals[label] = totals.get(label, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for label, value in sorted(self.totals().items()):
+            lines.append(f"{self.name}{self._labels(label)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """증감 게이지 (in-flight 요청 수 등)"""
+
+    kind = "gauge"
+
+    def dec(self, label: str = "", amount: float = 1) -> None:
+        self.inc(label, -amount)
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_name: Optional[str] = None,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, label_name)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, label: str = "") -> None:
+        """
+        관측값 기록
+
+        Args:
+            value: 관측값 (초 등)
+            label: 레이블 값
+        """
+        values = self._shard()
+        state = values.get(label)
+        if state is None:
+            # [버킷별 개수..., +Inf 개수, 합계]
+            state = values[label] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def time(self, label: str = "") -> Iterator[None]:
+        """with 블록 실행 시간 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, label)
+
+    def snapshot(self) -> Dict[str, Tuple[List[int], float]]:
+        """레이블별 (버킷별 개수, 합계) 합산"""
+        merged: Dict[str, Tuple[List[int], float]] = {}
+        for shard in list(self._shards):
+            for label, state in list(shard.items()):
+                counts, total = merged.get(label, ([0] * (len(self.buckets) + 1), 0.0))
+                merged[label] = ([a + b for a, b in zip(counts, state[:-1])], total + state[-1])
+        return merged
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for label, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{self._labels(label, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(label)} {repr(total)}")
+            lines.append(f"{self.name}_count{self._labels(label)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 목록과 스크레이프 시 수집 함수 관리"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], List[CollectedMetric]]] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_name: Optional[str] = None) -> Counter:
+        return self._register(Counter(name, help, label_name))
+
+    def gauge(self, name: str, help: str, label_name: Optional[str] = None) -> Gauge:
+        return self._register(Gauge(name, help, label_name))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_name: Optional[str] = None,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, label_name, buckets))
+
+    def register_collector(self, key: str, collect: Callable[[], List[CollectedMetric]]) -> None:
+        """
+        스크레이프 시 호출할 수집 함수 등록 (같은 키로 다시 등록하면 교체)
+
+        Args:
+            key: 수집 함수 식별자
+            collect: CollectedMetric 목록을 반환하는 함수 (예외 시 해당 수집만 생략)
+        """
+        self._collectors[key] = collect
+
+    def unregister_collector(self, key: str) -> None:
+        self._collectors.pop(key, None)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        collected: Dict[str, CollectedMetric] = {}
+        for collect in list(self._collectors.values()):
+            try:
+                items = collect()
+            except Exception:
+                continue
+            for item in items:
+                # 같은 이름은 레이블 값을 합쳐 한 번만 출력
+                existing = collected.setdefault(item.name, CollectedMetric(item.name, item.kind, item.help, item.label_name))
+                existing.values.update(item.values)
+
+        for item in collected.values():
+            lines.append(f"# HELP {item.name} {item.help}")
+            lines.append(f"# TYPE {item.name} {item.kind}")
+            for label, value in sorted(item.values.items()):
+                lines.append(f'{item.name}{{{item.label_name}="{_escape(label)}"}} {_format_value(value)}')
+
+        return "\n".join(lines) + "\n"
+
+
+class InFlightMiddleware:
+    """
+    처리 중 요청 수 게이지 ASGI 미들웨어 (스트리밍 응답은 본문 전송 완료까지 포함)
+
+    Args:
+        app: ASGI 앱
+        gauge: 경로별 in-flight 게이지
+        paths: 집계할 경로 (그 외 경로는 그대로 통과)
+    """
+
+    def __init__(self, app: Any, gauge: Gauge, paths: Sequence[str]) -> None:
+        self.app = app
+        self.gauge = gauge
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        path = scope.get("path")
+        if scope["type"] != "http" or path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        self.gauge.inc(path)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gauge.dec(path)
+
+
+# 프로세스 전역 레지스트리와 공통 메트릭
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "proxy_stage_duration_seconds",
+    "요청 처리 단계별 소요 시간 (body_parse, pattern_scan, overlap_resolution, redis, upstream, unmask, serialize)",
+    label_name="stage",
+)
+PATTERN_MATCHES = REGISTRY.counter(
+    "proxy_pattern_matches_total", "마스킹된 매치 수 (리소스 타입별)", label_name="type"
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "proxy_upstream_errors_total", "upstream(Claude API) 호출 오류 수 (예외 종류별)", label_name="error"
+)
+IN_FLIGHT_REQUESTS = REGISTRY.gauge(
+    "proxy_in_flight_requests", "처리 중인 요청 수 (경로별)", label_name="path"
+)
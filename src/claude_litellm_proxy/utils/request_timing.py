@@ -0,0 +1,213 @@
+"""
+요청 단위 처리 시간 분해 (Server-Timing 헤더 + 느린 요청 로그)
+
+/metrics 히스토그램은 전체 집계라 개별 요청의 지연이 프록시(마스킹/Redis)
+때문인지 모델(upstream) 때문인지 알 수 없음
+요청마다 RequestTiming을 contextvar로 두고 각 단계가 자기 소요 시간을 더함
+- mask: 요청 마스킹 전체 (스캔 + Redis 포함)
+- pattern_scan / overlap_resolution: 패턴 스캔 / 매치 충돌 해결 (mask에 포함)
+- redis: 토큰 조회/생성 round-trip
+- upstream: Claude API / Claude Code CLI 호출 (스트리밍은 첫 이벤트까지)
+- unmask: 응답 언마스킹 (스트리밍은 본문 전송 중 누적)
+- matches / mappings: 이번 요청에서 스캔된 매치 수 / 요청 매핑 수
+
+RequestTimingMiddleware가 응답 시작 시 Server-Timing 헤더를 붙이고,
+응답이 끝난 뒤 임계값을 넘은 요청의 전체 분해를 slow_request 이벤트로 기록
+
+환경 변수:
+    SERVER_TIMING_ENABLED: Server-Timing 헤더 노출 (기본 false)
+    SLOW_REQUEST_THRESHOLD_MS: 느린 요청 로그 임계값 (기본 10000, 0이면 기록 안 함)
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from .logging import log_event, setup_logger
+from .metrics import STAGE_SECONDS
+
+logger = setup_logger(__name__)
+
+# Server-Timing 헤더 출력 순서 (그 외 단계는 뒤에 기록 순서대로)
+STAGE_ORDER = ("mask", "redis", "upstream", "unmask")
+
+_current_timing: ContextVar[Optional["RequestTiming"]] = ContextVar("request_timing", default=None)
+
+
+@dataclass
+class RequestTiming:
+    """요청 하나의 단계별 누적 소요 시간(초)과 개수"""
+
+    path: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    status: Optional[int] = None
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_count(self, name: str, amount: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """with 블록 실행 시간을 이 요청의 단계에 더함 (히스토그램에는 기록 안 함)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(stage, time.perf_counter() - start)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _ordered_stages(self) -> Iterator[tuple[str, float]]:
+        for stage in STAGE_ORDER:
+            if stage in self.stages:
+                yield stage, self.stages[stage]
+        for stage, seconds in self.stages.items():
+            if stage not in STAGE_ORDER:
+                yield stage, seconds
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing 헤더 값
+
+        Returns:
+            예: 'mask;dur=1.2, redis;dur=0.4, upstream;dur=812.5, total;dur=815.0, matches;desc="2"'
+        """
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self._ordered_stages()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        parts.extend(f'{name};desc="{count}"' for name, count in self.counts.items())
+        return ", ".join(parts)
+
+    def breakdown(self) -> Dict[str, Any]:
+        """
+        로그용 전체 분해 (밀리초)
+
+        Returns:
+            {total_ms, proxy_ms(전체 - upstream), <단계>_ms..., <개수>...}
+        """
+        total = self.elapsed()
+        fields: Dict[str, Any] = {
+            "total_ms": round(total * 1000, 1),
+            "proxy_ms": round((total - self.stages.get("upstream", 0.0)) * 1000, 1),
+        }
+        for stage, seconds in self._ordered_stages():
+            fields[f"{stage}_ms"] = round(seconds * 1000, 1)
+        fields.update(self.counts)
+        return fields
+
+
+def current_request_timing() -> Optional[RequestTiming]:
+    """현재 요청의 RequestTiming (미들웨어 밖이면 None)"""
+    return _current_timing.get()
+
+
+@contextmanager
+def trace_stage(stage: str) -> Iterator[None]:
+    """with 블록 실행 시간을 현재 요청 단계에만 더함"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    with timing.measure(stage):
+        yield
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """with 블록 실행 시간을 단계 히스토그램과 현재 요청 단계에 함께 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage)
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.add_stage(stage, seconds)
+
+
+def record_count(name: str, amount: int) -> None:
+    """현재 요청의 개수 항목에 더함 (미들웨어 밖이면 무시)"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.add_count(name, amount)
+
+
+@dataclass
+class RequestTimingSettings:
+    """
+    RequestTimingMiddleware 설정 (실행 중 변경 가능)
+
+    Args:
+        server_timing: 응답에 Server-Timing 헤더 추가
+        slow_threshold_ms: 이 시간 이상 걸린 요청은 slow_request 로그 (0이면 기록 안 함)
+    """
+
+    server_timing: bool = False
+    slow_threshold_ms: float = 10000.0
+
+    @classmethod
+    def from_env(cls) -> "RequestTimingSettings":
+        return cls(
+            server_timing=os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true",
+            slow_threshold_ms=float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "10000")),
+        )
+
+
+class RequestTimingMiddleware:
+    """
+    요청별 RequestTiming 생성 ASGI 미들웨어
+
+    응답 시작 시점까지의 분해를 Server-Timing 헤더로 붙이고
+    (스트리밍은 이후 본문 전송 중 언마스킹 시간이 로그에만 반영됨)
+    본문 전송이 끝나면 임계값 이상인 요청을 기록
+
+    Args:
+        app: ASGI 앱
+        settings: 헤더/느린 요청 로그 설정
+        paths: 적용할 경로 (그 외 경로는 그대로 통과)
+    """
+
+    def __init__(self, app: Any, settings: RequestTimingSettings, paths: Sequence[str]) -> None:
+        self.app = app
+        self.settings = settings
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        path = scope.get("path")
+        if scope["type"] != "http" or path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(path=path)
+        settings = self.settings
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                timing.status = message["status"]
+                if settings.server_timing:
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.server_timing().encode("latin-1"))
+                    ]
+            await send(message)
+
+        token = _current_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            threshold = settings.slow_threshold_ms
+            if threshold > 0 and timing.elapsed() * 1000 >= threshold:
+                log_event(
+                    logger, logging.WARNING, "slow_request",
+                    path=path, status=timing.status, threshold_ms=threshold, **timing.breakdown()
+                )
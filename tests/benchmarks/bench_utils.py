@@ -0,0 +1,86 @@
+"""
+벤치마크 공통 유틸리티
+
+- 크기별 입력 페이로드 생성 (일반 대화 / AWS 리소스 밀집)
+- 반복 측정 후 최솟값 기준 처리량 계산
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# 프로젝트 소스 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+PAYLOAD_SIZES: List[Tuple[str, int]] = [
+    ("1KB", 1024),
+    ("64KB", 64 * 1024),
+    ("1MB", 1024 * 1024),
+]
+
+# AWS 식별자가 없는 일반 대화 텍스트
+PROSE_SAMPLE = (
+    "The user asked how to write a python function that sorts a list of records "
+    "by date; here is some ordinary prose with words, numbers like 42 and 3.14, "
+    "and a short code fragment: `sorted(items, key=lambda r: r.created_at)`.\n"
+)
+
+# AWS 리소스가 밀집된 로그/설정 텍스트
+AWS_SAMPLE = (
+    "Deploy arn:aws:lambda:us-east-1:123456789012:function:ProcessPayment to "
+    "i-1234567890abcdef0 in vpc-12345678 with sg-12345678 (subnet-0123456789abcdef0).\n"
+    "Role arn:aws:iam::123456789012:role/DeployRole, key AKIA1234567890ABCDEF, "
+    "public IP 8.8.8.8, private 10.0.0.1, bucket my-data-bucket-prod, db prod-db.\n"
+    "KMS 12345678-1234-1234-1234-123456789012 logs /aws/lambda/ProcessPayment\n"
+)
+
+
+def build_payload(sample: str, size: int) -> str:
+    """샘플 텍스트를 반복해 정확히 size 글자의 페이로드 생성"""
+    repeats = size // len(sample) + 1
+    return (sample * repeats)[:size]
+
+
+def measure(func: Callable[[], Any], min_time: float = 0.5, max_runs: int = 50) -> float:
+    """
+    함수 실행 시간 측정
+
+    Args:
+        func: 측정할 함수
+        min_time: 최소 누적 측정 시간 (초)
+        max_runs: 최대 반복 횟수
+
+    Returns:
+        최소 실행 시간 (초)
+    """
+    timings: List[float] = []
+    total = 0.0
+    while len(timings) < max_runs and (total < min_time or len(timings) < 3):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return min(timings)
+
+
+def format_throughput(size: int, seconds: float) -> str:
+    """처리량을 MB/s로 표시"""
+    if seconds <= 0:
+        return "inf"
+    return f"{size / seconds / (1024 * 1024):8.2f} MB/s"
+
+
+def print_table(title: str, rows: List[Dict[str, str]]) -> None:
+    """벤치마크 결과 표 출력"""
+    print(f"\n📊 {title}")
+    print("=" * 72)
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    widths = [max(len(h), *(len(r[h]) for r in rows)) for h in headers]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(row[h].ljust(w) for h, w in zip(headers, widths)))
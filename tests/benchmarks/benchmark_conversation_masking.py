@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+대화 턴별 요청 마스킹 비용 벤치마크
+
+Claude Code는 매 턴 전체 대화를 보내므로
+- 캐시 없음: 턴 n에서 n개 메시지 전체 재스캔 (세션 전체 O(n²))
+- 메시지 캐시: 새 메시지만 스캔 (턴당 거의 일정)
+의 턴별 마스킹 시간을 비교
+
+실행: python tests/benchmarks/benchmark_conversation_masking.py (Redis localhost:6379 db 15 필요)
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from bench_utils import AWS_SAMPLE, PROSE_SAMPLE, print_table
+
+from claude_litellm_proxy import main
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.message_mask_cache import MessageMaskCache
+
+TURNS = 200
+REPORT_TURNS = [1, 50, 100, 200]
+
+
+def build_message(turn: int, role: str) -> Dict[str, str]:
+    """턴별 메시지 (일반 대화 + AWS 리소스)"""
+    return {"role": role, "content": f"turn {turn}\n" + PROSE_SAMPLE * 4 + AWS_SAMPLE}
+
+
+async def run_session(cache: Optional[MessageMaskCache]) -> List[float]:
+    """대화 세션 재생, 턴별 마스킹 시간(초) 반환"""
+    main.message_mask_cache = cache
+    messages = []
+    timings = []
+    for turn in range(1, TURNS + 1):
+        messages.append(build_message(turn, "user"))
+        start = time.perf_counter()
+        await main.mask_request_content({"messages": list(messages)})
+        timings.append(time.perf_counter() - start)
+        messages.append(build_message(turn, "assistant"))
+    return timings
+
+
+async def run_benchmark() -> None:
+    """캐시 유무에 따른 턴별 마스킹 시간 비교"""
+    main.masking_system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    await main.masking_system.mapping_store.clear_all()
+
+    try:
+        uncached = await run_session(None)
+        cache = MessageMaskCache()
+        cached = await run_session(cache)
+    finally:
+        await main.masking_system.mapping_store.clear_all()
+        await main.masking_system.close()
+
+    rows = []
+    for turn in REPORT_TURNS:
+        rows.append({
+            "turn": str(turn),
+            "messages": str(turn * 2 - 1),
+            "no cache": f"{uncached[turn - 1] * 1000:9.2f} ms",
+            "message cache": f"{cached[turn - 1] * 1000:9.2f} ms",
+            "speedup": f"{uncached[turn - 1] / cached[turn - 1]:7.1f}x",
+        })
+    rows.append({
+        "turn": "total",
+        "messages": "-",
+        "no cache": f"{sum(uncached) * 1000:9.1f} ms",
+        "message cache": f"{sum(cached) * 1000:9.1f} ms",
+        "speedup": f"{sum(uncached) / sum(cached):7.1f}x",
+    })
+
+    print_table(f"턴별 요청 마스킹 시간 ({TURNS}턴 세션)", rows)
+    print(f"캐시 통계: {cache.get_statistics()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
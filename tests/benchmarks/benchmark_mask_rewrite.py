@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+마스킹 결과 재구성 벤치마크
+
+VPC 플로우 로그(줄마다 공인 IP 2개)에서 매치 1k / 5k / 20k개일 때
+매치별 슬라이싱(text[:start] + 값 + text[end:])과 구간 기반 한 번 join,
+JSON 직렬화(json.dumps(문자열) vs iter_json_string 조각)를 비교
+(패턴 스캔은 한 번만 하고 재구성 단계만 측정)
+
+실행: python tests/benchmarks/benchmark_mask_rewrite.py
+"""
+
+import json
+from typing import List
+
+from bench_utils import format_throughput, measure, print_table
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns
+from claude_litellm_proxy.patterns.text_rewriter import RewriteSpan, apply_spans, iter_json_string
+
+MATCH_COUNTS = [1_000, 5_000, 20_000]
+
+
+def build_flow_log(match_count: int) -> str:
+    """공인 IP가 줄마다 2개인 VPC 플로우 로그"""
+    lines = []
+    for i in range(match_count // 2):
+        lines.append(
+            f"2 eni-0a1b2c3d 54.{i // 65536 % 256}.{i // 256 % 256}.{i % 256} "
+            f"3.{i % 200}.{i // 200 % 256}.7 443 49152 6 10 840 ACCEPT OK"
+        )
+    return "\n".join(lines)
+
+
+def slice_rewrite(text: str, spans: List[RewriteSpan]) -> str:
+    """기존 방식: 뒤에서부터 매치마다 문자열 재생성"""
+    for start, end, replacement in reversed(spans):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def run_benchmark() -> None:
+    """매치 수별 재구성 방식 비교"""
+    patterns = CloudPatterns()
+    rows = []
+    for count in MATCH_COUNTS:
+        text = build_flow_log(count)
+        matches = patterns.find_matches(text)
+        spans = sorted(
+            (match["start"], match["end"], f"AWS_PUBLIC_IP_{i:03d}") for i, match in enumerate(matches)
+        )
+        assert slice_rewrite(text, spans) == apply_spans(text, spans)
+
+        slice_time = measure(lambda: slice_rewrite(text, spans), min_time=0.3, max_runs=5)
+        join_time = measure(lambda: apply_spans(text, spans))
+        dumps_time = measure(lambda: json.dumps(apply_spans(text, spans)))
+        segments_time = measure(lambda: "".join(iter_json_string(text, spans)))
+        rows.append({
+            "matches": f"{len(spans):,}",
+            "size": f"{len(text) // 1024}KB",
+            "slicing": format_throughput(len(text), slice_time),
+            "span join": format_throughput(len(text), join_time),
+            "speedup": f"{slice_time / join_time:7.1f}x",
+            "dumps(join)": f"{dumps_time * 1000:7.2f} ms",
+            "json segments": f"{segments_time * 1000:7.2f} ms",
+        })
+
+    print_table("마스킹 결과 재구성 (VPC 플로우 로그)", rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+충돌 해결 스케일링 벤치마크
+
+기존 O(n²) Union-Find 그룹핑과 sweep-line 그룹핑을
+10 / 1k / 100k 매치에서 비교 (기존 방식은 100k에서 측정 생략)
+
+실행: python tests/benchmarks/benchmark_overlap_resolution.py
+"""
+
+import random
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from bench_utils import measure, print_table
+
+from claude_litellm_proxy.patterns.cloud_patterns import PatternDefinition
+from claude_litellm_proxy.patterns.overlap_detection import OverlapDetectionEngine
+
+MATCH_COUNTS = [10, 1_000, 100_000]
+
+# 기존 방식은 n²이라 이 크기를 넘으면 측정하지 않음
+PAIRWISE_LIMIT = 1_000
+
+
+def build_matches(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """평균 2~3개씩 겹치는 매치 dict 생성 (실제 ARN/계정 ID 충돌과 유사한 밀도)"""
+    rng = random.Random(seed)
+    pattern_defs = [
+        PatternDefinition(
+            pattern="x", replacement="x-{:03d}", type=f"type_{i}", description="bench", priority=100 + i * 50
+        )
+        for i in range(4)
+    ]
+
+    matches = []
+    position = 0
+    for i in range(count):
+        position += rng.randint(0, 40)
+        length = rng.randint(8, 60)
+        pattern_def = rng.choice(pattern_defs)
+        matches.append({
+            "match": f"m{i}",
+            "pattern_name": pattern_def.type,
+            "pattern_def": pattern_def,
+            "start": position,
+            "end": position + length,
+            "type": pattern_def.type,
+            "priority": pattern_def.priority,
+        })
+
+    # find_matches 결과처럼 패턴 순서 → 위치 순으로 정렬
+    matches.sort(key=lambda m: (m["priority"], m["start"]))
+    return matches
+
+
+def pairwise_resolve(engine: OverlapDetectionEngine, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """기존 구현: 전체 쌍 비교 Union-Find + 원본 리스트 재탐색"""
+    match_objects = engine._to_match_objects(matches)
+    parent = list(range(len(match_objects)))
+
+    def find(x):
+        if parent[x] != x:
+            parent[x] = find(parent[x])
+        return parent[x]
+
+    for i in range(len(match_objects)):
+        for j in range(i + 1, len(match_objects)):
+            if match_objects[i].overlaps_with(match_objects[j]):
+                pi, pj = find(i), find(j)
+                if pi != pj:
+                    parent[pi] = pj
+
+    groups = defaultdict(list)
+    for i, match in enumerate(match_objects):
+        groups[find(i)].append(match)
+
+    result = []
+    for group in groups.values():
+        best = engine._select_best_match(group)
+        for original in matches:
+            if (original['start'] == best.start and original['end'] == best.end
+                    and original['pattern_name'] == best.pattern_name):
+                result.append(original)
+                break
+    return result
+
+
+def run_benchmark() -> None:
+    """매치 수별 충돌 해결 시간 비교"""
+    engine = OverlapDetectionEngine()
+    rows = []
+
+    for count in MATCH_COUNTS:
+        matches = build_matches(count)
+        resolved = engine.resolve_conflicts(matches)
+        sweep_time = measure(lambda: engine.resolve_conflicts(matches), max_runs=20)
+
+        if count <= PAIRWISE_LIMIT:
+            assert pairwise_resolve(engine, matches) == resolved
+            pairwise_time = measure(lambda: pairwise_resolve(engine, matches), max_runs=20)
+            pairwise_column = f"{pairwise_time * 1000:10.2f} ms"
+            speedup = f"{pairwise_time / sweep_time:8.1f}x"
+        else:
+            pairwise_column = "생략 (O(n²))"
+            speedup = "-"
+
+        rows.append({
+            "matches": f"{count:,}",
+            "groups": f"{len(resolved):,}",
+            "pairwise": pairwise_column,
+            "sweep-line": f"{sweep_time * 1000:10.2f} ms",
+            "speedup": speedup,
+        })
+
+    print_table("resolve_conflicts 스케일링", rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+대용량 스캔 오프로드 벤치마크
+
+인라인 find_matches(이벤트 루프 점유)와 프로세스 풀 청크 스캔의
+전체 시간과 스캔 중 최대 이벤트 루프 지연을 1MB / 4MB 페이로드에서 비교
+
+실행: python tests/benchmarks/benchmark_parallel_scan.py
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Tuple
+
+from bench_utils import AWS_SAMPLE, PROSE_SAMPLE, build_payload, format_throughput, print_table
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns
+from claude_litellm_proxy.patterns.parallel_scanner import ParallelScanner
+
+SIZES = [("1MB", 1024 * 1024), ("4MB", 4 * 1024 * 1024)]
+
+
+async def measure_with_ticker(scan: Callable[[], Awaitable[Any]]) -> Tuple[float, float]:
+    """스캔 시간과 그동안의 최대 이벤트 루프 지연(초) 측정"""
+    ticks = [time.perf_counter()]
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            ticks.append(time.perf_counter())
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await scan()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    return elapsed, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+
+async def run_benchmark() -> None:
+    """인라인 vs 프로세스 풀 스캔 비교"""
+    patterns = CloudPatterns()
+    scanner = ParallelScanner(patterns, offload_threshold=1)
+    sample = PROSE_SAMPLE * 20 + AWS_SAMPLE
+
+    async def inline(text: str) -> Any:
+        return patterns.find_matches(text)
+
+    try:
+        # 워커 프로세스 기동
+        await scanner.find_matches(build_payload(sample, 64 * 1024))
+
+        rows = []
+        for size_name, size in SIZES:
+            text = build_payload(sample, size)
+            inline_time, inline_stall = await measure_with_ticker(lambda: inline(text))
+            pool_time, pool_stall = await measure_with_ticker(lambda: scanner.find_matches(text))
+            rows.append({
+                "size": size_name,
+                "inline": format_throughput(size, inline_time),
+                "pool": format_throughput(size, pool_time),
+                "inline loop stall": f"{inline_stall * 1000:8.1f} ms",
+                "pool loop stall": f"{pool_stall * 1000:8.1f} ms",
+            })
+    finally:
+        scanner.close()
+
+    print_table(f"대용량 스캔 오프로드 ({os.cpu_count()} cores, {scanner.max_workers} workers)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+PatternScanner 처리량 벤치마크
+
+기존 패턴별 finditer 루프, 컴파일된 스캐너, 스캐너 + 리터럴 프리필터를
+1KB / 64KB / 1MB 페이로드에서 비교
+
+실행: python tests/benchmarks/benchmark_pattern_scanner.py
+"""
+
+from bench_utils import (
+    AWS_SAMPLE,
+    PAYLOAD_SIZES,
+    PROSE_SAMPLE,
+    build_payload,
+    format_throughput,
+    measure,
+    print_table,
+)
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns
+
+
+def run_benchmark() -> None:
+    """일반 대화/AWS 밀집 텍스트에서 루프 vs 스캐너 처리량 비교"""
+    sequential = CloudPatterns(use_scanner=False)
+    scanner = CloudPatterns(use_scanner=True, use_prefilter=False)
+    prefiltered = CloudPatterns(use_scanner=True, use_prefilter=True)
+
+    for corpus_name, sample in [("prose", PROSE_SAMPLE), ("aws-dense", AWS_SAMPLE)]:
+        rows = []
+        for size_name, size in PAYLOAD_SIZES:
+            text = build_payload(sample, size)
+
+            # 결과 동일성 먼저 확인
+            expected = sequential.find_matches(text, resolve_conflicts=False)
+            actual = scanner.find_matches(text, resolve_conflicts=False)
+            filtered = prefiltered.find_matches(text, resolve_conflicts=False)
+            key = lambda m: (m["pattern_name"], m["start"], m["end"])
+            assert [key(m) for m in expected] == [key(m) for m in actual]
+            assert [key(m) for m in expected] == [key(m) for m in filtered]
+
+            loop_time = measure(lambda: sequential.find_matches(text, resolve_conflicts=False))
+            scan_time = measure(lambda: scanner.find_matches(text, resolve_conflicts=False))
+            filter_time = measure(lambda: prefiltered.find_matches(text, resolve_conflicts=False))
+
+            rows.append({
+                "size": size_name,
+                "matches": str(len(actual)),
+                "loop": format_throughput(size, loop_time),
+                "scanner": format_throughput(size, scan_time),
+                "+prefilter": format_throughput(size, filter_time),
+                "speedup": f"{loop_time / scan_time:5.2f}x / {loop_time / filter_time:5.2f}x",
+            })
+
+        print_table(f"find_matches 원시 스캔 ({corpus_name})", rows)
+
+        # 프리필터 스킵률 (상위 일부만 표시)
+        stats = prefiltered.get_prefilter_stats()
+        skipped = sorted(
+            stats["patterns"].items(), key=lambda item: item[1]["skip_rate"]
+        )
+        always = [name for name, info in skipped if not info["anchors"]]
+        print(f"  프리필터 판정 {stats['calls']}회, 앵커 없는 패턴: {', '.join(always)}")
+        print("  스킵률 낮은 패턴: " + ", ".join(
+            f"{name}={info['skip_rate']:.0%}" for name, info in skipped[:6]
+        ))
+        prefiltered.reset_prefilter_stats()
+
+
+if __name__ == "__main__":
+    run_benchmark()
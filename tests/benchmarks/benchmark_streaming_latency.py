@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+스트리밍 첫 바이트 지연 벤치마크
+
+upstream이 토큰을 일정 간격으로 생성한다고 가정하고
+- 버퍼링: 전체 응답 수신 후 언마스킹 (기존 /v1/messages)
+- 스트리밍: text_delta마다 점진적 언마스킹
+의 첫 텍스트 도착 시간과 전체 시간을 비교
+
+실행: python tests/benchmarks/benchmark_streaming_latency.py
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from bench_utils import print_table
+
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.stream_unmasker import unmask_event_stream
+
+# upstream 토큰 생성 간격 (초)
+TOKEN_INTERVAL = 0.01
+
+RESPONSE_TOKENS = [20, 100, 300]
+
+MAPPINGS = {
+    "AWS_EC2_001": "i-1234567890abcdef0",
+    "AWS_VPC_002": "vpc-12345678",
+}
+
+SAMPLE_WORDS = "Instance AWS_EC2_001 runs in AWS_VPC_002 and serves traffic".split(" ")
+
+
+def build_deltas(count: int) -> List[str]:
+    """단어 단위 text_delta 목록 생성"""
+    return [SAMPLE_WORDS[i % len(SAMPLE_WORDS)] + " " for i in range(count)]
+
+
+async def upstream(deltas: List[str]) -> AsyncIterator[Dict[str, Any]]:
+    """일정 간격으로 토큰을 생성하는 upstream"""
+    yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    for text in deltas:
+        await asyncio.sleep(TOKEN_INTERVAL)
+        yield {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+    yield {"type": "content_block_stop", "index": 0}
+
+
+async def measure_buffered(deltas: List[str], system: IntegratedMaskingSystem) -> float:
+    """전체 수신 후 언마스킹: 첫 텍스트 도착 시간"""
+    start = time.perf_counter()
+    parts = [
+        event["delta"]["text"]
+        async for event in upstream(deltas)
+        if event["type"] == "content_block_delta"
+    ]
+    await system.unmask_text("".join(parts), MAPPINGS)
+    return time.perf_counter() - start
+
+
+async def measure_streaming(deltas: List[str], system: IntegratedMaskingSystem) -> float:
+    """점진적 언마스킹: 첫 텍스트 도착 시간"""
+    async def unmask(text: str) -> str:
+        return await system.unmask_text(text, MAPPINGS)
+
+    start = time.perf_counter()
+    first = None
+    async for event in unmask_event_stream(upstream(deltas), unmask):
+        if first is None and event["type"] == "content_block_delta":
+            first = time.perf_counter() - start
+    return first
+
+
+async def run_benchmark() -> None:
+    """응답 길이별 첫 텍스트 도착 시간 비교"""
+    # 모든 토큰이 요청 매핑에 있으므로 Redis 연결 없이 동작
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=1)
+    rows = []
+
+    for count in RESPONSE_TOKENS:
+        deltas = build_deltas(count)
+        buffered = await measure_buffered(deltas, system)
+        streaming = await measure_streaming(deltas, system)
+        rows.append({
+            "tokens": str(count),
+            "buffered TTFB": f"{buffered * 1000:9.1f} ms",
+            "streaming TTFB": f"{streaming * 1000:9.1f} ms",
+            "improvement": f"{buffered / streaming:7.1f}x",
+        })
+
+    print_table(f"첫 텍스트 도착 시간 (토큰 간격 {TOKEN_INTERVAL * 1000:.0f}ms)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
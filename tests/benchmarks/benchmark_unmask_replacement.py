@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+언마스킹 다중 토큰 치환 벤치마크
+
+매핑 항목별 str.replace 반복과 Aho-Corasick 단일 패스 치환(MultiStringReplacer)을
+매핑 10 / 1k / 10k개, 100KB 모델 출력에서 비교 (치환기 생성 비용은 따로 표시)
+
+실행: python tests/benchmarks/benchmark_unmask_replacement.py
+"""
+
+import random
+import time
+from typing import Dict
+
+from bench_utils import PROSE_SAMPLE, format_throughput, measure, print_table
+
+from claude_litellm_proxy.patterns.multi_replacer import MultiStringReplacer
+
+MAPPING_SIZES = [10, 1_000, 10_000]
+OUTPUT_SIZE = 100 * 1024
+TYPES = ["EC2", "VPC", "SUBNET", "SECURITY_GROUP", "IAM_ROLE", "S3_BUCKET", "LAMBDA_ARN", "ACCOUNT"]
+
+
+def build_mapping(count: int) -> Dict[str, str]:
+    """리소스 타입별 카운터 토큰 매핑 (카운터 자릿수가 늘면 접두어 관계 토큰 생김)"""
+    return {
+        f"AWS_{TYPES[i % len(TYPES)]}_{i // len(TYPES) + 1:03d}": f"resource-{i:08x}"
+        for i in range(count)
+    }
+
+
+def build_output(mapping: Dict[str, str], size: int) -> str:
+    """일반 문장 사이에 토큰이 섞인 모델 출력"""
+    rng = random.Random(42)
+    tokens = list(mapping)
+    parts = []
+    length = 0
+    while length < size:
+        part = PROSE_SAMPLE[:rng.randint(20, 120)] + rng.choice(tokens) + " "
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+
+def replace_loop(text: str, mapping: Dict[str, str]) -> str:
+    """기존 방식: 매핑 항목마다 str.replace"""
+    for masked_value, original_value in mapping.items():
+        text = text.replace(masked_value, original_value)
+    return text
+
+
+def run_benchmark() -> None:
+    """매핑 크기별 str.replace 루프 vs 단일 패스 치환 비교"""
+    rows = []
+    for count in MAPPING_SIZES:
+        mapping = build_mapping(count)
+        text = build_output(mapping, OUTPUT_SIZE)
+
+        start = time.perf_counter()
+        replacer = MultiStringReplacer(mapping)
+        build_time = time.perf_counter() - start
+
+        loop_time = measure(lambda: replace_loop(text, mapping), min_time=0.3, max_runs=10)
+        replacer_time = measure(lambda: replacer.replace(text))
+        rows.append({
+            "mappings": f"{count:,}",
+            "str.replace loop": format_throughput(OUTPUT_SIZE, loop_time),
+            "aho-corasick": format_throughput(OUTPUT_SIZE, replacer_time),
+            "build": f"{build_time * 1000:8.2f} ms",
+            "speedup": f"{loop_time / replacer_time:7.1f}x",
+        })
+
+    print_table("언마스킹 다중 토큰 치환 (100KB 출력)", rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Sweep-line 충돌 그룹핑 테스트
+기존 O(n²) Union-Find 그룹핑과 결과(그룹 순서, 선택 매치)가 동일한지,
+IntervalTree 검색이 전수 비교와 일치하는지 검증
+"""
+
+import random
+import sys
+import os
+from collections import defaultdict
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.cloud_patterns import PatternDefinition
+from claude_litellm_proxy.patterns.overlap_detection import (
+    IntervalTree,
+    Match,
+    OverlapDetectionEngine,
+)
+
+
+def _pairwise_groups(matches):
+    """기존 구현과 동일한 O(n²) Union-Find 그룹핑 (기준 결과)"""
+    parent = list(range(len(matches)))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for i in range(len(matches)):
+        for j in range(i + 1, len(matches)):
+            if matches[i].overlaps_with(matches[j]):
+                pi, pj = find(i), find(j)
+                if pi != pj:
+                    parent[pi] = pj
+
+    groups = defaultdict(list)
+    for i, match in enumerate(matches):
+        groups[find(i)].append(match)
+    return list(groups.values())
+
+
+def _random_match_dicts(rng, count, text_length):
+    """무작위 구간/우선순위의 매치 dict 생성"""
+    matches = []
+    for i in range(count):
+        start = rng.randrange(text_length)
+        end = start + rng.randint(1, 30)
+        name = f"pattern_{rng.randint(0, 5)}"
+        priority = rng.randint(1, 4) * 100
+        pattern_def = PatternDefinition(
+            pattern="x", replacement="x-{:03d}", type="test", description="test", priority=priority
+        )
+        matches.append({
+            "match": f"m{i}",
+            "pattern_name": name,
+            "pattern_def": pattern_def,
+            "start": start,
+            "end": end,
+            "type": "test",
+            "priority": priority,
+        })
+    return matches
+
+
+def test_groups_match_pairwise_union_find():
+    """그룹 구성과 순서가 기존 Union-Find 결과와 동일해야 함"""
+    rng = random.Random(42)
+    engine = OverlapDetectionEngine()
+
+    for count, text_length in [(0, 10), (1, 10), (20, 100), (200, 500), (300, 5000)]:
+        matches = engine._to_match_objects(_random_match_dicts(rng, count, text_length))
+        expected = _pairwise_groups(matches)
+        actual = engine._build_conflict_groups(matches)
+        assert [[id(m) for m in g] for g in actual] == [[id(m) for m in g] for g in expected]
+
+
+def test_resolve_conflicts_matches_reference():
+    """선택된 매치와 순서가 기존 선택 규칙 결과와 동일하고, 원본 dict를 그대로 반환"""
+    rng = random.Random(7)
+    engine = OverlapDetectionEngine()
+
+    for _ in range(20):
+        match_dicts = _random_match_dicts(rng, 150, 1000)
+        match_objects = engine._to_match_objects(match_dicts)
+
+        expected_keys = []
+        for group in _pairwise_groups(match_objects):
+            best = engine._select_best_match(group)
+            expected_keys.append((best.start, best.end, best.pattern_name))
+
+        resolved = engine.resolve_conflicts(match_dicts)
+        assert [(m["start"], m["end"], m["pattern_name"]) for m in resolved] == expected_keys
+        assert all(any(m is original for original in match_dicts) for m in resolved)
+
+
+def test_adjacent_matches_do_not_conflict():
+    """끝과 시작이 맞닿은 매치는 서로 다른 그룹"""
+    groups = OverlapDetectionEngine._build_conflict_index_groups([(0, 5), (5, 10), (9, 12), (20, 25)])
+    assert groups == [[0], [1, 2], [3]]
+
+
+def test_interval_tree_matches_brute_force():
+    """IntervalTree 검색 결과가 전수 비교와 일치해야 함 (긴 구간 포함)"""
+    rng = random.Random(3)
+    matches = [
+        Match(start=s, end=s + rng.choice([1, 3, 10, 400]), text="", pattern_name=f"p{i}",
+              pattern_type="test", priority=100, pattern_def=None)
+        for i, s in enumerate(rng.randrange(1000) for _ in range(300))
+    ]
+    tree = IntervalTree(matches)
+    assert len(tree) == len(matches)
+
+    for _ in range(200):
+        start = rng.randrange(1100)
+        end = start + rng.randint(1, 50)
+        expected = sorted(
+            (m for m in matches if m.start < end and start < m.end),
+            key=lambda m: (m.start, m.end),
+        )
+        actual = tree.find_overlapping_range(start, end)
+        assert sorted(id(m) for m in actual) == sorted(id(m) for m in expected)
+        assert [(m.start, m.end) for m in actual] == [(m.start, m.end) for m in expected]
+
+    # 기준 매치 자신도 결과에 포함
+    assert matches[0] in tree.find_overlapping(matches[0])
+    assert IntervalTree([]).find_overlapping_range(0, 10) == []
+
+
+if __name__ == "__main__":
+    test_groups_match_pairwise_union_find()
+    test_resolve_conflicts_matches_reference()
+    test_adjacent_matches_do_not_conflict()
+    test_interval_tree_matches_brute_force()
+    print("🎉 Sweep-line 그룹핑 검증 완료!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+공유 컴파일 패턴 집합(CompiledPatternSet) 테스트
+- CloudPatterns / MaskingEngine 인스턴스가 같은 패턴 집합을 공유
+- 패턴 집합과 패턴 정의는 변경 불가
+- 디버그 플래그, 프리필터 통계 등 인스턴스 옵션은 독립
+"""
+
+import dataclasses
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns, get_compiled_pattern_set
+from claude_litellm_proxy.patterns.masking_engine import MaskingEngine
+from test_pattern_scanner import SCANNER_TEST_TEXTS, _match_keys
+
+
+def test_instances_share_pattern_set():
+    """엔진마다 다시 컴파일하지 않고 같은 정규식 객체 사용"""
+    shared = get_compiled_pattern_set()
+    assert get_compiled_pattern_set() is shared
+    assert len(shared.patterns) == len(shared.compiled) == len(shared.sorted_patterns)
+
+    first, second = MaskingEngine(), MaskingEngine()
+    for patterns in (first.patterns, second.patterns, CloudPatterns(use_prefilter=False)):
+        assert patterns._pattern_set is shared
+        assert patterns._compiled_patterns["ec2_instance"] is shared.compiled["ec2_instance"]
+
+
+def test_pattern_set_is_immutable():
+    """공유 집합의 매핑과 패턴 정의는 수정할 수 없음"""
+    shared = get_compiled_pattern_set()
+    with pytest.raises(TypeError):
+        shared.patterns["extra"] = shared.patterns["ec2_instance"]
+    with pytest.raises(TypeError):
+        del shared.compiled["ec2_instance"]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        shared.patterns["ec2_instance"].priority = 0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        shared.anchors = {}
+
+
+def test_instance_options_stay_independent():
+    """디버그 플래그와 프리필터 통계는 인스턴스별, 새로 만든 집합과 결과 동일"""
+    debug, quiet = CloudPatterns(), CloudPatterns()
+    debug.enable_debug(True)
+    assert debug._overlap_engine.debug and not quiet._overlap_engine.debug
+
+    debug.find_matches(SCANNER_TEST_TEXTS[0])
+    assert debug.get_prefilter_stats()["calls"] == 1
+    assert quiet.get_prefilter_stats()["calls"] == 0
+
+    fresh = CloudPatterns(pattern_set=CloudPatterns.build_pattern_set())
+    assert fresh._pattern_set is not get_compiled_pattern_set()
+    for text in SCANNER_TEST_TEXTS:
+        assert _match_keys(fresh.find_matches(text)) == _match_keys(quiet.find_matches(text))
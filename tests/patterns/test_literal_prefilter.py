@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+리터럴 앵커 프리필터 테스트
+앵커 추출 규칙, 스킵 판정, 스킵 통계, 결과 동등성 검증
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns
+from claude_litellm_proxy.patterns.literal_prefilter import LiteralPrefilter, required_literals
+
+
+def test_required_literal_extraction():
+    """패턴별 필수 리터럴 추출"""
+    assert required_literals(r"arn:aws:lambda:[a-z0-9\-]+:\d+:function:[a-zA-Z0-9\-_]+") == ("arn:aws:lambda:",)
+    assert required_literals(r"[a-z\-]*db[a-z\-]*") == ("db",)
+    assert required_literals(r"[a-z0-9]{13,14}\.cloudfront\.net") == (".cloudfront.net",)
+    assert required_literals(r"\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b") == (".",)
+    # 모든 분기에 ':'가 필수
+    assert required_literals(r"\b([0-9a-f]{1,4}:){7}[0-9a-f]{1,4}\b|\b([0-9a-f]{1,4}:){1,7}:\b") == (":",)
+    # 분기마다 다른 리터럴 → 어느 하나라도 있으면 실행
+    assert set(required_literals(r"foo-\d+|bar-\d+")) == {"foo-", "bar-"}
+    # 선택적 그룹의 리터럴은 필수가 아님
+    assert required_literals(r"(?:abc)?\d{12}") == ()
+    assert required_literals(r"\b\d{12}\b") == ()
+    assert required_literals(r"(?i)akia[0-9a-z]{16}") == ()
+
+
+def test_prefilter_skips_absent_anchors():
+    """앵커가 없는 패턴만 실행 대상이어야 함"""
+    prefilter = LiteralPrefilter([
+        ("lambda", ("arn:aws:lambda:",)),
+        ("arn", ("arn:aws:",)),
+        ("ec2", ("i-",)),
+        ("account", ()),
+    ])
+
+    assert prefilter.evaluate("just chat text") == [False, False, False, True]
+    assert prefilter.evaluate("see arn:aws:s3:::bucket") == [False, True, False, True]
+    assert prefilter.evaluate("arn:aws:lambda:us-east-1 on i-abc") == [True, True, True, True]
+
+    stats = prefilter.get_statistics()
+    assert stats["calls"] == 3
+    assert stats["patterns"]["lambda"]["skipped"] == 2
+    assert stats["patterns"]["arn"]["skipped"] == 1
+    assert stats["patterns"]["account"]["skipped"] == 0
+    assert abs(stats["patterns"]["ec2"]["skip_rate"] - 2 / 3) < 1e-9
+
+    prefilter.reset_statistics()
+    assert prefilter.get_statistics()["calls"] == 0
+
+
+def test_prefilter_stats_thread_safe():
+    """여러 스레드에서 동시에 판정해도 통계가 누락되지 않아야 함"""
+    prefilter = LiteralPrefilter([("ec2", ("i-",)), ("account", ())])
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=lambda: [prefilter.evaluate("chat") for _ in range(2000)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(0.005)
+
+    stats = prefilter.get_statistics()
+    assert stats["calls"] == 16000
+    assert stats["patterns"]["ec2"]["skipped"] == 16000
+
+
+def test_prefilter_keeps_results_identical():
+    """프리필터 사용 여부와 무관하게 매치 결과가 동일해야 함"""
+    filtered = CloudPatterns(use_prefilter=True)
+    unfiltered = CloudPatterns(use_prefilter=False)
+
+    texts = [
+        "How do I sort a list in python?",
+        "Deploy arn:aws:lambda:us-east-1:123456789012:function:ProcessPayment to i-1234567890abcdef0",
+        "DB prod-db at 8.8.8.8, IPv6 2001:db8::1, key AKIA1234567890ABCDEF, bucket a-bucket-1",
+    ]
+    for text in texts:
+        key = lambda m: (m["pattern_name"], m["start"], m["end"])
+        assert [key(m) for m in filtered.find_matches(text)] == \
+            [key(m) for m in unfiltered.find_matches(text)]
+
+
+def test_cloud_patterns_prefilter_stats():
+    """일반 대화 텍스트에서는 앵커 있는 패턴이 모두 스킵되어야 함"""
+    patterns = CloudPatterns()
+    patterns.find_matches("Please refactor this function to be shorter")
+
+    stats = patterns.get_prefilter_stats()
+    assert stats["calls"] == 1
+    assert stats["patterns"]["lambda_arn"]["skip_rate"] == 1.0
+    assert stats["patterns"]["ec2_instance"]["skip_rate"] == 1.0
+    # 앵커 없는 패턴은 항상 실행
+    assert stats["patterns"]["account_id"]["skipped"] == 0
+    assert stats["patterns"]["secret_key"]["skipped"] == 0
+
+
+if __name__ == "__main__":
+    test_required_literal_extraction()
+    test_prefilter_skips_absent_anchors()
+    test_prefilter_stats_thread_safe()
+    test_prefilter_keeps_results_identical()
+    test_cloud_patterns_prefilter_stats()
+    print("🎉 리터럴 프리필터 검증 완료!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+다중 문자열 치환기(MultiStringReplacer) 테스트
+- 접두어 관계 토큰은 가장 긴 토큰으로 치환 (AWS_EC2_001 / AWS_EC2_0012)
+- 치환 결과를 다시 치환하지 않음, 무작위 입력에서 정규식 기준 구현과 동일
+- MaskingEngine.unmask_text는 매핑이 같으면 치환기 재사용
+"""
+
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.masking_engine import MaskingEngine
+from claude_litellm_proxy.patterns.multi_replacer import MultiStringReplacer
+
+
+def _reference_replace(text: str, mapping: dict) -> str:
+    """긴 키 우선 정규식 교대로 만든 기준 구현 (leftmost-longest)"""
+    keys = sorted(mapping, key=len, reverse=True)
+    pattern = re.compile("|".join(re.escape(key) for key in keys))
+    return pattern.sub(lambda m: mapping[m.group()], text)
+
+
+def test_prefix_tokens_use_longest_match():
+    """짧은 토큰이 긴 토큰의 앞부분을 먼저 바꾸지 않음"""
+    mapping = {
+        "AWS_EC2_001": "i-1111111111111111a",
+        "AWS_EC2_0012": "i-2222222222222222b",
+        "AWS_EC2_00123": "i-3333333333333333c",
+    }
+    replacer = MultiStringReplacer(mapping)
+    text = "AWS_EC2_0012 then AWS_EC2_001, AWS_EC2_00123 and AWS_EC2_0019"
+    assert replacer.replace(text) == (
+        "i-2222222222222222b then i-1111111111111111a, "
+        "i-3333333333333333c and i-1111111111111111a9"
+    )
+    assert replacer.find_spans("xxAWS_EC2_0012") == [(2, 14)]
+    assert len(replacer) == 3
+
+
+def test_replacement_is_not_rescanned():
+    """원본 값에 다른 토큰 모양 문자열이 있어도 연쇄 치환 없음, 겹치면 왼쪽 우선"""
+    replacer = MultiStringReplacer({"AWS_A_001": "AWS_B_001", "AWS_B_001": "real-b", "001AWS": "x"})
+    assert replacer.replace("AWS_A_001 AWS_B_001") == "AWS_B_001 real-b"
+    assert replacer.replace("AWS_A_001AWS_B_001") == "AWS_B_001real-b"
+    assert MultiStringReplacer({}).replace("AWS_EC2_001") == "AWS_EC2_001"
+    assert MultiStringReplacer({"": "x"}).replace("abc") == "abc"
+
+
+def test_matches_reference_on_random_inputs():
+    """겹치는 접두어/접미어 키가 섞인 무작위 입력에서 기준 구현과 동일"""
+    rng = random.Random(7)
+    alphabet = "ab_1"
+    for _ in range(300):
+        mapping = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))): f"<{i}>"
+            for i in range(rng.randint(1, 8))
+        }
+        text = "".join(rng.choice(alphabet + "x") for _ in range(rng.randint(0, 60)))
+        assert MultiStringReplacer(mapping).replace(text) == _reference_replace(text, mapping), (mapping, text)
+
+
+def test_masking_engine_reuses_replacer():
+    """같은 매핑이면 치환기 재사용, 매핑이 바뀌면 다시 생성"""
+    engine = MaskingEngine()
+    mapping = {"AWS_EC2_001": "i-1111111111111111a", "AWS_EC2_0012": "i-2222222222222222b"}
+
+    assert engine.unmask_text("AWS_EC2_0012", mapping) == "i-2222222222222222b"
+    replacer = engine._replacer
+    assert engine.unmask_text("AWS_EC2_001", dict(mapping)) == "i-1111111111111111a"
+    assert engine._replacer is replacer
+
+    mapping["AWS_VPC_001"] = "vpc-12345678"
+    assert engine.unmask_text("AWS_VPC_001", mapping) == "vpc-12345678"
+    assert engine._replacer is not replacer
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+대용량 스캔 오프로드(ParallelScanner) 테스트
+- 청크 분할 + 병합 결과가 단일 스캔과 완전히 동일
+- 구분 문자 안전성 검증 (패턴이 소비할 수 있는 문자는 경계로 쓰지 않음)
+- 오프로드 스캔 중에도 이벤트 루프가 막히지 않음
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns, PatternDefinition
+from claude_litellm_proxy.patterns.parallel_scanner import (
+    ParallelScanner,
+    safe_separators,
+    split_chunks,
+)
+from test_pattern_scanner import SCANNER_TEST_TEXTS, _match_keys
+
+
+def _build_large_text(repeats: int) -> str:
+    """경계가 토큰 중간에 걸리도록 다양한 구분 문자로 이어 붙인 텍스트"""
+    parts = []
+    for i in range(repeats):
+        parts.append(SCANNER_TEST_TEXTS[i % len(SCANNER_TEST_TEXTS)])
+        parts.append(("\n", " ", "\t", ",", "")[i % 5])
+    return "".join(parts)
+
+
+def test_safe_separators():
+    """기본 패턴은 공백류를 소비하지 않음, \\s나 ^를 쓰는 패턴이 있으면 제외"""
+    patterns = CloudPatterns()
+    assert safe_separators(patterns) == frozenset("\n \t\r")
+
+    patterns._sorted_patterns = patterns._sorted_patterns + [
+        ("spaced", PatternDefinition(r"key\s=\s\w+", "AWS_KEY_{:03d}", "key", "test", 999)),
+    ]
+    assert safe_separators(patterns) == frozenset()
+
+    patterns._sorted_patterns = patterns._sorted_patterns[:-1] + [
+        ("anchored", PatternDefinition(r"^start-[a-z]+", "AWS_START_{:03d}", "start", "test", 999)),
+    ]
+    assert safe_separators(patterns) == frozenset()
+
+
+def test_split_chunks_cuts_after_separators():
+    """청크는 텍스트 전체를 덮고 구분 문자 바로 뒤에서만 잘림"""
+    text = "a" * 50 + " " + "b" * 200 + "\n" + "c" * 10
+    chunks = split_chunks(text, 20, frozenset(" \n"))
+    assert chunks == [(0, 51), (51, 252), (252, len(text))]
+    assert "".join(text[s:e] for s, e in chunks) == text
+
+    # 구분 문자가 없으면 나누지 않음
+    assert split_chunks("x" * 1000, 10, frozenset(" ")) == [(0, 1000)]
+
+
+def test_chunked_scan_matches_single_scan():
+    """작은 청크로 나눠 병합해도 단일 스캔과 결과(순서 포함)가 동일"""
+    patterns = CloudPatterns()
+    text = _build_large_text(400)
+
+    for chunk_size in (7, 64, 1000):
+        scanner = ParallelScanner(patterns, chunk_size=chunk_size)
+        assert len(split_chunks(text, chunk_size, frozenset("\n \t\r"))) > 1
+        assert _match_keys(scanner.find_matches_chunked(text)) == _match_keys(patterns.find_matches(text))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_processes", [True, False])
+async def test_offloaded_scan_matches_single_scan(use_processes):
+    """프로세스/스레드 풀 스캔 결과가 단일 스캔과 동일, 임계값 미만은 인라인"""
+    patterns = CloudPatterns()
+    scanner = ParallelScanner(
+        patterns, offload_threshold=10_000, chunk_size=2_000, max_workers=2, use_processes=use_processes
+    )
+    try:
+        text = _build_large_text(600)
+        assert _match_keys(await scanner.find_matches(text)) == _match_keys(patterns.find_matches(text))
+
+        small = SCANNER_TEST_TEXTS[0]
+        assert _match_keys(await scanner.find_matches(small)) == _match_keys(patterns.find_matches(small))
+
+        # 단계를 나눠 호출해도 같은 결과 (호출자가 스캔/충돌 해결 시간을 따로 측정)
+        raw = await scanner.scan(text)
+        assert sorted(_match_keys(raw)) == sorted(_match_keys(patterns.scan(text)))
+        assert _match_keys(await scanner.resolve_conflicts(text, raw)) == _match_keys(patterns.find_matches(text))
+
+        stats = scanner.get_statistics()
+        assert stats["offloaded_scans"] == 2
+        assert stats["offloaded_chunks"] > 1
+        assert stats["inline_scans"] == 1
+    finally:
+        scanner.close()
+
+
+class _Ec2OnlyPatterns(CloudPatterns):
+    """EC2/VPC 패턴만 있는 사용자 패턴 집합"""
+
+    @classmethod
+    def _initialize_patterns(cls):
+        return {
+            name: definition for name, definition in super()._initialize_patterns().items()
+            if name in ("ec2_instance", "vpc")
+        }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_processes", [True, False])
+async def test_offloaded_scan_uses_caller_pattern_config(use_processes):
+    """풀 워커도 호출자의 pattern_set/use_prefilter로 스캔 (기본 패턴 집합이 아님)"""
+    patterns = CloudPatterns(use_prefilter=False, pattern_set=_Ec2OnlyPatterns.build_pattern_set())
+    scanner = ParallelScanner(
+        patterns, offload_threshold=10_000, chunk_size=2_000, max_workers=2, use_processes=use_processes
+    )
+    try:
+        text = _build_large_text(600)
+        expected = _match_keys(patterns.find_matches(text))
+        assert expected
+        assert {key[1] for key in expected} <= {"ec2_instance", "vpc"}
+        assert _match_keys(await scanner.find_matches(text)) == expected
+        assert scanner.get_statistics()["offloaded_scans"] == 1
+    finally:
+        scanner.close()
+
+
+@pytest.mark.asyncio
+async def test_offloaded_scan_does_not_block_event_loop():
+    """2MB 스캔 중에도 다른 코루틴이 계속 실행됨"""
+    patterns = CloudPatterns()
+    scanner = ParallelScanner(patterns, offload_threshold=64 * 1024, max_workers=2)
+    text = _build_large_text(40_000)
+    assert len(text) > 2 * 1024 * 1024
+
+    try:
+        await scanner.find_matches(text)  # 워커 프로세스 기동
+
+        ticks = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        matches = await scanner.find_matches(text)
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticker_task
+
+        assert matches
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        print(f"\n2MB 오프로드 스캔 {elapsed * 1000:.0f}ms, 최대 루프 지연 {max(gaps) * 1000:.1f}ms")
+        assert max(gaps) < max(0.1, elapsed / 2)
+    finally:
+        scanner.close()
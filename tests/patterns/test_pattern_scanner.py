@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+PatternScanner 동등성 테스트
+컴파일된 스캐너가 기존 패턴별 finditer 루프와 동일한 매치를 반환하는지 검증
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.cloud_patterns import CloudPatterns
+from claude_litellm_proxy.patterns.pattern_scanner import literal_prefix
+
+
+SCANNER_TEST_TEXTS = [
+    "Deploy arn:aws:lambda:us-east-1:123456789012:function:ProcessPayment",
+    "Launch i-1234567890abcdef0 in account 123456789012 with vpc-12345678",
+    # 같은 계열 ARN이 연속/인접한 경우
+    "arn:aws:iam::123456789012:role/Admin,arn:aws:iam::123456789012:user/bob",
+    "arn:aws:arn:aws:sns:us-east-1:123456789012:alerts arn:aws:s3:::my-bucket",
+    "arn:aws:ecs:us-east-1:123456789012:task/cluster/1234abcd-12ab-34cd-56ef-1234567890ab",
+    # 동일 정규식 본문 (KMS / Insights)
+    "KMS 12345678-1234-1234-1234-123456789012 query abcdef12-1234-1234-1234-123456789012",
+    # IP / IPv6 / 한글 경계
+    "서버 8.8.8.8 와 10.0.0.1, IPv6 2001:db8::1, 프로필 /aws/lambda/ProcessPayment",
+    "bucket my-data-bucket-prod, db prod-db, logs app-logs-2024, AKIA1234567890ABCDEF",
+    "",
+    "plain text without any cloud identifiers at all.",
+]
+
+
+def _match_keys(matches):
+    return [
+        (m["match"], m["pattern_name"], m["start"], m["end"], m["type"], m["priority"])
+        for m in matches
+    ]
+
+
+def test_scanner_matches_sequential_loop():
+    """스캐너와 기존 루프의 결과(순서 포함)가 완전히 동일해야 함"""
+    scanner = CloudPatterns(use_scanner=True)
+    sequential = CloudPatterns(use_scanner=False)
+
+    texts = SCANNER_TEST_TEXTS + ["\n".join(SCANNER_TEST_TEXTS) * 20]
+
+    for text in texts:
+        for resolve in (False, True):
+            expected = _match_keys(sequential.find_matches(text, resolve_conflicts=resolve))
+            actual = _match_keys(scanner.find_matches(text, resolve_conflicts=resolve))
+            assert actual == expected, f"결과 불일치 (resolve={resolve}): {text[:80]!r}"
+
+
+def test_scanner_prefers_lambda_arn():
+    """스캐너 경로에서도 충돌 해결 결과가 유지되어야 함"""
+    patterns = CloudPatterns()
+    matches = patterns.find_matches(
+        "Deploy arn:aws:lambda:us-east-1:123456789012:function:ProcessPayment"
+    )
+
+    assert len(matches) == 1
+    assert matches[0]["pattern_name"] == "lambda_arn"
+
+
+def test_literal_prefix_extraction():
+    """정규식 리터럴 접두어 추출 규칙"""
+    assert literal_prefix(r"arn:aws:lambda:[a-z0-9\-]+:\d+") == "arn:aws:lambda:"
+    assert literal_prefix(r"https://sqs\.[a-z0-9\-]+") == "https://sqs."
+    assert literal_prefix(r"eipalloc-[0-9a-f]{17}") == "eipalloc-"
+    # 수량자가 붙은 마지막 글자는 제외
+    assert literal_prefix(r"ab+c") == "a"
+    # 클래스/어서션으로 시작하거나 alternation이 있으면 접두어 없음
+    assert literal_prefix(r"\b\d{12}\b") == ""
+    assert literal_prefix(r"[a-z\-]*db[a-z\-]*") == ""
+    assert literal_prefix(r"abc|def") == ""
+
+
+if __name__ == "__main__":
+    test_scanner_matches_sequential_loop()
+    test_scanner_prefers_lambda_arn()
+    test_literal_prefix_extraction()
+    print("🎉 PatternScanner 동등성 검증 완료!")
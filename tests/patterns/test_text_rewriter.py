@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+마스킹 결과 재구성(text_rewriter) 테스트
+- 구간 적용 결과가 기존 슬라이싱 방식과 동일 (매치 수천 개)
+- JSON 조각 출력이 json.dumps(마스킹 결과)와 동일
+- 보호 구간(기존 토큰)과 겹치는 매치만 제거
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from claude_litellm_proxy.patterns.masking_engine import MaskingEngine
+from claude_litellm_proxy.patterns.text_rewriter import (
+    apply_spans,
+    drop_overlapping,
+    iter_json_string,
+    iter_segments,
+)
+
+
+def _slice_rewrite(text, spans):
+    """기존 방식: 뒤에서부터 매치마다 문자열 재생성"""
+    for start, end, replacement in reversed(spans):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def test_apply_spans_matches_slicing():
+    """경계/인접 구간 포함 기존 슬라이싱 결과와 동일"""
+    text = "0123456789"
+    spans = [(0, 2, "A"), (2, 3, ""), (5, 6, "BBB"), (9, 10, "C")]
+    assert apply_spans(text, spans) == _slice_rewrite(text, spans) == "A34BBB678C"
+    assert "".join(iter_segments(text, spans)) == "A34BBB678C"
+    assert apply_spans(text, []) is text
+
+
+def test_masking_engine_flow_log():
+    """IP 수천 개 플로우 로그 마스킹이 구간 기반으로 동일하게 복원됨"""
+    engine = MaskingEngine()
+    lines = [
+        f"2 123456789012 eni-abc 54.{i // 250}.{i % 250}.9 8.8.{i % 7}.{i % 200 + 1} 443 ACCEPT"
+        for i in range(2000)
+    ]
+    text = "\n".join(lines)
+
+    spans, mapping = engine.mask_spans(text)
+    assert len(spans) >= 4000
+    assert all(a[1] <= b[0] for a, b in zip(spans, spans[1:]))
+
+    masked = apply_spans(text, spans)
+    assert masked == _slice_rewrite(text, spans)
+    assert "54.0.1.9 " not in masked
+    assert engine.unmask_text(masked, mapping) == text
+
+
+def test_iter_json_string_equals_dumps():
+    """JSON 조각을 이어 붙이면 json.dumps(마스킹 결과)와 동일"""
+    text = 'say "hi"\n\tto 한글 i-1234567890abcdef0 \\ end'
+    spans = [(4, 8, "<q>"), (22, 41, "AWS_EC2_001")]
+    masked = apply_spans(text, spans)
+    assert "".join(iter_json_string(text, spans)) == json.dumps(masked)
+    assert "".join(iter_json_string(text, spans, ensure_ascii=False)) == json.dumps(masked, ensure_ascii=False)
+
+
+def test_drop_overlapping():
+    """보호 구간과 한 글자라도 겹치면 제거, 맞닿기만 하면 유지"""
+    matches = [{"start": s, "end": e} for s, e in [(0, 3), (3, 5), (8, 12), (14, 15), (19, 21), (25, 26)]]
+    kept = drop_overlapping(matches, [(5, 9), (15, 20)])
+    assert [(m["start"], m["end"]) for m in kept] == [(0, 3), (3, 5), (14, 15), (25, 26)]
+    assert drop_overlapping(matches, []) is matches
@@ -0,0 +1,173 @@
+"""
+Claude Code headless 스트리밍 테스트
+
+- stream-json 줄 단위 파싱 (청크 경계, 줄 크기 제한)
+- 실제 subprocess(fake CLI)에서 이벤트가 도착하는 즉시 전달
+- 이벤트별 언마스킹 후 SSE / NDJSON 전달
+
+Redis 없이 요청 범위 매핑만으로 복원 (Mock 사용 안 함)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from claude_litellm_proxy import main
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.stream_unmasker import unmask_json_value
+from claude_litellm_proxy.sdk.claude_code_client import ClaudeCodeHeadlessClient
+from claude_litellm_proxy.sdk.stream_json import JsonLineReader
+
+FAKE_CLI = os.path.join(os.path.dirname(__file__), "utilities", "fake_claude_cli.py")
+
+MAPPINGS = {
+    "AWS_EC2_001": "i-1234567890abcdef0",
+    "AWS_VPC_002": "vpc-12345678",
+}
+
+
+@pytest.fixture
+def system():
+    """연결 불가능한 Redis 설정 - 요청 매핑 밖 조회가 발생하면 ConnectionError"""
+    return IntegratedMaskingSystem(redis_host="localhost", redis_port=1, redis_db=15)
+
+
+@pytest.fixture
+def client():
+    os.environ["FAKE_CLAUDE_STARTUP_DELAY"] = "0"
+    return ClaudeCodeHeadlessClient(cli_command=[sys.executable, FAKE_CLI])
+
+
+async def _read_all(data: bytes, chunk_size: int, max_line_bytes: int):
+    stream = asyncio.StreamReader()
+    for i in range(0, len(data), chunk_size):
+        stream.feed_data(data[i:i + chunk_size])
+    stream.feed_eof()
+    reader = JsonLineReader(stream, max_line_bytes=max_line_bytes)
+    return [event async for event in reader.events()], reader
+
+
+@pytest.mark.asyncio
+async def test_line_reader_chunk_boundaries():
+    """청크 크기와 무관하게 같은 이벤트 (마지막 줄 개행 없음, 빈 줄/비JSON 줄 무시)"""
+    lines = [json.dumps({"type": "assistant", "n": i, "text": "가나다" * i}) for i in range(20)]
+    data = ("\n".join(lines[:10]) + "\n\nnot json\n" + "\n".join(lines[10:])).encode("utf-8")
+
+    for chunk_size in (1, 3, 7, 64, len(data)):
+        events, reader = await _read_all(data, chunk_size, 1 << 20)
+        assert [event["n"] for event in events] == list(range(20))
+        assert reader.invalid_lines == 1
+
+
+@pytest.mark.asyncio
+async def test_line_reader_drops_oversized_lines():
+    """최대 크기를 넘는 줄은 오류 이벤트로 대체하고 다음 줄부터 계속"""
+    big = json.dumps({"type": "assistant", "text": "x" * 5000})
+    data = "\n".join([
+        json.dumps({"type": "system"}),
+        big,
+        json.dumps({"type": "result"}),
+        big,
+    ]).encode("utf-8")
+
+    for chunk_size in (1, 100, 4096, len(data)):
+        events, reader = await _read_all(data, chunk_size, 1000)
+        assert [event["type"] for event in events] == ["system", "error", "result", "error"]
+        assert events[1]["error"]["type"] == "line_too_large"
+        assert reader.dropped_lines == 2
+
+
+@pytest.mark.asyncio
+async def test_events_arrive_before_process_exit(client):
+    """이벤트는 CLI 종료를 기다리지 않고 출력되는 즉시 전달"""
+    interval = 0.1
+    start = time.perf_counter()
+    arrivals = []
+
+    async for event in client.stream_headless("STREAM:5:0.1:hello"):
+        arrivals.append((event["type"], time.perf_counter() - start))
+
+    types = [event_type for event_type, _ in arrivals]
+    assert types == ["system"] + ["assistant"] * 5 + ["result"]
+
+    first_assistant = arrivals[1][1]
+    total = arrivals[-1][1]
+    print(f"\n첫 assistant 이벤트 {first_assistant * 1000:.1f}ms / 전체 {total * 1000:.1f}ms")
+    assert total >= interval * 5
+    assert first_assistant < interval * 3
+
+
+@pytest.mark.asyncio
+async def test_stream_line_cap(client):
+    """max_line_bytes를 넘는 출력 줄은 전달하지 않음"""
+    events = [event async for event in client.stream_headless("BIG:300000", max_line_bytes=64 * 1024)]
+
+    assert [event["type"] for event in events] == ["system", "error", "result"]
+    assert events[1]["error"]["type"] == "line_too_large"
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_raises(client):
+    """CLI 실패 시 종료 코드와 stderr를 담은 RuntimeError"""
+    with pytest.raises(RuntimeError, match="code: 3"):
+        async for _ in client.stream_headless("FAIL"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_unmask_json_value(system):
+    """텍스트, tool_use 입력, tool_result 등 위치와 무관하게 언마스킹"""
+
+    async def unmask(text):
+        return await system.unmask_text(text, MAPPINGS)
+
+    event = {
+        "type": "assistant",
+        "message": {
+            "content": [
+                {"type": "text", "text": "Instance AWS_EC2_001 in AWS_VPC_002"},
+                {"type": "tool_use", "input": {"command": "aws ec2 describe-instances --ids AWS_EC2_001"}},
+                {"type": "tool_result", "content": [{"type": "text", "text": "AWS_VPC_002 ok"}]},
+            ],
+            "usage": {"input_tokens": 10},
+        },
+    }
+
+    result = await unmask_json_value(event, unmask)
+    content = result["message"]["content"]
+
+    assert content[0]["text"] == "Instance i-1234567890abcdef0 in vpc-12345678"
+    assert content[1]["input"]["command"].endswith("--ids i-1234567890abcdef0")
+    assert content[2]["content"][0]["text"] == "vpc-12345678 ok"
+    assert result["message"]["usage"] == {"input_tokens": 10}
+    assert event["message"]["content"][0]["text"].startswith("Instance AWS_EC2_001")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ndjson", [False, True])
+async def test_streaming_response_unmasks_each_event(system, client, ndjson):
+    """엔드포인트 스트리밍 응답: 이벤트마다 언마스킹 후 SSE / NDJSON 프레임으로 전달"""
+    main.masking_system = system
+    main.claude_code_client = client
+
+    response = await main.stream_claude_code_response(
+        {"prompt": "STREAM:2:0:AWS_EC2_001 in AWS_VPC_002"}, MAPPINGS, ndjson=ndjson
+    )
+    body = "".join([chunk async for chunk in response.body_iterator])
+
+    if ndjson:
+        assert response.media_type == "application/x-ndjson"
+        events = [json.loads(line) for line in body.splitlines()]
+    else:
+        assert response.media_type == "text/event-stream"
+        frames = [frame for frame in body.split("\n\n") if frame]
+        assert all(frame.startswith("event: ") for frame in frames)
+        events = [json.loads(frame.split("data: ", 1)[1]) for frame in frames]
+
+    assert [event["type"] for event in events] == ["system", "assistant", "assistant", "result"]
+    assert events[1]["message"]["content"][0]["text"] == "0: i-1234567890abcdef0 in vpc-12345678"
+    assert "AWS_" not in body
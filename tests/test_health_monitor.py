@@ -0,0 +1,174 @@
+"""
+백그라운드 헬스 프로버 테스트
+
+- 프로브 요청은 캐시만 읽음 (검사 함수 호출 없음, 1ms 미만)
+- 검사 결과 ttl 초과 시 stale → not ready
+- 실제 컴포넌트 검사: Redis PING, 로컬 TCP 서버 연결, CLI 실행 파일 확인
+
+실제 Redis(localhost:6379) 사용, Mock 사용 안 함
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+import pytest
+
+from claude_litellm_proxy import main
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.litellm_client import LiteLLMClient
+from claude_litellm_proxy.sdk.claude_code_client import ClaudeCodeHeadlessClient
+from claude_litellm_proxy.utils.health import HealthMonitor
+
+
+@pytest.fixture
+async def upstream_server():
+    """Claude API 대신 연결만 받는 로컬 TCP 서버"""
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(1)
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", connections
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_probes_read_cache_only():
+    """snapshot/is_ready는 검사 함수를 호출하지 않고, 프로버만 주기적으로 호출"""
+    calls = []
+
+    async def check():
+        calls.append(time.monotonic())
+        return {"version": "test"}
+
+    monitor = HealthMonitor(interval=0.05, ttl=1.0)
+    monitor.register("component", check)
+    await monitor.start()
+    assert len(calls) == 1
+
+    for _ in range(1000):
+        assert monitor.is_ready()
+        snapshot = monitor.snapshot()
+    assert len(calls) == 1
+    assert snapshot["components"]["component"]["version"] == "test"
+
+    await asyncio.sleep(0.22)
+    await monitor.stop()
+    assert 3 <= len(calls) <= 6
+
+
+@pytest.mark.asyncio
+async def test_failed_timed_out_and_stale_components():
+    """실패/타임아웃은 not ready, 선택 컴포넌트 실패는 readiness에 영향 없음, ttl 초과 시 stale"""
+
+    async def ok():
+        return {}
+
+    async def broken():
+        raise ConnectionError("down")
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {}
+
+    monitor = HealthMonitor(interval=60, ttl=0.2, check_timeout=0.05)
+    monitor.register("required", ok)
+    monitor.register("optional", broken, required=False)
+    await monitor.start()
+
+    assert monitor.is_ready()
+    components = monitor.snapshot()["components"]
+    assert components["optional"]["status"] == "error"
+    assert components["optional"]["error"] == "down"
+
+    monitor.register("slow", slow)
+    await monitor.probe_all()
+    assert monitor.component_status("slow") == "timeout"
+    assert not monitor.is_ready()
+
+    # 프로버가 갱신하지 못하면 stale
+    await asyncio.sleep(0.25)
+    assert monitor.component_status("required") == "stale"
+    await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_component_checks(upstream_server, monkeypatch):
+    """Redis PING, TCP 연결, CLI 존재 확인 - 정상/실패"""
+    base_url, connections = upstream_server
+
+    healthy_redis = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    dead_redis = IntegratedMaskingSystem(redis_host="localhost", redis_port=1, redis_db=15)
+    assert await healthy_redis.mapping_store.ping()
+    with pytest.raises(Exception):
+        await dead_redis.mapping_store.ping()
+    await healthy_redis.close()
+
+    monkeypatch.setenv("LITELLM_CLAUDE_BASE_URL", base_url)
+    detail = await LiteLLMClient().check_connectivity()
+    assert detail["upstream"] == base_url.split("//")[1]
+    await asyncio.sleep(0.01)
+    assert connections == [1]
+
+    monkeypatch.setenv("LITELLM_CLAUDE_BASE_URL", "http://127.0.0.1:1")
+    with pytest.raises(OSError):
+        await LiteLLMClient().check_connectivity()
+
+    assert (await ClaudeCodeHeadlessClient(cli_command=[sys.executable]).check_cli())["cli"]
+    with pytest.raises(FileNotFoundError):
+        await ClaudeCodeHeadlessClient(cli_command=["no-such-claude-cli"]).check_cli()
+
+
+@pytest.mark.asyncio
+async def test_health_endpoints(upstream_server, monkeypatch):
+    """/health/live, /health/ready, /health - 캐시 기반 응답과 응답 시간"""
+    base_url, _ = upstream_server
+    monkeypatch.setenv("LITELLM_CLAUDE_BASE_URL", base_url)
+
+    main.masking_system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    main.litellm_client = LiteLLMClient()
+    main.claude_code_client = ClaudeCodeHeadlessClient(cli_command=[sys.executable])
+    main.health_monitor = main.build_health_monitor()
+    await main.health_monitor.start()
+
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/health/live")).json() == {"status": "alive"}
+
+            ready = await client.get("/health/ready")
+            assert ready.status_code == 200
+            assert set(ready.json()["components"]) == {"redis", "upstream", "claude_code"}
+
+            health = (await client.get("/health")).json()
+            assert health["status"] == "healthy"
+            assert health["redis_connection"] == "healthy"
+            assert health["litellm_client"] == "healthy"
+
+        # 프로브 처리 시간 (HTTP 계층 제외)
+        probes = 1000
+        start = time.perf_counter()
+        for _ in range(probes):
+            await main.readiness_check()
+        per_probe_ms = (time.perf_counter() - start) * 1000 / probes
+        print(f"\nreadiness 프로브 평균 {per_probe_ms:.4f}ms")
+        assert per_probe_ms < 1.0
+
+        # 필수 컴포넌트(upstream) 장애 → 503
+        main.litellm_client.claude_base_url = "http://127.0.0.1:1"
+        await main.health_monitor.probe_all()
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            not_ready = await client.get("/health/ready")
+            assert not_ready.status_code == 503
+            assert not_ready.json()["components"]["upstream"]["status"] == "error"
+            assert (await client.get("/health")).json()["status"] == "degraded"
+    finally:
+        await main.health_monitor.stop()
+        await main.masking_system.close()
+        main.health_monitor = None
@@ -192,6 +192,99 @@ class TestIntegratedMasking:
             assert len(mapping) == 2  # EC2 + IAM
             assert masked_text != texts[results.index((masked_text, mapping))]
 
+    @pytest.mark.asyncio
+    async def test_batched_masking_matches_per_match_reference(self):
+        """배치 마스킹 결과가 매치별 GET/INCR/저장 방식과 동일해야 함"""
+        text = (
+            "i-1234567890abcdef0 and i-abcdef01234567890 in vpc-12345678, "
+            "again i-1234567890abcdef0 with AKIA1234567890ABCDEF and vpc-87654321"
+        )
+
+        # 기준 구현용 별도 DB, 두 DB 모두 카운터까지 초기화 후 동일한 기존 매핑 준비
+        reference_store = MappingStore(host="localhost", port=6379, db=14)
+        for store in (reference_store, self.system.mapping_store):
+            await (await store._get_redis()).flushdb()
+            await store.save_mapping("AWS_VPC_900", "vpc-87654321")
+
+        # 기준 구현: 뒤에서부터 매치마다 Redis 왕복
+        expected_text = text
+        expected_mapping = {}
+        matches = self.system.masking_engine.patterns.find_matches(text)
+        for match in sorted(matches, key=lambda m: m["start"], reverse=True):
+            original = match["match"]
+            masked = await reference_store.get_masked(original)
+            if not masked:
+                counter = await reference_store.get_next_counter(match["pattern_def"].type)
+                masked = match["pattern_def"].replacement.format(counter)
+                await reference_store.save_mapping(masked, original)
+            expected_mapping[masked] = original
+            expected_text = expected_text[:match["start"]] + masked + expected_text[match["end"]:]
+
+        await (await reference_store._get_redis()).flushdb()
+        await reference_store.close()
+
+        masked_text, mapping = await self.system.mask_text(text)
+
+        assert masked_text == expected_text
+        assert list(mapping.items()) == list(expected_mapping.items())
+
+        # 중복 원본은 하나의 마스킹 값, 기존 매핑은 재사용
+        assert mapping["AWS_VPC_900"] == "vpc-87654321"
+        assert len(mapping) == 5
+        for masked_val, original_val in mapping.items():
+            assert await self.system.get_original_from_redis(masked_val) == original_val
+
+    @pytest.mark.asyncio
+    async def test_counter_crosses_three_digit_width(self):
+        """카운터가 999 → 1000을 넘어도 토큰이 잘리지 않고 각자 원본으로 복원"""
+        redis_client = await self.system.mapping_store._get_redis()
+        await redis_client.set("counter:ec2", 995)
+        try:
+            instance_ids = [f"i-{i:017x}" for i in range(1, 11)]
+            text = " ".join(instance_ids)
+            masked_text, mapping = await self.system.mask_text(text)
+
+            assert "AWS_EC2_999" in mapping and "AWS_EC2_1000" in mapping and "AWS_EC2_1005" in mapping
+            assert len(mapping) == 10
+            assert await self.system.unmask_text(masked_text) == text
+            assert await self.system.unmask_text(masked_text, mapping) == text
+        finally:
+            await redis_client.delete("counter:ec2")
+
+    @pytest.mark.asyncio
+    async def test_unmask_with_request_mappings_first(self):
+        """요청 범위 매핑으로 먼저 복원하고, 없는 토큰만 Redis에서 조회"""
+        masked_text, mapping = await self.system.mask_text(
+            "EC2 i-1234567890abcdef0 and VPC vpc-12345678"
+        )
+        vpc_token = [k for k, v in mapping.items() if v == "vpc-12345678"][0]
+
+        # 요청 매핑에는 EC2만 있고 VPC 토큰은 이전 대화에서 온 것으로 가정
+        ec2_only = {k: v for k, v in mapping.items() if k != vpc_token}
+        response = f"{masked_text} / again {vpc_token}"
+        unmasked = await self.system.unmask_text(response, ec2_only)
+        assert unmasked == (
+            "EC2 i-1234567890abcdef0 and VPC vpc-12345678 / again vpc-12345678"
+        )
+
+        # 요청 매핑이 Redis보다 우선
+        assert await self.system.unmask_text(vpc_token, {vpc_token: "request-value"}) == "request-value"
+
+    @pytest.mark.asyncio
+    async def test_unmask_from_request_mappings_without_redis(self):
+        """모든 토큰이 요청 매핑에 있으면 Redis 연결 없이 복원"""
+        # 연결 불가능한 Redis 설정 - 조회가 발생하면 ConnectionError
+        offline = IntegratedMaskingSystem(redis_host="localhost", redis_port=1, redis_db=15)
+
+        mappings = {"AWS_EC2_001": "i-1234567890abcdef0", "AWS_VPC_002": "vpc-12345678"}
+        text = "Run AWS_EC2_001 in AWS_VPC_002 (AWS_EC2_001)"
+
+        unmasked = await offline.unmask_text(text, mappings)
+        assert unmasked == "Run i-1234567890abcdef0 in vpc-12345678 (i-1234567890abcdef0)"
+
+        with pytest.raises(ConnectionError):
+            await offline.unmask_text("unknown AWS_EC2_999", mappings)
+
     @pytest.mark.asyncio
     async def test_error_recovery(self):
         """오류 상황에서의 복구 테스트"""
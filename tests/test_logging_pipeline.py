@@ -0,0 +1,86 @@
+"""
+비동기 구조화 로깅 파이프라인 테스트
+
+- JSON 한 줄 출력, 구조화 필드, 샘플링, 레벨 비활성 시 무출력
+- 큐가 가득 차면 대기 없이 버림
+- DEBUG 레벨 마스킹 이벤트에 원본 민감정보가 기록되지 않음
+
+실제 하위 프로세스 stdout 사용, Mock 사용 안 함
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+
+from claude_litellm_proxy.utils.logging import _NonBlockingQueueHandler
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+
+def _run(code: str, **env: str) -> list:
+    """하위 프로세스에서 코드를 실행하고 stdout JSON 줄 목록 반환"""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, timeout=60,
+        env={**os.environ, "PYTHONPATH": SRC_DIR, **env},
+    )
+    assert result.returncode == 0, result.stderr
+    return [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+
+
+def test_json_events_and_sampling():
+    """JSON 필드 출력, 25건 중 10건마다 1건, 비활성 레벨은 출력 없음"""
+    lines = _run(
+        "import logging\n"
+        "from claude_litellm_proxy.utils.logging import get_logging_statistics, log_event, setup_logger\n"
+        "logger = setup_logger('pipeline_test')\n"
+        "logger.info('started %s', 'ok')\n"
+        "for i in range(25):\n"
+        "    log_event(logger, logging.INFO, 'scan', sample_every=10, matches=i, name='x')\n"
+        "log_event(logger, logging.DEBUG, 'hidden')\n"
+        "assert get_logging_statistics()['sampled_out'] == 22\n",
+        LOG_LEVEL="INFO",
+    )
+    assert lines[0]["message"] == "started ok" and lines[0]["level"] == "INFO"
+    assert lines[0]["logger"] == "pipeline_test"
+
+    events = lines[1:]
+    assert [event["matches"] for event in events] == [0, 10, 20]
+    assert all(event["event"] == "scan" and event["sampled"] == 10 for event in events)
+    assert events[0]["field_name"] == "x"
+
+
+def test_masking_debug_events_omit_originals():
+    """DEBUG 레벨에서도 마스킹 이벤트는 개수만 기록"""
+    lines = _run(
+        "import asyncio, os\n"
+        "from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem\n"
+        "from claude_litellm_proxy.proxy.token_codec import TokenCodec\n"
+        "async def main():\n"
+        "    system = IntegratedMaskingSystem(redis_port=1, token_codec=TokenCodec({1: os.urandom(32)}))\n"
+        "    masked, mappings = await system.mask_text('Launch i-1234567890abcdef0 in vpc-12345678')\n"
+        "    await system.mask_texts(['account 123456789012'])\n"
+        "    assert await system.unmask_text(masked) == 'Launch i-1234567890abcdef0 in vpc-12345678'\n"
+        "    await system.close()\n"
+        "asyncio.run(main())\n",
+        LOG_LEVEL="DEBUG",
+    )
+    events = {line["event"]: line for line in lines if "event" in line}
+    assert events["mask_text"]["mappings"] == 2
+    assert events["mask_texts"]["texts"] == 1
+    output = json.dumps(lines)
+    for original in ("i-1234567890abcdef0", "vpc-12345678", "123456789012"):
+        assert original not in output
+
+
+def test_full_queue_drops_without_blocking():
+    """큐가 가득 차면 기다리지 않고 버린 건수만 증가"""
+    handler = _NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "value %s", ("a",), None)
+    handler.emit(record)
+    handler.emit(record)
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().msg == "value a"
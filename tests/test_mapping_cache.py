@@ -0,0 +1,161 @@
+"""
+2단계 매핑 캐시 테스트 (프로세스 내 LRU → Redis)
+
+- LRU 축출 / TTL 만료 / 통계
+- 캐시 적중 시 Redis 명령 없음
+- Redis 키 TTL을 넘겨 캐시하지 않음
+- 다른 워커(별도 MappingStore)의 삭제를 keyspace 알림으로 무효화
+
+실제 Redis(localhost:6379, db 15) 사용, Mock 사용 안 함
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from claude_litellm_proxy.proxy.mapping_cache import MappingCache
+from claude_litellm_proxy.proxy.mapping_store import MappingStore
+
+TOKEN_FORMATS = {"ec2": "AWS_EC2_{:03d}"}
+
+
+@pytest.fixture
+async def stores():
+    """db 15를 쓰는 저장소 생성기 (테스트 후 정리)"""
+    created = []
+
+    async def _make(**kwargs):
+        store = MappingStore(host="localhost", port=6379, db=15, **kwargs)
+        created.append(store)
+        return store
+
+    yield _make
+
+    if created:
+        await created[0].clear_all()
+        await (await created[0]._get_redis()).delete("counter:ec2")
+    for store in created:
+        await store.close()
+
+
+@pytest.fixture
+async def keyspace_notifications():
+    """keyspace 알림 활성화 (테스트 후 원래 설정 복구)"""
+    store = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+    redis_client = await store._get_redis()
+    previous = (await redis_client.config_get("notify-keyspace-events"))["notify-keyspace-events"]
+    await redis_client.config_set("notify-keyspace-events", "Kgxe")
+    yield
+    await redis_client.config_set("notify-keyspace-events", previous)
+    await store.close()
+
+
+def test_lru_eviction_and_ttl():
+    """가장 오래 사용하지 않은 항목부터 축출, 만료 항목은 miss"""
+    cache = MappingCache(max_entries=2, ttl=60)
+    cache.set("m2o:A", "a")
+    cache.set("m2o:B", "b")
+    assert cache.get("m2o:A") == "a"  # A 최근 사용
+    cache.set("m2o:C", "c")  # B 축출
+
+    assert cache.get("m2o:B") is None
+    assert cache.get("m2o:A") == "a"
+    assert cache.get("m2o:C") == "c"
+
+    cache.set("m2o:D", "d", ttl=0.05)  # A 축출
+    time.sleep(0.06)
+    assert cache.get("m2o:D") is None
+
+    assert cache.invalidate("m2o:C") is True
+    assert cache.invalidate("m2o:C") is False
+
+    stats = cache.get_statistics()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 2
+    assert stats["expirations"] == 1
+    assert stats["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_lookups_skip_redis(stores):
+    """반복되는 원본/토큰 조회는 Redis 명령 없이 캐시에서 처리"""
+    store = await stores()
+    await store.clear_all()
+    redis_client = await store._get_redis()
+    await redis_client.delete("counter:ec2")
+
+    pairs = [("ec2", "i-1234567890abcdef0"), ("ec2", "i-abcdef1234567890")]
+    tokens = await store.get_or_create_batch(pairs, TOKEN_FORMATS)
+    assert tokens == ["AWS_EC2_001", "AWS_EC2_002"]
+
+    before = await redis_client.info("commandstats")
+    for _ in range(50):
+        assert await store.get_or_create_batch(pairs, TOKEN_FORMATS) == tokens
+        assert await store.get_originals_batch(tokens) == {
+            "AWS_EC2_001": "i-1234567890abcdef0",
+            "AWS_EC2_002": "i-abcdef1234567890",
+        }
+    after = await redis_client.info("commandstats")
+
+    for command in ("cmdstat_evalsha", "cmdstat_mget", "cmdstat_get"):
+        assert after.get(command, {}).get("calls", 0) == before.get(command, {}).get("calls", 0)
+
+    stats = store.get_cache_statistics()
+    assert stats["enabled"] is True
+    assert stats["hits"] >= 200
+
+
+@pytest.mark.asyncio
+async def test_cache_respects_key_ttl(stores):
+    """Redis 키가 만료되면 캐시도 함께 만료 (읽기로 채운 항목 포함)"""
+    writer = await stores()
+    reader = await stores()
+    await writer.clear_all()
+
+    await writer.save_mapping("AWS_EC2_900", "i-0000000000000900", ttl=1)
+    assert await reader.get_original("AWS_EC2_900") == "i-0000000000000900"
+    assert await writer.get_original("AWS_EC2_900") == "i-0000000000000900"
+
+    await asyncio.sleep(1.1)
+    assert await reader.get_original("AWS_EC2_900") is None
+    assert await writer.get_original("AWS_EC2_900") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled(stores):
+    """cache_size=0이면 항상 Redis 조회"""
+    store = await stores(cache_size=0)
+    await store.save_mapping("AWS_EC2_901", "i-0000000000000901")
+    assert await store.get_original("AWS_EC2_901") == "i-0000000000000901"
+    assert store.get_cache_statistics() == {"enabled": False}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_across_workers(stores, keyspace_notifications):
+    """다른 워커가 매핑을 삭제하면 keyspace 알림으로 이 워커 캐시도 무효화"""
+    worker_a = await stores(cache_ttl=3600)
+    worker_b = await stores(cache_ttl=3600)
+    await worker_a.clear_all()
+    for _ in range(50):
+        if worker_a.get_cache_statistics()["invalidation"] == "keyspace":
+            break
+        await asyncio.sleep(0.02)
+
+    await worker_b.save_mapping("AWS_EC2_902", "i-0000000000000902")
+    assert await worker_a.get_original("AWS_EC2_902") == "i-0000000000000902"
+    assert await worker_a.get_masked("i-0000000000000902") == "AWS_EC2_902"
+    stats = worker_a.get_cache_statistics()
+    assert stats["invalidation"] == "keyspace"
+    assert stats["size"] == 2
+
+    await worker_b.clear_all()
+
+    for _ in range(50):
+        if worker_a.get_cache_statistics()["invalidations"] >= 2:
+            break
+        await asyncio.sleep(0.02)
+
+    assert await worker_a.get_original("AWS_EC2_902") is None
+    assert await worker_a.get_masked("i-0000000000000902") is None
@@ -0,0 +1,139 @@
+"""
+대화 메시지 마스킹 캐시 테스트
+
+- 100턴 세션: 턴마다 새 메시지만 스캔 (캐시 miss가 턴당 일정)
+- 캐시 사용 결과 == 전체 재스캔 결과
+- 항목 수 / 메모리 크기 제한과 축출
+
+실제 Redis(localhost:6379, db 15) 사용, Mock 사용 안 함
+"""
+
+import pytest
+
+from claude_litellm_proxy import main
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.message_mask_cache import MessageMaskCache
+
+
+@pytest.fixture
+async def masking_system():
+    """db 15 마스킹 시스템 (테스트 후 정리)"""
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    await system.mapping_store.clear_all()
+    main.masking_system = system
+    yield system
+    main.masking_system = None
+    main.message_mask_cache = None
+    await system.mapping_store.clear_all()
+    await system.close()
+
+
+def build_turn_message(turn: int, role: str) -> dict:
+    """턴별 AWS 리소스가 포함된 메시지"""
+    return {
+        "role": role,
+        "content": (
+            f"turn {turn}: check instance i-{turn:017x} in vpc-{turn:08x} "
+            f"and bucket my-bucket-{turn} for account 1234567890{turn % 10:02d}"
+        ),
+    }
+
+
+def test_cache_key_covers_role_and_content():
+    """role과 content가 같을 때만 같은 키 (content block 리스트 포함)"""
+    key = MessageMaskCache.key_for
+    assert key({"role": "user", "content": "i-1234567890abcdef0"}) == key({"role": "user", "content": "i-1234567890abcdef0"})
+    assert key({"role": "user", "content": "x"}) != key({"role": "assistant", "content": "x"})
+    assert key({"role": "user", "content": [{"type": "text", "text": "a"}]}) == key(
+        {"role": "user", "content": [{"text": "a", "type": "text"}]}
+    )
+    assert key({"role": "user", "content": [{"type": "text", "text": "a"}]}) != key({"role": "user", "content": "a"})
+
+
+def test_memory_bound_and_eviction():
+    """항목 수/바이트 제한 초과 시 가장 오래 사용하지 않은 항목부터 축출"""
+    cache = MessageMaskCache(max_entries=3, max_bytes=10_000)
+    for i in range(3):
+        cache.put(f"k{i}", f"masked {i}", {f"AWS_EC2_{i:03d}": f"i-{i}"})
+    assert cache.get("k0") is not None  # k0 최근 사용
+    cache.put("k3", "masked 3", {})  # k1 축출
+    assert cache.get("k1") is None
+    assert cache.get_statistics()["evictions"] == 1
+
+    cache.put("big", "x" * 9_700, {})  # 바이트 제한 → 나머지 축출
+    stats = cache.get_statistics()
+    assert stats["bytes"] <= 10_000
+    assert stats["entries"] == 1
+    assert cache.get("big") == ("x" * 9_700, {})
+
+    cache.put("huge", "x" * 20_000, {})  # 단일 항목이 제한 초과 → 캐시 안 함
+    assert cache.get("huge") is None
+    assert cache.get("big") is not None
+
+
+@pytest.mark.asyncio
+async def test_hundred_turn_session_scans_only_new_messages(masking_system):
+    """턴마다 전체 대화를 보내도 새 메시지만 스캔하고 결과/매핑은 전체 재스캔과 동일"""
+    main.message_mask_cache = MessageMaskCache(max_entries=1000)
+    messages = []
+    misses_per_turn = []
+
+    for turn in range(100):
+        messages.append(build_turn_message(turn, "user"))
+        before = main.message_mask_cache.misses
+        masked_request, mappings = await main.mask_request_content({"messages": list(messages)})
+        misses_per_turn.append(main.message_mask_cache.misses - before)
+
+        # 응답 복원에 필요한 매핑은 이전 턴 토큰까지 모두 포함
+        assert len(masked_request["messages"]) == len(messages)
+        assert "i-" + f"{0:017x}" in mappings.values()
+        messages.append({"role": "assistant", "content": f"done {turn}"})
+
+    assert all(misses <= 2 for misses in misses_per_turn)
+    stats = main.message_mask_cache.get_statistics()
+    assert stats["hits"] > stats["misses"] * 40
+    assert stats["skipped_bytes"] > 0
+
+    cached_request, cached_mappings = await main.mask_request_content({"messages": messages})
+    main.message_mask_cache = None
+    fresh_request, fresh_mappings = await main.mask_request_content({"messages": messages})
+    assert cached_request == fresh_request
+    assert cached_mappings == fresh_mappings
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_mapping_reset(masking_system):
+    """매핑 초기화 후에는 이전 세대 토큰을 재사용하지 않음 (토큰 충돌 방지)"""
+    main.message_mask_cache = masking_system.message_mask_cache = MessageMaskCache(max_entries=100)
+    first = {"role": "user", "content": "start i-0000000000000aaa0"}
+    _, before = await main.mask_request_content({"messages": [first]})
+    assert list(before.values()) == ["i-0000000000000aaa0"]
+
+    namespace = masking_system.cache_namespace
+    await masking_system.clear_all_mappings()
+    assert masking_system.cache_namespace != namespace
+    assert main.message_mask_cache.get_statistics()["entries"] == 0
+
+    # 이전 세대 키로 넣은 항목은 새 세대에서 조회되지 않음
+    stale_key = MessageMaskCache.key_for(first, namespace)
+    stale_content = f"start {next(iter(before))}"
+    main.message_mask_cache.put(stale_key, stale_content, before)
+
+    second = {"role": "user", "content": "next i-0000000000000bbb0"}
+    masked_request, mappings = await main.mask_request_content({"messages": [second, first]})
+    assert masked_request["messages"][1]["content"] != stale_content
+    assert sorted(mappings.values()) == ["i-0000000000000aaa0", "i-0000000000000bbb0"]
+    for token, original in mappings.items():
+        assert await masking_system.get_original_from_redis(token) == original
+
+
+def test_entry_ttl_bounded_by_mapping_ttl():
+    """항목 유지 시간은 매핑 TTL을 넘지 않음"""
+    import time
+
+    cache = MessageMaskCache(ttl=3600)
+    cache.put("short", "masked", {}, ttl=0.05)
+    cache.put("long", "masked", {})
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("long") is not None
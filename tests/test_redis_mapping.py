@@ -12,6 +12,7 @@ from typing import Dict, Optional
 
 # Red Phase: 아직 구현되지 않은 모듈
 try:
+    from claude_litellm_proxy.proxy.counter_allocator import MAX_BLOCK_SIZE
     from claude_litellm_proxy.proxy.mapping_store import MappingStore
 except ImportError:
     MappingStore = None
@@ -198,6 +199,345 @@ class TestRedisMappingStore:
         assert stats["iam_count"] == 1
         assert stats["bucket_count"] == 1
 
+    # Test 9: 원자적 get-or-create 스크립트
+    @pytest.mark.asyncio
+    async def test_get_or_create_batch(self):
+        """기존 매핑은 재사용, 새 원본은 순서대로 카운터 부여 후 양방향 저장"""
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:lua_test")
+        await self.store.save_mapping("AWS_LUA_TEST_900", "existing-value")
+
+        pairs = [
+            ("lua_test", "new-value-a"),
+            ("lua_test", "existing-value"),
+            ("lua_test", "new-value-b"),
+        ]
+        tokens = await self.store.get_or_create_batch(
+            pairs, {"lua_test": "AWS_LUA_TEST_{:03d}"}, ttl=60
+        )
+
+        assert tokens == ["AWS_LUA_TEST_001", "AWS_LUA_TEST_900", "AWS_LUA_TEST_002"]
+        assert await self.store.get_original("AWS_LUA_TEST_002") == "new-value-b"
+        assert await self.store.get_masked("new-value-a") == "AWS_LUA_TEST_001"
+        assert 0 < await redis_client.ttl("m2o:AWS_LUA_TEST_001") <= 60
+
+        # SCRIPT FLUSH 후에도 재적재하여 동작
+        await redis_client.script_flush()
+        again = await self.store.get_or_create_batch(pairs, {"lua_test": "AWS_LUA_TEST_{:03d}"})
+        assert again == tokens
+
+        # 새 토큰은 예약 블록에서 (INCR 없음), 쓰지 않은 값은 다음 새 토큰에 재사용
+        before = (await redis_client.info("commandstats")).get("cmdstat_incr", {}).get("calls", 0)
+        fresh = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+        try:
+            more = await fresh.get_or_create_batch(
+                [("lua_test", "existing-value"), ("lua_test", "new-value-c"), ("lua_test", "new-value-d")],
+                {"lua_test": "AWS_LUA_TEST_{:03d}"}
+            )
+            assert more == ["AWS_LUA_TEST_900", "AWS_LUA_TEST_065", "AWS_LUA_TEST_066"]
+            assert await fresh.get_or_create_batch(
+                [("lua_test", "new-value-e")], {"lua_test": "AWS_LUA_TEST_{:03d}"}
+            ) == ["AWS_LUA_TEST_067"]
+        finally:
+            await fresh.close()
+        after = (await redis_client.info("commandstats")).get("cmdstat_incr", {}).get("calls", 0)
+        assert after == before
+
+        # 카운터가 기존 토큰보다 뒤처져도 덮어쓰지 않고 새 블록으로 재시도
+        await self.store.save_mapping("AWS_LUA_TEST_200", "injected-value")
+        await redis_client.set("counter:lua_test", 199)
+        self.store.counter_allocator.discard("counter:lua_test")
+        assert await self.store.get_or_create_batch(
+            [("lua_test", "new-value-f")], {"lua_test": "AWS_LUA_TEST_{:03d}"}
+        ) == ["AWS_LUA_TEST_264"]
+        assert await self.store.get_original("AWS_LUA_TEST_200") == "injected-value"
+        await redis_client.delete("counter:lua_test")
+
+    @pytest.mark.asyncio
+    async def test_get_or_create_concurrent_single_token(self):
+        """동시 요청이 같은 새 원본을 처리해도 토큰/매핑은 하나만 생성 (워커별 예약 값은 빈 번호로 남음)"""
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:lua_race")
+
+        stores = [MappingStore(host="localhost", port=6379, db=15) for _ in range(10)]
+        results = await asyncio.gather(*[
+            store.get_or_create_batch([("lua_race", "arn:aws:sns:us-east-1:123456789012:race")],
+                                      {"lua_race": "AWS_LUA_RACE_{:03d}"})
+            for store in stores
+        ])
+        for store in stores:
+            await store.close()
+
+        assert len({tokens[0] for tokens in results}) == 1
+        assert [key async for key in redis_client.scan_iter(match="m2o:AWS_LUA_RACE_*")] == [
+            f"m2o:{results[0][0]}"
+        ]
+        assert (await self.store.get_statistics())["total_count"] == 1
+        await redis_client.delete("counter:lua_race")
+
+    # Test 10: 쓰기와 함께 갱신되는 통계
+    @pytest.mark.asyncio
+    async def test_statistics_maintained_on_write(self):
+        """재저장은 통계를 중복 증가시키지 않고, get-or-create는 새 토큰만 집계"""
+        await self.store.save_mapping("ec2-001", "i-1234567890abcdef0")
+        await self.store.save_mapping("ec2-001", "i-1234567890abcdef0")
+        await self.store.save_batch({"ec2-001": "i-1234567890abcdef0", "AWS_VPC_001": "vpc-12345678"})
+
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:stats_test")
+        pairs = [("stats_test", "value-a"), ("stats_test", "value-b"), ("stats_test", "value-a")]
+        await self.store.get_or_create_batch(pairs, {"stats_test": "AWS_STATS_TEST_{:03d}"})
+        await self.store.get_or_create_batch(pairs, {"stats_test": "AWS_STATS_TEST_{:03d}"})
+
+        stats = await self.store.get_statistics()
+        assert stats == {"total_count": 4, "ec2_count": 1, "vpc_count": 1, "stats_test_count": 2}
+
+        # SCAN 재계산 결과와 동일 (토큰에서 추출한 타입 이름 기준)
+        assert await self.store.recount_statistics() == stats
+        assert await self.store.get_statistics() == stats
+    
+    # Test 10-1: get-or-create와 save_batch가 같은 통계 필드를 사용
+    @pytest.mark.asyncio
+    async def test_statistics_unchanged_by_recount(self):
+        """패턴 타입과 토큰 타입이 달라도 쓰기 시점 통계가 재계산 결과와 동일"""
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:s3", "counter:ec2")
+        
+        pairs = [("s3", "my-bucket"), ("s3", "other-bucket"), ("ec2", "i-0123456789abcdef0")]
+        await self.store.get_or_create_batch(pairs, {"s3": "AWS_S3_BUCKET_{:03d}", "ec2": "AWS_EC2_{:03d}"})
+        await self.store.save_batch({"AWS_S3_BUCKET_900": "third-bucket", "AWS_VPC_001": "vpc-12345678"})
+        
+        before = await self.store.get_statistics()
+        assert before == {"total_count": 5, "s3_bucket_count": 3, "ec2_count": 1, "vpc_count": 1}
+        await self.store.recount_statistics()
+        assert await self.store.get_statistics() == before
+        await redis_client.delete("counter:s3", "counter:ec2")
+
+    # Test 11: KEYS 없이 통계/삭제
+    @pytest.mark.asyncio
+    async def test_statistics_and_clear_without_keys(self):
+        """get_statistics/clear_all은 KEYS를 호출하지 않고, SCAN 배치 UNLINK로 전부 삭제"""
+        self.store.scan_batch_size = 50
+        await self.store.save_batch({f"ec2-{i:04d}": f"i-{i:017x}" for i in range(230)})
+
+        redis_client = await self.store._get_redis()
+        keys_calls_before = (await redis_client.info("commandstats")).get("cmdstat_keys", {}).get("calls", 0)
+
+        assert (await self.store.get_statistics())["ec2_count"] == 230
+        await self.store.clear_all()
+
+        keys_calls_after = (await redis_client.info("commandstats")).get("cmdstat_keys", {}).get("calls", 0)
+        assert keys_calls_after == keys_calls_before
+        assert await self.store.get_statistics() == {"total_count": 0}
+        assert [key async for key in redis_client.scan_iter(match="m2o:*")] == []
+        assert [key async for key in redis_client.scan_iter(match="o2m:*")] == []
+
+    # Test 12: 카운터 블록 예약
+    @pytest.mark.asyncio
+    async def test_counter_block_reservation(self):
+        """새 식별자마다 INCR하지 않고 블록 단위 INCRBY, 여러 워커가 동시에 받아도 유일"""
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:block_test")
+
+        def incr_calls(stats):
+            return sum(stats.get(f"cmdstat_{name}", {}).get("calls", 0) for name in ("incr", "incrby"))
+
+        before = incr_calls(await redis_client.info("commandstats"))
+        values = [await self.store.get_next_counter("block_test") for _ in range(300)]
+        after = incr_calls(await redis_client.info("commandstats"))
+
+        assert values == list(range(1, 301))
+        assert after - before <= 4  # 64 → 128 → 256 (빠르게 소진하면 블록 확대)
+        assert self.store.counter_allocator.get_statistics()["block_sizes"]["counter:block_test"] > 64
+
+        # 계속 빠르게 소진해도 블록은 상한까지만 커짐 (버려지는 번호 제한)
+        await self.store.get_next_counters("block_test", 2000)
+        for _ in range(10):
+            await self.store.get_next_counters("block_test", 100)
+        assert self.store.counter_allocator.get_statistics()["block_sizes"]["counter:block_test"] == MAX_BLOCK_SIZE
+
+        # 다른 워커와 동시에 할당해도 중복 없음
+        other = MappingStore(host="localhost", port=6379, db=15, counter_block_size=8)
+        results = await asyncio.gather(
+            *(store.get_next_counters("block_test", 5) for store in (self.store, other) for _ in range(40))
+        )
+        allocated = [value for batch in results for value in batch] + values
+        assert len(allocated) == len(set(allocated)) == 700
+
+        await other.close()
+        await redis_client.delete("counter:block_test")
+
+    # Test 13: 종료 시 미사용 구간 반납
+    @pytest.mark.asyncio
+    async def test_counter_block_release(self):
+        """뒤를 아무도 예약하지 않았으면 카운터를 되돌리고, 예약했으면 빈 번호로 남김"""
+        redis_client = await self.store._get_redis()
+        await redis_client.delete("counter:release_test")
+
+        worker = MappingStore(host="localhost", port=6379, db=15)
+        assert await worker.get_next_counters("release_test", 3) == [1, 2, 3]
+        assert await redis_client.get("counter:release_test") == "64"
+        await worker.close()
+        assert await redis_client.get("counter:release_test") == "3"
+
+        worker = MappingStore(host="localhost", port=6379, db=15)
+        assert await worker.get_next_counter("release_test") == 4
+        assert await self.store.get_next_counter("release_test") == 68
+        await worker.close()
+        assert await redis_client.get("counter:release_test") == "131"
+
+        # 블록 비활성화 시 호출마다 INCR
+        plain = MappingStore(host="localhost", port=6379, db=15, counter_block_size=0)
+        assert await plain.get_next_counter("release_test") == 132
+        await plain.close()
+
+        # get-or-create가 쓰지 않은 값(기존 매핑)도 블록에 되붙어 함께 반납
+        await self.store.save_mapping("AWS_RELEASE_TEST_900", "release-existing")
+        worker = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+        assert await worker.get_or_create_batch(
+            [("release_test", "release-existing")], {"release_test": "AWS_RELEASE_TEST_{:03d}"}
+        ) == ["AWS_RELEASE_TEST_900"]
+        await worker.close()
+        assert await redis_client.get("counter:release_test") == "132"
+        await redis_client.delete("counter:release_test")
+
+    def test_lua_token_format_conversion(self):
+        """파이썬 토큰 형식 → Lua string.format 형식"""
+        from claude_litellm_proxy.proxy.mapping_store import to_lua_format
+
+        assert to_lua_format("AWS_EC2_{:03d}", "ec2") == "AWS_EC2_%03d"
+        assert to_lua_format("AWS_API_GW_{:03d}.execute-api.", "api_gateway") == "AWS_API_GW_%03d.execute-api."
+        assert to_lua_format("100%_{}", "x") == "100%%_%d"
+        # 변환 불가 형식은 파이썬 쪽 대체 형식과 동일
+        assert to_lua_format("AWS_{name}_{:03d}", "ec2") == "EC2_%03d"
+
+
+class TestRedisConnectionPool:
+    """연결 풀 크기 제한, 끊긴 연결 재시도, unix 소켓 + RESP3 (실제 redis-server)"""
+
+    @pytest.mark.asyncio
+    async def test_pool_bounded_under_concurrency(self):
+        """동시 요청이 풀 크기보다 많아도 연결은 max_connections를 넘지 않고 대기 후 처리"""
+        from claude_litellm_proxy.proxy.redis_connection import RedisConnectionOptions
+
+        store = MappingStore(
+            host="localhost", port=6379, db=15, cache_size=0,
+            connection_options=RedisConnectionOptions(max_connections=3)
+        )
+        await store.clear_all()
+        try:
+            async def roundtrip(i: int) -> Optional[str]:
+                tokens = await store.get_or_create_batch(
+                    [("pool_test", f"i-{i:017x}")], {"pool_test": "AWS_POOL_TEST_{:03d}"}
+                )
+                return (await store.get_originals_batch(tokens)).get(tokens[0])
+
+            originals = await asyncio.gather(*[roundtrip(i) for i in range(50)])
+            assert originals == [f"i-{i:017x}" for i in range(50)]
+
+            stats = store.get_pool_statistics()
+            assert stats["max"] == 3
+            assert stats["in_use"] == 0
+            assert 1 <= stats["idle"] <= 3
+        finally:
+            await store.clear_all()
+            await (await store._get_redis()).delete("counter:pool_test")
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_after_server_closed_connections(self):
+        """서버가 유휴 연결을 끊어도 다음 명령은 재연결 후 성공"""
+        store = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+        admin = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+        try:
+            await store.save_mapping("AWS_RETRY_TEST_001", "i-0123456789abcdef0")
+            store_client = await store._get_redis()
+            client_id = await store_client.client_id()
+
+            await (await admin._get_redis()).client_kill_filter(_id=client_id)
+
+            assert await store.get_original("AWS_RETRY_TEST_001") == "i-0123456789abcdef0"
+            assert await store_client.client_id() != client_id
+        finally:
+            await store.clear_all()
+            await store.close()
+            await admin.close()
+
+    @pytest.mark.asyncio
+    async def test_counter_block_not_retried_after_timeout(self):
+        """응답 전에 타임아웃된 블록 예약은 투명 재시도하지 않고, 필요한 개수만 다시 예약"""
+        from claude_litellm_proxy.proxy.redis_connection import RedisConnectionOptions
+
+        options = RedisConnectionOptions(socket_timeout=0.2, retry_backoff_base=0.01, retry_backoff_cap=0.05)
+        store = MappingStore(host="localhost", port=6379, db=15, cache_size=0, connection_options=options)
+        admin = MappingStore(host="localhost", port=6379, db=15, cache_size=0)
+        admin_client = await admin._get_redis()
+        await admin_client.delete("counter:timeout_test")
+        await store._get_counter_redis().ping()
+        # 서버를 0.3초 붙잡는 스크립트 (그동안 보낸 INCRBY는 타임아웃 후에 적용됨)
+        busy = admin_client.eval(
+            "local t = redis.call('TIME') "
+            "local deadline = t[1] * 1000000 + t[2] + tonumber(ARGV[1]) "
+            "repeat t = redis.call('TIME') until t[1] * 1000000 + t[2] >= deadline "
+            "return 1",
+            0, 300000
+        )
+        try:
+            busy_task = asyncio.create_task(busy)
+            await asyncio.sleep(0.05)
+            # 64 블록 예약이 타임아웃 (서버에는 적용) → 1개만 다시 예약
+            assert await store.get_next_counter("timeout_test") == 65
+            await busy_task
+            assert await admin_client.get("counter:timeout_test") == "65"
+        finally:
+            await admin_client.delete("counter:timeout_test")
+            await store.close()
+            await admin.close()
+
+    @pytest.mark.asyncio
+    async def test_unix_socket_resp3(self, tmp_path):
+        """unix 소켓 전용 redis-server에 RESP3로 연결해 매핑/통계/카운터 동작"""
+        import shutil
+        import subprocess
+        from claude_litellm_proxy.proxy.redis_connection import RedisConnectionOptions
+
+        if shutil.which("redis-server") is None:
+            pytest.skip("redis-server 실행 파일 없음")
+
+        socket_path = tmp_path / "redis.sock"
+        server = subprocess.Popen(
+            ["redis-server", "--port", "0", "--unixsocket", str(socket_path),
+             "--save", "", "--appendonly", "no", "--notify-keyspace-events", "Kgxe"],
+            stdout=subprocess.DEVNULL
+        )
+        try:
+            for _ in range(100):
+                if socket_path.exists():
+                    break
+                await asyncio.sleep(0.05)
+
+            store = MappingStore(
+                host="ignored", port=1,
+                connection_options=RedisConnectionOptions(unix_socket_path=str(socket_path), protocol=3)
+            )
+            try:
+                tokens = await store.get_or_create_batch(
+                    [("ec2", "i-0123456789abcdef0"), ("vpc", "vpc-12345678")],
+                    {"ec2": "AWS_EC2_{:03d}", "vpc": "AWS_VPC_{:03d}"}
+                )
+                assert tokens == ["AWS_EC2_001", "AWS_VPC_001"]
+                assert await store.get_originals_batch(tokens) == {
+                    "AWS_EC2_001": "i-0123456789abcdef0", "AWS_VPC_001": "vpc-12345678"
+                }
+                assert (await store.get_statistics())["total_count"] == 2
+                assert await store.get_next_counters("ec2", 2) == [2, 3]
+                assert await store.ping()
+            finally:
+                await store.close()
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
 
 class TestRedisRealConnectionRequired:
     """실제 Redis 연결 필수 확인 테스트"""
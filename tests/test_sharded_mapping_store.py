@@ -0,0 +1,319 @@
+"""
+샤딩된 매핑 저장소 테스트
+실제 redis-server 여러 개를 띄워 검증, Mock 절대 금지
+"""
+
+import asyncio
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+import redis
+from redis.crc import key_slot
+
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.mapping_store import (
+    MappingStore,
+    counter_tag,
+    format_shard_tag,
+    masked_key_tag,
+    original_sub_index,
+    shard_tag,
+    token_number,
+)
+from claude_litellm_proxy.proxy.sharded_mapping_store import (
+    HashRing,
+    ShardedMappingStore,
+    parse_shard_nodes,
+)
+
+TOKEN_FORMATS = {
+    "ec2": "AWS_EC2_{:03d}",
+    "vpc": "AWS_VPC_{:03d}",
+    "s3": "AWS_S3_BUCKET_{:03d}",
+    "iam_access_key": "AWS_ACCESS_KEY_{:03d}",
+    "security_group": "AWS_SECURITY_GROUP_{:03d}",
+    "subnet": "AWS_SUBNET_{:03d}",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def redis_nodes():
+    """독립 redis-server 3개 (영속화 없음)"""
+    if shutil.which("redis-server") is None:
+        pytest.skip("redis-server 실행 파일 없음")
+
+    ports = [_free_port() for _ in range(3)]
+    servers = [
+        subprocess.Popen(
+            ["redis-server", "--port", str(port), "--bind", "127.0.0.1",
+             "--save", "", "--appendonly", "no", "--notify-keyspace-events", "Kgxe"],
+            stdout=subprocess.DEVNULL
+        )
+        for port in ports
+    ]
+    try:
+        for port in ports:
+            client = redis.Redis(port=port)
+            for _ in range(100):
+                try:
+                    client.ping()
+                    break
+                except redis.ConnectionError:
+                    time.sleep(0.05)
+            client.close()
+        yield [("127.0.0.1", port) for port in ports]
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait(timeout=10)
+
+
+def _pairs():
+    return [
+        ("ec2", "i-0123456789abcdef0"),
+        ("vpc", "vpc-12345678"),
+        ("s3", "my-data-bucket"),
+        ("iam_access_key", "AKIA1234567890ABCDEF"),
+        ("security_group", "sg-0123456789abcdef0"),
+        ("subnet", "subnet-0123456789abcdef0"),
+        ("ec2", "i-0fedcba9876543210"),
+    ]
+
+
+def test_shard_tag_matches_token_format():
+    """토큰 형식의 태그와 실제 토큰의 태그가 같음 (카운터 자리수와 무관)"""
+    assert shard_tag("AWS_EC2_001") == "ec2"
+    assert shard_tag("AWS_EC2_12345") == "ec2"
+    assert shard_tag("AWS_S3_BUCKET_002") == "s3_bucket"
+    assert shard_tag("AWS_EC2_" + "A" * 26 + "_001") == "ec2"
+    assert shard_tag("ec2-001") == "ec2"
+    for resource_type, token_format in TOKEN_FORMATS.items():
+        assert format_shard_tag(token_format, resource_type) == shard_tag(token_format.format(1234))
+
+    assert counter_tag("ec2") == "ec2"
+    assert counter_tag("s3", TOKEN_FORMATS["s3"]) == "s3_bucket"
+    tagged = MappingStore(hash_tags=True)
+    assert tagged.counter_key("s3") == "counter:{s3}"
+    assert tagged.counter_key("s3", TOKEN_FORMATS["s3"]) == "counter:{s3_bucket}"
+
+    # 하위 태그: 토큰 번호 (n - 1) % sub_tags가 하위 태그 번호
+    assert masked_key_tag("AWS_EC2_006") == "ec2"
+    assert masked_key_tag("AWS_EC2_006", 4) == "ec2:1"
+    assert token_number(2, 1, 4) == 6 and token_number(6, 0, 1) == 6
+    assert MappingStore(hash_tags=True, sub_tags=4).counter_key("ec2", index=3) == "counter:{ec2:3}"
+    with pytest.raises(ValueError):
+        MappingStore(sub_tags=4)
+
+    assert parse_shard_nodes("a:7000, b:7001,c") == [("a", 7000), ("b", 7001), ("c", 6379)]
+    ring = HashRing(3)
+    assert {ring.node_for(f"tag{i}") for i in range(100)} == {0, 1, 2}
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_across_shards(redis_nodes):
+    """타입별로 여러 노드에 나뉘어 저장되고, 배치 조회/통계가 모든 노드를 합침"""
+    store = ShardedMappingStore(redis_nodes)
+    try:
+        pairs = _pairs()
+        tokens = await store.get_or_create_batch(pairs, TOKEN_FORMATS)
+        assert tokens == [
+            "AWS_EC2_001", "AWS_VPC_001", "AWS_S3_BUCKET_001", "AWS_ACCESS_KEY_001",
+            "AWS_SECURITY_GROUP_001", "AWS_SUBNET_001", "AWS_EC2_002",
+        ]
+        assert len({store.ring.node_for(shard_tag(token)) for token in tokens}) > 1
+
+        # 새 저장소(빈 캐시)에서도 같은 토큰 / 원본
+        fresh = ShardedMappingStore(redis_nodes, cache_size=0)
+        try:
+            assert await fresh.get_or_create_batch(pairs, TOKEN_FORMATS) == tokens
+            assert await fresh.get_originals_batch(tokens + ["AWS_VPC_999"]) == {
+                token: original for token, (_, original) in zip(tokens, pairs)
+            }
+            assert await fresh.get_masked("vpc-12345678", "vpc") == "AWS_VPC_001"
+        finally:
+            await fresh.close()
+
+        await store.save_batch({"AWS_EC2_" + "B" * 26 + "_001": "i-0aaaaaaaaaaaaaaaa"})
+        stats = await store.get_statistics()
+        assert stats["total_count"] == 8
+        assert stats["ec2_count"] == 3
+        assert stats["s3_bucket_count"] == 1
+        assert await store.recount_statistics() == stats
+        assert await store.get_statistics() == stats
+        assert await store.ping()
+        assert store.get_pool_statistics()["max"] == 150
+
+        # 카운터 API도 get-or-create와 같은 (형식의 태그) 카운터를 이어서 사용
+        assert await store.get_next_counters("s3", 2, TOKEN_FORMATS["s3"]) == [2, 3]
+        assert await store.reserve_counters({"ec2": 2, "vpc": 1}, TOKEN_FORMATS) == {"ec2": 65, "vpc": 65}
+    finally:
+        await store.clear_all()
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_mapping_keys_share_slot_and_node(redis_nodes):
+    """한 태그의 m2o/o2m/카운터/통계 키는 같은 노드, 같은 클러스터 슬롯"""
+    store = ShardedMappingStore(redis_nodes)
+    try:
+        tokens = await store.get_or_create_batch(_pairs(), TOKEN_FORMATS)
+        for (resource_type, original), token in zip(_pairs(), tokens):
+            tag = format_shard_tag(TOKEN_FORMATS[resource_type], resource_type)
+            shard = store.shard_for(tag)
+            keys = [
+                shard.m2o_key(token),
+                shard.o2m_key(original, tag),
+                shard.counter_key(resource_type, TOKEN_FORMATS[resource_type]),
+                shard.stats_key_for(tag),
+            ]
+            assert len({key_slot(key.encode()) for key in keys}) == 1
+
+            client = await shard._get_redis()
+            assert await client.exists(*keys) == 4
+            for other in store.shards:
+                if other is not shard:
+                    other_client = await other._get_redis()
+                    assert await other_client.exists(*keys) == 0
+    finally:
+        await store.clear_all()
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sub_tags_spread_one_type_across_nodes(redis_nodes):
+    """하위 태그면 한 타입의 매핑이 여러 노드에 나뉘고, 각 매핑은 자기 카운터와 같은 슬롯"""
+    store = ShardedMappingStore(redis_nodes, sub_tags=8)
+    try:
+        pairs = [("ec2", f"i-{i:017x}") for i in range(40)]
+        tokens = await store.get_or_create_batch(pairs, TOKEN_FORMATS)
+        assert len(set(tokens)) == len(pairs)
+        assert len({store.ring.node_for(masked_key_tag(token, 8)) for token in tokens}) > 1
+
+        for (_, original), token in zip(pairs, tokens):
+            index = original_sub_index(original, 8)
+            assert (int(token.rsplit("_", 1)[1]) - 1) % 8 == index
+            shard = store.shard_for_masked(token)
+            key_tag = shard.original_key_tag(original, "ec2")
+            keys = [
+                shard.m2o_key(token),
+                shard.o2m_key(original, key_tag),
+                shard.counter_key("ec2", TOKEN_FORMATS["ec2"], index),
+                shard.stats_key_for(key_tag),
+            ]
+            assert len({key_slot(key.encode()) for key in keys}) == 1
+            assert await (await shard._get_redis()).exists(*keys) == 4
+
+        fresh = ShardedMappingStore(redis_nodes, cache_size=0, sub_tags=8)
+        try:
+            assert await fresh.get_or_create_batch(pairs, TOKEN_FORMATS) == tokens
+            expected = {token: original for token, (_, original) in zip(tokens, pairs)}
+            assert await fresh.get_originals_batch(tokens) == expected
+            assert await fresh.get_masked_batch([original for _, original in pairs], "ec2") == {
+                original: token for token, original in expected.items()
+            }
+        finally:
+            await fresh.close()
+
+        stats = await store.get_statistics()
+        assert (stats["total_count"], stats["ec2_count"]) == (40, 40)
+        assert await store.recount_statistics() == stats
+
+        # 카운터 API는 하위 태그 0 몫의 번호 (get-or-create 토큰과 겹치지 않음)
+        numbers = await store.get_next_counters("ec2", 2, TOKEN_FORMATS["ec2"])
+        assert all((number - 1) % 8 == 0 for number in numbers)
+        assert not {TOKEN_FORMATS["ec2"].format(number) for number in numbers} & set(tokens)
+        with pytest.raises(ValueError):
+            await store.reserve_counters({"ec2": 2})
+    finally:
+        await store.clear_all()
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_write_scripts_run_on_cluster_node(tmp_path):
+    """쓰기 스크립트는 태그(슬롯)별로 실행되어 클러스터 노드에서 CROSSSLOT 없이 동작"""
+    if shutil.which("redis-server") is None:
+        pytest.skip("redis-server 실행 파일 없음")
+
+    port = _free_port()
+    server = subprocess.Popen(
+        ["redis-server", "--port", str(port), "--bind", "127.0.0.1", "--save", "", "--appendonly", "no",
+         "--cluster-enabled", "yes", "--cluster-config-file", str(tmp_path / "nodes.conf")],
+        stdout=subprocess.DEVNULL, cwd=tmp_path
+    )
+    try:
+        client = redis.Redis(port=port, decode_responses=True)
+        for _ in range(100):
+            try:
+                client.execute_command("CLUSTER", "ADDSLOTS", *range(16384))
+                break
+            except redis.ConnectionError:
+                time.sleep(0.05)
+        for _ in range(100):
+            if client.cluster("info")["cluster_state"] == "ok":
+                break
+            time.sleep(0.05)
+        client.close()
+
+        store = MappingStore(port=port, db=0, hash_tags=True, cache_size=0, cache_invalidation=False)
+        try:
+            tokens = await store.get_or_create_batch(_pairs(), TOKEN_FORMATS)
+            assert tokens[0] == "AWS_EC2_001" and tokens[-1] == "AWS_EC2_002"
+            assert await store.get_or_create_batch(_pairs(), TOKEN_FORMATS) == tokens
+            await store.save_batch({"AWS_EC2_900": "i-0aaaaaaaaaaaaaaaa", "AWS_VPC_900": "vpc-aaaaaaaa"})
+            assert await store.get_original("AWS_VPC_900") == "vpc-aaaaaaaa"
+        finally:
+            await store.close()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stores_agree(redis_nodes):
+    """여러 워커(저장소)가 동시에 같은 원본을 마스킹해도 토큰은 하나"""
+    stores = [ShardedMappingStore(redis_nodes) for _ in range(4)]
+    try:
+        pairs = [("ec2", f"i-{i:017x}") for i in range(20)] + [("vpc", f"vpc-{i:08x}") for i in range(20)]
+        results = await asyncio.gather(*(
+            store.get_or_create_batch(pairs[offset:] + pairs[:offset], TOKEN_FORMATS)
+            for offset, store in zip((0, 10, 20, 30), stores)
+        ))
+        by_original = [dict(zip((original for _, original in pairs[o:] + pairs[:o]), tokens))
+                       for o, tokens in zip((0, 10, 20, 30), results)]
+        assert all(mapping == by_original[0] for mapping in by_original)
+        assert len(set(by_original[0].values())) == len(pairs)
+    finally:
+        await stores[0].clear_all()
+        for store in stores:
+            await store.close()
+
+
+@pytest.mark.asyncio
+async def test_integrated_masking_with_shards(redis_nodes):
+    """REDIS_SHARDS 구성의 마스킹 → 복원 왕복"""
+    system = IntegratedMaskingSystem(redis_shards=redis_nodes)
+    try:
+        text = "EC2 i-0123456789abcdef0 in vpc-12345678, bucket arn:aws:s3:::my-data-bucket"
+        masked, mappings = await system.mask_text(text)
+        assert "i-0123456789abcdef0" not in masked and "vpc-12345678" not in masked
+        assert await system.unmask_text(masked) == text
+
+        again = IntegratedMaskingSystem(redis_shards=redis_nodes)
+        try:
+            assert (await again.mask_text(text))[0] == masked
+        finally:
+            await again.close()
+    finally:
+        await system.clear_all_mappings()
+        await system.close()
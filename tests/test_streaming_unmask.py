@@ -0,0 +1,231 @@
+"""
+스트리밍 점진적 언마스킹 테스트
+
+- 청크 경계에서 잘린 마스킹 토큰 복원
+- Anthropic 스트리밍 이벤트 변환 (실제 litellm 스트리밍 경로, mock_response 사용)
+- 첫 바이트 지연 측정
+
+Redis 없이 요청 범위 매핑만으로 복원 (모든 토큰이 요청 매핑에 있음)
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.litellm_client import LiteLLMClient
+from claude_litellm_proxy.proxy.stream_unmasker import (
+    StreamUnmasker,
+    format_sse_event,
+    unmask_event_stream,
+)
+
+MAPPINGS = {
+    "AWS_EC2_001": "i-1234567890abcdef0",
+    "AWS_VPC_002": "vpc-12345678",
+    "AWS_S3_BUCKET_001": "my-company-prod-logs",
+    "AWS_LAMBDA_ARN_001": "arn:aws:lambda:us-east-1:123456789012:function:ProcessPayment",
+}
+
+MASKED_RESPONSE = (
+    "Instance AWS_EC2_001 runs in AWS_VPC_002.\n"
+    "Logs go to AWS_S3_BUCKET_001 (AWS_EC2_001), invoked by AWS_LAMBDA_ARN_001. "
+    "Not a token: AWS_, AWSOME, A, AW."
+)
+
+
+@pytest.fixture
+def unmask():
+    """연결 불가능한 Redis 설정 - 요청 매핑 밖 조회가 발생하면 ConnectionError"""
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=1, redis_db=15)
+
+    async def _unmask(text: str) -> str:
+        return await system.unmask_text(text, MAPPINGS)
+
+    return _unmask
+
+
+async def _stream_text(unmask, chunks):
+    unmasker = StreamUnmasker(unmask)
+    parts = [await unmasker.feed(chunk) for chunk in chunks]
+    parts.append(await unmasker.flush())
+    return "".join(parts)
+
+
+@pytest.mark.asyncio
+async def test_split_token_at_every_boundary(unmask):
+    """모든 위치에서 두 청크로 나눠도 전체 언마스킹 결과와 동일"""
+    expected = await unmask(MASKED_RESPONSE)
+    assert "AWS_EC2_001" not in expected
+
+    for split in range(len(MASKED_RESPONSE) + 1):
+        chunks = [MASKED_RESPONSE[:split], MASKED_RESPONSE[split:]]
+        assert await _stream_text(unmask, chunks) == expected, f"split={split}"
+
+
+@pytest.mark.asyncio
+async def test_random_small_chunks(unmask):
+    """1~4글자 단위 청크(토큰 단위 스트리밍)에서도 동일"""
+    expected = await unmask(MASKED_RESPONSE)
+    rng = random.Random(11)
+
+    for _ in range(50):
+        chunks, position = [], 0
+        while position < len(MASKED_RESPONSE):
+            size = rng.randint(1, 4)
+            chunks.append(MASKED_RESPONSE[position:position + size])
+            position += size
+        assert await _stream_text(unmask, chunks) == expected
+
+
+@pytest.mark.asyncio
+async def test_only_token_tail_is_held_back(unmask):
+    """잘린 토큰일 수 있는 꼬리만 보류하고 나머지는 즉시 내보냄"""
+    unmasker = StreamUnmasker(unmask)
+
+    assert await unmasker.feed("Instance AWS_EC") == "Instance "
+    assert unmasker.pending == "AWS_EC"
+    assert await unmasker.feed("2_00") == ""
+    assert await unmasker.feed("1 is up") == "i-1234567890abcdef0 is up"
+    assert unmasker.pending == ""
+
+    # 토큰 접두어가 될 수 있는 끝 글자만 보류
+    assert await unmasker.feed("DONE. A") == "DONE. "
+    assert unmasker.pending == "A"
+    assert await unmasker.feed("ZURE") == "AZURE"
+    assert await unmasker.feed(" HTTP_200") == " HTTP_200"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_unmasking(unmask):
+    """text_delta 이벤트가 점진적으로 언마스킹되고 꼬리는 content_block_stop 전에 방출"""
+
+    async def upstream():
+        yield {"type": "message_start", "message": {"id": "msg_test"}}
+        yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+        for i in range(0, len(MASKED_RESPONSE), 7):
+            yield {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": MASKED_RESPONSE[i:i + 7]},
+            }
+        yield {"type": "content_block_stop", "index": 0}
+        yield {"type": "message_stop"}
+
+    events = [event async for event in unmask_event_stream(upstream(), unmask)]
+    types = [event["type"] for event in events]
+
+    assert types[:2] == ["message_start", "content_block_start"]
+    assert types[-2:] == ["content_block_stop", "message_stop"]
+    text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    assert text == await unmask(MASKED_RESPONSE)
+
+    frame = format_sse_event(events[0])
+    assert frame.startswith("event: message_start\ndata: {") and frame.endswith("\n\n")
+
+
+@pytest.mark.asyncio
+async def test_event_stream_tool_use_input_unmasked(unmask):
+    """input_json_delta는 content_block_stop까지 모아 tool_use 입력 전체를 언마스킹"""
+    tool_input = '{"command": "aws ec2 stop-instances --instance-ids AWS_EC2_001", "vpc": "AWS_VPC_002"}'
+
+    async def upstream():
+        yield {"type": "content_block_start", "index": 1,
+               "content_block": {"type": "tool_use", "id": "toolu_01", "name": "Bash", "input": {}}}
+        for i in range(0, len(tool_input), 5):
+            yield {"type": "content_block_delta", "index": 1,
+                   "delta": {"type": "input_json_delta", "partial_json": tool_input[i:i + 5]}}
+        yield {"type": "content_block_stop", "index": 1}
+
+    events = [event async for event in unmask_event_stream(upstream(), unmask)]
+
+    assert [event["type"] for event in events] == ["content_block_start", "content_block_delta", "content_block_stop"]
+    assert json.loads(events[1]["delta"]["partial_json"]) == {
+        "command": "aws ec2 stop-instances --instance-ids i-1234567890abcdef0",
+        "vpc": "vpc-12345678",
+    }
+
+
+@pytest.mark.asyncio
+async def test_litellm_stream_converted_to_claude_events(unmask):
+    """litellm 스트리밍 청크 → Anthropic 이벤트 순서/내용"""
+    import litellm
+
+    client = LiteLLMClient()
+    chunks = await litellm.acompletion(
+        model="anthropic/claude-3-haiku-20240307",
+        messages=[{"role": "user", "content": "hi"}],
+        mock_response=MASKED_RESPONSE,
+        stream=True,
+    )
+
+    events = [
+        event async for event in unmask_event_stream(
+            client._convert_stream_to_claude_events(chunks, "claude-3-haiku-20240307"), unmask
+        )
+    ]
+    types = [event["type"] for event in events]
+
+    assert types[0] == "message_start"
+    assert events[0]["message"]["model"] == "claude-3-haiku-20240307"
+    assert types[1] == "content_block_start"
+    assert types[-3:] == ["content_block_stop", "message_delta", "message_stop"]
+    assert events[-2]["delta"]["stop_reason"] == "end_turn"
+
+    text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+    assert text == await unmask(MASKED_RESPONSE)
+
+
+@pytest.mark.asyncio
+async def test_first_byte_latency(unmask):
+    """첫 이벤트는 upstream 생성 완료를 기다리지 않고 바로 전달"""
+    delay = 0.02
+    words = MASKED_RESPONSE.split(" ")
+
+    async def slow_upstream():
+        yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+        for i, word in enumerate(words):
+            await asyncio.sleep(delay)
+            yield {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": word + (" " if i < len(words) - 1 else "")},
+            }
+        yield {"type": "content_block_stop", "index": 0}
+
+    start = time.perf_counter()
+    first_text_at = None
+    async for event in unmask_event_stream(slow_upstream(), unmask):
+        if first_text_at is None and event["type"] == "content_block_delta":
+            first_text_at = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    print(f"\n첫 텍스트 {first_text_at * 1000:.1f}ms / 전체 생성 {total * 1000:.1f}ms")
+    assert total >= delay * len(words)
+    # 버퍼링 방식이면 첫 텍스트 = 전체 시간
+    assert first_text_at < delay * 3
+
+
+@pytest.mark.asyncio
+async def test_four_digit_counter_tokens_not_split():
+    """AWS_EC2_1000을 AWS_EC2_100 + "0"으로 자르지 않음 (일반/스트리밍 언마스킹 모두)"""
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    try:
+        await system.mapping_store.save_mapping("AWS_EC2_100", "i-1234567890abcdef0")
+        await system.mapping_store.save_mapping("AWS_EC2_1000", "i-0fedcba9876543210")
+        masked = "AWS_EC2_100 and AWS_EC2_1000, then AWS_EC2_1000."
+        expected = "i-1234567890abcdef0 and i-0fedcba9876543210, then i-0fedcba9876543210."
+
+        # 요청 매핑 / Redis 조회 모두
+        assert await system.unmask_text(masked) == expected
+        assert await system.unmask_text(masked, {"AWS_EC2_100": "i-1234567890abcdef0"}) == expected
+
+        for split in range(len(masked) + 1):
+            chunks = [masked[:split], masked[split:]]
+            assert await _stream_text(system.unmask_text, chunks) == expected, f"split={split}"
+    finally:
+        await system.clear_all_mappings()
+        await system.close()
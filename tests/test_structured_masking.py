@@ -0,0 +1,195 @@
+"""
+구조 인식 요청 마스킹 테스트 (content block / system / tools)
+
+- text / tool_use input / tool_result / system / tools 설명의 문자열 leaf 마스킹
+- image·base64 document·thinking 블록은 그대로 (같은 객체 공유)
+- 원본 요청 변경 없음, 바뀌지 않은 하위 트리는 복사하지 않음
+- 요청 전체 leaf를 get-or-create 스크립트 한 번으로 마스킹
+
+실제 Redis(localhost:6379, db 15) 사용, Mock 사용 안 함
+"""
+
+import copy
+
+import pytest
+
+from claude_litellm_proxy import main
+from claude_litellm_proxy.proxy.content_walker import apply_leaves, collect_content_leaves
+from claude_litellm_proxy.proxy.integrated_masking import IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.message_mask_cache import MessageMaskCache
+
+IMAGE_DATA = "iVBORw0KGgo" + "A" * 4096  # AWS 패턴처럼 보일 수 있는 base64 (디코딩/스캔 안 함)
+
+
+@pytest.fixture
+async def masking_system():
+    """db 15 마스킹 시스템 (테스트 후 정리)"""
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    await system.mapping_store.clear_all()
+    main.masking_system = system
+    main.message_mask_cache = None
+    yield system
+    main.masking_system = None
+    main.message_mask_cache = None
+    await system.mapping_store.clear_all()
+    await system.close()
+
+
+def build_request() -> dict:
+    """Claude Code 형식 요청 (content block 리스트 + system + tools)"""
+    return {
+        "model": "claude-3-5-sonnet-20241022",
+        "system": [{"type": "text", "text": "You manage account 123456789012 resources."}],
+        "tools": [{
+            "name": "Bash",
+            "description": "Runs commands on i-1234567890abcdef0",
+            "input_schema": {"type": "object", "properties": {"command": {"type": "string"}}},
+        }],
+        "messages": [
+            {"role": "user", "content": "plain question without resources"},
+            {"role": "user", "content": [
+                {"type": "text", "text": "Check i-1234567890abcdef0 in vpc-12345678"},
+                {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": IMAGE_DATA}},
+            ]},
+            {"role": "assistant", "content": [
+                {"type": "thinking", "thinking": "vpc-12345678 looks fine", "signature": "sig"},
+                {"type": "tool_use", "id": "toolu_01", "name": "Bash",
+                 "input": {"command": "aws ec2 describe-instances --instance-ids i-1234567890abcdef0",
+                           "env": ["sg-12345678"]}},
+            ]},
+            {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": "toolu_01", "content": [
+                    {"type": "text", "text": "Instance in subnet-0123456789abcdef0"},
+                ]},
+                {"type": "document", "source": {"type": "text", "media_type": "text/plain",
+                                                "data": "bucket my-data-bucket-prod"}},
+                {"type": "document", "source": {"type": "base64", "media_type": "application/pdf",
+                                                "data": IMAGE_DATA}},
+            ]},
+        ],
+    }
+
+
+def test_apply_leaves_copies_only_changed_paths():
+    """바뀐 경로의 컨테이너만 복사, 나머지는 원본 객체 공유"""
+    request = build_request()
+    snapshot = copy.deepcopy(request)
+    leaves = []
+    collect_content_leaves(request["messages"][1]["content"], ("messages", 1, "content"), leaves)
+    assert [path for path, _ in leaves] == [("messages", 1, "content", 0, "text")]
+
+    result = apply_leaves(request, [(("messages", 1, "content", 0, "text"), "masked")])
+    assert request == snapshot
+    assert result["messages"][1]["content"][0]["text"] == "masked"
+    assert result["messages"][1]["content"][1] is request["messages"][1]["content"][1]
+    assert result["messages"][0] is request["messages"][0]
+    assert result["tools"] is request["tools"]
+
+
+@pytest.mark.asyncio
+async def test_structured_request_masking(masking_system):
+    """모든 구조의 문자열 leaf 마스킹, 바이너리/thinking 블록 보존, 원본 요청 불변"""
+    request = build_request()
+    snapshot = copy.deepcopy(request)
+
+    redis_client = await masking_system.mapping_store._get_redis()
+    before = (await redis_client.info("commandstats")).get("cmdstat_evalsha", {}).get("calls", 0)
+    masked, mappings = await main.mask_request_content(request)
+    after = (await redis_client.info("commandstats")).get("cmdstat_evalsha", {}).get("calls", 0)
+
+    assert after - before == 1  # 요청 전체 leaf를 한 번에
+    assert request == snapshot
+
+    originals = set(mappings.values())
+    assert {"123456789012", "i-1234567890abcdef0", "vpc-12345678", "sg-12345678",
+            "subnet-0123456789abcdef0", "my-data-bucket-prod"} <= originals
+
+    messages = masked["messages"]
+    assert "i-1234567890abcdef0" not in messages[1]["content"][0]["text"]
+    assert "i-1234567890abcdef0" not in messages[2]["content"][1]["input"]["command"]
+    assert messages[2]["content"][1]["input"]["env"][0].startswith("AWS_")
+    assert "subnet-" not in messages[3]["content"][0]["content"][0]["text"]
+    assert "my-data-bucket-prod" not in messages[3]["content"][1]["source"]["data"]
+    assert "123456789012" not in masked["system"][0]["text"]
+    assert "i-1234567890abcdef0" not in masked["tools"][0]["description"]
+
+    # 건드리지 않는 블록은 같은 객체
+    assert messages[0] is request["messages"][0]
+    assert messages[1]["content"][1] is request["messages"][1]["content"][1]
+    assert messages[2]["content"][0] is request["messages"][2]["content"][0]
+    assert messages[3]["content"][2] is request["messages"][3]["content"][2]
+    assert masked["tools"][0]["input_schema"] is request["tools"][0]["input_schema"]
+
+    # 같은 원본은 구조 위치와 무관하게 같은 토큰
+    token = next(masked_value for masked_value, original in mappings.items() if original == "i-1234567890abcdef0")
+    assert token in messages[2]["content"][1]["input"]["command"]
+    assert token in masked["tools"][0]["description"]
+
+
+@pytest.mark.asyncio
+async def test_structured_masking_with_message_cache(masking_system):
+    """캐시 재사용 결과 == 전체 마스킹 결과 (system/tools 포함)"""
+    uncached, uncached_mappings = await main.mask_request_content(build_request())
+
+    main.message_mask_cache = MessageMaskCache()
+    first, _ = await main.mask_request_content(build_request())
+    misses = main.message_mask_cache.misses
+    second, second_mappings = await main.mask_request_content(build_request())
+
+    assert main.message_mask_cache.misses == misses
+    assert first == second == uncached
+    assert second_mappings == uncached_mappings
+
+
+@pytest.mark.asyncio
+async def test_tool_schema_structure_preserved(masking_system):
+    """tools는 description만 마스킹, 스키마 키워드/속성 이름/required/enum은 그대로"""
+    schema = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "description": "Target account 123456789012",
+        "properties": {
+            "dbInstanceIdentifier": {"type": "string", "description": "e.g. prod-db in vpc-12345678"},
+            "clusters": {"type": "array", "items": {"type": "string", "enum": ["my-cluster", "analytics-redshift"]}},
+        },
+        "required": ["dbInstanceIdentifier"],
+    }
+    request = {"tools": [{"name": "Rds", "description": "Query i-1234567890abcdef0", "input_schema": schema}],
+               "messages": []}
+    snapshot = copy.deepcopy(schema)
+
+    masked, _ = await main.mask_request_content(request)
+    masked_schema = masked["tools"][0]["input_schema"]
+
+    assert "i-1234567890abcdef0" not in masked["tools"][0]["description"]
+    assert "123456789012" not in masked_schema["description"]
+    assert "vpc-12345678" not in masked_schema["properties"]["dbInstanceIdentifier"]["description"]
+    for keyword in ("$schema", "type", "required"):
+        assert masked_schema[keyword] == snapshot[keyword]
+    assert list(masked_schema["properties"]) == list(snapshot["properties"])
+    assert masked_schema["properties"]["clusters"] is schema["properties"]["clusters"]
+
+
+@pytest.mark.asyncio
+async def test_response_tool_use_input_unmasked(masking_system):
+    """응답 tool_use 블록의 input 문자열도 요청 매핑으로 복원"""
+    masked, mappings = await main.mask_request_content(build_request())
+    token = next(masked_value for masked_value, original in mappings.items() if original == "i-1234567890abcdef0")
+
+    response = {
+        "id": "msg_01",
+        "content": [
+            {"type": "text", "text": f"Describing {token}"},
+            {"type": "tool_use", "id": "toolu_02", "name": "Bash",
+             "input": {"command": f"aws ec2 describe-instances --instance-ids {token}", "dry_run": False,
+                       "targets": [token]}},
+        ],
+    }
+    snapshot = copy.deepcopy(response)
+    unmasked = await main.unmask_response_content(response, mappings)
+
+    assert response == snapshot
+    assert unmasked["content"][0]["text"] == "Describing i-1234567890abcdef0"
+    tool_input = unmasked["content"][1]["input"]
+    assert tool_input == {"command": "aws ec2 describe-instances --instance-ids i-1234567890abcdef0",
+                          "dry_run": False, "targets": ["i-1234567890abcdef0"]}
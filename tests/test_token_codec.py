@@ -0,0 +1,134 @@
+"""
+키 기반 가역 토큰(암호화 토큰 모드) 테스트
+
+- 왕복 복원, 결정성, 기존 토큰 정규식 호환
+- 변조 / 다른 키 / 타입 바꿔치기 토큰은 복원 안 함, 키 교체 후에도 이전 토큰 복원
+- Redis 없이 마스킹/복원 (도달 불가 포트), 토큰 재마스킹 없음, 스트리밍 언마스킹
+- 감사 모드: 매핑이 Redis에 기록됨
+
+실제 Redis(localhost:6379, db 15) 사용, Mock 사용 안 함
+"""
+
+import base64
+import os
+
+import pytest
+
+from claude_litellm_proxy.proxy.integrated_masking import _MASKED_TOKEN_PATTERN, IntegratedMaskingSystem
+from claude_litellm_proxy.proxy.stream_unmasker import StreamUnmasker
+from claude_litellm_proxy.proxy.token_codec import TokenCodec, parse_token_keys
+
+KEY_1 = os.urandom(32)
+KEY_2 = os.urandom(32)
+
+ORIGINALS = [
+    ("AWS_EC2_", "i-1234567890abcdef0"),
+    ("AWS_ACCOUNT_", "123456789012"),
+    ("AWS_IAM_ROLE_", "arn:aws:iam::123456789012:role/" + "Deploy" * 40),
+    ("AWS_S3_BUCKET_", "버킷-my-data-bucket"),
+]
+
+
+def test_round_trip_and_token_shape():
+    """원본 복원, 같은 입력이면 같은 토큰, 토큰 정규식과 전체 일치"""
+    codec = TokenCodec({1: KEY_1})
+    for prefix, original in ORIGINALS:
+        token = codec.encode(prefix, original)
+        assert token.startswith(prefix) and token.endswith("_001")
+        assert _MASKED_TOKEN_PATTERN.fullmatch(token)
+        assert codec.encode(prefix, original) == token
+        assert codec.decode(token) == original
+
+    assert codec.format_token("AWS_API_GW_{:03d}.execute-api.", "abc").endswith("_001.execute-api.")
+
+
+def test_rejects_tampered_and_foreign_tokens():
+    """변조, 다른 키, 타입 바꿔치기, 카운터 토큰은 None"""
+    codec = TokenCodec({1: KEY_1})
+    token = codec.encode("AWS_EC2_", "i-1234567890abcdef0")
+    payload = token[len("AWS_EC2_"):-4]
+
+    flipped = payload[:-1] + ("A" if payload[-1] != "A" else "B")
+    assert codec.decode(f"AWS_EC2_{flipped}_001") is None
+    assert codec.decode(f"AWS_VPC_{payload}_001") is None
+    assert codec.decode(f"AWS_EC2_{payload}_002") is None
+    assert TokenCodec({1: KEY_2}).decode(token) is None
+    assert codec.decode("AWS_EC2_001") is None
+    assert codec.decode("AWS_S3_BUCKET_001") is None
+
+
+def test_key_rotation():
+    """새 키로 토큰을 만들어도 이전 키 토큰은 계속 복원"""
+    old = TokenCodec({1: KEY_1})
+    rotated = TokenCodec({1: KEY_1, 2: KEY_2})
+    assert rotated.active_key_id == 2
+
+    old_token = old.encode("AWS_EC2_", "i-1234567890abcdef0")
+    new_token = rotated.encode("AWS_EC2_", "i-1234567890abcdef0")
+    assert new_token.endswith("_002")
+    assert rotated.decode(old_token) == rotated.decode(new_token) == "i-1234567890abcdef0"
+
+
+def test_parse_token_keys():
+    """MASKING_TOKEN_KEYS 형식 파싱과 검증"""
+    spec = f"1:{base64.b64encode(KEY_1).decode()}, 7:{base64.b64encode(KEY_2).decode()}"
+    assert parse_token_keys(spec) == {1: KEY_1, 7: KEY_2}
+    with pytest.raises(ValueError):
+        parse_token_keys(f"1:{base64.b64encode(b'short').decode()}")
+    with pytest.raises(ValueError):
+        parse_token_keys("x:not-base64")
+    with pytest.raises(ValueError):
+        TokenCodec({})
+
+
+@pytest.mark.asyncio
+async def test_masking_without_redis():
+    """Redis에 연결할 수 없어도 마스킹/복원, 이미 마스킹된 토큰은 다시 마스킹하지 않음"""
+    system = IntegratedMaskingSystem(redis_host="localhost", redis_port=1, token_codec=TokenCodec({1: KEY_1}))
+    text = "Launch i-1234567890abcdef0 in vpc-12345678 for account 123456789012"
+
+    masked, mappings = await system.mask_text(text)
+    assert "i-1234567890abcdef0" not in masked
+    assert len(mappings) == 3
+
+    # 요청 매핑 없이(다음 턴/다른 워커) 복원
+    assert await system.unmask_text(masked) == text
+
+    # 다음 턴에 모델 응답의 토큰이 다시 들어와도 그대로 유지
+    remasked, remappings = await system.mask_text(masked)
+    assert remasked == masked
+    assert remappings == {}
+
+    # 스트리밍: 긴 토큰이 청크 경계에서 잘려도 복원
+    async def unmask(chunk: str) -> str:
+        return await system.unmask_text(chunk)
+
+    unmasker = StreamUnmasker(unmask)
+    pieces = [await unmasker.feed(masked[i:i + 7]) for i in range(0, len(masked), 7)]
+    pieces.append(await unmasker.flush())
+    assert "".join(pieces) == text
+
+    await system.close()
+
+
+@pytest.mark.asyncio
+async def test_audit_mode_records_mappings():
+    """감사 모드는 매핑을 Redis에 기록 (응답 경로에서는 대기하지 않음)"""
+    system = IntegratedMaskingSystem(
+        redis_host="localhost", redis_port=6379, redis_db=15,
+        token_codec=TokenCodec({1: KEY_1}), token_audit=True
+    )
+    await system.mapping_store.clear_all()
+
+    masked, mappings = await system.mask_text("Check i-1234567890abcdef0 now")
+    token = next(iter(mappings))
+    assert token in masked
+
+    await system.close()
+
+    store_system = IntegratedMaskingSystem(redis_host="localhost", redis_port=6379, redis_db=15)
+    assert await store_system.get_original_from_redis(token) == "i-1234567890abcdef0"
+    stats = await store_system.mapping_store.get_statistics()
+    assert stats["ec2_count"] == 1
+    await store_system.mapping_store.clear_all()
+    await store_system.close()
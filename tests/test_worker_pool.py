@@ -0,0 +1,149 @@
+"""
+Claude Code CLI 워커 풀 테스트
+
+실제 subprocess로 로컬 fake CLI(tests/utilities/fake_claude_cli.py)를 실행
+(stream-json 프로토콜 동일, Mock 사용 안 함)
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+from claude_litellm_proxy.sdk.claude_code_client import ClaudeCodeHeadlessClient
+from claude_litellm_proxy.sdk.worker_pool import (
+    ClaudeWorkerPool,
+    CliLauncher,
+    JobOptions,
+    PoolSaturatedError,
+)
+
+FAKE_CLI = os.path.join(os.path.dirname(__file__), "utilities", "fake_claude_cli.py")
+
+# fake CLI 기동 시간
+STARTUP_DELAY = 0.3
+
+
+def _result_event(job):
+    """stdout에서 result 라인 추출"""
+    for line in job.stdout.decode("utf-8").splitlines():
+        event = json.loads(line)
+        if event["type"] == "result":
+            return event
+    raise AssertionError("result 라인 없음")
+
+
+@pytest.fixture
+async def make_pool():
+    """fake CLI 런처를 사용하는 풀 생성 (테스트 후 종료)"""
+    os.environ["FAKE_CLAUDE_STARTUP_DELAY"] = str(STARTUP_DELAY)
+    pools = []
+
+    async def _make(**kwargs):
+        pool = ClaudeWorkerPool(launcher=CliLauncher([sys.executable, FAKE_CLI]), **kwargs)
+        await pool.start()
+        pools.append(pool)
+        return pool
+
+    yield _make
+
+    for pool in pools:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_worker_skips_startup(make_pool):
+    """warm 워커는 기동 시간이 실행 시간에 포함되지 않음"""
+    pool = await make_pool(size=1)
+    await asyncio.sleep(STARTUP_DELAY + 0.2)  # 미리 띄운 워커 기동 완료 대기
+
+    warm = await pool.run("hello")
+    assert warm.return_code == 0
+    assert _result_event(warm)["result"] == "echo: hello"
+    assert warm.timing.warm and warm.timing.spawn == 0.0
+    assert warm.timing.execute < STARTUP_DELAY
+
+    # 다른 옵션은 즉석 워커 → 기동 시간이 실행 시간에 포함
+    cold = await pool.run("hello", JobOptions(allowed_tools=("Read",)))
+    assert not cold.timing.warm and cold.timing.spawn > 0
+    assert cold.timing.execute >= STARTUP_DELAY
+    init = json.loads(cold.stdout.decode("utf-8").splitlines()[0])
+    assert init["args"][init["args"].index("--allowedTools") + 1] == "Read"
+    print(f"\nwarm {warm.timing.to_dict()} / cold {cold.timing.to_dict()}")
+
+
+@pytest.mark.asyncio
+async def test_worker_recycled_after_max_jobs(make_pool):
+    """max_jobs_per_worker개 job 후 새 프로세스로 교체"""
+    pool = await make_pool(size=1, max_jobs_per_worker=2)
+
+    pids = []
+    for i in range(5):
+        job = await pool.run(f"job {i}")
+        pids.append(_result_event(job)["pid"])
+
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    stats = pool.get_statistics()
+    assert stats["jobs"] == 5
+    assert stats["recycled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_single_job_workers_are_not_reused(make_pool):
+    """기본값(1 job/워커)은 job마다 다른 프로세스 - 대화 문맥 공유 없음"""
+    pool = await make_pool(size=2)
+
+    results = await asyncio.gather(*[pool.run(f"q{i}") for i in range(4)])
+    pids = [_result_event(job)["pid"] for job in results]
+    assert len(set(pids)) == 4
+    assert all(_result_event(job)["job"] == 1 for job in results)
+
+
+@pytest.mark.asyncio
+async def test_admission_control(make_pool):
+    """워커가 모두 사용 중이고 대기열이 가득 차면 즉시 거절"""
+    pool = await make_pool(size=1, max_queue=1)
+
+    running = asyncio.create_task(pool.run("SLEEP:0.5"))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(pool.run("queued"))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(PoolSaturatedError):
+        await pool.run("rejected")
+
+    first, second = await asyncio.gather(running, queued)
+    assert first.return_code == 0
+    assert second.timing.queue_wait > 0.2
+    assert pool.get_statistics()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_job_reports_exit_code(make_pool):
+    """CLI 실패 시 종료 코드/stderr 전달 후 풀은 계속 동작"""
+    pool = await make_pool(size=1, max_jobs_per_worker=3)
+
+    failed = await pool.run("FAIL")
+    assert failed.return_code == 3
+    assert b"fake cli failure" in failed.stderr
+
+    ok = await pool.run("after failure")
+    assert ok.return_code == 0
+
+
+@pytest.mark.asyncio
+async def test_headless_client_uses_pool(make_pool):
+    """ClaudeCodeHeadlessClient가 풀을 통해 실행하고 시간 측정을 반환"""
+    pool = await make_pool(size=1, options=JobOptions(allowed_tools=("Read", "Write", "Bash")))
+    client = ClaudeCodeHeadlessClient(worker_pool=pool)
+
+    result = await client.query_headless("analyze", allowed_tools=["Read", "Write", "Bash"])
+
+    assert result["content"][0]["text"] == "echo: analyze"
+    assert result["timing"]["warm"] is True
+    assert set(result["timing"]) == {"queue_wait_ms", "spawn_ms", "execute_ms", "warm"}
+
+    with pytest.raises(RuntimeError):
+        await client.query_headless("FAIL", allowed_tools=["Read", "Write", "Bash"])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+테스트용 fake Claude Code CLI
+
+실제 `claude -p --input-format stream-json --output-format stream-json`과 같은
+stdin/stdout 프로토콜을 흉내냄 (네트워크/API 키 불필요)
+
+- 시작 시 FAKE_CLAUDE_STARTUP_DELAY 초 대기 (Node/CLI 기동 시간 모사, 기본 0.3초)
+- --input-format 있으면 stdin의 user 메시지 한 줄마다 응답, stdin EOF → 종료
+- 없으면 `-p <프롬프트>` 인자 하나에 응답 후 종료
+- 응답: system/assistant/result 라인 출력
+- 프롬프트 "FAIL" → stderr 출력 후 종료 코드 3
+- 프롬프트 "SLEEP:<초>" → 해당 시간 대기 후 응답
+- 프롬프트 "STREAM:<개수>:<간격>:<텍스트>" → assistant 이벤트를 간격마다 하나씩 출력
+- 프롬프트 "BIG:<바이트>" → 해당 크기의 assistant 라인 출력
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def emit(event):
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def respond(prompt, jobs):
+    """프롬프트 하나에 대한 stream-json 응답 출력"""
+    if prompt == "FAIL":
+        sys.stderr.write("fake cli failure\n")
+        sys.stderr.flush()
+        sys.exit(3)
+
+    if prompt.startswith("SLEEP:"):
+        time.sleep(float(prompt.split(":", 1)[1]))
+
+    emit({"type": "system", "subtype": "init", "pid": os.getpid(), "args": sys.argv[1:]})
+
+    if prompt.startswith("STREAM:"):
+        _, count, interval, body = prompt.split(":", 3)
+        for i in range(int(count)):
+            time.sleep(float(interval))
+            emit({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": f"{i}: {body}"}]}})
+        text = f"streamed {count}"
+    elif prompt.startswith("BIG:"):
+        emit({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": "x" * int(prompt[4:])}]}})
+        text = "big done"
+    else:
+        text = f"echo: {prompt}"
+        emit({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": text}]}})
+
+    emit({
+        "type": "result",
+        "subtype": "success",
+        "is_error": False,
+        "result": text,
+        "content": [{"type": "text", "text": text}],
+        "pid": os.getpid(),
+        "job": jobs,
+    })
+
+
+def main():
+    time.sleep(float(os.getenv("FAKE_CLAUDE_STARTUP_DELAY", "0.3")))
+
+    if "--input-format" not in sys.argv:
+        respond(sys.argv[sys.argv.index("-p") + 1], 1)
+        return
+
+    jobs = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        message = json.loads(line)
+        prompt = "".join(
+            block.get("text", "") for block in message["message"]["content"]
+        )
+        jobs += 1
+        respond(prompt, jobs)
+
+
+if __name__ == "__main__":
+    main()